@@ -4,6 +4,7 @@ from typing import Dict, Any
 from config import SearchableObject, LINEARISED_FIELD
 import json
 from ProvenaInterfaces.RegistryModels import *
+from ProvenaInterfaces.SearchAPI import SEARCH_PROJECTION_FIELD, SEARCH_STRUCTURED_FIELD, SearchResultProjection, StructuredSearchFields, build_search_projection, build_structured_fields
 
 
 def get_index_endpoint(search_domain_name: str, search_index: str) -> str:
@@ -55,7 +56,7 @@ def delete_document_from_index(url: str, awsauth: Any, id: str, event_id: str, e
     return True
 
 
-def lodge_document_into_index(url: str, awsauth: Any, id: str, event_id: str, object: Dict[str, str], error_ids: List[str]) -> bool:
+def lodge_document_into_index(url: str, awsauth: Any, id: str, event_id: str, object: Dict[str, Any], error_ids: List[str]) -> bool:
     try:
         response = requests.put(url + id, auth=awsauth,
                                 json=object, headers=headers)
@@ -89,10 +90,19 @@ def fail_with_error(id: str, message: str, error_ids: List[str]) -> None:
     error_ids.append(id)
 
 
-def linearise_search_object(object: Dict[str, str]) -> Dict[str, str]:
+def linearise_search_object(object: Dict[str, str], projection: Optional[SearchResultProjection] = None, structured: Optional[StructuredSearchFields] = None) -> Dict[str, Any]:
     # retains item subtype if present
     output = " ".join(object.values())
-    return {LINEARISED_FIELD: output, "item_subtype": object.get("item_subtype") or "", "id": object.get("id") or ""}
+    linearised: Dict[str, Any] = {LINEARISED_FIELD: output, "item_subtype": object.get(
+        "item_subtype") or "", "id": object.get("id") or ""}
+    # store the compact projection so hydrated searches can render results
+    # without fetching from the registry
+    if projection is not None:
+        linearised[SEARCH_PROJECTION_FIELD] = projection.dict()
+    # typed fields used for filtering and facets
+    if structured is not None:
+        linearised[SEARCH_STRUCTURED_FIELD] = structured.dict()
+    return linearised
 
 
 def modified_handler(awsauth: Any, records: List[Dict[str, Any]], record_id_field: str, index_name: str, search_service_endpoint: str, item_type: SearchableObject) -> None:
@@ -151,6 +161,10 @@ def modified_handler(awsauth: Any, records: List[Dict[str, Any]], record_id_fiel
 
         # ready to pull out search object
         search_object: Dict[str, str] = {}
+        projection: Optional[SearchResultProjection] = None
+        structured: Optional[StructuredSearchFields] = None
+        # the fully parsed item (not present for seed items)
+        parsed_item: Optional[BaseModel] = None
 
         # now parse as the desired object type
         if item_type == SearchableObject.REGISTRY_ITEM:
@@ -225,6 +239,7 @@ def modified_handler(awsauth: Any, records: List[Dict[str, Any]], record_id_fiel
                 # get the searchable object
                 try:
                     search_object = full_item.get_search_ready_object()
+                    parsed_item = full_item
                 except Exception as e:
                     fail_with_error(
                         id=id,
@@ -242,6 +257,22 @@ def modified_handler(awsauth: Any, records: List[Dict[str, Any]], record_id_fiel
                 index_fail_count += 1
                 continue
 
+            # build the compact projection used by hydrated searches and the
+            # typed fields used by filtered searches
+            try:
+                projection = build_search_projection(
+                    record_info=record_info,
+                    search_object=search_object
+                )
+                structured = build_structured_fields(
+                    record_info=record_info,
+                    item=parsed_item
+                )
+            except Exception as e:
+                # the projection is an optimisation - still index the item
+                log.warning(
+                    f"Failed to build search projection or structured fields for item with {id = }, indexing without them. Error {e}.")
+
             # lodge the search object
             log.debug("Parsed searchable item - ready to lodge")
             try:
@@ -253,7 +284,8 @@ def modified_handler(awsauth: Any, records: List[Dict[str, Any]], record_id_fiel
         elif item_type == SearchableObject.DATA_STORE_ITEM:
             print("Cannot index dataset! Deprecated")
 
-        linearised = linearise_search_object(object=search_object)
+        linearised = linearise_search_object(
+            object=search_object, projection=projection, structured=structured)
         # lodge the item
         success = lodge_document_into_index(
             id=sanitized_id,
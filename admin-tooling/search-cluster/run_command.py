@@ -7,6 +7,7 @@ from helpers.get_aws_auth import get_auth
 from ToolingEnvironmentManager.Management import EnvironmentManager, process_params
 from enum import Enum
 from rich import print
+from ProvenaInterfaces.SearchAPI import SEARCH_PROJECTION_FIELD, SEARCH_STRUCTURED_FIELD
 
 # disabled to prevent entire json input content from being
 # output resulting in error messages being lost in terminal.
@@ -253,6 +254,25 @@ def create_body_field_ngram_registry_index(
                 LINEARISED_FIELD: {
                     "type": "text",
                     "analyzer": "autocomplete"
+                },
+                # returned with hits but never searched (see setup_ngram.json)
+                SEARCH_PROJECTION_FIELD: {
+                    "type": "object",
+                    "enabled": False
+                },
+                # typed fields for filters and facets (see setup_ngram.json)
+                SEARCH_STRUCTURED_FIELD: {
+                    "properties": {
+                        "item_category": {"type": "keyword"},
+                        "item_subtype": {"type": "keyword"},
+                        "record_type": {"type": "keyword"},
+                        "owner_username": {"type": "keyword"},
+                        "created_timestamp": {"type": "date", "format": "epoch_second"},
+                        "updated_timestamp": {"type": "date", "format": "epoch_second"},
+                        "dataset_template_ids": {"type": "keyword"},
+                        "workflow_template_ids": {"type": "keyword"},
+                        "study_ids": {"type": "keyword"}
+                    }
                 }
             }
         },
@@ -1,6 +1,10 @@
 from pydantic import BaseSettings
+from typing import Optional
 
 
 class Settings(BaseSettings):
     # Job status table name
     table_name: str
+
+    # Batch counter table name
+    batch_table_name: Optional[str] = None
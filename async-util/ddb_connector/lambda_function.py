@@ -2,8 +2,19 @@ from typing import Any, Dict, List, Optional
 from ProvenaInterfaces.AsyncJobModels import *
 from config import Settings
 import json
+import random
+import threading
+import time
 import boto3  # type: ignore
 
+# Attempts at writing a batch job before giving up - the counter update
+# conflicts with concurrent updates of the same batch
+MAX_TRANSACTION_ATTEMPTS = 5
+
+# Table handles are created once per (lambda container) thread and reused
+# across invocations - resources are not thread safe
+_thread_local = threading.local()
+
 
 def extract_sns_payloads(event: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -84,31 +95,98 @@ def py_to_dict(model: BaseModel) -> Dict[str, Any]:
 
 
 def setup_boto_table(settings: Settings) -> Any:
-    # create boto resources
-    dynamodb_resource = boto3.resource(
-        "dynamodb", region_name="ap-southeast-2")
-    return dynamodb_resource.Table(settings.table_name)
-
-
-def write_record(entry: JobStatusTable, table: Any) -> None:
+    tables: Optional[Dict[str, Any]] = getattr(_thread_local, "tables", None)
+    if tables is None:
+        tables = {}
+        _thread_local.tables = tables
+    table = tables.get(settings.table_name)
+    if table is None:
+        # create boto resources
+        dynamodb_resource = boto3.resource(
+            "dynamodb", region_name="ap-southeast-2")
+        table = dynamodb_resource.Table(settings.table_name)
+        tables[settings.table_name] = table
+    return table
+
+
+def batch_counter_update(entry: JobStatusTable, batch_table_name: str) -> Dict[str, Any]:
+    # Counts a new job in its batch - the counter entry is created by the first
+    # job in the batch
+    assert entry.batch_id is not None
+    return {
+        "TableName": batch_table_name,
+        "Key": {"batch_id": entry.batch_id},
+        "UpdateExpression": "SET #username = if_not_exists(#username, :username) ADD #total :one, #status :one",
+        "ExpressionAttributeNames": {
+            "#username": "username",
+            "#total": "total",
+            "#status": BATCH_COUNTER_FIELD_MAP[entry.status],
+        },
+        "ExpressionAttributeValues": {":username": entry.username, ":one": 1},
+    }
+
+
+def write_record(entry: JobStatusTable, table: Any, batch_table_name: Optional[str] = None) -> None:
     """
 
-    Writes an entry to the job status table
+    Writes an entry to the job status table. Batch jobs are counted in the
+    batch counter table in the same transaction.
 
     Args:
         entry (JobStatusTable): entry
         table (Any): ddb table
+        batch_table_name (Optional[str], optional): batch counter table. Defaults to None.
     """
     payload = py_to_dict(entry)
 
-    # Store the item in DynamoDB
+    # Store the item in DynamoDB - only if the entry doesn't already exist. The
+    # job API writes the entry up front for batch launches, and a worker may
+    # already have progressed the job, so never overwrite.
     try:
-        table.put_item(Item=payload)
+        if entry.batch_id is not None and batch_table_name is not None:
+            write_batch_record(entry=entry, payload=payload, table=table,
+                               batch_table_name=batch_table_name)
+        else:
+            table.put_item(
+                Item=payload,
+                ConditionExpression="attribute_not_exists(session_id)"
+            )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(
+            f"Job status entry already exists for session id: {entry.session_id}. Not overwriting.")
     except Exception as e:
         print(
             f"Failed to write item to job status table! Session id: {entry.session_id}. Error: {e}.")
 
 
+def write_batch_record(entry: JobStatusTable, payload: Dict[str, Any], table: Any, batch_table_name: str) -> None:
+    # Writes the entry and counts it in the batch in one transaction. The
+    # transaction is cancelled if the entry exists or if it conflicts with
+    # another update of the batch counters (which is retried).
+    for attempt in range(MAX_TRANSACTION_ATTEMPTS):
+        try:
+            table.meta.client.transact_write_items(TransactItems=[
+                {"Put": {
+                    "TableName": table.name,
+                    "Item": payload,
+                    "ConditionExpression": "attribute_not_exists(session_id)"
+                }},
+                {"Update": batch_counter_update(
+                    entry=entry, batch_table_name=batch_table_name)}
+            ])
+            return
+        except table.meta.client.exceptions.TransactionCanceledException as e:
+            if 'Item' in table.get_item(Key={"session_id": entry.session_id}, ProjectionExpression="session_id"):
+                print(
+                    f"Job status entry already exists for session id: {entry.session_id}. Not overwriting.")
+                return
+            print(
+                f"Batch counter update conflicted, retrying. Session id: {entry.session_id}. Error: {e}.")
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+    raise Exception(
+        f"Failed to write batch job after {MAX_TRANSACTION_ATTEMPTS} attempts.")
+
+
 def convert_to_status(job: JobSnsPayload) -> JobStatusTable:
     """
 
@@ -130,6 +208,7 @@ def convert_to_status(job: JobSnsPayload) -> JobStatusTable:
         job_type=job.job_type,
         job_sub_type=job.job_sub_type,
         created_timestamp=job.created_timestamp,
+        priority=job.priority,
         status=JobStatus.PENDING,
         payload=job.payload,
         info=None
@@ -152,7 +231,8 @@ def write_payloads(jobs: List[JobSnsPayload], settings: Settings) -> None:
     for j in jobs:
         print(f"Writing record with session id = {j.session_id}")
         status = convert_to_status(j)
-        write_record(entry=status, table=table)
+        write_record(entry=status, table=table,
+                     batch_table_name=settings.batch_table_name)
 
 
 def handler(event: Dict[str, Any], context: Any) -> None:
@@ -1,8 +1,66 @@
 import boto3  # type: ignore
+from botocore.exceptions import ClientError  # type: ignore
 from pydantic import BaseModel
 from typing import Dict, Optional
 from ProvenaInterfaces.AsyncJobModels import *
+from enum import Enum
 import json
+import random
+import threading
+import time
+
+# boto3 sessions are not thread safe - each job worker thread uses its own
+_thread_local = threading.local()
+
+# DynamoDB limit on items in a single transaction
+MAX_TRANSACTION_ITEMS = 100
+
+# Jobs per coalesced write - leaves room for a counter update per batch
+MAX_COALESCED_JOBS = 50
+
+# Attempts at a batch job transition - transactions updating the same batch
+# counters conflict with each other
+MAX_TRANSITION_ATTEMPTS = 5
+
+# The statuses a job may be in when moving to a given status. Terminal
+# statuses are never overwritten, so a redelivered or duplicated message
+# cannot regress a finished job. IN_PROGRESS is allowed before DEQUEUED so
+# that a message which becomes visible again after a failed lifecycle can be
+# picked up.
+ALLOWED_PREVIOUS_STATUSES: Dict[JobStatus, List[JobStatus]] = {
+    JobStatus.DEQUEUED: [JobStatus.PENDING, JobStatus.DEQUEUED, JobStatus.IN_PROGRESS],
+    JobStatus.IN_PROGRESS: [JobStatus.PENDING, JobStatus.DEQUEUED, JobStatus.IN_PROGRESS],
+    JobStatus.SUCCEEDED: [JobStatus.PENDING, JobStatus.DEQUEUED, JobStatus.IN_PROGRESS],
+    JobStatus.FAILED: [JobStatus.PENDING, JobStatus.DEQUEUED, JobStatus.IN_PROGRESS],
+}
+
+
+# The status a job is normally in when moving to a given status - batch job
+# transitions are conditional on an exact previous status so that the batch
+# counters can be moved with them
+EXPECTED_PREVIOUS_STATUS: Dict[JobStatus, JobStatus] = {
+    JobStatus.DEQUEUED: JobStatus.PENDING,
+    JobStatus.IN_PROGRESS: JobStatus.DEQUEUED,
+    JobStatus.SUCCEEDED: JobStatus.IN_PROGRESS,
+    JobStatus.FAILED: JobStatus.IN_PROGRESS,
+}
+
+
+class StatusWriteOutcome(str, Enum):
+    # The status was written
+    APPLIED = "APPLIED"
+    # The entry exists but was not in an allowed previous status
+    REJECTED = "REJECTED"
+    # The write failed
+    ERROR = "ERROR"
+
+
+def get_session() -> Any:
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = boto3.session.Session()
+        _thread_local.session = session
+    return session
 
 
 def py_to_dict(model: BaseModel) -> Dict[str, Any]:
@@ -11,10 +69,19 @@ def py_to_dict(model: BaseModel) -> Dict[str, Any]:
 
 
 def setup_boto_table(table_name: str) -> Any:
-    # create boto resources
-    dynamodb_resource = boto3.resource(
-        "dynamodb", region_name="ap-southeast-2")
-    return dynamodb_resource.Table(table_name)
+    # table handles are cached per thread (alongside the session) rather than
+    # creating a resource for every write
+    tables: Optional[Dict[str, Any]] = getattr(_thread_local, "tables", None)
+    if tables is None:
+        tables = {}
+        _thread_local.tables = tables
+    table = tables.get(table_name)
+    if table is None:
+        dynamodb_resource = get_session().resource(
+            "dynamodb", region_name="ap-southeast-2")
+        table = dynamodb_resource.Table(table_name)
+        tables[table_name] = table
+    return table
 
 
 def write_record(entry: JobStatusTable, table: Any) -> None:
@@ -39,6 +106,7 @@ def convert_to_status(job: JobSnsPayload, status: JobStatus, info: Optional[str]
         job_type=job.job_type,
         job_sub_type=job.job_sub_type,
         created_timestamp=job.created_timestamp,
+        priority=job.priority,
         status=status,
         payload=job.payload,
         info=info,
@@ -46,9 +114,302 @@ def convert_to_status(job: JobSnsPayload, status: JobStatus, info: Optional[str]
     )
 
 
-def update_job_status_table(job_sns_payload: JobSnsPayload, status: JobStatus, table_name: str, info: Optional[str] = None, result: Optional[Dict[str, Any]] = None) -> None:
+def status_update_params(session_id: str, status: JobStatus, info: Optional[str], result: Optional[Dict[str, Any]], previous: Optional[List[JobStatus]] = None) -> Dict[str, Any]:
+    """
+
+    Builds the UpdateItem parameters for a status transition. Only the status,
+    info and result are written, conditional on the entry being in one of the
+    previous statuses.
+
+    Args:
+        session_id (str): The session id (partition key)
+        status (JobStatus): The new status
+        info (Optional[str]): The info, removed if None
+        result (Optional[Dict[str, Any]]): The result, removed if None
+        previous (Optional[List[JobStatus]], optional): The statuses the entry may be in. Defaults to all allowed previous statuses.
+
+    Returns:
+        Dict[str, Any]: The update parameters (without the table name)
+    """
+    if previous is None:
+        previous = ALLOWED_PREVIOUS_STATUSES[status]
+    names: Dict[str, str] = {
+        "#status": "status", "#info": "info", "#result": "result"}
+    values: Dict[str, Any] = {":status": status.value}
+    previous_keys: List[str] = []
+    for i, previous_status in enumerate(previous):
+        key = f":previous{i}"
+        values[key] = previous_status.value
+        previous_keys.append(key)
+
+    set_clauses = ["#status = :status"]
+    remove_clauses: List[str] = []
+    if info is not None:
+        set_clauses.append("#info = :info")
+        values[":info"] = info
+    else:
+        remove_clauses.append("#info")
+    if result is not None:
+        set_clauses.append("#result = :result")
+        # round trip for dynamo safe types
+        values[":result"] = json.loads(json.dumps(result))
+    else:
+        remove_clauses.append("#result")
+
+    expression = "SET " + ", ".join(set_clauses)
+    if len(remove_clauses) > 0:
+        expression += " REMOVE " + ", ".join(remove_clauses)
+
+    return {
+        "Key": {"session_id": session_id},
+        "UpdateExpression": expression,
+        "ConditionExpression": f"#status IN ({', '.join(previous_keys)})",
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def counter_update_params(batch_id: str, username: str, deltas: Dict[JobStatus, int], added: int = 0) -> Dict[str, Any]:
+    """
+
+    Builds the UpdateItem parameters which move the batch counters. The
+    counter entry is created by the first update of the batch.
+
+    Args:
+        batch_id (str): The batch id (partition key)
+        username (str): The batch owner
+        deltas (Dict[JobStatus, int]): The change in count of each status
+        added (int, optional): Jobs added to the batch. Defaults to 0.
+
+    Returns:
+        Dict[str, Any]: The update parameters (without the table name)
+    """
+    names: Dict[str, str] = {"#username": "username"}
+    values: Dict[str, Any] = {":username": username}
+    add_clauses: List[str] = []
+    if added != 0:
+        names["#total"] = "total"
+        values[":total"] = added
+        add_clauses.append("#total :total")
+    for status, delta in deltas.items():
+        if delta == 0:
+            continue
+        field = BATCH_COUNTER_FIELD_MAP[status]
+        names[f"#{field}"] = field
+        values[f":{field}"] = delta
+        add_clauses.append(f"#{field} :{field}")
+
+    expression = "SET #username = if_not_exists(#username, :username)"
+    if len(add_clauses) > 0:
+        expression += " ADD " + ", ".join(add_clauses)
+
+    return {
+        "Key": {"batch_id": batch_id},
+        "UpdateExpression": expression,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }
+
+
+def write_missing_record(entry: JobStatusTable, table: Any) -> bool:
+    # Writes the full entry only if none exists - used when a worker sees a job
+    # before the initial PENDING entry has been written
+    try:
+        table.put_item(Item=py_to_dict(entry),
+                       ConditionExpression="attribute_not_exists(session_id)")
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+
+def read_current_status(session_id: str, table: Any) -> Optional[JobStatus]:
+    item = table.get_item(Key={"session_id": session_id}, ProjectionExpression="#status",
+                          ExpressionAttributeNames={"#status": "status"}).get('Item')
+    if item is None:
+        return None
+    return JobStatus(item['status'])
+
+
+def transition_batch_job_status(job_sns_payload: JobSnsPayload, status: JobStatus, table: Any, batch_table_name: str, info: Optional[str], result: Optional[Dict[str, Any]]) -> StatusWriteOutcome:
+    """
+
+    Moves a batch job to the given status and moves the batch counters in the
+    same transaction. The transition is conditional on the exact previous
+    status (so the right counter is decremented) - if the job is in a
+    different allowed status the transition is retried from that status.
+    Conflicting updates of the batch counters are retried with backoff.
+
+    Args:
+        job_sns_payload (JobSnsPayload): The job (with a batch id)
+        status (JobStatus): The new status
+        table (Any): The status table
+        batch_table_name (str): The batch counter table name
+        info (Optional[str]): Status info
+        result (Optional[Dict[str, Any]]): Job result
+
+    Returns:
+        StatusWriteOutcome: Whether the transition was applied
+    """
+    assert job_sns_payload.batch_id is not None
+    session_id = job_sns_payload.session_id
+    client = table.meta.client
+    previous: Optional[JobStatus] = EXPECTED_PREVIOUS_STATUS[status]
+
+    for attempt in range(MAX_TRANSITION_ATTEMPTS):
+        if previous is None:
+            # no entry yet - write the full entry and count it in the batch
+            items = [
+                {"Put": {
+                    "TableName": table.name,
+                    "Item": py_to_dict(convert_to_status(job=job_sns_payload, status=status, info=info, result=result)),
+                    "ConditionExpression": "attribute_not_exists(session_id)"
+                }},
+                {"Update": {"TableName": batch_table_name, **counter_update_params(
+                    batch_id=job_sns_payload.batch_id, username=job_sns_payload.username, deltas={status: 1}, added=1)}}
+            ]
+        else:
+            items = [{"Update": {"TableName": table.name, **status_update_params(
+                session_id=session_id, status=status, info=info, result=result, previous=[previous])}}]
+            if previous != status:
+                items.append({"Update": {"TableName": batch_table_name, **counter_update_params(
+                    batch_id=job_sns_payload.batch_id, username=job_sns_payload.username, deltas={previous: -1, status: 1})}})
+
+        try:
+            client.transact_write_items(TransactItems=items)
+            return StatusWriteOutcome.APPLIED
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'TransactionCanceledException':
+                raise
+
+        # work out why - a different status, a missing entry or a conflict
+        current = read_current_status(session_id=session_id, table=table)
+        if current is not None and current not in ALLOWED_PREVIOUS_STATUSES[status]:
+            print(
+                f"Not moving job {session_id} to status {status} as it is not in one of {[s.value for s in ALLOWED_PREVIOUS_STATUSES[status]]}.")
+            return StatusWriteOutcome.REJECTED
+        if current == previous:
+            # conflicted with a concurrent update of the batch counters
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        previous = current
+
+    raise Exception(
+        f"Failed to move job to status {status} after {MAX_TRANSITION_ATTEMPTS} attempts.")
+
+
+def transition_job_status(job_sns_payload: JobSnsPayload, status: JobStatus, table_name: str, info: Optional[str] = None, result: Optional[Dict[str, Any]] = None, batch_table_name: Optional[str] = None) -> StatusWriteOutcome:
+    """
+
+    Moves a job to the given status with a partial, conditional update. If
+    the entry does not exist yet the full entry is written instead. Batch jobs
+    also move the batch counters when a batch table is provided.
+
+    Args:
+        job_sns_payload (JobSnsPayload): The job
+        status (JobStatus): The new status
+        table_name (str): The status table name
+        info (Optional[str], optional): Status info. Defaults to None.
+        result (Optional[Dict[str, Any]], optional): Job result. Defaults to None.
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Returns:
+        StatusWriteOutcome: Whether the transition was applied
+    """
+    session_id = job_sns_payload.session_id
+    print(f"Moving job {session_id} to status {status}.")
+    try:
+        table = setup_boto_table(table_name=table_name)
+        if job_sns_payload.batch_id is not None and batch_table_name is not None:
+            return transition_batch_job_status(job_sns_payload=job_sns_payload, status=status, table=table, batch_table_name=batch_table_name, info=info, result=result)
+
+        try:
+            table.update_item(**status_update_params(
+                session_id=session_id, status=status, info=info, result=result))
+            return StatusWriteOutcome.APPLIED
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+        # either missing or in a status which can't move to this one
+        if write_missing_record(entry=convert_to_status(job=job_sns_payload, status=status, info=info, result=result), table=table):
+            return StatusWriteOutcome.APPLIED
+        print(
+            f"Not moving job {session_id} to status {status} as it is not in one of {[s.value for s in ALLOWED_PREVIOUS_STATUSES[status]]}.")
+        return StatusWriteOutcome.REJECTED
+    except Exception as e:
+        print(
+            f"Failed to write item to job status table! Session id: {session_id}. Error: {e}.")
+        return StatusWriteOutcome.ERROR
+
+
+def coalesced_transition_items(jobs: List[JobSnsPayload], status: JobStatus, table_name: str, batch_table_name: Optional[str], info: Optional[str]) -> List[Dict[str, Any]]:
+    # Batch jobs are conditional on the expected previous status and the
+    # counter changes are summed into one update per batch
+    items: List[Dict[str, Any]] = []
+    batch_moves: Dict[str, int] = {}
+    batch_owners: Dict[str, str] = {}
+    expected = EXPECTED_PREVIOUS_STATUS[status]
+    for job in jobs:
+        counted = job.batch_id is not None and batch_table_name is not None
+        items.append({"Update": {"TableName": table_name, **status_update_params(
+            session_id=job.session_id, status=status, info=info, result=None, previous=[expected] if counted else None)}})
+        if counted:
+            assert job.batch_id is not None
+            batch_moves[job.batch_id] = batch_moves.get(job.batch_id, 0) + 1
+            batch_owners[job.batch_id] = job.username
+    for batch_id, moved in batch_moves.items():
+        items.append({"Update": {"TableName": batch_table_name, **counter_update_params(
+            batch_id=batch_id, username=batch_owners[batch_id], deltas={expected: -moved, status: moved})}})
+    return items
+
+
+def transition_job_statuses(jobs: List[JobSnsPayload], status: JobStatus, table_name: str, info: Optional[str] = None, batch_table_name: Optional[str] = None) -> Dict[str, StatusWriteOutcome]:
+    """
+
+    Moves several jobs to the same status, coalescing the updates (and the
+    batch counter changes) into a single transactional write. If the
+    transaction is cancelled (e.g. a job has already finished or has no entry
+    yet) each job is moved individually instead.
+
+    Args:
+        jobs (List[JobSnsPayload]): The jobs
+        status (JobStatus): The new status
+        table_name (str): The status table name
+        info (Optional[str], optional): Status info. Defaults to None.
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Returns:
+        Dict[str, StatusWriteOutcome]: Outcome by session id
+    """
+    outcomes: Dict[str, StatusWriteOutcome] = {}
+    if len(jobs) == 0:
+        return outcomes
+    if len(jobs) == 1:
+        job = jobs[0]
+        outcomes[job.session_id] = transition_job_status(
+            job_sns_payload=job, status=status, table_name=table_name, info=info, batch_table_name=batch_table_name)
+        return outcomes
+
+    for start in range(0, len(jobs), MAX_COALESCED_JOBS):
+        chunk = jobs[start:start + MAX_COALESCED_JOBS]
+        print(f"Moving {len(chunk)} jobs to status {status} in one write.")
+        try:
+            table = setup_boto_table(table_name=table_name)
+            table.meta.client.transact_write_items(TransactItems=coalesced_transition_items(
+                jobs=chunk, status=status, table_name=table_name, batch_table_name=batch_table_name, info=info))
+            for job in chunk:
+                outcomes[job.session_id] = StatusWriteOutcome.APPLIED
+        except Exception as e:
+            print(
+                f"Coalesced status write failed, error: {e}. Writing individually.")
+            for job in chunk:
+                outcomes[job.session_id] = transition_job_status(
+                    job_sns_payload=job, status=status, table_name=table_name, info=info, batch_table_name=batch_table_name)
+    return outcomes
+
+
+def update_job_status_table(job_sns_payload: JobSnsPayload, status: JobStatus, table_name: str, info: Optional[str] = None, result: Optional[Dict[str, Any]] = None, batch_table_name: Optional[str] = None) -> None:
     # Updates an existing job status table entry based on the callback response.
-    status_payload = convert_to_status(
-        job=job_sns_payload, status=status, info=info, result=result)
-    table = setup_boto_table(table_name=table_name)
-    write_record(entry=status_payload, table=table)
+    transition_job_status(job_sns_payload=job_sns_payload, status=status,
+                          table_name=table_name, info=info, result=result, batch_table_name=batch_table_name)
@@ -1,15 +1,14 @@
 from EcsSqsPythonTools.Settings import JobBaseSettings
 from ProvenaInterfaces.AsyncJobModels import *
 from EcsSqsPythonTools.Workflow import *
+from EcsSqsPythonTools.SqsTools import VisibilityHeartbeat
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import Counter, deque
 from datetime import datetime
-from time import sleep
+from math import ceil, floor
+from typing import Deque
 from EcsSqsPythonTools.Types import *
-
-# 5 second wait time between polls
-LOOP_POLL_WAIT = 5.0
-
-# How many items to pull per poll
-JOBS_PER_POLL = 1
+import json
 
 
 def get_timestamp() -> float:
@@ -27,6 +26,8 @@ def continue_consuming(last_consumed_stamp: float, settings: JobBaseSettings) ->
     Returns:
         bool: True iff continue consuming
     """
+    if settings.warm_worker:
+        return True
     print(f"Testing to determine if idle timeout reached.")
     idle_timeout = settings.idle_timeout
     current_stamp = get_timestamp()
@@ -41,6 +42,38 @@ def continue_consuming(last_consumed_stamp: float, settings: JobBaseSettings) ->
         return False
 
 
+def poll_wait_time(last_consumed_stamp: float, settings: JobBaseSettings) -> int:
+    """
+
+    Determines how long the next poll should long poll for. This is bounded by
+    the remaining idle time so that an idle worker still shuts down close to
+    the idle timeout. Warm workers always wait the full poll time.
+
+    Args:
+        last_consumed_stamp (float): The last timestamp when consumed
+        settings (JobBaseSettings): Settings
+
+    Returns:
+        int: The long poll wait time in seconds
+    """
+    if settings.warm_worker:
+        return settings.poll_wait_seconds
+    remaining = settings.idle_timeout - \
+        (get_timestamp() - last_consumed_stamp)
+    return max(0, min(settings.poll_wait_seconds, ceil(remaining)))
+
+
+def scheduling_latency_log(work: ReceivedPayload) -> str:
+    # a json log line per dispatched job - published as the SchedulingLatency
+    # metric (by job type and priority) with a log metric filter
+    return json.dumps({
+        "scheduling_latency_seconds": max(0.0, get_timestamp() - work.payload.created_timestamp),
+        "job_type": work.payload.job_type.value,
+        "priority": work.payload.priority.value,
+        "session_id": work.payload.session_id
+    })
+
+
 def action_callback_response(task: ReceivedPayload, callback_response: CallbackResponse, settings: JobBaseSettings) -> None:
     """
 
@@ -54,85 +87,246 @@ def action_callback_response(task: ReceivedPayload, callback_response: CallbackR
         settings (JobBaseSettings): Settings
     """
     print(f"Actioning callback response...")
-    finish_work(queue_url=settings.queue_url, status_table_name=settings.status_table_name,
-                received_payload=task, callback_response=callback_response)
+    finish_work(status_table_name=settings.status_table_name,
+                received_payload=task, callback_response=callback_response, batch_table_name=settings.batch_table_name)
     print(f"Finished actioning callback response")
 
 
-def run_job_loop(callback: CallbackFunc, settings: JobBaseSettings) -> None:
+def run_job(work: ReceivedPayload, callback: CallbackFunc, settings: JobBaseSettings, heartbeat: VisibilityHeartbeat) -> None:
+    """
+
+    Runs the lifecycle of a single job - marks it as in progress, dispatches
+    to the callback and actions the response. Runs on a worker thread.
+
+    Args:
+        work (ReceivedPayload): The received job
+        callback (CallbackFunc): The function to dispatch to
+        settings (JobBaseSettings): The settings
+        heartbeat (VisibilityHeartbeat): Keeps the message hidden until finished
+    """
+    print(f"Work payload: {work}.")
+    print(scheduling_latency_log(work))
+    try:
+        # Mark as in progress
+        update_job_status_table(
+            job_sns_payload=work.payload,
+            status=JobStatus.IN_PROGRESS,
+            table_name=settings.status_table_name,
+            info="Job has been dispatched to worker callback and is in progress.",
+            batch_table_name=settings.batch_table_name
+        )
+
+        print(f"Dispatching to work callback")
+        callback_response: CallbackResponse
+        try:
+            callback_response = callback(work.payload, settings)
+        except Exception as e:
+            info = f"Callback function raised unhandled exception. Error: {e}."
+            callback_response = CallbackResponse(
+                status=JobStatus.FAILED,
+                info=info,
+                result=None
+            )
+        print(f"Actioning workflow.")
+        action_callback_response(
+            task=work, callback_response=callback_response, settings=settings)
+        print(f"Job lifecycle completed.")
+    except Exception as e:
+        # the message was not finished - it will become visible again
+        print(
+            f"Job lifecycle failed for session {work.payload.session_id}, error: {e}.")
+    finally:
+        heartbeat.untrack(work.receipt_handle)
+
+
+def bulk_user_cap(settings: JobBaseSettings, concurrency: int) -> int:
+    # the most bulk jobs one user can run while others are waiting
+    return max(1, floor(concurrency * settings.bulk_user_share))
+
+
+def take_bulk_job(pending_bulk: Deque[ReceivedPayload], running: List[ReceivedPayload], cap: int, allow_over_cap: bool) -> Optional[ReceivedPayload]:
+    """
+
+    Picks the next bulk job to dispatch. Waiting jobs are taken in order from
+    the user with the fewest running bulk jobs, so one user's large batch does
+    not hold up everyone else's.
+
+    Args:
+        pending_bulk (Deque[ReceivedPayload]): Bulk jobs waiting for a worker
+        running (List[ReceivedPayload]): Jobs currently running
+        cap (int): The most bulk jobs a single user should run
+        allow_over_cap (bool): Dispatch even if every waiting job's user is at the cap
+
+    Returns:
+        Optional[ReceivedPayload]: The job (removed from pending), if any
+    """
+    running_counts = Counter(
+        work.payload.username for work in running if work.payload.priority == JobPriority.BULK)
+    best: Optional[ReceivedPayload] = None
+    for work in pending_bulk:
+        if best is None or running_counts[work.payload.username] < running_counts[best.payload.username]:
+            best = work
+    if best is None or (running_counts[best.payload.username] >= cap and not allow_over_cap):
+        return None
+    pending_bulk.remove(best)
+    return best
+
+
+def receive_work(queue_url: str, settings: JobBaseSettings, max_count: int, wait_time_seconds: int) -> List[ReceivedPayload]:
+    # If job is pulled, then the status will be set to dequeued
+    return check_for_work(job_type=settings.job_type,
+                          queue_url=queue_url,
+                          status_table_name=settings.status_table_name,
+                          jobs_per_poll=max_count,
+                          wait_time_seconds=wait_time_seconds,
+                          batch_table_name=settings.batch_table_name)
+
+
+def run_job_loop(callback: CallbackFunc, settings: JobBaseSettings, concurrency: int = 1) -> None:
     """
 
     Primary job loop runner.
 
-    Polls for work according to specified timeouts and delays.
+    Long polls for work (up to the configured number of messages per poll)
+    until the idle timeout is reached. Received messages have their
+    visibility extended until they are finished.
+
+    Dispatches up to concurrency jobs at a time to the callback on a thread
+    pool. Workers are only idle when no jobs are running or waiting, and
+    running jobs are drained before returning.
 
-    Dispatches jobs to the runner.
+    If a bulk queue is configured, the interactive queue is always checked
+    (and its jobs dispatched) before bulk jobs are dispatched. Bulk jobs are
+    shared fairly between users - while a user is at their share of the
+    workers, the bulk queue is read ahead (up to bulk_lookahead jobs) looking
+    for other users' jobs before any more of theirs are dispatched.
 
     Args:
         callback (CallbackFunc): The function to dispatch to
         settings (JobBaseSettings): The settings
+        concurrency (int, optional): Maximum jobs run at once. Defaults to 1.
     """
     last_consumed_stamp = get_timestamp()
-    work_found_last_round = False
-
-    while continue_consuming(last_consumed_stamp, settings=settings):
-        print(f"Polling for work...")
-
-        # If job is pulled, then the status will be set to dequeued
-        jobs = check_for_work(job_type=settings.job_type,
-                              queue_url=settings.queue_url,
-                              status_table_name=settings.status_table_name,
-                              jobs_per_poll=JOBS_PER_POLL)
-
-        if len(jobs) > 0:
-            print(f"Work found.")
-            work_found_last_round = True
-            # for each item - execute job lifecycle
-            for work in jobs:
-                print(f"Work payload: {work}.")
-                print(f"Updating last consumed timestamp")
+
+    heartbeat = VisibilityHeartbeat(
+        queue_url=settings.queue_url,
+        interval_seconds=settings.visibility_heartbeat_interval,
+        visibility_timeout=settings.visibility_timeout_extension
+    )
+    heartbeat.start()
+
+    executor = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="job-worker")
+    # received jobs waiting for a free worker, by priority
+    pending_interactive: Deque[ReceivedPayload] = deque()
+    pending_bulk: Deque[ReceivedPayload] = deque()
+    in_flight: Dict[Future, ReceivedPayload] = {}
+
+    bulk_queue_url = settings.bulk_queue_url
+    cap = bulk_user_cap(settings=settings, concurrency=concurrency)
+    # was the last read of the bulk queue empty?
+    bulk_queue_drained = False
+
+    def free_workers() -> int:
+        return concurrency - len(in_flight)
+
+    def receive_limit() -> int:
+        # only receive as many jobs as there are free workers - received jobs
+        # stay hidden from other workers until they are finished
+        return max(1, min(settings.messages_per_poll, free_workers()))
+
+    def hold(jobs: List[ReceivedPayload], pending: Deque[ReceivedPayload]) -> None:
+        # keep all received messages hidden until they are finished
+        for work in jobs:
+            heartbeat.track(work.receipt_handle, queue_url=work.queue_url)
+            pending.append(work)
+
+    try:
+        while True:
+            in_flight = {future: work for future,
+                         work in in_flight.items() if not future.done()}
+
+            # the worker is not idle while it has jobs
+            if len(in_flight) > 0 or len(pending_interactive) > 0 or len(pending_bulk) > 0:
                 last_consumed_stamp = get_timestamp()
 
-                # Mark as in progress
-
-                # now mark the status item as dequeued
-                update_job_status_table(
-                    job_sns_payload=work.payload,
-                    status=JobStatus.IN_PROGRESS,
-                    table_name=settings.status_table_name,
-                    info="Job has been dispatched to worker callback and is in progress."
-                )
-
-                print(f"Dispatching to work callback")
-                callback_response: CallbackResponse
-                try:
-                    callback_response = callback(work.payload, settings)
-                except Exception as e:
-                    info = f"Callback function raised unhandled exception. Error: {e}."
-                    callback_response = CallbackResponse(
-                        status=JobStatus.FAILED,
-                        info=info,
-                        result=None
+            if not continue_consuming(last_consumed_stamp, settings=settings):
+                break
+
+            # interactive jobs go ahead of bulk jobs which are already held
+            if bulk_queue_url is not None and len(in_flight) < concurrency and len(pending_interactive) == 0 and len(pending_bulk) > 0:
+                hold(receive_work(queue_url=settings.queue_url, settings=settings,
+                     max_count=receive_limit(), wait_time_seconds=0), pending_interactive)
+
+            while len(in_flight) < concurrency:
+                next_work: Optional[ReceivedPayload] = None
+                if len(pending_interactive) > 0:
+                    next_work = pending_interactive.popleft()
+                elif len(pending_bulk) > 0:
+                    next_work = take_bulk_job(
+                        pending_bulk=pending_bulk,
+                        running=list(in_flight.values()),
+                        cap=cap,
+                        allow_over_cap=bulk_queue_drained or len(
+                            pending_bulk) >= settings.bulk_lookahead
                     )
-                print(f"Actioning workflow.")
-                action_callback_response(
-                    task=work, callback_response=callback_response, settings=settings)
+                if next_work is None:
+                    break
                 print(
-                    f"Job lifecycle completed.")
-        else:
-            work_found_last_round = False
-            print(
-                f"No work found...waiting to poll again. Timeout: {LOOP_POLL_WAIT}.")
+                    f"Dispatching {next_work.payload.priority.value} job {next_work.payload.session_id} to worker.")
+                in_flight[executor.submit(
+                    run_job, next_work, callback, settings, heartbeat)] = next_work
+
+            if len(in_flight) >= concurrency:
+                print(f"All workers busy...waiting for a job to complete.")
+                wait(in_flight.keys(), return_when=FIRST_COMPLETED)
+                continue
+
+            wait_time = poll_wait_time(
+                last_consumed_stamp=last_consumed_stamp, settings=settings)
+
+            if bulk_queue_url is None:
+                print(f"Polling for work (waiting up to {wait_time}s)...")
+                hold(receive_work(queue_url=settings.queue_url, settings=settings,
+                     max_count=receive_limit(), wait_time_seconds=wait_time), pending_interactive)
+            else:
+                # only reached with free workers, no waiting interactive jobs
+                # and any waiting bulk jobs held back by the user cap
+                jobs = receive_work(queue_url=settings.queue_url, settings=settings,
+                                    max_count=receive_limit(), wait_time_seconds=0)
+                if len(jobs) > 0:
+                    hold(jobs, pending_interactive)
+                elif len(pending_bulk) < free_workers() + settings.bulk_lookahead:
+                    # enough to fill the free workers plus the look ahead
+                    jobs = receive_work(queue_url=bulk_queue_url, settings=settings,
+                                        max_count=min(settings.messages_per_poll, free_workers() + settings.bulk_lookahead - len(pending_bulk)), wait_time_seconds=0)
+                    bulk_queue_drained = len(jobs) == 0
+                    hold(jobs, pending_bulk)
+
+                if len(jobs) == 0 and len(pending_bulk) == 0:
+                    wait_time = min(wait_time, settings.bulk_poll_interval)
+                    print(
+                        f"Polling for interactive work (waiting up to {wait_time}s)...")
+                    jobs = receive_work(queue_url=settings.queue_url, settings=settings,
+                                        max_count=receive_limit(), wait_time_seconds=wait_time)
+                    hold(jobs, pending_interactive)
+
+            if len(pending_interactive) == 0 and len(pending_bulk) == 0:
+                print(f"No work found...polling again.")
+                continue
 
-        if not work_found_last_round:
-            print(f"Going to sleep...")
-            sleep(LOOP_POLL_WAIT)
-            print(f"Woke up...")
-        else:
-            print(f"Queue busy so not waiting before poll.")
+            print(
+                f"Work waiting. Interactive: {len(pending_interactive)}, bulk: {len(pending_bulk)}.")
+            print(f"Updating last consumed timestamp")
+            last_consumed_stamp = get_timestamp()
+    finally:
+        # drain running jobs before shutting down
+        print(f"Waiting for {len(in_flight)} running job(s) to complete.")
+        executor.shutdown(wait=True)
+        heartbeat.stop()
 
 
-def ecs_job_worker(worker_callback: CallbackFunc) -> None:
+def ecs_job_worker(worker_callback: CallbackFunc, concurrency: Optional[int] = None, initialise: Optional[InitialiseFunc] = None) -> None:
     """
 
     Main entry point for ECS worker.
@@ -141,8 +335,17 @@ def ecs_job_worker(worker_callback: CallbackFunc) -> None:
 
     Sub type dispatching is handled by the caller.
 
+    The callback may be run concurrently on multiple threads when concurrency
+    (or the JOB_CONCURRENCY setting) is greater than 1, so must be thread safe.
+
+    The optional initialise function is run once before polling starts. A
+    failure is reported but does not stop the worker - jobs are still run and
+    can retry the initialisation themselves.
+
     Args:
         worker_callback (CallbackFunc): The callback function.
+        concurrency (Optional[int], optional): Maximum jobs run at once. Defaults to the job_concurrency setting.
+        initialise (Optional[InitialiseFunc], optional): Sets up resources reused across jobs. Defaults to None.
     """
     print(f"Worker launched successfully")
 
@@ -151,7 +354,16 @@ def ecs_job_worker(worker_callback: CallbackFunc) -> None:
     settings = JobBaseSettings()
     print("Success")
 
+    if initialise is not None:
+        print("Initialising worker resources...")
+        try:
+            initialise(settings)
+            print("Success")
+        except Exception as e:
+            print(f"Failed to initialise worker resources, error: {e}.")
+
     print("Starting job loop.")
-    run_job_loop(callback=worker_callback, settings=settings)
+    run_job_loop(callback=worker_callback, settings=settings,
+                 concurrency=max(1, concurrency or settings.job_concurrency))
 
     print("Completed job loop - shutting down exit 0")
@@ -1,16 +1,29 @@
 from pydantic import BaseSettings
+from typing import Optional
 from ProvenaInterfaces.AsyncJobModels import JobType
 
 
 class JobBaseSettings(BaseSettings):
     # These are env variables required for running a job
     idle_timeout: int
+
+    # Warm workers are kept running (by an ECS service) to take the first jobs
+    # of a burst without a task cold start - they never exit due to the idle
+    # timeout
+    warm_worker: bool = False
     
-    # The SQS queue URL
+    # The SQS queue URL - the interactive priority lane
     queue_url: str
+
+    # The bulk priority lane SQS queue URL - only the interactive queue is
+    # polled if not set
+    bulk_queue_url: Optional[str] = None
     
     # Job status table ARN
     status_table_name: str
+
+    # Batch counter table name - batch counters are not updated if not set
+    batch_table_name: Optional[str] = None
     
     # The SNS topic arn
     sns_topic_arn: str
@@ -21,6 +34,33 @@ class JobBaseSettings(BaseSettings):
     # job API endpoint
     job_api_endpoint: str
 
+    # Queue polling - long poll for up to this many seconds (max 20) and
+    # receive up to this many messages per poll (max 10)
+    poll_wait_seconds: int = 20
+    messages_per_poll: int = 10
+
+    # Received messages which are not yet finished have their visibility
+    # timeout extended to visibility_timeout_extension seconds every
+    # visibility_heartbeat_interval seconds
+    visibility_heartbeat_interval: int = 120
+    visibility_timeout_extension: int = 300
+
+    # Maximum number of jobs run concurrently by the worker (on a thread pool)
+    job_concurrency: int = 1
+
+    # Interactive jobs are always dispatched before bulk jobs. While the
+    # interactive queue is empty it is long polled for at most
+    # bulk_poll_interval seconds between checks of the bulk queue
+    bulk_poll_interval: int = 5
+
+    # Fraction of the job concurrency (at least one job) which a single user's
+    # bulk jobs can occupy while other users' bulk jobs are waiting
+    bulk_user_share: float = 0.5
+
+    # Bulk jobs held waiting by the worker (beyond its free workers) while
+    # looking for other users' bulk jobs
+    bulk_lookahead: int = 20
+
     # use .env file
     class Config:
         env_file = ".env"
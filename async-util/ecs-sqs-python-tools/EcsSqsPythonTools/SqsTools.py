@@ -1,8 +1,27 @@
 import boto3  # type: ignore
+import threading
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set
 from dataclasses import dataclass
 
+# SQS limits for a single receive call
+MAX_MESSAGES_PER_RECEIVE = 10
+MAX_WAIT_TIME_SECONDS = 20
+
+# The client is created once and reused across polls - boto3 clients are
+# thread safe
+_sqs_client: Optional[Any] = None
+_sqs_client_lock = threading.Lock()
+
+
+def get_sqs_client() -> Any:
+    global _sqs_client
+    if _sqs_client is None:
+        with _sqs_client_lock:
+            if _sqs_client is None:
+                _sqs_client = boto3.client('sqs')
+    return _sqs_client
+
 
 @dataclass
 class MessageContents():
@@ -12,25 +31,27 @@ class MessageContents():
     receipt_handle: str
 
 
-def consume_raw_messages_from_queue(queue_url: str, max_count: int = 1) -> List[MessageContents]:
+def consume_raw_messages_from_queue(queue_url: str, max_count: int = 1, wait_time_seconds: int = 0) -> List[MessageContents]:
     """
 
-    Pulls an item from the queue
+    Pulls up to max_count items from the queue, long polling for up to
+    wait_time_seconds if the queue is empty.
 
     Args:
         queue_url (str): The queue url
-        max_count (int, optional): The count. Defaults to 1.
+        max_count (int, optional): The count (at most 10). Defaults to 1.
+        wait_time_seconds (int, optional): Long poll wait (at most 20). Defaults to 0.
 
     Returns:
-        Optional[MessageContents]: Message if found
+        List[MessageContents]: Messages found
     """
-    sqs = boto3.client('sqs')
+    sqs = get_sqs_client()
 
     # Receive set number of messages from queue
     response = sqs.receive_message(
         QueueUrl=queue_url,
-        MaxNumberOfMessages=max_count,
-        WaitTimeSeconds=0
+        MaxNumberOfMessages=max(1, min(max_count, MAX_MESSAGES_PER_RECEIVE)),
+        WaitTimeSeconds=max(0, min(wait_time_seconds, MAX_WAIT_TIME_SECONDS))
     )
 
     print(f"SQS response from queue poll: {response}")
@@ -51,9 +72,74 @@ def consume_raw_messages_from_queue(queue_url: str, max_count: int = 1) -> List[
 
 
 def delete_message_from_queue(queue_url: str, receipt_handle: str) -> None:
-    # Setup client
-    sqs = boto3.client('sqs')
+    sqs = get_sqs_client()
     sqs.delete_message(
         QueueUrl=queue_url,
         ReceiptHandle=receipt_handle
     )
+
+
+def change_message_visibility(queue_url: str, receipt_handle: str, visibility_timeout: int) -> None:
+    sqs = get_sqs_client()
+    sqs.change_message_visibility(
+        QueueUrl=queue_url,
+        ReceiptHandle=receipt_handle,
+        VisibilityTimeout=visibility_timeout
+    )
+
+
+class VisibilityHeartbeat():
+    """
+
+    Background thread which periodically extends the visibility timeout of
+    messages which have been received but not yet finished. This stops long
+    running jobs (or jobs waiting behind them in a multi message receive) from
+    reappearing on the queue and being processed twice.
+    """
+
+    def __init__(self, queue_url: str, interval_seconds: int, visibility_timeout: int) -> None:
+        # the default queue - handles can be tracked against other queues
+        self.queue_url = queue_url
+        self.interval_seconds = interval_seconds
+        self.visibility_timeout = visibility_timeout
+
+        # receipt handle -> queue url
+        self.receipt_handles: Dict[str, str] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, name="sqs-visibility-heartbeat", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def track(self, receipt_handle: str, queue_url: Optional[str] = None) -> None:
+        with self.lock:
+            self.receipt_handles[receipt_handle] = queue_url or self.queue_url
+
+    def untrack(self, receipt_handle: str) -> None:
+        with self.lock:
+            self.receipt_handles.pop(receipt_handle, None)
+
+    def extend_all(self) -> None:
+        with self.lock:
+            handles = list(self.receipt_handles.items())
+        for handle, queue_url in handles:
+            try:
+                change_message_visibility(
+                    queue_url=queue_url,
+                    receipt_handle=handle,
+                    visibility_timeout=self.visibility_timeout
+                )
+            except Exception as e:
+                # the message may have been finished in the meantime
+                print(
+                    f"Failed to extend visibility of message with receipt handle {handle}, error: {e}.")
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval_seconds):
+            self.extend_all()
@@ -16,3 +16,7 @@ class CallbackResponse():
 # A callback function takes a payload and settings, and returns the callback
 # response
 CallbackFunc = Callable[[JobSnsPayload, JobBaseSettings], CallbackResponse]
+
+# An initialise function is run once when the worker starts (before polling)
+# to set up anything reused across jobs, e.g. config, secrets and clients
+InitialiseFunc = Callable[[JobBaseSettings], None]
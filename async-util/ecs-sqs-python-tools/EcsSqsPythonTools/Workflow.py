@@ -3,7 +3,7 @@ from EcsSqsPythonTools.SqsTools import *
 import json
 from typing import Type, cast
 from dataclasses import dataclass
-from EcsSqsPythonTools.DynamoTools import update_job_status_table
+from EcsSqsPythonTools.DynamoTools import update_job_status_table, transition_job_statuses, StatusWriteOutcome
 from EcsSqsPythonTools.Types import CallbackResponse
 
 
@@ -32,9 +32,11 @@ class ReceivedPayload():
     payload: JobSnsPayload
     # Receipt handle for SQS
     receipt_handle: str
+    # The queue the message was received from - each priority has a queue
+    queue_url: str
 
 
-def check_for_work(job_type: JobType, queue_url: str, status_table_name: str, jobs_per_poll: int) -> List[ReceivedPayload]:
+def check_for_work(job_type: JobType, queue_url: str, status_table_name: str, jobs_per_poll: int, wait_time_seconds: int = 0, batch_table_name: Optional[str] = None) -> List[ReceivedPayload]:
     """
     Read from queue, if item to process, returns validated payload of the
     appropriate type based on type map.
@@ -42,14 +44,16 @@ def check_for_work(job_type: JobType, queue_url: str, status_table_name: str, jo
     Args:
         job_type (JobType): The job type to process queue_url (str): The SQS
         queue arn
+        wait_time_seconds (int, optional): How long to long poll for if the queue is empty. Defaults to 0.
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
 
     Returns:
         Optional[BaseModel]: The parsed model if found
     """
 
-    # look for messages (one at time for now)
+    # look for messages
     messages: List[MessageContents] = consume_raw_messages_from_queue(
-        queue_url=queue_url, max_count=jobs_per_poll)
+        queue_url=queue_url, max_count=jobs_per_poll, wait_time_seconds=wait_time_seconds)
 
     # collect parsed payloads
     payloads: List[ReceivedPayload] = []
@@ -64,21 +68,34 @@ def check_for_work(job_type: JobType, queue_url: str, status_table_name: str, jo
                 f"Failed to parse a model, error: {e}. Skipping item as cannot proceed.")
             continue
 
-        # now mark the status item as dequeued
-        print(f"Updating job table to mark as dequeud")
-        update_job_status_table(
-            job_sns_payload=parsed_model,
-            status=JobStatus.DEQUEUED,
-            table_name=status_table_name,
-            info="Job removed from queue ready for processing by worker task."
-        )
-
         # This is ready to be consumed by the ECS worker - it can type cast it into
         # it's desired model to have valid typing
         payloads.append(ReceivedPayload(payload=parsed_model,
-                        receipt_handle=message.receipt_handle))
+                        receipt_handle=message.receipt_handle, queue_url=queue_url))
+
+    # now mark the status items as dequeued - in one write for the whole poll
+    print(f"Updating job table to mark as dequeud")
+    outcomes = transition_job_statuses(
+        jobs=[received.payload for received in payloads],
+        status=JobStatus.DEQUEUED,
+        table_name=status_table_name,
+        info="Job removed from queue ready for processing by worker task.",
+        batch_table_name=batch_table_name
+    )
+
+    # jobs which are already finished are redelivered messages - clear them
+    # out rather than running them again
+    ready: List[ReceivedPayload] = []
+    for received in payloads:
+        if outcomes.get(received.payload.session_id) == StatusWriteOutcome.REJECTED:
+            print(
+                f"Job {received.payload.session_id} has already finished - deleting redelivered message.")
+            delete_message_from_queue(
+                queue_url=queue_url, receipt_handle=received.receipt_handle)
+            continue
+        ready.append(received)
 
-    return payloads
+    return ready
 
 
 def parse_job_specific_payload(payload: JobSnsPayload, job_sub_type: JobSubType) -> BaseModel:
@@ -101,20 +118,20 @@ def parse_job_specific_payload(payload: JobSnsPayload, job_sub_type: JobSubType)
     return desired_model.parse_obj(payload.payload)
 
 
-def finish_work(queue_url: str, status_table_name: str, received_payload: ReceivedPayload, callback_response: CallbackResponse) -> None:
+def finish_work(status_table_name: str, received_payload: ReceivedPayload, callback_response: CallbackResponse, batch_table_name: Optional[str] = None) -> None:
     """
     Closes out a job in the ECS job consumer workflow. 
 
     This includes
     - updating the entry in the status table according to the defined status and info
-    - clearing the message from the queue using helper from SqsTools
+    - clearing the message from the queue it was received from using helper from SqsTools
 
     Args:
-        queue_url (str): The URL of the queue
         status_table_name (str): The name of the dynamodb status table
         received_payload (ReceivedPayload): The payload received initially - see helper above
         status (JobStatus): The status - i.e. did it succeed or fail?
         info (Optional[str], optional): If error -> provide info. Defaults to None.
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
 
     Returns: None
     """
@@ -122,10 +139,11 @@ def finish_work(queue_url: str, status_table_name: str, received_payload: Receiv
     # Start by updating the job status table
     print("Updating job status table")
     update_job_status_table(job_sns_payload=received_payload.payload,
-                            status=callback_response.status, table_name=status_table_name, info=callback_response.info, result=callback_response.result)
+                            status=callback_response.status, table_name=status_table_name, info=callback_response.info, result=callback_response.result,
+                            batch_table_name=batch_table_name)
 
     # Now clear out the message
     print(
         f"Deleting message from queue using receipt handle {received_payload.receipt_handle}.")
     delete_message_from_queue(
-        queue_url=queue_url, receipt_handle=received_payload.receipt_handle)
+        queue_url=received_payload.queue_url, receipt_handle=received_payload.receipt_handle)
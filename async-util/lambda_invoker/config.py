@@ -1,4 +1,5 @@
 from pydantic import BaseSettings
+from typing import Optional
 
 # These are read from the env at runtime
 
@@ -12,6 +13,8 @@ class Settings(BaseSettings):
     idle_timeout: int
     # how many possible tasks can be running before we stop - safety cutoff
     max_task_scaling: int
+    # target number of outstanding queued jobs per running task
+    jobs_per_task: int = 10
 
     # Type = PROV_LODGE
     prov_lodge_task_definition_arn: str
@@ -24,3 +27,23 @@ class Settings(BaseSettings):
 
     # Type = REPORT
     report_task_definition_arn: str
+
+    # Warm worker task definitions for each job type - these tasks are kept
+    # running by an ECS service and count towards the running tasks
+    prov_lodge_warm_task_definition_arn: Optional[str] = None
+    registry_warm_task_definition_arn: Optional[str] = None
+    email_warm_task_definition_arn: Optional[str] = None
+    report_warm_task_definition_arn: Optional[str] = None
+
+    # Queue URLs for each job type - used to scale on queue depth
+    prov_lodge_queue_url: str
+    registry_queue_url: str
+    email_queue_url: str
+    report_queue_url: str
+
+    # Bulk priority lane queue URLs for each job type - bulk jobs also count
+    # towards the queue depth
+    prov_lodge_bulk_queue_url: Optional[str] = None
+    registry_bulk_queue_url: Optional[str] = None
+    email_bulk_queue_url: Optional[str] = None
+    report_bulk_queue_url: Optional[str] = None
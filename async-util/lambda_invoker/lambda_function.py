@@ -6,11 +6,16 @@ import json
 import boto3  # type: ignore
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from math import ceil
 
 # Live states - see
 # https://docs.aws.amazon.com/AmazonECS/latest/developerguide/task-lifecycle.html
 BLOCKING_ECS_STATES = ["PENDING", "PROVISIONING", "ACTIVATING", "RUNNING"]
 
+# ECS API limits
+MAX_DESCRIBE_TASKS = 100
+MAX_RUN_TASK_COUNT = 10
+
 
 @dataclass
 class RunningTaskInfo():
@@ -223,6 +228,112 @@ def get_task_dfn(job_type: JobType, settings: Settings) -> str:
             f"Not sure how to process the job type: {job_type}. No settings task definition arn.")
 
 
+def get_warm_task_dfn(job_type: JobType, settings: Settings) -> Optional[str]:
+    """
+
+    Pulls the desired job type's warm worker task dfn, if warm workers are
+    configured for the job type.
+
+    Args:
+        job_type (JobType): JobType to pull
+        settings (Settings): The settings where this is located
+
+    Raises:
+        Exception: Unknown job type
+
+    Returns:
+        Optional[str]: Warm worker task definition ARN for this job type
+    """
+    if job_type == JobType.PROV_LODGE:
+        return settings.prov_lodge_warm_task_definition_arn
+    elif job_type == JobType.REGISTRY:
+        return settings.registry_warm_task_definition_arn
+    elif job_type == JobType.EMAIL:
+        return settings.email_warm_task_definition_arn
+    elif job_type == JobType.REPORT:
+        return settings.report_warm_task_definition_arn
+    else:
+        raise Exception(
+            f"Not sure how to process the job type: {job_type}. No settings task definition arn.")
+
+
+def get_queue_urls(job_type: JobType, settings: Settings) -> List[str]:
+    """
+
+    Pulls the desired job type's SQS queue URLs - the interactive queue and,
+    if configured, the bulk queue.
+
+    Args:
+        job_type (JobType): JobType to pull
+        settings (Settings): The settings where this is located
+
+    Raises:
+        Exception: Can't find the job type queue url
+
+    Returns:
+        List[str]: The queue URLs for this job type
+    """
+    urls: List[Optional[str]]
+    if job_type == JobType.PROV_LODGE:
+        urls = [settings.prov_lodge_queue_url,
+                settings.prov_lodge_bulk_queue_url]
+    elif job_type == JobType.REGISTRY:
+        urls = [settings.registry_queue_url, settings.registry_bulk_queue_url]
+    elif job_type == JobType.EMAIL:
+        urls = [settings.email_queue_url, settings.email_bulk_queue_url]
+    elif job_type == JobType.REPORT:
+        urls = [settings.report_queue_url, settings.report_bulk_queue_url]
+    else:
+        raise Exception(
+            f"Not sure how to process the job type: {job_type}. No settings queue url.")
+    return [url for url in urls if url is not None]
+
+
+def get_queue_depth(queue_url: str) -> int:
+    """
+
+    Reports the number of jobs outstanding on the queue - both waiting
+    (ApproximateNumberOfMessages) and received by a worker but not finished
+    (ApproximateNumberOfMessagesNotVisible).
+
+    Args:
+        queue_url (str): The queue URL
+
+    Returns:
+        int: The approximate number of outstanding jobs
+    """
+    sqs_client = boto3.client('sqs')
+    response = sqs_client.get_queue_attributes(
+        QueueUrl=queue_url,
+        AttributeNames=['ApproximateNumberOfMessages',
+                        'ApproximateNumberOfMessagesNotVisible']
+    )
+    attributes = response['Attributes']
+    waiting = int(attributes.get('ApproximateNumberOfMessages', 0))
+    in_flight = int(attributes.get('ApproximateNumberOfMessagesNotVisible', 0))
+    print(f"Queue depth: {waiting} waiting, {in_flight} in flight.")
+    return waiting + in_flight
+
+
+def desired_task_count(queue_depth: int, settings: Settings) -> int:
+    """
+
+    Determines how many tasks should be running to work through the queue -
+    one task per jobs_per_task outstanding jobs, at least one (the invoker is
+    only triggered when a job has been submitted) and at most
+    max_task_scaling.
+
+    Args:
+        queue_depth (int): The outstanding jobs
+        settings (Settings): The settings
+
+    Returns:
+        int: The desired task count
+    """
+    desired = max(1, ceil(queue_depth / max(1, settings.jobs_per_task)))
+    return min(desired, settings.max_task_scaling)
+
+
 def select_public_subnet(vpc_id: str) -> Optional[str]:
     """
 
@@ -250,43 +361,51 @@ def select_public_subnet(vpc_id: str) -> Optional[str]:
     return public_subnets[0]
 
 
+def task_family_from_arn(task_definition_arn: str) -> str:
+    # arn:aws:ecs:<region>:<account>:task-definition/<family>:<revision>
+    return task_definition_arn.split('/')[-1].split(':')[0]
+
+
 def check_tasks_running(task_definition_arn: str, cluster_arn: str) -> TasksRunningResponse:
     """
 
-    Checks if a task is running already
-
-    TODO improve scaling behaviour past 1
+    Checks which tasks are running for the task definition's family. Only the
+    tasks in the family are listed (and then described for their status and
+    start time).
 
     Args:
         task_definition_arn (str): The task dfn ARN
         cluster_arn (str): The ECS cluster
 
     Returns:
-        bool: True iff task is already running on that task dfn arn
+        TasksRunningResponse: Whether any are running, and their info
     """
     # Create an ECS client
     ecs_client = boto3.client('ecs')
 
-    # List tasks in the cluster
-    response = ecs_client.list_tasks(cluster=cluster_arn)
-    tasks = response['taskArns']
+    # List tasks in the family - desired status RUNNING includes pending tasks
+    task_arns: List[str] = []
+    paginator = ecs_client.get_paginator('list_tasks')
+    for page in paginator.paginate(
+        cluster=cluster_arn,
+        family=task_family_from_arn(task_definition_arn),
+        desiredStatus='RUNNING'
+    ):
+        task_arns.extend(page['taskArns'])
 
-    if len(tasks) == 0:
+    if len(task_arns) == 0:
         return TasksRunningResponse(is_running=False)
 
-    # Describe tasks in the cluster (get status and task definition)
-    response = ecs_client.describe_tasks(cluster=cluster_arn, tasks=tasks)
-
-    matched_tasks: List[Dict[str, Any]] = []
-
-    # Check if any running tasks have the specified task definition ARN
-    for task in response['tasks']:
-        if task['taskDefinitionArn'] == task_definition_arn:
-            matched_tasks.append(task)
+    # Describe the family's tasks (get status and start time)
+    described: List[Dict[str, Any]] = []
+    for i in range(0, len(task_arns), MAX_DESCRIBE_TASKS):
+        response = ecs_client.describe_tasks(
+            cluster=cluster_arn, tasks=task_arns[i:i + MAX_DESCRIBE_TASKS])
+        described.extend(response['tasks'])
 
     # Now we want to filter for non blocked state tasks
     active_tasks = list(
-        filter(lambda t: t['lastStatus'] in BLOCKING_ECS_STATES, matched_tasks))
+        filter(lambda t: t['lastStatus'] in BLOCKING_ECS_STATES, described))
 
     # if there are no active tasks - return such
     if len(active_tasks) == 0:
@@ -294,11 +413,52 @@ def check_tasks_running(task_definition_arn: str, cluster_arn: str) -> TasksRunn
 
     # now report info for each
     tasks = list(map(lambda t: RunningTaskInfo(
-        status=t['lastStatus'], started_at=task.get('startedAt')), active_tasks))
+        status=t['lastStatus'], started_at=t.get('startedAt')), active_tasks))
     return TasksRunningResponse(is_running=True, tasks=tasks)
 
 
-def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster_arn: str) -> None:
+def tasks_to_launch(desired: int, tasks_running: TasksRunningResponse, settings: Settings, warm_running: int = 0) -> int:
+    """
+
+    Determines how many new tasks to launch to reach the desired count.
+
+    If enough tasks are already running, a single extra task may still be
+    launched when every running task may be about to exit due to the idle
+    timeout (see should_run_safety_delta). Warm workers don't exit due to the
+    idle timeout, so this is not needed if they alone meet the desired count.
+
+    Args:
+        desired (int): The desired task count
+        tasks_running (TasksRunningResponse): The (on demand) tasks currently running
+        settings (Settings): The settings
+        warm_running (int, optional): The warm worker tasks currently running. Defaults to 0.
+
+    Returns:
+        int: The number of tasks to launch
+    """
+    on_demand = len(tasks_running.tasks or []) if tasks_running.is_running else 0
+    running = on_demand + warm_running
+    print(
+        f"Desired tasks: {desired}, running tasks: {running} ({warm_running} warm).")
+
+    if running < desired:
+        return desired - running
+
+    if warm_running >= desired:
+        return 0
+
+    if on_demand > 0 and should_run_safety_delta(
+        idle_timeout_s=settings.idle_timeout,
+        tasks=tasks_running.tasks or [],
+        settings=settings
+    ):
+        print("Running tasks are within the idle timeout safety margin - launching one more task.")
+        return 1
+
+    return 0
+
+
+def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster_arn: str, count: int = 1) -> None:
     """
 
     Uses the ECS run task operation in the specified
@@ -311,6 +471,7 @@ def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster
         subnet_id (str): The subnet
         task_definition_arn (str): Task dfn
         cluster_arn (str): Cluster
+        count (int, optional): How many tasks to launch (at most 10). Defaults to 1.
 
     Raises:
         Exception: Something goes wrong
@@ -323,6 +484,7 @@ def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster
         cluster=cluster_arn,
         launchType='FARGATE',
         taskDefinition=task_definition_arn,
+        count=count,
         networkConfiguration={
             'awsvpcConfiguration': {
                 'subnets': [subnet_id],
@@ -333,8 +495,10 @@ def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster
 
     # Check if the task was successfully launched
     if response['tasks']:
-        task_arn = response['tasks'][0]['taskArn']
-        print(f"Task {task_arn} launched successfully.")
+        for task in response['tasks']:
+            print(f"Task {task['taskArn']} launched successfully.")
+        for failure in response.get('failures') or []:
+            print(f"Task launch failure: {failure}.")
     else:
         raise Exception(
             f"Failed to initiate task with definition arn {task_definition_arn}")
@@ -343,9 +507,11 @@ def launch_task_in_ecs_cluster(subnet_id: str, task_definition_arn: str, cluster
 def launch_for_task(type: JobType, subnet_id: str, settings: Settings) -> None:
     """
 
-    Handles launching a new task for a given job type.
+    Handles launching new tasks for a given job type.
 
-    Combines dispatching of the task dfn arn, checking if task is running, and launching.
+    The desired task count is derived from the depth of the job type's queues
+    (see desired_task_count) and the difference to the running tasks is
+    launched.
 
     Args:
         type (JobType): The job type
@@ -355,47 +521,41 @@ def launch_for_task(type: JobType, subnet_id: str, settings: Settings) -> None:
     task_definition_arn = get_task_dfn(job_type=type, settings=settings)
     cluster_arn = settings.cluster_arn
 
-    # TODO Make this more sophisticated - this is basic scaling protection
+    try:
+        queue_depth = sum(get_queue_depth(queue_url=queue_url)
+                          for queue_url in get_queue_urls(job_type=type, settings=settings))
+    except Exception as e:
+        # fall back to ensuring at least one task is running
+        print(
+            f"Failed to determine queue depth for {type}, error: {e}. Assuming a single job.")
+        queue_depth = 1
 
-    # This limits to 1 concurrent
+    desired = desired_task_count(queue_depth=queue_depth, settings=settings)
     tasks_running = check_tasks_running(
         task_definition_arn=task_definition_arn, cluster_arn=cluster_arn)
 
-    run_task = False
-
-    # run task if either running AND exceeded safety delta OR not running
-    if tasks_running.is_running:
-        if tasks_running.tasks is None or len(tasks_running.tasks) == 0:
-            print("Unexpected state in which tasks were marked as running but no tasks were provided. Handle by defaulting to running a task.")
-            run_task = True
-        else:
-            print(
-                f"There were {len(tasks_running.tasks)} tasks observed to be running.")
-            run_task = should_run_safety_delta(
-                idle_timeout_s=settings.idle_timeout,
-                tasks=tasks_running.tasks,
-                settings=settings
-            )
-    else:
-        run_task = True
-
-    if tasks_running.is_running:
-        if run_task:
-            print(
-                f"The job type: {type} does have a task running already, \
-            however it is within the delta safety margin and therefore another task will be launched.")
-        else:
-            print(
-                f"The job type: {type} does have a task running already and no new task will be run")
-    else:
-        print(
-            f"The job type: {type} does not have a task running already and so a new task will be run.")
+    warm_running = 0
+    warm_task_definition_arn = get_warm_task_dfn(job_type=type, settings=settings)
+    if warm_task_definition_arn is not None:
+        warm_tasks = check_tasks_running(
+            task_definition_arn=warm_task_definition_arn, cluster_arn=cluster_arn)
+        warm_running = len(warm_tasks.tasks or []) if warm_tasks.is_running else 0
 
-    if run_task:
+    to_launch = tasks_to_launch(
+        desired=desired, tasks_running=tasks_running, settings=settings, warm_running=warm_running)
+
+    if to_launch == 0:
         print(
-            f"Launching task for {type}. {subnet_id=} {task_definition_arn=} {cluster_arn=}")
+            f"The job type: {type} has enough tasks running for its queue and no new task will be run")
+        return
+
+    print(
+        f"Launching {to_launch} task(s) for {type}. {subnet_id=} {task_definition_arn=} {cluster_arn=}")
+    while to_launch > 0:
+        count = min(to_launch, MAX_RUN_TASK_COUNT)
         launch_task_in_ecs_cluster(
-            subnet_id=subnet_id, task_definition_arn=task_definition_arn, cluster_arn=cluster_arn)
+            subnet_id=subnet_id, task_definition_arn=task_definition_arn, cluster_arn=cluster_arn, count=count)
+        to_launch -= count
 
 
 def handler(event: Any, context: Any) -> None:
@@ -106,6 +106,11 @@ class Config(BaseConfig):
     # Wait at least 5 days on pending request before allowing another
     minimum_request_waiting_time_days: int = 5
 
+    # how long looked up username -> person links are cached per process (0
+    # disables) - links written through another instance may be stale for up
+    # to this long
+    identity_cache_ttl_seconds: int = 30
+
     # validate person in registry when performing link updates
     # DEBUG ONLY
     link_update_registry_connection: bool = True
@@ -3,7 +3,8 @@ from fastapi import HTTPException
 from KeycloakFastAPI.Dependencies import *
 from config import Config
 from ProvenaInterfaces.AuthAPI import *
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_io import aws_io
+from ProvenaSharedFunctionality.Services.aws_clients import get_dynamodb_table
 from helpers.groups_helpers import *
 
 # Pull out the properties of the metadata model
@@ -16,8 +17,7 @@ def get_group_metadata(
     config: Config
 ) -> Optional[UserGroupMetadata]:
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
 
     # Get item
     try:
@@ -53,8 +53,7 @@ def get_populated_group(
     config: Config
 ) -> Optional[UserGroup]:
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
 
     # Get item
     try:
@@ -88,8 +87,7 @@ def list_group_metadata(
     config: Config
 ) -> List[UserGroupMetadata]:
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
 
     try:
         items = []
@@ -128,8 +126,7 @@ def list_full_groups(
     config: Config
 ) -> List[UserGroup]:
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
 
     try:
         items = []
@@ -394,8 +391,7 @@ def raw_write(
     payload: Dict[str, Any],
     config: Config
 ) -> None:
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
 
     # write Item to table
     try:
@@ -428,15 +424,14 @@ def delete_entry(
     id: str,
     config: Config
 ) -> None:
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(config.user_groups_table_name)
+    table = get_groups_table(config=config)
     delete_entry_with_table(id=id, table=table)
 
 
 def get_table_from_name(table_name: str) -> Any:
     """    get_table_from_name
-        Generates a dynamodb resource table to be 
-        used in the below methods. 
+        Returns the (cached, per thread) dynamodb 
+        resource table to be used in the below methods. 
 
         Returns
         -------
@@ -449,9 +444,7 @@ def get_table_from_name(table_name: str) -> Any:
         Examples (optional)
         --------
     """
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(table_name)
-    return table
+    return get_dynamodb_table(table_name)
 
 
 def get_groups_table(config: Config) -> Any:
@@ -470,3 +463,17 @@ def get_groups_table(config: Config) -> Any:
         --------
     """
     return get_table_from_name(table_name=config.user_groups_table_name)
+
+
+# Async variants of the helpers used by the (async) group routes - run on the
+# shared AWS IO thread pool so a slow table call doesn't block the event loop
+get_group_metadata_async = aws_io(get_group_metadata)
+get_populated_group_async = aws_io(get_populated_group)
+list_group_metadata_async = aws_io(list_group_metadata)
+list_full_groups_async = aws_io(list_full_groups)
+write_new_group_async = aws_io(write_new_group)
+add_group_user_async = aws_io(add_group_user)
+remove_group_user_async = aws_io(remove_group_user)
+remove_group_users_async = aws_io(remove_group_users)
+delete_group_async = aws_io(delete_group)
+update_group_metadata_async = aws_io(update_group_metadata)
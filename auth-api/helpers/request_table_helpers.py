@@ -3,7 +3,7 @@ from fastapi import HTTPException
 from KeycloakFastAPI.Dependencies import *
 from config import Config
 from ProvenaInterfaces.AuthAPI import *
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_dynamodb_table
 from boto3.dynamodb.conditions import Key  # type: ignore
 from typing import Optional, Tuple
 from datetime import datetime, timedelta
@@ -99,8 +99,7 @@ def write_access_request_entry(
         Examples (optional)
         --------
     """
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(config.access_request_table_name)
+    table = get_dynamodb_table(config.access_request_table_name)
 
     # Get dictionary representation of the item
     write_item = item.dict()
@@ -211,8 +210,7 @@ def delete_request_entry(
         --------
     """
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.access_request_table_name)
+    table = get_dynamodb_table(config.access_request_table_name)
 
     # Get item
     try:
@@ -267,8 +265,7 @@ def get_request_entry(
         --------
     """
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.access_request_table_name)
+    table = get_dynamodb_table(config.access_request_table_name)
 
     # Get item
     try:
@@ -327,8 +324,7 @@ def get_all_access_request_entries(
         --------
     """
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.access_request_table_name)
+    table = get_dynamodb_table(config.access_request_table_name)
 
     try:
         items = []
@@ -389,8 +385,7 @@ def get_access_request_entries(
         --------
     """
     # Get the table
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(config.access_request_table_name)
+    table = get_dynamodb_table(config.access_request_table_name)
 
     # Make query against partition key
     try:
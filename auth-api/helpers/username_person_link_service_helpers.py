@@ -1,8 +1,11 @@
 import json
+import time
+from threading import Lock
 from fastapi import HTTPException
 from config import Config
-import boto3  # type: ignore
-from typing import Optional
+from ProvenaSharedFunctionality.Services.aws_clients import get_dynamodb_table
+from ProvenaSharedFunctionality.Services.dynamo import BatchGetError, batch_get_items
+from typing import Optional, Tuple
 from ProvenaInterfaces.AuthAPI import *
 from ProvenaInterfaces.RegistryAPI import AccessSettings
 from helpers.util import py_to_dict
@@ -27,8 +30,8 @@ def id_appears_valid(id: str) -> bool:
 
 def get_table_from_name(table_name: str) -> Any:
     """    get_table_from_name
-        Generates a dynamodb resource table to be 
-        used in the below methods. 
+        Returns the (cached, per thread) dynamodb 
+        resource table to be used in the below methods. 
 
         Returns
         -------
@@ -41,9 +44,7 @@ def get_table_from_name(table_name: str) -> Any:
         Examples (optional)
         --------
     """
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(table_name)
-    return table
+    return get_dynamodb_table(table_name)
 
 
 def get_username_person_link_table(config: Config) -> Any:
@@ -64,9 +65,126 @@ def get_username_person_link_table(config: Config) -> Any:
     return get_table_from_name(table_name=config.username_person_link_table_name)
 
 
+# short lived per process cache of username -> link entry (None = no link).
+# Entries are dropped when written/deleted through this process - other lambda
+# instances may serve a stale link for up to the configured TTL.
+_link_cache: Dict[Tuple[str, str], Tuple[float, Optional[UsernamePersonLinkTableEntry]]] = {}
+_link_cache_lock = Lock()
+
+
+def clear_link_cache() -> None:
+    with _link_cache_lock:
+        _link_cache.clear()
+
+
+def cached_link_entry(username: str, config: Config) -> Tuple[bool, Optional[UsernamePersonLinkTableEntry]]:
+    """
+    Returns (hit, entry) for the username from the link cache.
+    """
+    if config.identity_cache_ttl_seconds <= 0:
+        return False, None
+    key = (config.username_person_link_table_name, username)
+    with _link_cache_lock:
+        cached = _link_cache.get(key)
+        if cached is None:
+            return False, None
+        expiry, entry = cached
+        if expiry <= time.monotonic():
+            del _link_cache[key]
+            return False, None
+        return True, entry
+
+
+def cache_link_entry(username: str, entry: Optional[UsernamePersonLinkTableEntry], config: Config) -> None:
+    if config.identity_cache_ttl_seconds <= 0:
+        return
+    with _link_cache_lock:
+        _link_cache[(config.username_person_link_table_name, username)] = (
+            time.monotonic() + config.identity_cache_ttl_seconds, entry)
+
+
+def invalidate_link_entry(username: str, config: Config) -> None:
+    with _link_cache_lock:
+        _link_cache.pop(
+            (config.username_person_link_table_name, username), None)
+
+
+def parse_link_entry(item: Dict[str, Any]) -> UsernamePersonLinkTableEntry:
+    try:
+        return UsernamePersonLinkTableEntry.parse_obj(item)
+    except Exception as e:
+        # Parse failure - probably happens if there are entries with old invalid format
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error encountered when parsing object from user link service table: {e}"
+        )
+
+
+def get_link_entries_by_usernames(
+    usernames: List[str],
+    config: Config,
+    use_cache: bool = True
+) -> Dict[str, UsernamePersonLinkTableEntry]:
+    """
+    Looks up the specified usernames from the username person link service
+    table, using batched reads (BatchGetItem) for any not in the cache.
+
+    Args:
+        usernames (List[str]): The usernames
+        config (Config): app config
+        use_cache (bool): Serve/populate the short lived link cache. Disable
+        where a stale read matters (e.g. before writing a link).
+
+    Returns:
+        Dict[str, UsernamePersonLinkTableEntry]: The parsed entries of the
+        usernames which have one.
+    """
+    entries: Dict[str, UsernamePersonLinkTableEntry] = {}
+
+    # de-duplicate preserving order, serving from the cache where possible
+    to_fetch: List[str] = []
+    for username in dict.fromkeys(usernames):
+        if use_cache:
+            hit, entry = cached_link_entry(username=username, config=config)
+            if hit:
+                if entry is not None:
+                    entries[username] = entry
+                continue
+        to_fetch.append(username)
+
+    if len(to_fetch) == 0:
+        return entries
+
+    try:
+        items = batch_get_items(
+            table_name=config.username_person_link_table_name,
+            key_name='username',
+            keys=to_fetch
+        )
+    except BatchGetError as e:
+        # something went wrong when retrieving
+        raise HTTPException(
+            status_code=500,
+            detail=(
+                f'Failed to access user link service table. Error: {e}')
+        )
+    fetched: Dict[str, UsernamePersonLinkTableEntry] = {
+        username: parse_link_entry(item) for username, item in items.items()}
+
+    for username in to_fetch:
+        entry = fetched.get(username)
+        if use_cache:
+            cache_link_entry(username=username, entry=entry, config=config)
+        if entry is not None:
+            entries[username] = entry
+
+    return entries
+
+
 def get_link_entry_by_username(
     username: str,
-    config: Config
+    config: Config,
+    use_cache: bool = True
 ) -> Optional[UsernamePersonLinkTableEntry]:
     """
     Looks up the specified username from the username person link service table.
@@ -74,10 +192,17 @@ def get_link_entry_by_username(
     Args:
         username (str): The username
         config (Config): app config
+        use_cache (bool): Serve/populate the short lived link cache. Disable
+        where a stale read matters (e.g. before writing a link).
 
     Returns:
         Optional[UsernamePersonLinkTableEntry]: If present, the parsed table entry.
     """
+    if use_cache:
+        hit, cached = cached_link_entry(username=username, config=config)
+        if hit:
+            return cached
+
     # Get the table
     table = get_username_person_link_table(config=config)
 
@@ -96,17 +221,13 @@ def get_link_entry_by_username(
         )
 
     # does the item exist?
+    entry: Optional[UsernamePersonLinkTableEntry] = None
     if "Item" in response.keys():
-        try:
-            return UsernamePersonLinkTableEntry.parse_obj(response['Item'])
-        except Exception as e:
-            # Parse failure - probably happens if there are entries with old invalid format
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error encountered when parsing object from user link service table: {e}"
-            )
-    else:
-        return None
+        entry = parse_link_entry(response['Item'])
+
+    if use_cache:
+        cache_link_entry(username=username, entry=entry, config=config)
+    return entry
 
 
 def set_link_entry_by_username(
@@ -120,6 +241,7 @@ def set_link_entry_by_username(
     payload = py_to_dict(entry)
 
     # Set item
+    invalidate_link_entry(username=entry.username, config=config)
     try:
         table.put_item(Item=payload)
     except Exception as e:
@@ -162,6 +284,7 @@ def del_link_entry_by_username(
     table = get_username_person_link_table(config=config)
 
     # Set item
+    invalidate_link_entry(username=username, config=config)
     try:
         table.delete_item(
             Key={
@@ -216,15 +339,5 @@ def get_link_entries_by_person_id(
             detail=(f'Failed to access user link service table. Error: {e}')
         )
 
-    def parse_item(item: Dict[str, Any]) -> UsernamePersonLinkTableEntry:
-        try:
-            return UsernamePersonLinkTableEntry.parse_obj(item)
-        except Exception as e:
-            # Parse failure - probably happens if there are entries with old invalid format
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error encountered when parsing object from user link service table: {e}"
-            )
-
     # return the parsed list of results - probably one but could be multiple!
-    return list(map(parse_item, response['Items']))
+    return list(map(parse_link_entry, response['Items']))
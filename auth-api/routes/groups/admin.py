@@ -4,6 +4,8 @@ from dependencies.dependencies import *
 from ProvenaInterfaces.AuthAPI import *
 from helpers.groups_table_helpers import *
 from helpers.groups_helpers import *
+from helpers.username_person_link_service_helpers import get_link_entries_by_usernames, id_appears_valid
+from ProvenaSharedFunctionality.Services.aws_io import run_aws_io
 from config import Config, get_settings
 
 router = APIRouter(
@@ -27,7 +29,7 @@ async def list_groups(
         The list of groups
     """
     # fetch the groups
-    groups = list_group_metadata(config=config)
+    groups = await list_group_metadata_async(config=config)
 
     return ListGroupsResponse(
         status=Status(
@@ -58,7 +60,7 @@ async def describe_group(
         The group metadata and status
     """
     # fetch the group - None if not found
-    group = get_group_metadata(id=id, config=config)
+    group = await get_group_metadata_async(id=id, config=config)
 
     if group:
         return DescribeGroupResponse(
@@ -75,6 +77,7 @@ async def describe_group(
 @router.get("/list_members", response_model=ListMembersResponse, operation_id="admin_list_members")
 async def list_members(
     id: str,
+    include_person_links: bool = False,
     config: Config = Depends(get_settings),
     protected_roles: ProtectedRole = Depends(sys_admin_read_dependency)
 ) -> ListMembersResponse:
@@ -86,18 +89,32 @@ async def list_members(
     ----------
     id : str
         The group ID
+    include_person_links : bool
+        Also return the linked registry person of each member (looked up in
+        one batch)
 
     Returns
     -------
     ListMembersResponse
         The list of users
     """
-    full_group = get_populated_group(id=id, config=config)
+    full_group = await get_populated_group_async(id=id, config=config)
     if full_group:
+        person_links: Optional[Dict[str, str]] = None
+        if include_person_links:
+            entries = await run_aws_io(
+                get_link_entries_by_usernames,
+                usernames=[user.username for user in full_group.users],
+                config=config
+            )
+            person_links = {
+                username: entry.person_id for username, entry in entries.items() if id_appears_valid(entry.person_id)
+            }
         return ListMembersResponse(
             status=Status(
                 success=True, details=f"Group with {len(full_group.users)} users returned."),
-            group=full_group
+            group=full_group,
+            person_links=person_links
         )
     else:
         return ListMembersResponse(
@@ -129,7 +146,7 @@ async def list_user_membership(
         The list of group metadata for that users groups
     """
     # TODO optimise this to avoid scans
-    full_groups = list_full_groups(config=config)
+    full_groups = await list_full_groups_async(config=config)
     groups: List[UserGroupMetadata] = []
     for group in full_groups:
         found = False
@@ -170,7 +187,7 @@ async def check_membership(
     CheckMembershipResponse
         Status and is_member boolean response
     """
-    full_group = get_populated_group(id=group_id, config=config)
+    full_group = await get_populated_group_async(id=group_id, config=config)
     if not full_group:
         return CheckMembershipResponse(
             status=Status(
@@ -209,7 +226,7 @@ async def add_member(
     AddMemberResponse
         Success response
     """
-    add_group_user(
+    await add_group_user_async(
         id=group_id,
         user=user,
         config=config
@@ -245,7 +262,7 @@ async def remove_member(
         Success or failure response
     """
     print(f"Removing user {username}.")
-    remove_group_user(
+    await remove_group_user_async(
         id=group_id,
         user=GroupUser(username=username),
         config=config
@@ -280,7 +297,7 @@ async def remove_members(
     """
     print(
         f"Removing {len(remove_request.member_usernames)} users from group {remove_request.group_id}.")
-    remove_group_users(
+    await remove_group_users_async(
         id=remove_request.group_id,
         users=list(map(lambda username: GroupUser(
             username=username), remove_request.member_usernames)),
@@ -314,7 +331,7 @@ async def add_group(
     AddGroupResponse
         Success or failure response
     """
-    write_new_group(
+    await write_new_group_async(
         metadata=metadata,
         config=config
     )
@@ -345,7 +362,7 @@ async def remove_group(
     RemoveGroupResponse
         Success of failure response.
     """
-    delete_group(
+    await delete_group_async(
         id=id,
         config=config
     )
@@ -377,7 +394,7 @@ async def update_group(
     UpdateGroupResponse
         Success or failure response
     """
-    update_group_metadata(
+    await update_group_metadata_async(
         group=metadata,
         config=config
     )
@@ -27,7 +27,7 @@ async def list_groups(
         The list of groups
     """
     # fetch the groups
-    groups = list_group_metadata(config=config)
+    groups = await list_group_metadata_async(config=config)
 
     return ListGroupsResponse(
         status=Status(
@@ -58,7 +58,7 @@ async def describe_group(
         The group metadata and status
     """
     # fetch the group - None if not found
-    group = get_group_metadata(id=id, config=config)
+    group = await get_group_metadata_async(id=id, config=config)
 
     if group:
         return DescribeGroupResponse(
@@ -90,7 +90,7 @@ async def list_user_membership(
     """
     username = user.username
     # TODO optimise this to avoid scans
-    full_groups = list_full_groups(config=config)
+    full_groups = await list_full_groups_async(config=config)
     groups: List[UserGroupMetadata] = []
     for group in full_groups:
         found = False
@@ -129,7 +129,7 @@ async def list_members(
         The list of users
     """
     # check if part of group
-    membership_response = membership_check(
+    membership_response = await membership_check(
         group_id=id,
         config=config,
         username=user.username
@@ -148,7 +148,7 @@ async def list_members(
     
     # membership check was successful, are they a member?
     if membership_response.is_member:
-        full_group = get_populated_group(id=id, config=config)
+        full_group = await get_populated_group_async(id=id, config=config)
         if full_group:
             return ListMembersResponse(
                 status=Status(
@@ -168,12 +168,12 @@ async def list_members(
         
 
 
-def membership_check(
+async def membership_check(
     group_id: str,
     config: Config,
     username: str,
 ) -> CheckMembershipResponse:
-    full_group = get_populated_group(id=group_id, config=config)
+    full_group = await get_populated_group_async(id=group_id, config=config)
     if not full_group:
         return CheckMembershipResponse(
             status=Status(
@@ -209,7 +209,7 @@ async def check_membership(
     CheckMembershipResponse
         Status and is_member boolean response
     """
-    return membership_check(
+    return await membership_check(
         group_id=group_id,
         config=config,
         username=user.username
@@ -58,6 +58,42 @@ async def lookup(
             return AdminLinkUserLookupResponse(person_id=entry.person_id, success=True)
 
 
+@router.post("/lookup_batch", response_model=AdminLinkUserLookupBatchResponse, operation_id="admin_link_user_lookup_batch")
+async def lookup_batch(
+    request: AdminLinkUserLookupBatchRequest,
+    config: Config = Depends(get_settings),
+    roles: ProtectedRole = Depends(sys_admin_read_dependency)
+) -> AdminLinkUserLookupBatchResponse:
+    """
+
+    Looks up the specified usernames in the username person link service in
+    one request (e.g. to show the linked person of each member of a group).
+
+    Args:
+        request (AdminLinkUserLookupBatchRequest): The usernames to lookup.
+
+    Returns:
+        AdminLinkUserLookupBatchResponse: The person ID of each username which
+        has a valid link - usernames without one are omitted.
+    """
+    try:
+        entries = get_link_entries_by_usernames(
+            usernames=request.usernames,
+            config=config
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unhandled internal server exception when trying to read values from table. Error: {e}."
+        )
+
+    return AdminLinkUserLookupBatchResponse(person_ids={
+        username: entry.person_id for username, entry in entries.items() if id_appears_valid(entry.person_id)
+    })
+
+
 @router.post("/assign", response_model=AdminLinkUserAssignResponse, operation_id="admin_link_user_assign")
 async def assign(
     request: AdminLinkUserAssignRequest,
@@ -86,11 +122,12 @@ async def assign(
     username = request.username
     print(f"Using username: {username}.")
 
-    # lookup username in the table
+    # lookup username in the table - uncached as we are about to write
     try:
         entry = get_link_entry_by_username(
             username=username,
-            config=config
+            config=config,
+            use_cache=False
         )
     except HTTPException as he:
         raise he
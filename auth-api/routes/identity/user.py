@@ -92,11 +92,12 @@ async def assign(
     username = user.username
     print(f"Using username: {username}.")
 
-    # lookup username in the table
+    # lookup username in the table - uncached as this checks before a write
     try:
         entry = get_link_entry_by_username(
             username=username,
-            config=config
+            config=config,
+            use_cache=False
         )
     except HTTPException as he:
         raise he
@@ -195,11 +196,12 @@ async def validate(
     username = user.username
     print(f"Using username: {username}.")
 
-    # lookup username in the table
+    # lookup username in the table - uncached as this checks before a write
     try:
         entry = get_link_entry_by_username(
             username=username,
-            config=config
+            config=config,
+            use_cache=False
         )
     except HTTPException as he:
         raise he
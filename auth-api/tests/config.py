@@ -24,6 +24,7 @@ lookup_action = "lookup"
 assign_action = "assign"
 clear_action = "clear"
 reverse_action = "reverse_lookup"
+lookup_batch_action = "lookup_batch"
 
 user_lookup = f"/{link_prefix}/{user_prefix}/{lookup_action}"
 user_assign = f"/{link_prefix}/{user_prefix}/{assign_action}"
@@ -32,6 +33,7 @@ admin_lookup = f"/{link_prefix}/{admin_prefix}/{lookup_action}"
 admin_assign = f"/{link_prefix}/{admin_prefix}/{assign_action}"
 admin_clear = f"/{link_prefix}/{admin_prefix}/{clear_action}"
 admin_reverse_lookup = f"/{link_prefix}/{admin_prefix}/{reverse_action}"
+admin_lookup_batch = f"/{link_prefix}/{admin_prefix}/{lookup_batch_action}"
 
 
 @dataclass
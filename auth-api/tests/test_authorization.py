@@ -62,6 +62,7 @@ role_secured_endpoints = [
     ("/groups/admin/update_group", "PUT"),
     ("/link/admin/assign", "POST"),
     ("/link/admin/lookup", "GET"),
+    ("/link/admin/lookup_batch", "POST"),
 ]
 
 general_secured_endpoints = [
@@ -17,6 +17,9 @@ import boto3  # type: ignore
 import random
 from tests.helpers import *
 from tests.username_person_link_helpers import *
+from helpers.username_person_link_service_helpers import clear_link_cache
+from ProvenaSharedFunctionality.Services.dynamo import BATCH_GET_MAX_KEYS
+import ProvenaSharedFunctionality.Services.dynamo
 
 client = TestClient(app)
 
@@ -66,6 +69,14 @@ def aws_credentials() -> None:
     os.environ['AWS_DEFAULT_REGION'] = 'us-east-1'
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_identity_cache() -> Generator:
+    # link tables are recreated per test
+    clear_link_cache()
+    yield
+    clear_link_cache()
+
+
 @pytest.fixture(scope="function")
 def config_link_table(provide_global_config: Config) -> Config:
     config = provide_global_config
@@ -378,3 +389,73 @@ def test_reverse_lookup(config_link_table: Config) -> None:
     admin_clear_link(client=client, username=emails[0])
     admin_reverse_lookup_assert_equality(
         client=client, person_id=persons[0], usernames=[])
+
+
+@mock_dynamodb
+def test_admin_lookup_batch(config_link_table: Config, monkeypatch: Any) -> None:
+    # config
+    config = config_link_table
+
+    # setup the link table
+    botoclient = boto3.client('dynamodb')
+    setup_link_table(botoclient=botoclient, table_name=config.username_person_link_table_name,
+                     gsi_name=config.username_person_link_table_person_index_name)
+    checkout_email_all_deps("admin@gmail.com")
+
+    # more users than fit in one BatchGetItem
+    linked = {f"{i}@gmail.com": str(i)
+              for i in range(BATCH_GET_MAX_KEYS + 20)}
+    for username, person_id in linked.items():
+        admin_assign_link_assert_success(
+            client=client, username=username, person_id=person_id, force=False)
+    linked_usernames = list(linked.keys())
+    unlinked = ["missing@gmail.com"]
+
+    # count the batch reads
+    batch_get_calls: List[Dict[str, Any]] = []
+    original_get_resource = ProvenaSharedFunctionality.Services.dynamo.get_resource
+
+    class CountingResource():
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            self.resource = original_get_resource(*args, **kwargs)
+
+        def batch_get_item(self, **kwargs: Any) -> Any:
+            batch_get_calls.append(kwargs)
+            return self.resource.batch_get_item(**kwargs)
+
+        def Table(self, name: str) -> Any:
+            return self.resource.Table(name)
+
+    monkeypatch.setattr(
+        ProvenaSharedFunctionality.Services.dynamo, "get_resource", CountingResource)
+
+    # * all links returned, missing omitted, duplicates ignored
+    usernames = linked_usernames + unlinked + linked_usernames[:1]
+    assert admin_batch_lookup(client=client, usernames=usernames) == linked
+    assert len(batch_get_calls) == 2
+
+    # * served from the cache the second time
+    assert admin_batch_lookup(client=client, usernames=usernames) == linked
+    assert len(batch_get_calls) == 2
+
+    # * writes through the api invalidate the cached link
+    admin_assign_link_assert_success(
+        client=client, username=linked_usernames[0], person_id="updated", force=True)
+    admin_clear_link(client=client, username=linked_usernames[1])
+    assert admin_batch_lookup(client=client, usernames=linked_usernames[:3]) == {
+        linked_usernames[0]: "updated",
+        linked_usernames[2]: linked[linked_usernames[2]]
+    }
+    assert len(batch_get_calls) == 3
+
+    # * writes elsewhere are seen once the cache is cleared/expires
+    boto3.resource('dynamodb').Table(config.username_person_link_table_name).put_item(
+        Item={'username': unlinked[0], 'person_id': "elsewhere"})
+    assert admin_batch_lookup(client=client, usernames=unlinked) == {}
+    clear_link_cache()
+    assert admin_batch_lookup(client=client, usernames=unlinked) == {
+        unlinked[0]: "elsewhere"}
+
+    # * request size is bounded
+    response = client.post(admin_lookup_batch, json={"usernames": []})
+    assert response.status_code == 422
@@ -2,7 +2,7 @@ from typing import Optional, Any, Dict
 from fastapi.testclient import TestClient
 from httpx import Response
 from tests.config import *
-from ProvenaInterfaces.AuthAPI import UserLinkUserLookupResponse, UserLinkReverseLookupResponse
+from ProvenaInterfaces.AuthAPI import UserLinkUserLookupResponse, UserLinkReverseLookupResponse, AdminLinkUserLookupBatchResponse
 
 
 def assert_x_ok(res: Response, desired_status_code: int = 200) -> None:
@@ -147,6 +147,17 @@ def admin_person_lookup(client: TestClient, person_id: str) -> List[str]:
     return UserLinkReverseLookupResponse.parse_obj(res.json()).usernames
 
 
+def admin_batch_lookup(client: TestClient, usernames: List[str]) -> Dict[str, str]:
+    res = client.post(
+        url=admin_lookup_batch,
+        json={"usernames": usernames}
+    )
+
+    assert_200_ok(res)
+
+    return AdminLinkUserLookupBatchResponse.parse_obj(res.json()).person_ids
+
+
 def admin_reverse_lookup_assert_equality(client: TestClient, person_id: str, usernames: List[str]) -> None:
     usernames = admin_person_lookup(client=client, person_id=person_id)
 
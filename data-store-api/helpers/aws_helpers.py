@@ -1,6 +1,6 @@
 import json
 from typing import List, Any
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_client
 import botocore.session  # type: ignore
 from aws_secretsmanager_caching import SecretCache, SecretCacheConfig  # type: ignore
 from .sanitize import *
@@ -107,7 +107,7 @@ def is_s3_path_in_bucket(path: str, config: Config) -> bool:
 
     """
     # Create client
-    s3_client = boto3.client('s3')
+    s3_client = get_client('s3')
 
     # Check that the bucket name is present
     assert config.S3_STORAGE_BUCKET_NAME is not None
@@ -284,7 +284,7 @@ def seed_s3_location_with_metadata(s3_location: S3Location, metadata: ROCrate, c
     json_body = json.dumps(metadata, indent=2).encode('UTF-8')
 
     # Get s3 client
-    client = boto3.client('s3')
+    client = get_client('s3')
 
     # Construct full path into s3
     path = s3_location.path.rstrip('/') + '/' + config.METADATA_FILE_NAME
@@ -329,7 +329,7 @@ def update_metadata_at_s3(s3_location: S3Location, metadata: Dict[str, Any], con
     json_body = json.dumps(metadata, indent=2).encode('UTF-8')
 
     # Get s3 client
-    client = boto3.client('s3')
+    client = get_client('s3')
 
     # Construct full path into s3
     path = s3_location.path.rstrip('/') + '/' + config.METADATA_FILE_NAME
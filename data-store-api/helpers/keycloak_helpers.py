@@ -1,129 +1,109 @@
-import requests
-from requests.auth import HTTPBasicAuth
 from fastapi.exceptions import HTTPException
 #from config import config
 from .aws_helpers import retrieve_secret_value
 from aws_secretsmanager_caching import SecretCache # type: ignore
+from ProvenaSharedFunctionality.Services.service_token import ServiceTokenProvider, get_secret_service_token_provider, get_http_service_token, get_http_service_token_async
 import json
 from config import Config
 
 def get_oidc_service_token(secret_cache: SecretCache, config: Config) -> str:
-    # Get the secret details (potentially cached)
+    # Get the token from keycloak using the OIDC service account secret
+    # (cached until shortly before expiry)
     assert config.OIDC_SERVICE_ACCOUNT_SECRET_ARN
-    secret_json = json.loads(
-        retrieve_secret_value(
-            secret_arn=config.OIDC_SERVICE_ACCOUNT_SECRET_ARN,
-            secret_cache=secret_cache
-        )
-    )
-
-    # Get the token from keycloak using the secret
-    # TODO use existing cached token if still valid
-    return get_client_credential_token(
-        client_id=secret_json['client_id'],
-        client_secret=secret_json['client_secret'],
-        grant_type=secret_json['grant_type'],
+    return get_http_service_token(service_token_provider(
+        secret_cache=secret_cache,
+        secret_arn=config.OIDC_SERVICE_ACCOUNT_SECRET_ARN,
         token_endpoint=config.KEYCLOAK_TOKEN_ENDPOINT
-    )
+    ))
+
+
+def service_token_provider(secret_cache: SecretCache, secret_arn: str, token_endpoint: str) -> ServiceTokenProvider:
+    """    service_token_provider
+        Returns the (process wide) token provider for the service account
+        stored in the given secret. The secret is only read when a new token
+        is requested.
+
+        Arguments
+        ----------
+        secret_cache : SecretCache
+            The secret cache for AWS SM
+        secret_arn : str
+            The service account secret ARN
+        token_endpoint : str
+            The keycloak token endpoint
 
+        Returns
+        -------
+         : ServiceTokenProvider
+            The shared token provider
+    """
+    return get_secret_service_token_provider(
+        secret_arn=secret_arn,
+        token_endpoint=token_endpoint,
+        read_secret=lambda secret_arn: retrieve_secret_value(
+            secret_arn=secret_arn, secret_cache=secret_cache)
+    )
 
 
 def get_service_token(secret_cache: SecretCache, config: Config) -> str:
     """    get_service_token
-        Given the secret cache object, will get the 
-        secret ARN for the service account, expand it 
-        and make a keycloak token request, then return
-        the access token.
+        Given the secret cache object, will return the service account's
+        access token. Tokens are cached until shortly before they expire (see
+        ServiceTokenProvider) so keycloak is only asked for a new token as
+        needed.
+
+        Blocks while a new token is requested - prefer
+        get_service_token_async in async code.
 
         Arguments
         ----------
         secret_cache : SecretCache
             The secret cache for AWS SM
+        config : Config
+            The API config
 
         Returns
         -------
          : str
             The token
 
-        See Also (optional)
-        --------
-
-        Examples (optional)
-        --------
+        Raises
+        ------
+        HTTPException
+            500 if the token could not be obtained
     """
-    # Get the secret details (potentially cached)
     assert config.SERVICE_ACCOUNT_SECRET_ARN
-    secret_json = json.loads(
-        retrieve_secret_value(
-            secret_arn=config.SERVICE_ACCOUNT_SECRET_ARN,
-            secret_cache=secret_cache
-        )
-    )
-
-    # Get the token from keycloak using the secret
-    # TODO use existing cached token if still valid
-    return get_client_credential_token(
-        client_id=secret_json['client_id'],
-        client_secret=secret_json['client_secret'],
-        grant_type=secret_json['grant_type'],
+    return get_http_service_token(service_token_provider(
+        secret_cache=secret_cache,
+        secret_arn=config.SERVICE_ACCOUNT_SECRET_ARN,
         token_endpoint=config.KEYCLOAK_TOKEN_ENDPOINT
-    )
+    ))
 
 
-def get_client_credential_token(client_id: str, client_secret: str, token_endpoint: str, grant_type: str) -> str:
-    """    get_service_access_token
-        Given the client id, secret, grant type and endpoint will perform a token 
-        request against the keycloak server to retrieve a service account credential.
+async def get_service_token_async(secret_cache: SecretCache, config: Config) -> str:
+    """    get_service_token_async
+        As get_service_token, but token requests don't block the event loop.
 
         Arguments
         ----------
-        client_id : str
-            The keycloak client id
-        client_secret : str
-            The keycloak client secret
-        token_endpoint : str
-            The token endpoint for keycloak auth server
-        grant_type : str
-            The grant type (probably client_credentials)
+        secret_cache : SecretCache
+            The secret cache for AWS SM
+        config : Config
+            The API config
 
         Returns
         -------
          : str
-            The access token
+            The token
 
         Raises
         ------
         HTTPException
-            500 if something goes wrong making request
-        HTTPException
-            500 if 401 unauthorized response
-
-        See Also (optional)
-        --------
-
-        Examples (optional)
-        --------
+            500 if the token could not be obtained
     """
-    auth = HTTPBasicAuth(client_id, client_secret)
-    payload = {
-        'grant_type': grant_type
-    }
-
-    # make request
-    response = requests.post(token_endpoint, data=payload, auth=auth)
-
-    try:
-        assert response.status_code == 200
-    except Exception as e:
-        if response.status_code == 401:
-            raise HTTPException(
-                status_code=500,
-                detail="API service account creds appear to be incorrect. Contact administrator."
-            )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"API service creds request failed, code: {response.status_code}."
-            )
-
-    return response.json()['access_token']
+    assert config.SERVICE_ACCOUNT_SECRET_ARN
+    return await get_http_service_token_async(service_token_provider(
+        secret_cache=secret_cache,
+        secret_arn=config.SERVICE_ACCOUNT_SECRET_ARN,
+        token_endpoint=config.KEYCLOAK_TOKEN_ENDPOINT
+    ))
@@ -3,7 +3,7 @@ from ProvenaInterfaces.RegistryModels import *
 from ProvenaInterfaces.DataStoreAPI import *
 from KeycloakFastAPI.Dependencies import ProtectedRole
 from config import Config
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_dynamodb_table
 from helpers.auth_helpers import get_user_link, get_usernames_from_id  # type: ignore
 from helpers.aws_helpers import setup_secret_cache
 from helpers.auth_helpers import evaluate_user_access, evaluate_user_access_all
@@ -26,8 +26,7 @@ def add_reviewer(reviewer_id: IdentifiedResource, config: Config) -> None:
     # management in the console.
 
     try:
-        ddb_resource = boto3.resource('dynamodb')
-        reviewers_table = ddb_resource.Table(config.REVIEWERS_TABLE_NAME)
+        reviewers_table = get_dynamodb_table(config.REVIEWERS_TABLE_NAME)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -52,8 +51,7 @@ def connect_to_table(table_name: str) -> Any:
 
     reviewers_table: Any
     try:
-        ddb_resource = boto3.resource('dynamodb')
-        reviewers_table = ddb_resource.Table(table_name)
+        reviewers_table = get_dynamodb_table(table_name)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1,6 +1,7 @@
 
 from typing import List
 import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_client
 from botocore.exceptions import ClientError #type: ignore
 from fastapi import HTTPException
 from helpers.sts_helpers import call_sts_oidc_service
@@ -31,7 +32,7 @@ def check_file_exists(bucket_name: str, file_path: str ) -> bool:
     Exception
         Unexpected error occurred during s3 head operation.
     """
-    s3 = boto3.client('s3')
+    s3 = get_client('s3')
 
     try:
         s3.head_object(Bucket=bucket_name, Key=file_path)
@@ -2,7 +2,7 @@ from helpers.keycloak_helpers import get_oidc_service_token
 import json
 from dependencies.secret_cache import secret_cache
 from ProvenaInterfaces.DataStoreAPI import *
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_client
 from helpers.aws_helpers import create_policy_document, S3CredentialPaths
 import urllib
 import requests
@@ -127,7 +127,7 @@ def call_sts_oidc_service(session_name: str, s3_location: S3Location, write: boo
     )
 
     # Create AWS client
-    client = boto3.client('sts')
+    client = get_client('sts')
 
     # Try to call assume role
     # This relies on the role ARN trusting web
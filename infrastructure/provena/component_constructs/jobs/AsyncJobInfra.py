@@ -12,7 +12,9 @@ from aws_cdk import (
     aws_s3 as s3,
     aws_apigateway as api_gw,
     aws_secretsmanager as sm,
-    aws_certificatemanager as aws_cm
+    aws_certificatemanager as aws_cm,
+    aws_logs as logs,
+    aws_cloudwatch as cloudwatch
 )
 from constructs import Construct
 from typing import Any, List, Dict, Optional
@@ -35,6 +37,19 @@ class JobType(str, Enum):
     REPORT = "REPORT"
 
 
+# Mirrors the job priorities in the shared interfaces - the topic routes each
+# priority to its own queue using this message attribute
+class JobPriority(str, Enum):
+    INTERACTIVE = "INTERACTIVE"
+    BULK = "BULK"
+
+
+JOB_PRIORITY_ATTRIBUTE = "priority"
+
+# Namespace for job metrics published from the worker logs
+JOB_METRIC_NAMESPACE = "Provena/AsyncJobs"
+
+
 @dataclass
 class JobConfig():
     type: JobType
@@ -42,6 +57,11 @@ class JobConfig():
     visibility_timeout: Duration
     environment: Dict[str, str]
     secrets: Dict[str, ecs.Secret]
+    # how many jobs each task runs at once
+    concurrency: int = 1
+    # how many workers are kept running (by an ECS service) regardless of
+    # the idle timeout
+    min_warm_workers: int = 0
 
 
 class AsyncJobInfra(Construct):
@@ -66,6 +86,7 @@ class AsyncJobInfra(Construct):
                  git_commit_id: Optional[str],
                  sentry_config: SentryConfig,
                  feature_number: Optional[int],
+                 jobs_per_task: int = 10,
                  **kwargs: Any) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
@@ -227,12 +248,27 @@ class AsyncJobInfra(Construct):
         job_api.function.add_environment(
             key="global_list_index_name", value=global_list_index_name)
 
+        # DynamoDB for per batch status counters - updated in the same
+        # transaction as each status change of a batch job
+        batch_table: ddb.Table = ddb.Table(
+            scope=self,
+            id='batchcounters',
+            billing_mode=ddb.BillingMode.PAY_PER_REQUEST,
+
+            # Primary key = batch id
+            partition_key=ddb.Attribute(
+                name=batch_key, type=ddb.AttributeType.STRING),
+        )
+        batch_table.grant_read_write_data(job_api.function)
+        job_api.function.add_environment(
+            key="batch_table_name", value=batch_table.table_name)
+
         # =============
         # CLUSTER SETUP
         # =============
 
         # ECS Cluster and tasks as configured (all)
-        # No services need to run here
+        # Services only run warm workers (if configured)
         cluster: ecs.Cluster = ecs.Cluster(
             scope=self,
             id='cluster',
@@ -252,7 +288,10 @@ class AsyncJobInfra(Construct):
             path="../async-util/lambda_invoker",
             timeout=Duration.minutes(2),
             bundling_required=True,
-            extra_hash_dirs=invoker_extra_hash_dirs
+            extra_hash_dirs=invoker_extra_hash_dirs,
+            # scaling decisions are made one at a time so that simultaneous
+            # job submissions don't each launch the full task deficit
+            concurrent_limit=1
         )
 
         # Let the invoker know the cluster ARN
@@ -297,6 +336,11 @@ class AsyncJobInfra(Construct):
         connector.add_environment(
             key="TABLE_NAME", value=status_table.table_name)
 
+        # Connector counts new batch jobs
+        batch_table.grant_read_write_data(connector)
+        connector.add_environment(
+            key="BATCH_TABLE_NAME", value=batch_table.table_name)
+
         # ==========
         # JOBS SETUP
         # ==========
@@ -316,6 +360,7 @@ class AsyncJobInfra(Construct):
         # Need an SNS topic for each job type (each)
         topics: Dict[JobType, sns.Topic] = {}
         queues: Dict[JobType, sqs.Queue] = {}
+        bulk_queues: Dict[JobType, sqs.Queue] = {}
         task_roles: Dict[JobType, iam.IGrantable] = {}
         task_dfns: Dict[JobType, ecs.FargateTaskDefinition] = {}
 
@@ -357,9 +402,32 @@ class AsyncJobInfra(Construct):
                 visibility_timeout=job.visibility_timeout
             )
 
-            # Subscribe the queue to topic
+            # Bulk priority lane - shares the DLQ
+            bulk_queue: sqs.Queue = sqs.Queue(
+                scope=self,
+                id='bulkqueue' + job.type,
+                dead_letter_queue=redrive,
+                visibility_timeout=job.visibility_timeout
+            )
+
+            # Subscribe the queues to topic - routed by job priority
+            topic.add_subscription(
+                sns_subs.SqsSubscription(
+                    queue=queue,
+                    filter_policy={
+                        JOB_PRIORITY_ATTRIBUTE: sns.SubscriptionFilter.string_filter(
+                            allowlist=[JobPriority.INTERACTIVE.value])
+                    }
+                )
+            )
             topic.add_subscription(
-                sns_subs.SqsSubscription(queue=queue)
+                sns_subs.SqsSubscription(
+                    queue=bulk_queue,
+                    filter_policy={
+                        JOB_PRIORITY_ATTRIBUTE: sns.SubscriptionFilter.string_filter(
+                            allowlist=[JobPriority.BULK.value])
+                    }
+                )
             )
             # Subscribe the invoker to topic
             topic.add_subscription(
@@ -390,19 +458,25 @@ class AsyncJobInfra(Construct):
             # r/w sqs queue
             # r/w ddb table
             queue.grant_consume_messages(task_dfn.task_role)
+            bulk_queue.grant_consume_messages(task_dfn.task_role)
             status_table.grant_read_write_data(task_dfn.task_role)
+            batch_table.grant_read_write_data(task_dfn.task_role)
 
             # Add the container to task dfn
             base_environment = job.environment.copy()
             base_environment.update({
                 'QUEUE_URL': queue.queue_url,
+                'BULK_QUEUE_URL': bulk_queue.queue_url,
                 'STATUS_TABLE_NAME': status_table.table_name,
+                'BATCH_TABLE_NAME': batch_table.table_name,
                 'SNS_TOPIC_ARN': topic.topic_arn,
                 'JOB_TYPE': job.type,
                 # This is also included for all tasks
                 'JOB_API_ENDPOINT': self.job_api_endpoint,
                 # Determines how long the job polls before quitting
-                'IDLE_TIMEOUT': str(idle_timeout)
+                'IDLE_TIMEOUT': str(idle_timeout),
+                # How many jobs the task runs at once
+                'JOB_CONCURRENCY': str(job.concurrency)
             })
             # If this job type produces reports, inject S3 details
             if job.type == JobType.REPORT:
@@ -413,12 +487,71 @@ class AsyncJobInfra(Construct):
                         "REPORT_PRESIGNED_EXPIRY_SECONDS": "10800",
                     }
                 )
+            log_group = logs.LogGroup(
+                scope=self,
+                id='joblogs' + job.type,
+                retention=logs.RetentionDays.ONE_MONTH,
+                removal_policy=RemovalPolicy.DESTROY
+            )
             task_dfn.add_container(
                 id='jobcontainer' + job.type,
                 image=job.image,
                 environment=base_environment,
                 secrets=job.secrets,
-                logging=ecs.LogDriver.aws_logs(stream_prefix=job.type)
+                logging=ecs.LogDriver.aws_logs(
+                    stream_prefix=job.type, log_group=log_group)
+            )
+
+            # Warm workers - the same container, kept running by a service and
+            # never exiting due to the idle timeout. These share the task roles
+            # so have the same permissions as the on demand tasks.
+            warm_task_dfn: Optional[ecs.FargateTaskDefinition] = None
+            if job.min_warm_workers > 0:
+                warm_task_dfn = ecs.FargateTaskDefinition(
+                    scope=self,
+                    id='fgwarmdfn' + job.type,
+                    cpu=1024,
+                    memory_limit_mib=2048,
+                    task_role=task_dfn.task_role,
+                    execution_role=task_dfn.obtain_execution_role()
+                )
+                warm_environment = base_environment.copy()
+                warm_environment['WARM_WORKER'] = 'true'
+                warm_task_dfn.add_container(
+                    id='warmjobcontainer' + job.type,
+                    image=job.image,
+                    environment=warm_environment,
+                    secrets=job.secrets,
+                    logging=ecs.LogDriver.aws_logs(
+                        stream_prefix=job.type + 'warm', log_group=log_group)
+                )
+                # Same networking as the tasks run by the invoker
+                ecs.FargateService(
+                    scope=self,
+                    id='warmworkers' + job.type,
+                    cluster=cluster,
+                    task_definition=warm_task_dfn,
+                    desired_count=job.min_warm_workers,
+                    assign_public_ip=True,
+                    vpc_subnets=ec2.SubnetSelection(
+                        subnet_type=ec2.SubnetType.PUBLIC)
+                )
+
+            # Workers log the time each job waited to be dispatched
+            logs.MetricFilter(
+                scope=self,
+                id='schedulinglatency' + job.type,
+                log_group=log_group,
+                metric_namespace=JOB_METRIC_NAMESPACE,
+                metric_name="SchedulingLatency",
+                filter_pattern=logs.FilterPattern.exists(
+                    "$.scheduling_latency_seconds"),
+                metric_value="$.scheduling_latency_seconds",
+                dimensions={
+                    "JobType": "$.job_type",
+                    "Priority": "$.priority"
+                },
+                unit=cloudwatch.Unit.SECONDS
             )
 
             # Grant S3 permissions to the fargate task role for REPORT jobs
@@ -428,6 +561,7 @@ class AsyncJobInfra(Construct):
 
             # Update dicts
             queues[job.type] = queue
+            bulk_queues[job.type] = bulk_queue
             topics[job.type] = topic
             task_dfns[job.type] = task_dfn
             task_roles[job.type] = task_dfn.task_role
@@ -443,6 +577,22 @@ class AsyncJobInfra(Construct):
             # Let the invoker invoke the task definition
             task_dfn.grant_run(invoker)
 
+            # The invoker counts running warm workers
+            if warm_task_dfn is not None:
+                invoker.add_environment(
+                    # e.g. PROV_LODGE_WARM_TASK_DEFINITION_ARN
+                    key=job.type + "_WARM_TASK_DEFINITION_ARN", value=warm_task_dfn.task_definition_arn)
+
+            # The invoker scales on the depth of the queue
+            invoker.add_environment(
+                # e.g. PROV_LODGE_QUEUE_URL
+                key=job.type + "_QUEUE_URL", value=queue.queue_url)
+            queue.grant(invoker, "sqs:GetQueueAttributes")
+            invoker.add_environment(
+                # e.g. PROV_LODGE_BULK_QUEUE_URL
+                key=job.type + "_BULK_QUEUE_URL", value=bulk_queue.queue_url)
+            bulk_queue.grant(invoker, "sqs:GetQueueAttributes")
+
         invoker.add_environment(
             key="vpc_id", value=vpc.vpc_id
         )
@@ -452,10 +602,15 @@ class AsyncJobInfra(Construct):
         invoker.add_environment(
             key="max_task_scaling", value=str(max_task_scaling)
         )
+        invoker.add_environment(
+            key="jobs_per_task", value=str(jobs_per_task)
+        )
 
         # expose information
         self.status_table = status_table
+        self.batch_table = batch_table
         self.task_dfns = task_dfns
         self.queues = queues
+        self.bulk_queues = bulk_queues
         self.topics = topics
         self.task_roles = task_roles
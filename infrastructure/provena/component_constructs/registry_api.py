@@ -6,19 +6,23 @@ from aws_cdk import (
     aws_secretsmanager as sm,
     Duration,
     RemovalPolicy,
-    aws_iam as iam
+    aws_iam as iam,
+    aws_lambda as _lambda,
+    aws_lambda_event_sources as lambda_sources,
 )
 
 from constructs import Construct
 from provena.custom_constructs.DNS_allocator import DNSAllocator
 from provena.utility.direct_secret_import import direct_import
 from provena.custom_constructs.docker_lambda_function import DockerImageLambda
-from provena.component_constructs.registry_table import RegistryTable, IdIndexTable
+from provena.component_constructs.registry_table import RegistryTable, IdIndexTable, AccessProjectionTable
 from provena.config.config_class import APIGatewayRateLimitingSettings, SentryConfig
 from typing import Any, List, Optional
 
 
 REGISTRY_API_TIMEOUT = 60  # seconds
+ACCESS_PROJECTION_STREAMER_TIMEOUT = 60  # seconds
+ACCESS_PROJECTION_STREAMER_HANDLER = "access_projection_streamer.handler"
 
 
 class RegistryAPI(Construct):
@@ -47,6 +51,7 @@ class RegistryAPI(Construct):
                  git_release_url: Optional[str],
                  sentry_config: SentryConfig,
                  feature_number: Optional[int],
+                 access_projection_table: Optional[AccessProjectionTable] = None,
                  extra_hash_dirs: List[str] = [],
                  **kwargs: Any) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -110,7 +115,8 @@ class RegistryAPI(Construct):
             "FEATURE_NUMBER": str(feature_number),
             "USER_KEY_ID": user_context_key.key_id,
             "USER_KEY_REGION": Stack.of(self).region,
-            "USER_CONTEXT_HEADER": "X-User-Context"
+            "USER_CONTEXT_HEADER": "X-User-Context",
+            "ACCESS_PROJECTION_TABLE_NAME": access_projection_table.table_name if access_projection_table else None,
         }
 
         for key, val in api_environment.items():
@@ -163,6 +169,9 @@ class RegistryAPI(Construct):
             # and auth/lock table
             auth_table.table.grant_read_write_data(grantee)
             lock_table.table.grant_read_write_data(grantee)
+            # and the access projection (rebuilt by admins through the api)
+            if access_projection_table:
+                access_projection_table.table.grant_read_write_data(grantee)
 
             # let api func act as service acc
             service_secret.grant_read(grantee)
@@ -173,6 +182,47 @@ class RegistryAPI(Construct):
         # grant permissions to registry api
         grant_api_equivalent_permissions(api_func.function)
 
+        functions: List[_lambda.Function] = [api_func.function]
+
+        if access_projection_table:
+            # same image as the api with the streamer entry point - maintains
+            # the access projection from the registry and auth table streams
+            streamer_func = DockerImageLambda(
+                self,
+                'access-projection-streamer',
+                build_directory="../registry-api",
+                dockerfile_path_relative="lambda_dockerfile",
+                build_args={
+                    "github_token": oauth_token,
+                    "repo_string": repo_string,
+                    "branch_name": branch_name
+                },
+                extra_hash_dirs=extra_hash_dirs,
+                timeout=Duration.seconds(ACCESS_PROJECTION_STREAMER_TIMEOUT),
+                cmd=[ACCESS_PROJECTION_STREAMER_HANDLER]
+            )
+            for key, val in api_environment.items():
+                if val is not None:
+                    streamer_func.function.add_environment(key, val)
+            grant_api_equivalent_permissions(streamer_func.function)
+
+            for source_table in [registry_table.table, auth_table.table]:
+                streamer_func.function.add_event_source(lambda_sources.DynamoEventSource(
+                    starting_position=_lambda.StartingPosition.LATEST,
+                    table=source_table,
+                    bisect_batch_on_error=True,
+                    retry_attempts=5,
+                    report_batch_item_failures=True,
+                ))
+                source_table.grant_stream_read(streamer_func.function)
+
+            functions.append(streamer_func.function)
+
+        def add_to_environment(key: str, value: str) -> None:
+            # keep the api and streamer environments (config) in sync
+            for function in functions:
+                function.add_environment(key, value)
+
         self.registry_api_environment = api_environment
         self.grant_api_equivalent_permissions = grant_api_equivalent_permissions
-        self.add_to_environment = api_func.function.add_environment
+        self.add_to_environment = add_to_environment
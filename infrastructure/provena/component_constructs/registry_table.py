@@ -130,6 +130,7 @@ class IdIndexTable(Construct):
             readers: List[iam.IGrantable],
             writers: List[iam.IGrantable],
             removal_policy: RemovalPolicy,
+            streams_enabled: bool = False,
             **kwargs: Any) -> None:
         """    __init__
             Basic dynamoDB registry auth table. Setup to not be deleted if the 
@@ -152,6 +153,9 @@ class IdIndexTable(Construct):
                 List of grantable readers
             writers : List[iam.IGrantable]
                 List of grantable writers
+            streams_enabled : bool
+                Should a (keys only) stream be enabled - e.g. the auth table
+                stream maintains the registry access projection
 
             See Also (optional)
             --------
@@ -174,8 +178,8 @@ class IdIndexTable(Construct):
             partition_key=dynamodb.Attribute(
                 name=ID_FIELD_NAME,
                 type=dynamodb.AttributeType.STRING
-            )
-            # no streams enabled for the auth or lock table
+            ),
+            stream=dynamodb.StreamViewType.KEYS_ONLY if streams_enabled else None,
         )
 
         # Add the permissions to other components
@@ -187,3 +191,95 @@ class IdIndexTable(Construct):
 
         # Expose the table name
         self.table_name = self.table.table_name
+
+
+# access projection table keys - see registry-api/helpers/access_projection_helpers.py
+PROJECTION_PARTITION_KEY = "principal"
+PROJECTION_SUBTYPE_PARTITION_KEY = "principal_subtype"
+projection_sort_keys: List[str] = [
+    "updated_timestamp", "created_timestamp", "display_name"]
+
+
+class AccessProjectionTable(Construct):
+    def __init__(
+            self,
+            scope: Construct,
+            construct_id: str,
+            readers: List[iam.IGrantable],
+            writers: List[iam.IGrantable],
+            **kwargs: Any) -> None:
+        """    __init__
+            Per principal projection of the registry items each principal can
+            read - one row per (principal, item id). Derived entirely from the
+            registry and auth tables (and can be rebuilt from them) so is not
+            retained or backed up.
+
+            Indexed by principal (and principal + subtype) against each sort
+            key of the general list, plus an id index used to find an item's
+            rows when it changes.
+
+            Arguments
+            ----------
+            scope : Construct
+                The CDK scope
+            construct_id : str
+                The CDK construct ID
+            readers : List[iam.IGrantable]
+                List of grantable readers
+            writers : List[iam.IGrantable]
+                List of grantable writers
+
+            See Also (optional)
+            --------
+
+            Examples (optional)
+            --------
+        """
+        super().__init__(scope, construct_id, **kwargs)
+
+        self.table = dynamodb.Table(
+            self,
+            "table",
+            billing_mode=BILLING_MODE,
+            removal_policy=RemovalPolicy.DESTROY,
+            partition_key=dynamodb.Attribute(
+                name=PROJECTION_PARTITION_KEY,
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name=ID_FIELD_NAME,
+                type=dynamodb.AttributeType.STRING
+            ),
+        )
+
+        # add one at a time to an existing table (see above)
+        for partition_key in [PROJECTION_PARTITION_KEY, PROJECTION_SUBTYPE_PARTITION_KEY]:
+            for sort_key in projection_sort_keys:
+                self.table.add_global_secondary_index(
+                    index_name=partition_key+'-'+sort_key+INDEX_NAME_POSTFIX,
+                    partition_key=dynamodb.Attribute(
+                        name=partition_key,
+                        type=dynamodb.AttributeType.STRING
+                    ),
+                    sort_key=dynamodb.Attribute(
+                        name=sort_key,
+                        type=dynamodb.AttributeType.STRING if sort_key in string_sort_keys else dynamodb.AttributeType.NUMBER
+                    ),
+                )
+
+        self.table.add_global_secondary_index(
+            index_name=ID_FIELD_NAME+INDEX_NAME_POSTFIX,
+            partition_key=dynamodb.Attribute(
+                name=ID_FIELD_NAME,
+                type=dynamodb.AttributeType.STRING
+            ),
+            projection_type=dynamodb.ProjectionType.KEYS_ONLY,
+        )
+
+        for r in readers:
+            self.table.grant_read_data(r)
+
+        for w in writers:
+            self.table.grant_read_write_data(w)
+
+        self.table_name = self.table.table_name
@@ -28,6 +28,7 @@ class LambdaSearchAPI(Construct):
                  registry_index: str,
                  global_index: str,
                  linearised_field_name: str,
+                 registry_api_endpoint: str,
                  api_rate_limiting: Optional[APIGatewayRateLimitingSettings],
                  git_commit_id: Optional[str],
                  sentry_config: SentryConfig,
@@ -69,6 +70,7 @@ class LambdaSearchAPI(Construct):
             "REGISTRY_INDEX": registry_index,
             "GLOBAL_INDEX": global_index,
             "LINEARISED_FIELD": linearised_field_name,
+            "REGISTRY_API_ENDPOINT": registry_api_endpoint,
             "MONITORING_ENABLED": str(sentry_config.monitoring_enabled),
             "GIT_COMMIT_ID": git_commit_id,
             "SENTRY_DSN": sentry_config.sentry_dsn_back_end,
@@ -156,6 +156,22 @@ class AsyncJobsComponent(BaseModel):
     # maximum number of concurrent tasks
     max_task_scaling: int = 3
 
+    # target number of outstanding queued jobs per task - tasks are scaled on
+    # queue depth up to max_task_scaling
+    jobs_per_task: int = 10
+
+    # how many jobs each prov/registry task runs at once (these jobs are I/O
+    # bound)
+    prov_job_concurrency: int = 4
+    registry_job_concurrency: int = 4
+
+    # how many workers of each job type are kept running regardless of the
+    # idle timeout - avoids a task cold start for the first jobs of a burst
+    prov_min_warm_workers: int = 0
+    registry_min_warm_workers: int = 0
+    email_min_warm_workers: int = 0
+    report_min_warm_workers: int = 0
+
     # Job config extra hash dirs (defaults provided)
     registry_job_extra_hash_dirs: List[str] = REGISTRY_JOB_EXTRA_HASH_DIRS
     prov_job_extra_hash_dirs: List[str] = PROV_JOB_EXTRA_HASH_DIRS
@@ -328,6 +344,11 @@ class EntityRegistryComponent(BaseModel):
     # removals
     tables_removal_policy: RemovalPolicy = RemovalPolicy.RETAIN
 
+    # maintain the per principal access projection (from the registry/auth
+    # table streams) and use it for general listing - populate it for existing
+    # items with the /admin/access_projection/rebuild endpoint
+    access_projection_enabled: bool = False
+
     component: ProvenaComponent = ProvenaComponent.ENTITY_REGISTRY
 
 
@@ -42,6 +42,7 @@ class DockerImageLambda(Construct):
                  build_args: Optional[Dict[str, str]] = {},
                  timeout: Optional[Duration] = DEFAULT_LAMBDA_TIMEOUT,
                  memory_size: Optional[int] = DEFAULT_MEMORY_SIZE,
+                 cmd: Optional[List[str]] = None,
                  **kwargs: Any) -> None:
 
         # Super constructor
@@ -70,7 +71,9 @@ class DockerImageLambda(Construct):
                 directory=build_directory,
                 build_args=final_build_args,
                 file=dockerfile_path_relative,
-                extra_hash=extra_hash
+                extra_hash=extra_hash,
+                # overrides the image CMD (handler) if provided
+                cmd=cmd
             ),
             timeout=timeout,
             memory_size=memory_size,
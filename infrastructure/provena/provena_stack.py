@@ -25,7 +25,7 @@ from provena.component_constructs.jobs.AsyncJobInfra import (
     JobConfig,
 )
 from provena.component_constructs.prov_api import ProvAPI
-from provena.component_constructs.registry_table import RegistryTable, IdIndexTable
+from provena.component_constructs.registry_table import RegistryTable, IdIndexTable, AccessProjectionTable
 from provena.component_constructs.static_cloudfront_distribution import (
     StaticCloudfrontDistribution,
 )
@@ -367,6 +367,7 @@ class ProvenaStack(Stack):
                 unqualified_search_domain=open_search_infra.unqualified_domain_endpoint,
                 registry_index=search_config.registry_index_name,
                 global_index=search_config.global_index_name,
+                registry_api_endpoint=resolved_endpoints.registry_api,
                 git_commit_id=config.deployment.git_commit_id,
                 sentry_config=config.deployment.sentry_config,
                 feature_number=config.deployment.ticket_number,
@@ -414,6 +415,8 @@ class ProvenaStack(Stack):
                 readers=[],
                 writers=[],
                 removal_policy=reg_config.tables_removal_policy,
+                # access changes update the access projection
+                streams_enabled=reg_config.access_projection_enabled,
             )
             lock_table = IdIndexTable(
                 scope=self,
@@ -423,6 +426,14 @@ class ProvenaStack(Stack):
                 writers=[],
                 removal_policy=reg_config.tables_removal_policy,
             )
+            access_projection_table: Optional[AccessProjectionTable] = None
+            if reg_config.access_projection_enabled:
+                access_projection_table = AccessProjectionTable(
+                    scope=self,
+                    construct_id="entity-registry-access-projection",
+                    readers=[],
+                    writers=[],
+                )
             # Create lambda API for registry
             registry_api = RegistryAPI(
                 scope=self,
@@ -441,6 +452,7 @@ class ProvenaStack(Stack):
                 registry_table=registry_table,
                 auth_table=auth_table,
                 lock_table=lock_table,
+                access_projection_table=access_projection_table,
                 cert_arn=cert_arn,
                 user_context_key=symmetric_key,
                 auth_api_endpoint=auth_api.endpoint,
@@ -721,6 +733,8 @@ class ProvenaStack(Stack):
                 # topic by default - these are added in
                 environment=prov_lodge_environment,
                 secrets={},
+                concurrency=async_config.prov_job_concurrency,
+                min_warm_workers=async_config.prov_min_warm_workers,
             ),
             JobConfig(
                 type=JobType.REGISTRY,
@@ -741,6 +755,8 @@ class ProvenaStack(Stack):
                 # topic by default - these are added in
                 environment=registry_job_environment,
                 secrets={},
+                concurrency=async_config.registry_job_concurrency,
+                min_warm_workers=async_config.registry_min_warm_workers,
             ),
             JobConfig(
                 type=JobType.EMAIL,
@@ -784,6 +800,7 @@ class ProvenaStack(Stack):
                         secret=email_secret, field="email_from"
                     ),
                 },
+                min_warm_workers=async_config.email_min_warm_workers,
             ),
             JobConfig(
                 type=JobType.REPORT,
@@ -802,6 +819,7 @@ class ProvenaStack(Stack):
                 visibility_timeout=Duration.minutes(5),
                 environment=prov_lodge_environment,
                 secrets={},
+                min_warm_workers=async_config.report_min_warm_workers,
             ),
         ]
 
@@ -812,6 +830,7 @@ class ProvenaStack(Stack):
             jobs=jobs,
             idle_timeout=async_config.async_idle_timeout,
             max_task_scaling=async_config.max_task_scaling,
+            jobs_per_task=async_config.jobs_per_task,
             cert_arn=config.dns.domain_certificate_arn,
             allocator=dns_allocator,
             keycloak_endpoint=keycloak_auth_endpoint_full,
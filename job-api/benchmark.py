@@ -0,0 +1,110 @@
+import typer
+import os
+import json
+import logging
+import logging.config
+import contextlib
+from typing import Optional
+
+# End to end load benchmark for the async job pipeline.
+#
+# Launches synthetic (wake up) jobs through the job API launch service against
+# moto, with the SNS topic, priority lane queues, status table connector and
+# invoker lambdas, and ECS workers (run in process by the invoker) wired
+# together as deployed. Reports latency percentiles, queue wait and worker
+# utilisation, e.g.
+#
+# python benchmark.py --jobs 5000 --bulk-fraction 0.8 --concurrency 8
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(
+    jobs: int = typer.Option(1000, help="The number of jobs to launch."),
+    job_type: str = typer.Option(
+        "PROV_LODGE", help="The job type (PROV_LODGE, REGISTRY or EMAIL)."),
+    rate: float = typer.Option(
+        0.0, help="Target launch rate in jobs/s (0 launches as fast as possible)."),
+    launchers: int = typer.Option(
+        4, help="Concurrent launch requests (job API invocations)."),
+    users: int = typer.Option(4, help="Number of users launching jobs."),
+    bulk_fraction: float = typer.Option(
+        0.5, help="Fraction of jobs launched as bulk batches - the rest are single interactive launches."),
+    batch_size: int = typer.Option(100, help="Jobs per bulk batch launch."),
+    job_ms: float = typer.Option(50.0, help="Mean synthetic job duration."),
+    job_jitter: float = typer.Option(
+        0.5, help="Job duration jitter as a fraction of the mean."),
+    failure_rate: float = typer.Option(
+        0.0, help="Fraction of jobs which fail."),
+    concurrency: int = typer.Option(4, help="Jobs run at once per task."),
+    jobs_per_task: int = typer.Option(
+        10, help="Invoker target outstanding jobs per task."),
+    max_task_scaling: int = typer.Option(
+        10, help="Invoker maximum running tasks."),
+    idle_timeout: int = typer.Option(
+        120, help="Seconds without work before a task exits (as deployed - the invoker's scaling depends on it)."),
+    task_start_seconds: float = typer.Option(
+        0.0, help="Simulated task start up time."),
+    connector_concurrency: int = typer.Option(
+        4, help="Concurrent status table connector invocations."),
+    timeout_seconds: float = typer.Option(
+        600.0, help="Give up waiting for jobs to finish after this long."),
+    random_seed: int = typer.Option(
+        42, help="Seed for the launch mix, job durations and failures."),
+    json_output: Optional[str] = typer.Option(
+        None, help="Also write the results as json to this path (e.g. for CI)."),
+    verbose: bool = typer.Option(
+        False, help="Show the pipeline components' output."),
+) -> None:
+    # the job API reads its base config at import time
+    os.environ.setdefault("KEYCLOAK_ENDPOINT", "")
+    os.environ.setdefault("STAGE", "DEV")
+    os.environ.setdefault("DOMAIN_BASE", "benchmark")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ap-southeast-2")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    from ProvenaInterfaces.AsyncJobModels import JobType
+    from helpers.benchmark import PipelineOptions, run_pipeline
+
+    options = PipelineOptions(
+        jobs=jobs,
+        job_type=JobType(job_type),
+        rate=rate,
+        launchers=launchers,
+        users=users,
+        bulk_fraction=bulk_fraction,
+        batch_size=batch_size,
+        job_seconds=job_ms / 1000,
+        job_jitter=job_jitter,
+        failure_rate=failure_rate,
+        concurrency=concurrency,
+        jobs_per_task=jobs_per_task,
+        max_task_scaling=max_task_scaling,
+        idle_timeout=idle_timeout,
+        task_start_seconds=task_start_seconds,
+        connector_concurrency=connector_concurrency,
+        timeout_seconds=timeout_seconds,
+        random_seed=random_seed
+    )
+
+    print(f"Running {jobs} {job_type} jobs through the pipeline...")
+    # per job logging and printing would dominate the measurement
+    if verbose:
+        report = run_pipeline(options)
+    else:
+        logging.disable(logging.WARNING)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = run_pipeline(options)
+        logging.disable(logging.NOTSET)
+    print(report.summary())
+
+    if json_output is not None:
+        with open(json_output, "w") as f:
+            json.dump(report.as_dict(), f, indent=2)
+        print(f"Wrote results to {json_output}.")
+
+
+if __name__ == "__main__":
+    app()
@@ -74,6 +74,9 @@ class Config(BaseConfig):
     # Global list index name
     global_list_index_name: str
 
+    # Batch counter table name
+    batch_table_name: str
+
     # Job type topic arns
 
     # PROV_LODGE
@@ -90,6 +93,17 @@ class Config(BaseConfig):
 
     TEMP_FILE_LOCATION: str = "/tmp"
 
+    # Maximum concurrent AWS requests when launching a batch of jobs
+    launch_batch_workers: int = 16
+
+    # Status streaming - how often watched jobs/batches are read, how often
+    # keep alive comments are sent and the maximum duration of a single stream
+    # (the client reopens it). The default duration fits inside the API
+    # gateway integration timeout.
+    status_stream_poll_seconds: float = 1.0
+    status_stream_keepalive_seconds: float = 10.0
+    status_stream_max_seconds: float = 25.0
+
     class Config:
         env_file = ".env"
         frozen = True
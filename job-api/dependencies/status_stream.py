@@ -0,0 +1,18 @@
+from config import Config, get_settings
+from helpers.status_stream import StatusPoller
+from fastapi import Depends
+from typing import Optional
+
+# The poller is shared by all requests handled by this process
+status_poller: Optional[StatusPoller] = None
+
+
+def get_status_poller(config: Config = Depends(get_settings)) -> StatusPoller:
+    global status_poller
+    if status_poller is None or status_poller.table_name != config.status_table_name or status_poller.batch_table_name != config.batch_table_name:
+        status_poller = StatusPoller(
+            table_name=config.status_table_name,
+            batch_table_name=config.batch_table_name,
+            poll_seconds=config.status_stream_poll_seconds
+        )
+    return status_poller
@@ -0,0 +1,855 @@
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import ModuleType
+from unittest import mock
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import boto3  # type: ignore
+from ProvenaInterfaces.AsyncJobAPI import *
+from EcsSqsPythonTools import JobRunner
+from EcsSqsPythonTools.Settings import JobBaseSettings
+from EcsSqsPythonTools.Types import CallbackResponse, CallbackFunc
+import service.jobs.admin as admin_service
+
+# Lambda handler signature of the async job lambdas
+LambdaHandler = Callable[[Dict[str, Any], Any], None]
+
+REPO_ROOT = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", ".."))
+CONNECTOR_PATH = os.path.join(REPO_ROOT, "async-util", "ddb_connector")
+INVOKER_PATH = os.path.join(REPO_ROOT, "async-util", "lambda_invoker")
+
+# Names of the benchmark resources - these only exist in moto
+STATUS_TABLE_NAME = "benchmark-status"
+BATCH_TABLE_NAME = "benchmark-batch-counters"
+USERNAME_INDEX_NAME = "username-created_timestamp-index"
+BATCH_INDEX_NAME = "batch_id-created_timestamp-index"
+GLOBAL_INDEX_NAME = f"{GSI_FIELD_NAME}-created_timestamp-index"
+CLUSTER_ARN = "arn:aws:ecs:ap-southeast-2:000000000000:cluster/benchmark"
+BENCHMARK_VPC_ID = "vpc-benchmark"
+BENCHMARK_SUBNET_ID = "subnet-benchmark"
+# how long the lambda stand ins get to work through queued events at the end
+PUMP_DRAIN_SECONDS = 30.0
+
+# Synthetic jobs are wake ups - these need no downstream services
+WAKE_UP_SUB_TYPES: Dict[JobType, JobSubType] = {
+    JobType.PROV_LODGE: JobSubType.PROV_LODGE_WAKE_UP,
+    JobType.REGISTRY: JobSubType.REGISTRY_WAKE_UP,
+    JobType.EMAIL: JobSubType.EMAIL_WAKE_UP,
+}
+
+
+# =========
+# Pipeline
+# =========
+
+
+def load_lambda(name: str, directory: str) -> ModuleType:
+    """
+
+    Imports a lambda's lambda_function module from its directory. Each lambda
+    has its own top level config module, so it is swapped in for the import
+    and then removed again.
+
+    Args:
+        name (str): Module name to register the lambda as
+        directory (str): The lambda directory
+
+    Returns:
+        ModuleType: The imported lambda_function module
+    """
+    previous_config = sys.modules.pop('config', None)
+    sys.path.insert(0, directory)
+    try:
+        spec = importlib.util.spec_from_file_location(
+            name, os.path.join(directory, "lambda_function.py"))
+        assert spec is not None and spec.loader is not None
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop('config', None)
+        if previous_config is not None:
+            sys.modules['config'] = previous_config
+    return module
+
+
+@dataclass
+class PipelineInfra():
+    job_type: JobType
+    topic_arn: str
+    # the priority lanes
+    queue_url: str
+    bulk_queue_url: str
+    # queues which deliver the topic to the lambdas
+    connector_queue_url: str
+    invoker_queue_url: str
+    task_definition_arn: str
+
+
+@contextlib.contextmanager
+def serialised_dynamodb() -> Iterator[None]:
+    # moto's DynamoDB backend is not thread safe (e.g. concurrent transactions
+    # can fail), so requests to it are handled one at a time - as a single
+    # table partition would
+    from moto.dynamodb.responses import DynamoHandler  # type: ignore
+    original = DynamoHandler.call_action
+    lock = threading.Lock()
+
+    def call_action(self: Any) -> Any:
+        with lock:
+            return original(self)
+    with mock.patch.object(DynamoHandler, "call_action", call_action):
+        yield
+
+
+def setup_tables() -> None:
+    # the status table (with its indexes) and batch counter table as deployed
+    client = boto3.client('dynamodb')
+    client.create_table(
+        TableName=STATUS_TABLE_NAME,
+        AttributeDefinitions=[
+            {'AttributeName': 'session_id', 'AttributeType': 'S'},
+            {'AttributeName': 'batch_id', 'AttributeType': 'S'},
+            {'AttributeName': 'username', 'AttributeType': 'S'},
+            {'AttributeName': 'created_timestamp', 'AttributeType': 'N'},
+            {'AttributeName': GSI_FIELD_NAME, 'AttributeType': 'S'},
+        ],
+        KeySchema=[{'AttributeName': 'session_id', 'KeyType': 'HASH'}],
+        BillingMode='PAY_PER_REQUEST',
+        GlobalSecondaryIndexes=[
+            {
+                'IndexName': index_name,
+                'KeySchema': [
+                    {'AttributeName': hash_key, 'KeyType': 'HASH'},
+                    {'AttributeName': 'created_timestamp', 'KeyType': 'RANGE'},
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+            } for index_name, hash_key in [
+                (USERNAME_INDEX_NAME, 'username'),
+                (BATCH_INDEX_NAME, 'batch_id'),
+                (GLOBAL_INDEX_NAME, GSI_FIELD_NAME),
+            ]
+        ]
+    )
+    client.create_table(
+        TableName=BATCH_TABLE_NAME,
+        AttributeDefinitions=[
+            {'AttributeName': 'batch_id', 'AttributeType': 'S'}],
+        KeySchema=[{'AttributeName': 'batch_id', 'KeyType': 'HASH'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+def subscribe_queue(topic_arn: str, name: str, filter_priority: Optional[JobPriority] = None) -> str:
+    sqs = boto3.client('sqs')
+    queue_url = sqs.create_queue(QueueName=name)['QueueUrl']
+    queue_arn = sqs.get_queue_attributes(
+        QueueUrl=queue_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+    attributes: Dict[str, str] = {}
+    if filter_priority is not None:
+        attributes['FilterPolicy'] = json.dumps(
+            {JOB_PRIORITY_ATTRIBUTE: [filter_priority.value]})
+    boto3.client('sns').subscribe(
+        TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_arn, Attributes=attributes)
+    return queue_url
+
+
+def setup_pipeline(job_type: JobType) -> PipelineInfra:
+    """
+
+    Creates the job type's topic and its subscribers as deployed - the
+    interactive and bulk queues (filtered on priority) and, in place of the
+    lambda subscriptions, a queue for each lambda.
+
+    Args:
+        job_type (JobType): The job type
+
+    Returns:
+        PipelineInfra: The resource details
+    """
+    name = job_type.value.lower().replace("_", "-")
+    topic_arn = boto3.client('sns').create_topic(Name=name)['TopicArn']
+    return PipelineInfra(
+        job_type=job_type,
+        topic_arn=topic_arn,
+        queue_url=subscribe_queue(
+            topic_arn, f"{name}-interactive", JobPriority.INTERACTIVE),
+        bulk_queue_url=subscribe_queue(
+            topic_arn, f"{name}-bulk", JobPriority.BULK),
+        connector_queue_url=subscribe_queue(topic_arn, f"{name}-connector"),
+        invoker_queue_url=subscribe_queue(topic_arn, f"{name}-invoker"),
+        task_definition_arn=f"arn:aws:ecs:ap-southeast-2:000000000000:task-definition/benchmark-{name}:1"
+    )
+
+
+def lambda_environment(infra: PipelineInfra, idle_timeout: int, max_task_scaling: int, jobs_per_task: int) -> Dict[str, str]:
+    # the settings of both lambdas - the names do not overlap
+    environment = {
+        "TABLE_NAME": STATUS_TABLE_NAME,
+        "BATCH_TABLE_NAME": BATCH_TABLE_NAME,
+        "CLUSTER_ARN": CLUSTER_ARN,
+        "VPC_ID": BENCHMARK_VPC_ID,
+        "IDLE_TIMEOUT": str(idle_timeout),
+        "MAX_TASK_SCALING": str(max_task_scaling),
+        "JOBS_PER_TASK": str(jobs_per_task),
+    }
+    for job_type in JobType:
+        prefix = job_type.value
+        if job_type == infra.job_type:
+            environment[f"{prefix}_TASK_DEFINITION_ARN"] = infra.task_definition_arn
+            environment[f"{prefix}_QUEUE_URL"] = infra.queue_url
+            environment[f"{prefix}_BULK_QUEUE_URL"] = infra.bulk_queue_url
+        else:
+            environment[f"{prefix}_TASK_DEFINITION_ARN"] = "unused"
+            environment[f"{prefix}_QUEUE_URL"] = "unused"
+    return environment
+
+
+def sns_event(envelope: Dict[str, Any]) -> Dict[str, Any]:
+    # the lambda event for a single SNS delivery
+    return {
+        "Records": [{
+            "EventSource": "aws:sns",
+            "Sns": {
+                "TopicArn": envelope.get("TopicArn"),
+                "MessageId": envelope.get("MessageId"),
+                "Message": envelope["Message"],
+                "MessageAttributes": envelope.get("MessageAttributes", {}),
+            }
+        }]
+    }
+
+
+class LambdaPump():
+    """
+
+    Invokes a lambda handler for each message published to the topic, one
+    message per invocation as SNS does. Messages are read from a queue
+    subscribed to the topic, with up to concurrency invocations at once.
+    """
+
+    def __init__(self, handler: LambdaHandler, queue_url: str, concurrency: int) -> None:
+        self.handler = handler
+        self.queue_url = queue_url
+        self.concurrency = concurrency
+
+        self.invocations = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        for _ in range(self.concurrency):
+            thread = threading.Thread(target=self.run, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def drain(self, timeout: float) -> None:
+        # lets the pump finish the messages still queued, e.g. the status
+        # writes for jobs which the workers picked up first
+        sqs = boto3.client('sqs')
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            attributes = sqs.get_queue_attributes(QueueUrl=self.queue_url, AttributeNames=[
+                'ApproximateNumberOfMessages', 'ApproximateNumberOfMessagesNotVisible'])['Attributes']
+            if sum(int(value) for value in attributes.values()) == 0:
+                return
+            time.sleep(0.2)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
+
+    def run(self) -> None:
+        sqs = boto3.client('sqs')
+        while not self.stopped.is_set():
+            messages = sqs.receive_message(
+                QueueUrl=self.queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=1).get('Messages', [])
+            for message in messages:
+                error = False
+                try:
+                    self.handler(sns_event(json.loads(message['Body'])), None)
+                except Exception:
+                    error = True
+                with self.lock:
+                    self.invocations += 1
+                    self.errors += int(error)
+                sqs.delete_message(QueueUrl=self.queue_url,
+                                   ReceiptHandle=message['ReceiptHandle'])
+
+
+# ===========
+# Measurement
+# ===========
+
+
+@dataclass
+class JobTiming():
+    # perf counter times - any may be missing, e.g. a job can be dispatched
+    # before its launch call has returned
+    priority: Optional[JobPriority] = None
+    launched: Optional[float] = None
+    dispatched: Optional[float] = None
+    finished: Optional[float] = None
+    status: Optional[JobStatus] = None
+
+
+class PipelineRecorder():
+    """
+
+    Records when each job was launched, dispatched to a worker and finished.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.timings: Dict[str, JobTiming] = {}
+        self.expected = 0
+        self.finished_count = 0
+        self.all_finished = threading.Event()
+
+    def launched(self, session_ids: List[str], priority: JobPriority, at: float) -> None:
+        with self.lock:
+            for session_id in session_ids:
+                timing = self.timings.setdefault(session_id, JobTiming())
+                timing.priority = priority
+                timing.launched = at
+
+    def expect(self, count: int) -> None:
+        with self.lock:
+            self.expected += count
+            self.check_finished()
+
+    def dispatched(self, session_id: str, at: float) -> None:
+        with self.lock:
+            self.timings.setdefault(
+                session_id, JobTiming()).dispatched = at
+
+    def finished(self, session_id: str, status: JobStatus, at: float) -> None:
+        with self.lock:
+            timing = self.timings.setdefault(session_id, JobTiming())
+            if timing.finished is None:
+                self.finished_count += 1
+            timing.finished = at
+            timing.status = status
+            self.check_finished()
+
+    def check_finished(self) -> None:
+        if self.expected > 0 and self.finished_count >= self.expected:
+            self.all_finished.set()
+
+
+@dataclass
+class HarnessTask():
+    # ECS style status
+    status: str = "PROVISIONING"
+    started_at: Optional[datetime] = None
+    # perf counter times
+    running_since: Optional[float] = None
+    stopped_at: Optional[float] = None
+    # total time spent in the job callback
+    busy_seconds: float = 0.0
+    jobs: int = 0
+
+
+class FakeCluster():
+    """
+
+    Stands in for ECS - tasks launched by the invoker run the ECS job runner
+    on a thread in this process, dispatching to the synthetic job.
+    """
+
+    def __init__(self, invoker: ModuleType, job: CallbackFunc, worker_settings: JobBaseSettings, concurrency: int, task_start_seconds: float, recorder: PipelineRecorder) -> None:
+        self.invoker = invoker
+        self.job = job
+        self.worker_settings = worker_settings
+        self.concurrency = concurrency
+        self.task_start_seconds = task_start_seconds
+        self.recorder = recorder
+
+        self.lock = threading.Lock()
+        self.tasks: List[HarnessTask] = []
+        self.threads: List[threading.Thread] = []
+        self.max_running = 0
+        self.errors = 0
+
+    def active_tasks(self) -> List[HarnessTask]:
+        with self.lock:
+            return [task for task in self.tasks if task.stopped_at is None]
+
+    def check_tasks_running(self, task_definition_arn: str, cluster_arn: str) -> Any:
+        active = self.active_tasks()
+        if len(active) == 0:
+            return self.invoker.TasksRunningResponse(is_running=False)
+        return self.invoker.TasksRunningResponse(is_running=True, tasks=[
+            self.invoker.RunningTaskInfo(
+                status=task.status, started_at=task.started_at)
+            for task in active
+        ])
+
+    def launch_task(self, subnet_id: str, task_definition_arn: str, cluster_arn: str, count: int = 1) -> None:
+        with self.lock:
+            for _ in range(count):
+                task = HarnessTask()
+                self.tasks.append(task)
+                thread = threading.Thread(
+                    target=self.run_task, args=(task,), daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.max_running = max(self.max_running, len(
+                [task for task in self.tasks if task.stopped_at is None]))
+
+    def callback_for(self, task: HarnessTask) -> CallbackFunc:
+        def callback(payload: JobSnsPayload, settings: JobBaseSettings) -> CallbackResponse:
+            start = time.perf_counter()
+            self.recorder.dispatched(payload.session_id, start)
+            try:
+                return self.job(payload, settings)
+            finally:
+                with self.lock:
+                    task.busy_seconds += time.perf_counter() - start
+                    task.jobs += 1
+        return callback
+
+    def run_task(self, task: HarnessTask) -> None:
+        # container start up
+        time.sleep(self.task_start_seconds)
+        task.status = "RUNNING"
+        task.started_at = datetime.now(timezone.utc)
+        task.running_since = time.perf_counter()
+        try:
+            JobRunner.run_job_loop(callback=self.callback_for(
+                task), settings=self.worker_settings, concurrency=self.concurrency)
+        except Exception:
+            with self.lock:
+                self.errors += 1
+        finally:
+            task.status = "STOPPED"
+            task.stopped_at = time.perf_counter()
+
+    def wait_for_tasks(self, timeout: float) -> None:
+        deadline = time.perf_counter() + timeout
+        for thread in list(self.threads):
+            thread.join(max(0.0, deadline - time.perf_counter()))
+
+    def utilisation(self, until: float) -> float:
+        # busy worker time over the worker time available while tasks were
+        # running, up to the given time (e.g. the last job finishing)
+        with self.lock:
+            available = sum(
+                self.concurrency *
+                max(0.0, min(task.stopped_at or until, until) - task.running_since)
+                for task in self.tasks if task.running_since is not None
+            )
+            busy = sum(task.busy_seconds for task in self.tasks)
+        return min(1.0, busy / available) if available > 0 else 0.0
+
+
+def synthetic_job(job_seconds: float, jitter: float, failure_rate: float, rng: random.Random) -> CallbackFunc:
+    """
+
+    A job callback which waits for the job duration (uniformly jittered by
+    +/- jitter of the duration) and fails at the failure rate.
+    """
+    lock = threading.Lock()
+
+    def callback(payload: JobSnsPayload, settings: JobBaseSettings) -> CallbackResponse:
+        with lock:
+            duration = job_seconds * (1 + rng.uniform(-jitter, jitter))
+            fail = rng.random() < failure_rate
+        time.sleep(max(0.0, duration))
+        if fail:
+            return CallbackResponse(status=JobStatus.FAILED, info="Synthetic failure.")
+        return CallbackResponse(status=JobStatus.SUCCEEDED, result={})
+    return callback
+
+
+# ====
+# Load
+# ====
+
+
+@dataclass
+class LaunchUnit():
+    username: str
+    priority: JobPriority
+    # single interactive launches have a count of one, everything else is
+    # launched as a batch
+    count: int
+
+
+def plan_launches(jobs: int, users: int, bulk_fraction: float, batch_size: int, rng: random.Random) -> List[LaunchUnit]:
+    """
+
+    Splits the jobs into single interactive launches and bulk batch launches,
+    spread across the users, in a random order.
+
+    Args:
+        jobs (int): Total jobs
+        users (int): Number of users launching jobs
+        bulk_fraction (float): Fraction of jobs launched as bulk batches
+        batch_size (int): Jobs per bulk batch launch
+        rng (random.Random): Random source
+
+    Returns:
+        List[LaunchUnit]: The launches
+    """
+    users = max(1, users)
+    bulk_jobs = round(jobs * bulk_fraction)
+    units = [
+        LaunchUnit(username=f"user-{i % users}",
+                   priority=JobPriority.INTERACTIVE, count=1)
+        for i in range(jobs - bulk_jobs)
+    ]
+    size = max(1, min(batch_size, MAX_LAUNCH_BATCH_SIZE))
+    for number, offset in enumerate(range(0, bulk_jobs, size)):
+        units.append(LaunchUnit(username=f"user-{number % users}",
+                     priority=JobPriority.BULK, count=min(size, bulk_jobs - offset)))
+    rng.shuffle(units)
+    return units
+
+
+def launch_unit(unit: LaunchUnit, infra: PipelineInfra, recorder: PipelineRecorder) -> None:
+    # launches through the job API service layer
+    job_sub_type = WAKE_UP_SUB_TYPES[infra.job_type]
+    payload: Dict[str, Any] = json.loads(
+        WakeUpPayload(reason="benchmark").json())
+    at = time.perf_counter()
+    if unit.count == 1 and unit.priority == JobPriority.INTERACTIVE:
+        response = admin_service.launch_job(
+            username=unit.username,
+            job_type=infra.job_type,
+            job_sub_type=job_sub_type,
+            job_specific_payload=payload,
+            table_name=STATUS_TABLE_NAME,
+            sns_topic_arn=infra.topic_arn,
+            request_batch_id=False,
+            batch_id=None,
+            batch_id_index_name=BATCH_INDEX_NAME,
+            priority=unit.priority
+        )
+        recorder.launched([response.session_id], unit.priority, at)
+        return
+
+    batch_response = admin_service.launch_job_batch(
+        username=unit.username,
+        job_type=infra.job_type,
+        jobs=[AdminLaunchJobBatchItem(job_sub_type=job_sub_type,
+                                      job_payload=payload) for _ in range(unit.count)],
+        table_name=STATUS_TABLE_NAME,
+        sns_topic_arn=infra.topic_arn,
+        request_batch_id=True,
+        batch_id=None,
+        batch_id_index_name=BATCH_INDEX_NAME,
+        max_workers=4,
+        batch_table_name=BATCH_TABLE_NAME,
+        priority=unit.priority
+    )
+    recorder.launched(batch_response.session_ids, unit.priority, at)
+    # unpublished jobs never reach a worker (and unreserved jobs were never
+    # launched)
+    for failure in batch_response.failures:
+        if failure.session_id is not None:
+            recorder.finished(failure.session_id, JobStatus.FAILED, at)
+
+
+# ======
+# Report
+# ======
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    # nearest rank
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) if len(values) > 0 else 0.0,
+        "p50": percentile(values, 0.5),
+        "p90": percentile(values, 0.9),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if len(values) > 0 else 0.0,
+    }
+
+
+def format_distribution(values: List[float]) -> str:
+    d = distribution(values)
+    return f"n {d['count']}, mean {d['mean']:.3f}s, p50 {d['p50']:.3f}s, p90 {d['p90']:.3f}s, p99 {d['p99']:.3f}s, max {d['max']:.3f}s"
+
+
+@dataclass
+class PipelineReport():
+    jobs: int
+    succeeded: int
+    failed: int
+    unfinished: int
+    launch_seconds: float
+    duration_seconds: float
+    # by priority - launch to finished, launch to dispatched, dispatched to finished
+    end_to_end: Dict[str, List[float]] = field(default_factory=dict)
+    queue_wait: Dict[str, List[float]] = field(default_factory=dict)
+    run_time: Dict[str, List[float]] = field(default_factory=dict)
+    tasks_launched: int = 0
+    max_tasks_running: int = 0
+    worker_utilisation: float = 0.0
+    connector_invocations: int = 0
+    invoker_invocations: int = 0
+    lambda_errors: int = 0
+    task_errors: int = 0
+
+    @property
+    def jobs_per_second(self) -> float:
+        finished = self.succeeded + self.failed
+        return finished / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "jobs": self.jobs,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "unfinished": self.unfinished,
+            "launch_seconds": self.launch_seconds,
+            "duration_seconds": self.duration_seconds,
+            "jobs_per_second": self.jobs_per_second,
+            "end_to_end": {k: distribution(v) for k, v in self.end_to_end.items()},
+            "queue_wait": {k: distribution(v) for k, v in self.queue_wait.items()},
+            "run_time": {k: distribution(v) for k, v in self.run_time.items()},
+            "tasks_launched": self.tasks_launched,
+            "max_tasks_running": self.max_tasks_running,
+            "worker_utilisation": self.worker_utilisation,
+            "connector_invocations": self.connector_invocations,
+            "invoker_invocations": self.invoker_invocations,
+            "lambda_errors": self.lambda_errors,
+            "task_errors": self.task_errors,
+        }
+
+    def summary(self) -> str:
+        def section(title: str, values: Dict[str, List[float]]) -> str:
+            return "\n".join([f"    {title}"] + [f"      {k}: {format_distribution(v)}" for k, v in values.items()])
+        return f"""
+    Jobs: {self.jobs} ({self.succeeded} succeeded, {self.failed} failed, {self.unfinished} unfinished)
+    Launch duration: {self.launch_seconds:.2f}s
+    Duration: {self.duration_seconds:.2f}s
+    Throughput: {self.jobs_per_second:.1f} jobs/s
+
+{section("End to end (launch to finished):", self.end_to_end)}
+{section("Queue wait (launch to dispatched):", self.queue_wait)}
+{section("Run time (dispatched to finished):", self.run_time)}
+
+    Tasks launched: {self.tasks_launched} (at most {self.max_tasks_running} running)
+    Worker utilisation: {self.worker_utilisation * 100:.1f}%
+    Lambda invocations: connector {self.connector_invocations}, invoker {self.invoker_invocations} ({self.lambda_errors} errors)
+    Task errors: {self.task_errors}
+    """
+
+
+def build_report(recorder: PipelineRecorder, cluster: FakeCluster, jobs: int, start: float, launch_end: float, pumps: List[LambdaPump]) -> PipelineReport:
+    end_to_end: Dict[str, List[float]] = {"ALL": []}
+    queue_wait: Dict[str, List[float]] = {"ALL": []}
+    run_time: Dict[str, List[float]] = {"ALL": []}
+    succeeded = 0
+    failed = 0
+    last_finished = start
+
+    with recorder.lock:
+        timings = list(recorder.timings.values())
+
+    for timing in timings:
+        if timing.status == JobStatus.SUCCEEDED:
+            succeeded += 1
+        elif timing.status == JobStatus.FAILED:
+            failed += 1
+        if timing.finished is not None:
+            last_finished = max(last_finished, timing.finished)
+
+        key = timing.priority.value if timing.priority else "UNKNOWN"
+        samples = [
+            (end_to_end, timing.launched, timing.finished),
+            (queue_wait, timing.launched, timing.dispatched),
+            (run_time, timing.dispatched, timing.finished),
+        ]
+        for target, begin, finish in samples:
+            if begin is not None and finish is not None:
+                target.setdefault(key, []).append(finish - begin)
+                target["ALL"].append(finish - begin)
+
+    connector, invoker = pumps
+    return PipelineReport(
+        jobs=jobs,
+        succeeded=succeeded,
+        failed=failed,
+        unfinished=jobs - succeeded - failed,
+        launch_seconds=launch_end - start,
+        duration_seconds=last_finished - start,
+        end_to_end=end_to_end,
+        queue_wait=queue_wait,
+        run_time=run_time,
+        tasks_launched=len(cluster.tasks),
+        max_tasks_running=cluster.max_running,
+        worker_utilisation=cluster.utilisation(until=last_finished),
+        connector_invocations=connector.invocations,
+        invoker_invocations=invoker.invocations,
+        lambda_errors=connector.errors + invoker.errors,
+        task_errors=cluster.errors,
+    )
+
+
+# ===
+# Run
+# ===
+
+
+@dataclass
+class PipelineOptions():
+    jobs: int = 1000
+    job_type: JobType = JobType.PROV_LODGE
+    # load
+    rate: float = 0.0
+    launchers: int = 4
+    users: int = 4
+    bulk_fraction: float = 0.5
+    batch_size: int = 100
+    # synthetic jobs
+    job_seconds: float = 0.05
+    job_jitter: float = 0.5
+    failure_rate: float = 0.0
+    # workers and scaling
+    concurrency: int = 4
+    jobs_per_task: int = 10
+    max_task_scaling: int = 10
+    idle_timeout: int = 120
+    task_start_seconds: float = 0.0
+    connector_concurrency: int = 4
+    timeout_seconds: float = 600.0
+    random_seed: int = 42
+
+
+def run_pipeline(options: PipelineOptions) -> PipelineReport:
+    """
+
+    Runs synthetic jobs through the job pipeline against moto - the job API
+    launch service, the SNS topic and its subscriptions, the status table
+    connector and invoker lambdas, and ECS workers running the ECS SQS job
+    runner (in process, launched by the invoker).
+
+    Args:
+        options (PipelineOptions): The load and pipeline settings
+
+    Returns:
+        PipelineReport: The results
+    """
+    from moto import mock_dynamodb, mock_sns, mock_sqs  # type: ignore
+
+    rng = random.Random(options.random_seed)
+    recorder = PipelineRecorder()
+
+    with mock_dynamodb(), mock_sns(), mock_sqs(), serialised_dynamodb():
+        setup_tables()
+        infra = setup_pipeline(job_type=options.job_type)
+        os.environ.update(lambda_environment(
+            infra=infra,
+            idle_timeout=options.idle_timeout,
+            max_task_scaling=options.max_task_scaling,
+            jobs_per_task=options.jobs_per_task
+        ))
+
+        connector = load_lambda("benchmark_ddb_connector", CONNECTOR_PATH)
+        # typed as Any as its ECS functions are replaced below
+        invoker: Any = load_lambda("benchmark_lambda_invoker", INVOKER_PATH)
+
+        worker_settings = JobBaseSettings(
+            idle_timeout=options.idle_timeout,
+            queue_url=infra.queue_url,
+            bulk_queue_url=infra.bulk_queue_url,
+            status_table_name=STATUS_TABLE_NAME,
+            batch_table_name=BATCH_TABLE_NAME,
+            sns_topic_arn=infra.topic_arn,
+            job_type=infra.job_type,
+            job_api_endpoint="http://benchmark",
+            poll_wait_seconds=min(20, options.idle_timeout),
+            job_concurrency=options.concurrency
+        )
+        cluster = FakeCluster(
+            invoker=invoker,
+            job=synthetic_job(job_seconds=options.job_seconds, jitter=options.job_jitter,
+                              failure_rate=options.failure_rate, rng=rng),
+            worker_settings=worker_settings,
+            concurrency=options.concurrency,
+            task_start_seconds=options.task_start_seconds,
+            recorder=recorder
+        )
+
+        # ECS and the VPC are replaced by the fake cluster
+        invoker.select_public_subnet = lambda vpc_id: BENCHMARK_SUBNET_ID
+        invoker.check_tasks_running = cluster.check_tasks_running
+        invoker.launch_task_in_ecs_cluster = cluster.launch_task
+
+        # jobs are finished once the worker has actioned the callback response
+        original_action = JobRunner.action_callback_response
+
+        def recording_action(task: Any, callback_response: CallbackResponse, settings: JobBaseSettings) -> None:
+            original_action(task=task, callback_response=callback_response, settings=settings)
+            recorder.finished(task.payload.session_id,
+                              callback_response.status, time.perf_counter())
+        JobRunner.action_callback_response = recording_action  # type: ignore
+
+        pumps = [
+            LambdaPump(handler=connector.handler, queue_url=infra.connector_queue_url,
+                       concurrency=options.connector_concurrency),
+            # the invoker has a reserved concurrency of 1
+            LambdaPump(handler=invoker.handler,
+                       queue_url=infra.invoker_queue_url, concurrency=1),
+        ]
+        for pump in pumps:
+            pump.start()
+
+        try:
+            units = plan_launches(jobs=options.jobs, users=options.users, bulk_fraction=options.bulk_fraction,
+                                  batch_size=options.batch_size, rng=rng)
+            recorder.expect(sum(unit.count for unit in units))
+
+            start = time.perf_counter()
+            launched = 0
+            futures: List[Future] = []
+            with ThreadPoolExecutor(max_workers=max(1, options.launchers)) as executor:
+                for unit in units:
+                    if options.rate > 0:
+                        time.sleep(
+                            max(0.0, start + launched / options.rate - time.perf_counter()))
+                    futures.append(executor.submit(
+                        launch_unit, unit, infra, recorder))
+                    launched += unit.count
+            for future in futures:
+                future.result()
+            launch_end = time.perf_counter()
+
+            recorder.all_finished.wait(
+                max(0.0, options.timeout_seconds - (launch_end - start)))
+        finally:
+            for pump in pumps:
+                pump.drain(timeout=PUMP_DRAIN_SECONDS)
+                pump.stop()
+            # workers check the idle timeout between polls - dropping it lets
+            # them exit without waiting out the real timeout
+            worker_settings.idle_timeout = 0
+            cluster.wait_for_tasks(
+                timeout=worker_settings.bulk_poll_interval + 30)
+            JobRunner.action_callback_response = original_action  # type: ignore
+
+        return build_report(recorder=recorder, cluster=cluster, jobs=options.jobs, start=start, launch_end=launch_end, pumps=pumps)
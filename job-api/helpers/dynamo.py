@@ -1,9 +1,15 @@
 from ProvenaInterfaces.AsyncJobAPI import *
-from ProvenaInterfaces.AsyncJobModels import GSI_FIELD_NAME, GSI_VALUE
-import boto3  # type: ignore
+from ProvenaInterfaces.AsyncJobModels import GSI_FIELD_NAME, GSI_VALUE, BATCH_COUNTER_FIELD_MAP, BatchCounterTable
 from typing import List, Dict, Any, Optional, Tuple
 from boto3.dynamodb.conditions import Key  # type: ignore
+from boto3.dynamodb.types import TypeSerializer  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_io import aws_io
+from ProvenaSharedFunctionality.Services.aws_clients import get_client, get_dynamodb_table
+from decimal import Decimal
+import json
 import logging
+import random
+import time
 
 # setup logger
 logging.config.fileConfig('logging.conf', disable_existing_loggers=False)
@@ -13,10 +19,14 @@ logger_key = "helpers"
 logger = logging.getLogger(logger_key)
 
 
+# Attempts at a transaction before giving up - updates of the same batch
+# counters conflict with each other
+MAX_TRANSACTION_ATTEMPTS = 5
+
+
 def setup_status_table(table_name: str) -> Any:
-    # create boto resources
-    dynamodb_resource = boto3.resource("dynamodb")
-    return dynamodb_resource.Table(table_name)
+    # cached per thread - resources are not thread safe
+    return get_dynamodb_table(table_name)
 
 
 PaginatedStatusList = Tuple[List[JobStatusTable], Optional[PaginationKey]]
@@ -217,3 +227,218 @@ def list_all_jobs(table_name: str, pagination_key: Optional[PaginationKey], limi
         global_index_name=global_index_name,
         table=table,
     )
+
+
+def setup_dynamodb_client() -> Any:
+    # low level client - unlike resources this is thread safe, so one is
+    # shared across the process
+    return get_client("dynamodb")
+
+
+def serialise_status_entry(entry: JobStatusTable) -> Dict[str, Any]:
+    # dynamo does not support floats
+    payload = json.loads(entry.json(exclude_none=True), parse_float=Decimal)
+    serializer = TypeSerializer()
+    return {k: serializer.serialize(v) for k, v in payload.items()}
+
+
+def counter_update(batch_id: str, username: str, deltas: Dict[JobStatus, int], added: int, batch_table_name: str) -> Dict[str, Any]:
+    """
+
+    Builds a transaction update which moves the batch counters. The counter
+    entry is created by the first update of the batch.
+
+    Args:
+        batch_id (str): The batch id
+        username (str): The batch owner
+        deltas (Dict[JobStatus, int]): The change in count of each status
+        added (int): Jobs added to the batch
+        batch_table_name (str): The batch counter table name
+
+    Returns:
+        Dict[str, Any]: The Update transaction item
+    """
+    serializer = TypeSerializer()
+    names: Dict[str, str] = {"#username": "username"}
+    values: Dict[str, Any] = {":username": serializer.serialize(username)}
+    add_clauses: List[str] = []
+    if added != 0:
+        names["#total"] = "total"
+        values[":total"] = serializer.serialize(added)
+        add_clauses.append("#total :total")
+    for status, delta in deltas.items():
+        field = BATCH_COUNTER_FIELD_MAP[status]
+        names[f"#{field}"] = field
+        values[f":{field}"] = serializer.serialize(delta)
+        add_clauses.append(f"#{field} :{field}")
+
+    expression = "SET #username = if_not_exists(#username, :username)"
+    if len(add_clauses) > 0:
+        expression += " ADD " + ", ".join(add_clauses)
+    return {"Update": {
+        "TableName": batch_table_name,
+        "Key": {"batch_id": serializer.serialize(batch_id)},
+        "UpdateExpression": expression,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }}
+
+
+def status_entry_exists(session_id: str, table_name: str, client: Any) -> bool:
+    response = client.get_item(
+        TableName=table_name,
+        Key={"session_id": {"S": session_id}},
+        ProjectionExpression="session_id"
+    )
+    return 'Item' in response
+
+
+def reserve_status_entries(entries: List[JobStatusTable], table_name: str, batch_table_name: str, client: Any) -> bool:
+    """
+
+    Writes the PENDING entries of jobs in the same batch, and counts them in the
+    batch, in a single transaction (at most 99 entries). The transaction is
+    cancelled if any session id is already in use or it conflicts with another
+    update of the batch counters.
+
+    Args:
+        entries (List[JobStatusTable]): The entries to write - all in one batch
+        table_name (str): The status table name
+        batch_table_name (str): The batch counter table name
+        client (Any): The dynamodb client
+
+    Raises:
+        Exception: Write failure other than cancellation
+
+    Returns:
+        bool: True iff written, False if cancelled
+    """
+    batch_id = entries[0].batch_id
+    assert batch_id is not None
+    items: List[Dict[str, Any]] = [
+        {"Put": {
+            "TableName": table_name,
+            "Item": serialise_status_entry(entry),
+            "ConditionExpression": "attribute_not_exists(session_id)"
+        }} for entry in entries
+    ]
+    items.append(counter_update(batch_id=batch_id, username=entries[0].username, deltas={
+                 JobStatus.PENDING: len(entries)}, added=len(entries), batch_table_name=batch_table_name))
+    try:
+        client.transact_write_items(TransactItems=items)
+    except client.exceptions.TransactionCanceledException:
+        return False
+    except Exception as e:
+        raise Exception(f"Failed to write to the job status table, err: {e}.")
+    return True
+
+
+def reserve_status_entry(entry: JobStatusTable, table_name: str, client: Any, batch_table_name: Optional[str] = None) -> bool:
+    """
+
+    Writes the status entry only if the session id is not already in use. This
+    both allocates the session id and records the job without a separate read.
+
+    Batch jobs are counted in the batch in the same transaction when a batch
+    table is provided - conflicting counter updates are retried.
+
+    Args:
+        entry (JobStatusTable): The entry to write
+        table_name (str): The status table name
+        client (Any): The dynamodb client
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Raises:
+        Exception: Write failure other than the session id being taken
+
+    Returns:
+        bool: True iff written, False if the session id is already in use
+    """
+    if entry.batch_id is not None and batch_table_name is not None:
+        for attempt in range(MAX_TRANSACTION_ATTEMPTS):
+            if reserve_status_entries(entries=[entry], table_name=table_name, batch_table_name=batch_table_name, client=client):
+                return True
+            if status_entry_exists(session_id=entry.session_id, table_name=table_name, client=client):
+                return False
+            time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        raise Exception(
+            f"Failed to write to the job status table after {MAX_TRANSACTION_ATTEMPTS} attempts.")
+
+    try:
+        client.put_item(
+            TableName=table_name,
+            Item=serialise_status_entry(entry),
+            ConditionExpression="attribute_not_exists(session_id)"
+        )
+    except client.exceptions.ConditionalCheckFailedException:
+        return False
+    except Exception as e:
+        raise Exception(f"Failed to write to the job status table, err: {e}.")
+    return True
+
+
+def fail_status_entry(entry: JobStatusTable, table_name: str, client: Any, batch_table_name: Optional[str] = None) -> None:
+    """
+
+    Overwrites a PENDING entry with the given FAILED entry. Batch jobs move
+    the batch counters in the same transaction when a batch table is provided.
+
+    Args:
+        entry (JobStatusTable): The failed entry
+        table_name (str): The status table name
+        client (Any): The dynamodb client
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Raises:
+        Exception: Write failure
+    """
+    put = {
+        "TableName": table_name,
+        "Item": serialise_status_entry(entry),
+        "ConditionExpression": "#status = :pending",
+        "ExpressionAttributeNames": {"#status": "status"},
+        "ExpressionAttributeValues": {":pending": {"S": JobStatus.PENDING.value}},
+    }
+    try:
+        if entry.batch_id is None or batch_table_name is None:
+            client.put_item(**put)
+            return
+        for attempt in range(MAX_TRANSACTION_ATTEMPTS):
+            try:
+                client.transact_write_items(TransactItems=[
+                    {"Put": put},
+                    counter_update(batch_id=entry.batch_id, username=entry.username, deltas={
+                                   JobStatus.PENDING: -1, entry.status: 1}, added=0, batch_table_name=batch_table_name)
+                ])
+                return
+            except client.exceptions.TransactionCanceledException:
+                time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        raise Exception(f"Gave up after {MAX_TRANSACTION_ATTEMPTS} attempts.")
+    except Exception as e:
+        raise Exception(f"Failed to write to the job status table, err: {e}.")
+
+
+def read_batch_counters(batch_id: str, batch_table_name: str) -> Optional[BatchCounterTable]:
+    table = setup_status_table(table_name=batch_table_name)
+    try:
+        response = table.get_item(Key={"batch_id": batch_id})
+    except Exception as e:
+        raise Exception(f"Failed to read from the batch counter table, err: {e}.")
+
+    item = response.get('Item')
+    if item is None:
+        return None
+
+    try:
+        return BatchCounterTable.parse_obj(item)
+    except Exception as e:
+        raise Exception(f"Failed to parse item from batch counter table, err: {e}.")
+
+
+# Async variants of the table reads - run on the shared AWS IO thread pool so
+# the route handlers don't block the event loop while waiting on DynamoDB
+get_items_by_batch_id_async = aws_io(get_items_by_batch_id)
+get_job_by_session_id_async = aws_io(get_job_by_session_id)
+list_jobs_by_username_async = aws_io(list_jobs_by_username)
+list_all_jobs_async = aws_io(list_all_jobs)
+read_batch_counters_async = aws_io(read_batch_counters)
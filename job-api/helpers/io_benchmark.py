@@ -0,0 +1,234 @@
+import asyncio
+import contextlib
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Tuple
+import httpx
+from ProvenaInterfaces.AsyncJobAPI import *
+from ProvenaSharedFunctionality.Services.aws_io import configure_aws_io_executor
+from ProvenaSharedFunctionality.Services.aws_clients import clear_aws_clients, get_session
+from KeycloakFastAPI.Dependencies import User
+import helpers.dynamo as dynamo
+from helpers.benchmark import STATUS_TABLE_NAME, BATCH_TABLE_NAME, USERNAME_INDEX_NAME, BATCH_INDEX_NAME, GLOBAL_INDEX_NAME, distribution, format_distribution, serialised_dynamodb, setup_tables
+
+# Concurrency benchmark for the job API's status table reads.
+#
+# Drives the job fetch route (in process, through the ASGI app) with a mix of
+# fast and slow DynamoDB calls - the latency is injected into the boto3 calls
+# made against moto. Each mode is run with the same request plan:
+#
+# - inline: the table read is made directly in the async route handler (as
+#   before the AWS IO thread pool), so a slow call blocks the event loop
+# - offloaded: the table read runs on the AWS IO thread pool
+
+BENCHMARK_USERNAME = "benchmark-user"
+SLOW_SESSION_PREFIX = "slow-"
+FAST_SESSION_PREFIX = "fast-"
+# distinct jobs of each kind - requests pick from these
+SEEDED_JOBS = 50
+
+MODES = ["inline", "offloaded"]
+
+
+@dataclass
+class IoBenchmarkOptions():
+    requests: int = 1000
+    concurrency: int = 32
+    slow_fraction: float = 0.1
+    slow_seconds: float = 0.2
+    fast_seconds: float = 0.0
+    aws_io_workers: int = 32
+    random_seed: int = 42
+
+
+@dataclass
+class IoBenchmarkResult():
+    mode: str
+    requests: int
+    duration_seconds: float
+    errors: int
+    # request latencies by call kind
+    fast: List[float] = field(default_factory=list)
+    slow: List[float] = field(default_factory=list)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "requests": self.requests,
+            "duration_seconds": self.duration_seconds,
+            "requests_per_second": self.requests_per_second,
+            "errors": self.errors,
+            "fast": distribution(self.fast),
+            "slow": distribution(self.slow),
+        }
+
+    def summary(self) -> str:
+        return f"""
+    Mode: {self.mode}
+    Requests: {self.requests} ({self.errors} errors) in {self.duration_seconds:.2f}s
+    Throughput: {self.requests_per_second:.1f} requests/s
+    Fast calls: {format_distribution(self.fast)}
+    Slow calls: {format_distribution(self.slow)}
+    """
+
+
+@contextlib.contextmanager
+def injected_latency(slow_seconds: float, fast_seconds: float) -> Iterator[None]:
+    """
+
+    Delays the status table reads made through the shared boto3 session -
+    reads of slow- sessions by slow_seconds and others by fast_seconds.
+
+    Args:
+        slow_seconds (float): Latency of slow calls
+        fast_seconds (float): Latency of fast calls
+    """
+    def delay(params: Dict[str, Any], **kwargs: Any) -> None:
+        session_id = params.get('Key', {}).get('session_id', {})
+        # the resource may already have serialised the key
+        if isinstance(session_id, dict):
+            session_id = session_id.get('S', '')
+        time.sleep(slow_seconds if str(session_id).startswith(
+            SLOW_SESSION_PREFIX) else fast_seconds)
+
+    # clients copy the session's handlers when created - start from a fresh
+    # session so every client the API uses is delayed
+    clear_aws_clients()
+    session = get_session()
+    session.events.register('before-parameter-build.dynamodb.GetItem', delay)
+    try:
+        yield
+    finally:
+        clear_aws_clients()
+
+
+@contextlib.contextmanager
+def inline_reads() -> Iterator[None]:
+    # the route awaits the async variant - make it call the blocking read
+    # directly on the event loop
+    original = dynamo.get_job_by_session_id_async
+
+    async def blocking(**kwargs: Any) -> Any:
+        return dynamo.get_job_by_session_id(**kwargs)
+    dynamo.get_job_by_session_id_async = blocking
+    try:
+        yield
+    finally:
+        dynamo.get_job_by_session_id_async = original
+
+
+def seed_jobs() -> Tuple[List[str], List[str]]:
+    table = dynamo.setup_status_table(table_name=STATUS_TABLE_NAME)
+    ids: Dict[str, List[str]] = {}
+    for prefix in [FAST_SESSION_PREFIX, SLOW_SESSION_PREFIX]:
+        ids[prefix] = []
+        for index in range(SEEDED_JOBS):
+            session_id = f"{prefix}{index}"
+            entry = JobStatusTable(
+                session_id=session_id,
+                username=BENCHMARK_USERNAME,
+                job_type=JobType.PROV_LODGE,
+                job_sub_type=JobSubType.PROV_LODGE_WAKE_UP,
+                created_timestamp=index,
+                status=JobStatus.SUCCEEDED,
+                payload={}
+            )
+            table.put_item(Item=json.loads(entry.json(exclude_none=True)))
+            ids[prefix].append(session_id)
+    return ids[FAST_SESSION_PREFIX], ids[SLOW_SESSION_PREFIX]
+
+
+def plan_requests(requests: int, slow_fraction: float, fast_ids: List[str], slow_ids: List[str], rng: random.Random) -> List[str]:
+    return [
+        rng.choice(slow_ids) if rng.random() < slow_fraction else rng.choice(fast_ids)
+        for _ in range(requests)
+    ]
+
+
+async def drive(app: Any, plan: List[str], concurrency: int, mode: str) -> IoBenchmarkResult:
+    result = IoBenchmarkResult(
+        mode=mode, requests=len(plan), duration_seconds=0.0, errors=0)
+    queue: asyncio.Queue = asyncio.Queue()
+    for session_id in plan:
+        queue.put_nowait(session_id)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def worker() -> None:
+            while not queue.empty():
+                session_id = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(JOBS_USER_PREFIX + JOBS_USER_ACTIONS_MAP[JobsUserActions.FETCH], params={"session_id": session_id})
+                elapsed = time.perf_counter() - start
+                if response.status_code != 200:
+                    result.errors += 1
+                (result.slow if session_id.startswith(SLOW_SESSION_PREFIX)
+                 else result.fast).append(elapsed)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        result.duration_seconds = time.perf_counter() - start
+    return result
+
+
+def run_io_benchmark(options: IoBenchmarkOptions) -> List[IoBenchmarkResult]:
+    """
+
+    Runs the same mix of fast and slow job fetches against the job API in each
+    mode (see above).
+
+    Args:
+        options (IoBenchmarkOptions): The load settings
+
+    Returns:
+        List[IoBenchmarkResult]: The result of each mode
+    """
+    from moto import mock_dynamodb  # type: ignore
+    from main import app
+    from config import Config, get_settings, base_config
+    from dependencies.dependencies import user_general_dependency
+
+    config = Config(
+        keycloak_endpoint=base_config.keycloak_endpoint,
+        stage=base_config.stage,
+        domain_base=base_config.domain_base,
+        test_mode=True,
+        status_table_name=STATUS_TABLE_NAME,
+        batch_table_name=BATCH_TABLE_NAME,
+        username_index_name=USERNAME_INDEX_NAME,
+        batch_id_index_name=BATCH_INDEX_NAME,
+        global_list_index_name=GLOBAL_INDEX_NAME,
+        email_topic_arn="",
+        prov_lodge_topic_arn="",
+        registry_topic_arn="",
+        report_topic_arn="",
+    )
+    user = User(username=BENCHMARK_USERNAME, roles=[],
+                access_token="benchmark", email=None)
+    app.dependency_overrides[get_settings] = lambda: config
+    app.dependency_overrides[user_general_dependency] = lambda: user
+    configure_aws_io_executor(max_workers=options.aws_io_workers)
+
+    rng = random.Random(options.random_seed)
+    results: List[IoBenchmarkResult] = []
+    try:
+        with mock_dynamodb(), serialised_dynamodb():
+            setup_tables()
+            fast_ids, slow_ids = seed_jobs()
+            plan = plan_requests(requests=options.requests, slow_fraction=options.slow_fraction,
+                                 fast_ids=fast_ids, slow_ids=slow_ids, rng=rng)
+            with injected_latency(slow_seconds=options.slow_seconds, fast_seconds=options.fast_seconds):
+                for mode in MODES:
+                    context = inline_reads() if mode == "inline" else contextlib.nullcontext()
+                    with context:
+                        results.append(asyncio.run(drive(
+                            app=app, plan=plan, concurrency=options.concurrency, mode=mode)))
+    finally:
+        app.dependency_overrides = {}
+    return results
@@ -1,7 +1,16 @@
 from ProvenaInterfaces.AsyncJobAPI import *
-import boto3  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_clients import get_client
 import logging
 from pydantic import BaseModel
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# SNS publish batch limits
+MAX_PUBLISH_BATCH_ENTRIES = 10
+MAX_PUBLISH_BATCH_BYTES = 256 * 1024
+
+# (index of the model, error)
+PublishFailure = Tuple[int, str]
 
 # setup logger
 logging.config.fileConfig('logging.conf', disable_existing_loggers=False)
@@ -11,20 +20,110 @@ logger_key = "helpers"
 logger = logging.getLogger(logger_key)
 
 
+def message_attributes(model: BaseModel) -> Dict[str, Any]:
+    # subscriptions filter on the priority so each lane has its own queue
+    priority: Optional[JobPriority] = getattr(model, 'priority', None)
+    if priority is None:
+        return {}
+    return {
+        JOB_PRIORITY_ATTRIBUTE: {
+            "DataType": "String",
+            "StringValue": priority.value
+        }
+    }
+
+
 def publish_model_to_sns(model: BaseModel, topic_arn: str) -> None:
     # Serialize the model to JSON
     message_body = model.json(exclude_none=True)
 
-    # Create an SNS client
-    sns_client = boto3.client('sns')
+    # The shared SNS client
+    sns_client = get_client('sns')
 
     # Publish the message to the SNS topic
     try:
         sns_client.publish(
             TopicArn=topic_arn,
-            Message=message_body
+            Message=message_body,
+            MessageAttributes=message_attributes(model)
         )
     except Exception as e:
         err = f"Failed to publish to SNS topic: {e}."
         logging.error(err)
         raise Exception(err)
+
+
+def chunk_publish_entries(messages: List[str]) -> List[List[Tuple[int, str]]]:
+    """
+
+    Groups the messages into publish batches which respect both the entry
+    count and total payload size limits. Messages are tagged with their index.
+
+    Args:
+        messages (List[str]): The serialised messages
+
+    Returns:
+        List[List[Tuple[int, str]]]: The batches of (index, message)
+    """
+    chunks: List[List[Tuple[int, str]]] = []
+    current: List[Tuple[int, str]] = []
+    current_size = 0
+    for index, message in enumerate(messages):
+        size = len(message.encode('utf-8'))
+        if len(current) > 0 and (len(current) >= MAX_PUBLISH_BATCH_ENTRIES or current_size + size > MAX_PUBLISH_BATCH_BYTES):
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append((index, message))
+        current_size += size
+    if len(current) > 0:
+        chunks.append(current)
+    return chunks
+
+
+def publish_chunk(chunk: List[Tuple[int, str]], topic_arn: str, sns_client: Any, attributes: List[Dict[str, Any]]) -> List[PublishFailure]:
+    try:
+        response = sns_client.publish_batch(
+            TopicArn=topic_arn,
+            PublishBatchRequestEntries=[
+                {"Id": str(index), "Message": message,
+                 "MessageAttributes": attributes[index]} for index, message in chunk
+            ]
+        )
+    except Exception as e:
+        err = f"Failed to publish batch to SNS topic: {e}."
+        logging.error(err)
+        return [(index, err) for index, _ in chunk]
+
+    failed: List[Dict[str, Any]] = response.get('Failed') or []
+    return [
+        (int(f['Id']), f"Failed to publish to SNS topic: {f.get('Code')} {f.get('Message')}.") for f in failed
+    ]
+
+
+def publish_models_to_sns_batch(models: Sequence[BaseModel], topic_arn: str, max_workers: int) -> List[PublishFailure]:
+    """
+
+    Publishes the models using SNS PublishBatch. Batches are published
+    concurrently.
+
+    Args:
+        models (Sequence[BaseModel]): The models to publish
+        topic_arn (str): The SNS topic
+        max_workers (int): Maximum concurrent publish requests
+
+    Returns:
+        List[PublishFailure]: The index and error of each model which failed to publish
+    """
+    messages = [model.json(exclude_none=True) for model in models]
+    attributes = [message_attributes(model) for model in models]
+    chunks = chunk_publish_entries(messages)
+
+    # clients are thread safe
+    sns_client = get_client('sns')
+
+    failures: List[PublishFailure] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_failures in executor.map(lambda chunk: publish_chunk(chunk=chunk, topic_arn=topic_arn, sns_client=sns_client, attributes=attributes), chunks):
+            failures.extend(chunk_failures)
+    return sorted(failures)
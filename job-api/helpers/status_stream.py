@@ -0,0 +1,124 @@
+from ProvenaInterfaces.AsyncJobAPI import *
+import asyncio
+import helpers.dynamo as dynamo
+import logging
+from typing import Any, Dict, List, Optional, Set, Union
+
+# setup logger
+logging.config.fileConfig('logging.conf', disable_existing_loggers=False)
+
+# get logger for this module
+logger_key = "helpers"
+logger = logging.getLogger(logger_key)
+
+# Statuses after which a job will not change again
+TERMINAL_STATUSES: Set[JobStatus] = {JobStatus.SUCCEEDED, JobStatus.FAILED}
+
+# The current state of a watched job (its status entry) or batch (its counters)
+WatchedState = Union[JobStatusTable, BatchCounterTable]
+
+
+def is_finished(state: WatchedState) -> bool:
+    if isinstance(state, BatchCounterTable):
+        return state.total > 0 and state.succeeded + state.failed >= state.total
+    return state.status in TERMINAL_STATUSES
+
+
+class StatusSubscription():
+    """
+
+    A listener for the state of a single job or a batch. The state read by
+    each poll is put on the queue.
+    """
+
+    def __init__(self, session_id: Optional[str] = None, batch_id: Optional[str] = None) -> None:
+        self.session_id = session_id
+        self.batch_id = batch_id
+        self.queue: asyncio.Queue[WatchedState] = asyncio.Queue()
+
+    @property
+    def key(self) -> str:
+        return f"session:{self.session_id}" if self.session_id is not None else f"batch:{self.batch_id}"
+
+
+class StatusPoller():
+    """
+
+    Polls the current state of every watched job (its status entry) and batch
+    (its counter entry) and fans it out to subscriptions. One poller is shared
+    by every request in the process, so each watched job or batch is read once
+    per poll no matter how many clients are listening. Batches are a single
+    read regardless of their size. The poller only runs while there are
+    subscriptions.
+    """
+
+    def __init__(self, table_name: str, batch_table_name: str, poll_seconds: float) -> None:
+        self.table_name = table_name
+        self.batch_table_name = batch_table_name
+        self.poll_seconds = poll_seconds
+
+        self.subscriptions: Set[StatusSubscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, subscription: StatusSubscription) -> None:
+        """
+
+        Registers the subscription - its job or batch is read from the next
+        poll onwards.
+
+        Args:
+            subscription (StatusSubscription): The subscription
+        """
+        self.subscriptions.add(subscription)
+        loop = asyncio.get_running_loop()
+        # the loop can change between invocations when running in lambda
+        if self.loop is not loop or self.task is None or self.task.done():
+            self.loop = loop
+            self.task = loop.create_task(self.run())
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    async def read(self, subscription: StatusSubscription) -> Optional[WatchedState]:
+        if subscription.session_id is not None:
+            return await dynamo.get_job_by_session_id_async(
+                session_id=subscription.session_id, table_name=self.table_name)
+        assert subscription.batch_id is not None
+        return await dynamo.read_batch_counters_async(
+            batch_id=subscription.batch_id, batch_table_name=self.batch_table_name)
+
+    async def poll(self) -> None:
+        # one read per watched job/batch, made concurrently
+        watched: Dict[str, List[StatusSubscription]] = {}
+        for subscription in list(self.subscriptions):
+            watched.setdefault(subscription.key, []).append(subscription)
+        states = await asyncio.gather(
+            *[self.read(subscriptions[0])
+              for subscriptions in watched.values()],
+            return_exceptions=True
+        )
+        for subscriptions, state in zip(watched.values(), states):
+            if isinstance(state, BaseException):
+                logging.error(
+                    f"Failed to read job status, err: {state}. Retrying.")
+                continue
+            if state is None:
+                continue
+            for subscription in subscriptions:
+                subscription.queue.put_nowait(state)
+
+    async def run(self) -> None:
+        while len(self.subscriptions) > 0:
+            await asyncio.sleep(self.poll_seconds)
+            await self.poll()
+
+
+def format_event(event: JobStatusStreamEventType, data: BaseModel) -> str:
+    # server sent event - the data is always a single line of json
+    return f"event: {event.value}\ndata: {data.json(exclude_none=True)}\n\n"
+
+
+def format_keepalive() -> str:
+    # comment lines are ignored by clients
+    return ": keepalive\n\n"
@@ -0,0 +1,75 @@
+import typer
+import os
+import json
+import logging
+import logging.config
+from typing import Optional
+
+# Concurrency benchmark for the job API's status table reads.
+#
+# Fetches jobs through the job API (in process, against moto) with a mix of
+# fast and slow DynamoDB calls, first with the table read made directly in
+# the async route handler and then offloaded to the AWS IO thread pool.
+# Reports throughput and latency percentiles of each, e.g.
+#
+# python io_benchmark.py --requests 2000 --slow-fraction 0.1 --slow-ms 200
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(
+    requests: int = typer.Option(1000, help="The number of job fetches."),
+    concurrency: int = typer.Option(
+        32, help="Concurrent requests in flight."),
+    slow_fraction: float = typer.Option(
+        0.1, help="Fraction of requests whose DynamoDB call is slow."),
+    slow_ms: float = typer.Option(
+        200.0, help="Latency added to slow DynamoDB calls."),
+    fast_ms: float = typer.Option(
+        0.0, help="Latency added to the other DynamoDB calls."),
+    aws_io_workers: int = typer.Option(
+        32, help="AWS IO thread pool size (AWS_IO_MAX_WORKERS as deployed)."),
+    random_seed: int = typer.Option(
+        42, help="Seed for the request mix."),
+    json_output: Optional[str] = typer.Option(
+        None, help="Also write the results as json to this path (e.g. for CI)."),
+) -> None:
+    # the job API reads its base config at import time
+    os.environ.setdefault("KEYCLOAK_ENDPOINT", "")
+    os.environ.setdefault("STAGE", "DEV")
+    os.environ.setdefault("DOMAIN_BASE", "benchmark")
+    # the API is driven in process - tokens are not validated
+    os.environ.setdefault("TEST_MODE", "true")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ap-southeast-2")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    from helpers.io_benchmark import IoBenchmarkOptions, run_io_benchmark
+
+    options = IoBenchmarkOptions(
+        requests=requests,
+        concurrency=concurrency,
+        slow_fraction=slow_fraction,
+        slow_seconds=slow_ms / 1000,
+        fast_seconds=fast_ms / 1000,
+        aws_io_workers=aws_io_workers,
+        random_seed=random_seed
+    )
+
+    print(f"Running {requests} job fetches in each mode...")
+    # per request logging would dominate the measurement
+    logging.disable(logging.WARNING)
+    results = run_io_benchmark(options)
+    logging.disable(logging.NOTSET)
+    for result in results:
+        print(result.summary())
+
+    if json_output is not None:
+        with open(json_output, "w") as f:
+            json.dump([result.as_dict() for result in results], f, indent=2)
+        print(f"Wrote results to {json_output}.")
+
+
+if __name__ == "__main__":
+    app()
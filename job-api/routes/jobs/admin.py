@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
+from ProvenaSharedFunctionality.Services.aws_io import run_aws_io
 from config import get_settings, Config
 from KeycloakFastAPI.Dependencies import User, ProtectedRole
 from dependencies.dependencies import admin_user_protected_role_dependency, read_user_protected_role_dependency, read_write_user_protected_role_dependency
@@ -43,7 +44,8 @@ async def launch_job(
 
     logging.info("Lodging job.")
     try:
-        service_response = admin_service.launch_job(
+        service_response = await run_aws_io(
+            admin_service.launch_job,
             username=username,
             request_batch_id=request.request_batch_id,
             batch_id=request.add_to_batch,
@@ -55,7 +57,8 @@ async def launch_job(
                 job_type=request.job_type,
                 config=config
             ),
-            batch_id_index_name=config.batch_id_index_name
+            batch_id_index_name=config.batch_id_index_name,
+            priority=request.priority
         )
     except Exception as e:
         raise HTTPException(
@@ -69,6 +72,64 @@ async def launch_job(
     )
 
 
+@router.post(JOBS_ADMIN_ACTIONS_MAP[JobsAdminActions.LAUNCH_BATCH], operation_id="launch_job_batch")
+async def launch_job_batch(
+    request: AdminLaunchJobBatchRequest,
+    roles: ProtectedRole = Depends(read_write_user_protected_role_dependency),
+    config: Config = Depends(get_settings)
+) -> AdminLaunchJobBatchResponse:
+    logging.info(f"Launching batch of {len(request.jobs)} tasks.")
+
+    # determine appropriate username to use
+    username = request.username or roles.user.username
+    logging.info(f"Lodging with username {username}.")
+
+    logging.info(f"Validating payloads")
+    for index, job in enumerate(request.jobs):
+        try:
+            admin_service.validate_payload(
+                job_sub_type=job.job_sub_type,
+                job_specific_payload=job.job_payload
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid payload supplied for job at index {index}: {e}."
+            )
+
+    logging.info("Lodging jobs.")
+    try:
+        service_response = await run_aws_io(
+            admin_service.launch_job_batch,
+            username=username,
+            request_batch_id=request.request_batch_id,
+            batch_id=request.add_to_batch,
+            job_type=request.job_type,
+            jobs=request.jobs,
+            table_name=config.status_table_name,
+            sns_topic_arn=admin_service.get_correct_topic_arn(
+                job_type=request.job_type,
+                config=config
+            ),
+            batch_id_index_name=config.batch_id_index_name,
+            max_workers=config.launch_batch_workers,
+            batch_table_name=config.batch_table_name,
+            priority=request.priority
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to lodge jobs, error: {e}."
+        )
+
+    return AdminLaunchJobBatchResponse(
+        session_ids=service_response.session_ids,
+        batch_id=service_response.batch_id,
+        failures=service_response.failures if len(
+            service_response.failures) > 0 else None
+    )
+
+
 @router.get(JOBS_ADMIN_ACTIONS_MAP[JobsAdminActions.FETCH], operation_id="admin_get_job")
 async def get_job(
     session_id: str,
@@ -79,7 +140,7 @@ async def get_job(
 
     # get the item
     try:
-        item = user_service.get_job_by_session_id(
+        item = await user_service.get_job_by_session_id(
             session_id=session_id,
             table_name=config.status_table_name
         )
@@ -106,7 +167,7 @@ async def list_jobs(
 ) -> AdminListJobsResponse:
     logging.info(f"Querying all jobs. Request: {request}.")
     try:
-        items, pag_key = admin_service.list_jobs(
+        items, pag_key = await admin_service.list_jobs(
             username=request.username_filter,
             table_name=config.status_table_name,
             username_index=config.username_index_name,
@@ -136,7 +197,7 @@ async def list_batch(
 
     # get the item
     try:
-        items, pag_key = user_service.list_batch_by_batch_id(
+        items, pag_key = await user_service.list_batch_by_batch_id(
             batch_id=request.batch_id,
             table_name=config.status_table_name,
             batch_id_index=config.batch_id_index_name,
@@ -1,8 +1,10 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from config import get_settings, Config
 from KeycloakFastAPI.Dependencies import User
 from dependencies.dependencies import user_general_dependency
+from dependencies.status_stream import get_status_poller
 from ProvenaInterfaces.AsyncJobAPI import *
 from service.jobs.user import *
 
@@ -26,7 +28,7 @@ async def get_job(
 
     # get the item
     try:
-        item = get_job_by_session_id(
+        item = await get_job_by_session_id(
             session_id=session_id,
             table_name=config.status_table_name
         )
@@ -59,7 +61,7 @@ async def list_jobs(
 
     # get the item
     try:
-        items, pag_key = list_jobs_by_username(
+        items, pag_key = await list_jobs_by_username(
             username=user.username,
             table_name=config.status_table_name,
             username_index=config.username_index_name,
@@ -86,7 +88,7 @@ async def list_batch(
 
     # get the item
     try:
-        items, pag_key = list_batch_by_batch_id(
+        items, pag_key = await list_batch_by_batch_id(
             batch_id=request.batch_id,
             table_name=config.status_table_name,
             batch_id_index=config.batch_id_index_name,
@@ -110,6 +112,106 @@ async def list_batch(
     )
 
 
+@router.get(JOBS_USER_ACTIONS_MAP[JobsUserActions.BATCH_SUMMARY], operation_id="get_batch_summary")
+async def get_batch_summary_route(
+    batch_id: str,
+    user: User = Depends(user_general_dependency),
+    config: Config = Depends(get_settings)
+) -> GetBatchSummaryResponse:
+    logging.info("Starting batch summary operation.")
+
+    try:
+        summary = await get_batch_summary(
+            batch_id=batch_id,
+            table_name=config.status_table_name,
+            batch_id_index=config.batch_id_index_name,
+            batch_table_name=config.batch_table_name
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Unexpected internal error occurred: {e}")
+
+    if summary is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch was not found."
+        )
+
+    if summary.username != user.username:
+        raise HTTPException(status_code=401,
+                            detail=f"Not authorised to view this batch.")
+
+    return GetBatchSummaryResponse(
+        summary=summary
+    )
+
+
+@router.get(JOBS_USER_ACTIONS_MAP[JobsUserActions.STREAM], operation_id="stream_job_status", response_class=StreamingResponse)
+async def stream_job_status(
+    session_id: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    user: User = Depends(user_general_dependency),
+    config: Config = Depends(get_settings),
+    poller: StatusPoller = Depends(get_status_poller)
+) -> StreamingResponse:
+    """
+
+    Streams the status of a job, or the status counts of a batch, as server
+    sent events each time they change. Clients should reopen the stream if
+    the end event is not complete.
+
+    """
+    logging.info("Starting status stream operation.")
+
+    if (session_id is None) == (batch_id is None):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Provide exactly one of session_id or batch_id."
+        )
+
+    # the current state - a single read for a job or a batch
+    initial: Optional[WatchedState]
+    try:
+        if session_id is not None:
+            initial = await get_job_by_session_id(
+                session_id=session_id,
+                table_name=config.status_table_name
+            )
+        else:
+            assert batch_id is not None
+            initial = await get_batch_counters(
+                batch_id=batch_id,
+                batch_table_name=config.batch_table_name
+            )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Unexpected internal error occurred: {e}")
+
+    if initial is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Item was not found." if session_id is not None else f"Batch was not found. Batches launched before batch counters were introduced can't be streamed - list the batch instead."
+        )
+
+    if initial.username != user.username:
+        raise HTTPException(status_code=401,
+                            detail=f"Not authorised to view this record.")
+
+    return StreamingResponse(
+        stream_job_status_events(
+            username=user.username,
+            initial=initial,
+            subscription=StatusSubscription(
+                session_id=session_id, batch_id=batch_id),
+            poller=poller,
+            keepalive_seconds=config.status_stream_keepalive_seconds,
+            max_seconds=config.status_stream_max_seconds
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 @router.post("/retry", operation_id="retry_job",
              # Remove this annotation once destubbed
              include_in_schema=False)
@@ -5,6 +5,7 @@ from ProvenaInterfaces.AsyncJobAPI import *
 from helpers.time import get_timestamp
 from config import Config
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 import logging
 
@@ -185,7 +186,8 @@ def launch_job(
     sns_topic_arn: str,
     request_batch_id: bool,
     batch_id: Optional[str],
-    batch_id_index_name: str
+    batch_id_index_name: str,
+    priority: JobPriority = JobPriority.INTERACTIVE
 ) -> LaunchJobServiceResponse:
     """
 
@@ -205,6 +207,7 @@ def launch_job(
         request_batch_id (bool): Do we want a batch ID?
         batch_id (Optional[str]): Current batch ID
         batch_id_index_name (str): Index for batches
+        priority (JobPriority, optional): The queue lane. Defaults to JobPriority.INTERACTIVE.
 
     Raises:
         ValueError: Inappropriate reques combination
@@ -235,7 +238,8 @@ def launch_job(
         job_sub_type=job_sub_type,
         created_timestamp=get_timestamp(),
         payload=job_specific_payload,
-        batch_id=desired_batch_id
+        batch_id=desired_batch_id,
+        priority=priority
     )
 
     logger.info("Submitting to SNS topic")
@@ -252,7 +256,258 @@ def launch_job(
     )
 
 
-def list_jobs(username: Optional[str], table_name: str,  username_index: str, pagination_key: Optional[PaginationKey], limit: int, global_index_name: str) -> dynamo.PaginatedStatusList:
+# Attempts at allocating a unique session id before failing
+SESSION_ID_ATTEMPTS = 10
+
+
+# Jobs reserved per transaction - one item is left for the batch counters
+RESERVE_TRANSACTION_JOBS = 99
+
+
+def reserve_session(payload: JobSnsPayload, table_name: str, client: Any, batch_table_name: Optional[str] = None) -> JobSnsPayload:
+    """
+
+    Allocates a unique session id for the job by conditionally writing its
+    PENDING status entry. On the (very unlikely) event of a collision a new
+    id is generated.
+
+    Args:
+        payload (JobSnsPayload): The job payload - session id is replaced
+        table_name (str): The status table name
+        client (Any): The dynamodb client
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Raises:
+        Exception: Could not allocate a unique id
+
+    Returns:
+        JobSnsPayload: The payload with its allocated session id
+    """
+    for _ in range(SESSION_ID_ATTEMPTS):
+        payload.session_id = str(uuid.uuid4())
+        if dynamo.reserve_status_entry(
+            entry=status_entry(job=payload, status=JobStatus.PENDING),
+            table_name=table_name,
+            client=client,
+            batch_table_name=batch_table_name
+        ):
+            return payload
+        logging.info(f"Session id {payload.session_id} is in use - retrying.")
+    raise Exception(
+        f"Failed to generate unique ID. Tried {SESSION_ID_ATTEMPTS} times.")
+
+
+def try_reserve_session(payload: JobSnsPayload, table_name: str, client: Any, batch_table_name: Optional[str] = None) -> Optional[str]:
+    """
+
+    Reserves a session id for the job (see reserve_session), reporting rather
+    than raising any failure.
+
+    Args:
+        payload (JobSnsPayload): The job payload - session id is replaced
+        table_name (str): The status table name
+        client (Any): The dynamodb client
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+
+    Returns:
+        Optional[str]: The error if the job could not be reserved, otherwise None
+    """
+    try:
+        reserve_session(payload=payload, table_name=table_name,
+                        client=client, batch_table_name=batch_table_name)
+        return None
+    except Exception as e:
+        logging.error(f"Failed to reserve a session id, error: {e}.")
+        return f"Job could not be reserved. {e}"
+
+
+def reserve_batch_sessions(payloads: List[JobSnsPayload], table_name: str, batch_table_name: str, client: Any) -> List[Optional[str]]:
+    """
+
+    Allocates session ids for jobs in the same batch by writing their PENDING
+    status entries and counting them in the batch in a single transaction. If
+    the transaction is cancelled (a collision or a conflicting counter
+    update) or fails, each job is reserved individually.
+
+    Args:
+        payloads (List[JobSnsPayload]): The job payloads - session ids are replaced
+        table_name (str): The status table name
+        batch_table_name (str): The batch counter table name
+        client (Any): The dynamodb client
+
+    Returns:
+        List[Optional[str]]: The error of each job which could not be reserved (None if reserved)
+    """
+    for payload in payloads:
+        payload.session_id = str(uuid.uuid4())
+    try:
+        if dynamo.reserve_status_entries(
+            entries=[status_entry(job=payload, status=JobStatus.PENDING)
+                     for payload in payloads],
+            table_name=table_name,
+            batch_table_name=batch_table_name,
+            client=client
+        ):
+            return [None for _ in payloads]
+        logging.info("Batch reservation was cancelled - reserving individually.")
+    except Exception as e:
+        # transactions are all or nothing so none of the jobs were written
+        logging.error(
+            f"Batch reservation failed, error: {e} - reserving individually.")
+    return [try_reserve_session(payload=payload, table_name=table_name, client=client, batch_table_name=batch_table_name) for payload in payloads]
+
+
+def status_entry(job: JobSnsPayload, status: JobStatus, info: Optional[str] = None) -> JobStatusTable:
+    return JobStatusTable(
+        session_id=job.session_id,
+        batch_id=job.batch_id,
+        username=job.username,
+        job_type=job.job_type,
+        job_sub_type=job.job_sub_type,
+        created_timestamp=job.created_timestamp,
+        priority=job.priority,
+        status=status,
+        payload=job.payload,
+        info=info
+    )
+
+
+@dataclass
+class LaunchJobBatchServiceResponse():
+    session_ids: List[str]
+    batch_id: Optional[str]
+    failures: List[AdminLaunchJobBatchFailure]
+
+
+def launch_job_batch(
+    username: str,
+    job_type: JobType,
+    jobs: List[AdminLaunchJobBatchItem],
+    table_name: str,
+    sns_topic_arn: str,
+    request_batch_id: bool,
+    batch_id: Optional[str],
+    batch_id_index_name: str,
+    max_workers: int,
+    batch_table_name: Optional[str] = None,
+    priority: JobPriority = JobPriority.BULK
+) -> LaunchJobBatchServiceResponse:
+    """
+
+    Launches many jobs of the same type.
+
+    1) generate batch id if needed
+    2) allocate session ids by conditionally writing PENDING status entries
+       (concurrently) - batch jobs are written in transactions of up to 99
+       which also count them in the batch. Jobs which can't be reserved are
+       reported as failures
+    3) publish the reserved jobs to the SNS topic with PublishBatch
+       (concurrently)
+    4) mark any jobs which failed to publish as FAILED
+
+    Args:
+        username (str): The username for entries
+        job_type (JobType): job type
+        jobs (List[AdminLaunchJobBatchItem]): The sub types and payloads
+        table_name (str): table name
+        sns_topic_arn (str): The SNS topic to publish to
+        request_batch_id (bool): Do we want a batch ID?
+        batch_id (Optional[str]): Current batch ID
+        batch_id_index_name (str): Index for batches
+        max_workers (int): Maximum concurrent AWS requests
+        batch_table_name (Optional[str], optional): The batch counter table name. Defaults to None.
+        priority (JobPriority, optional): The queue lane. Defaults to JobPriority.BULK.
+
+    Raises:
+        ValueError: Inappropriate request combination
+
+    Returns:
+        LaunchJobBatchServiceResponse: The allocated ids (of reserved jobs) and any failures
+    """
+    if request_batch_id and (batch_id is not None):
+        raise ValueError("Cannot both request a batch and add to a batch.")
+
+    desired_batch_id = batch_id
+    if request_batch_id:
+        desired_batch_id = generate_unique_batch_id(
+            table_name=table_name, batch_id_index_name=batch_id_index_name)
+
+    created_timestamp = get_timestamp()
+    payloads = [
+        JobSnsPayload(
+            # allocated below
+            session_id="",
+            username=username,
+            job_type=job_type,
+            job_sub_type=job.job_sub_type,
+            created_timestamp=created_timestamp,
+            payload=job.job_payload,
+            batch_id=desired_batch_id,
+            priority=priority
+        ) for job in jobs
+    ]
+
+    logger.info(f"Allocating {len(payloads)} session ids.")
+    client = dynamo.setup_dynamodb_client()
+    reserve_errors: List[Optional[str]]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if desired_batch_id is not None and batch_table_name is not None:
+            chunks = [payloads[i:i + RESERVE_TRANSACTION_JOBS]
+                      for i in range(0, len(payloads), RESERVE_TRANSACTION_JOBS)]
+            reserve_errors = [error for chunk_errors in executor.map(
+                lambda c: reserve_batch_sessions(
+                    payloads=c, table_name=table_name, batch_table_name=batch_table_name, client=client),
+                chunks
+            ) for error in chunk_errors]
+        else:
+            reserve_errors = list(executor.map(
+                lambda p: try_reserve_session(
+                    payload=p, table_name=table_name, client=client),
+                payloads
+            ))
+
+    # jobs which could not be reserved have no status entry so are only
+    # reported
+    failures: List[AdminLaunchJobBatchFailure] = [
+        AdminLaunchJobBatchFailure(index=index, session_id=None, error=error)
+        for index, error in enumerate(reserve_errors) if error is not None
+    ]
+    reserved = [index for index, error in enumerate(
+        reserve_errors) if error is None]
+
+    logger.info("Submitting to SNS topic")
+    publish_failures = sns.publish_models_to_sns_batch(
+        models=[payloads[index] for index in reserved], topic_arn=sns_topic_arn, max_workers=max_workers)
+
+    for reserved_index, error in publish_failures:
+        index = reserved[reserved_index]
+        failed = payloads[index]
+        failures.append(AdminLaunchJobBatchFailure(
+            index=index, session_id=failed.session_id, error=error))
+        try:
+            dynamo.fail_status_entry(
+                entry=status_entry(
+                    job=failed, status=JobStatus.FAILED, info=f"Job could not be launched. {error}"),
+                table_name=table_name,
+                client=client,
+                batch_table_name=batch_table_name
+            )
+        except Exception as e:
+            logging.error(
+                f"Failed to mark unpublished job {failed.session_id} as failed, error: {e}.")
+    failures.sort(key=lambda failure: failure.index)
+
+    logger.info(
+        f"Published {len(payloads) - len(failures)} of {len(payloads)} jobs.")
+
+    return LaunchJobBatchServiceResponse(
+        session_ids=[payloads[index].session_id for index in reserved],
+        batch_id=desired_batch_id,
+        failures=failures
+    )
+
+
+async def list_jobs(username: Optional[str], table_name: str,  username_index: str, pagination_key: Optional[PaginationKey], limit: int, global_index_name: str) -> dynamo.PaginatedStatusList:
     """
 
     list jobs for admin
@@ -274,7 +529,7 @@ def list_jobs(username: Optional[str], table_name: str,  username_index: str, pa
         dynamo.PaginatedStatusList: paginated response
     """
     if username is not None:
-        return dynamo.list_jobs_by_username(
+        return await dynamo.list_jobs_by_username_async(
             username=username,
             table_name=table_name,
             username_index=username_index,
@@ -282,7 +537,7 @@ def list_jobs(username: Optional[str], table_name: str,  username_index: str, pa
             limit=limit
         )
     else:
-        return dynamo.list_all_jobs(
+        return await dynamo.list_all_jobs_async(
             table_name=table_name,
             pagination_key=pagination_key,
             global_index_name=global_index_name,
@@ -1,10 +1,13 @@
 from ProvenaInterfaces.AsyncJobAPI import *
 import helpers.dynamo as dynamo
-from typing import Tuple, Optional
+from helpers.status_stream import *
+from typing import AsyncGenerator, Tuple, Optional
+import asyncio
+import time
 from ProvenaInterfaces.AsyncJobAPI import PaginationKey
 
 
-def get_job_by_session_id(session_id: str, table_name: str) -> Optional[JobStatusTable]:
+async def get_job_by_session_id(session_id: str, table_name: str) -> Optional[JobStatusTable]:
     """
     
     Given a session id and table name, gets the job status table entry if present.
@@ -16,12 +19,12 @@ def get_job_by_session_id(session_id: str, table_name: str) -> Optional[JobStatu
     Returns:
         Optional[JobStatusTable]: Item if present
     """    
-    item = dynamo.get_job_by_session_id(
+    item = await dynamo.get_job_by_session_id_async(
         session_id=session_id, table_name=table_name)
     return item
 
 
-def list_jobs_by_username(username: str, table_name: str,  username_index: str, pagination_key: Optional[PaginationKey], limit: int) -> dynamo.PaginatedStatusList:
+async def list_jobs_by_username(username: str, table_name: str,  username_index: str, pagination_key: Optional[PaginationKey], limit: int) -> dynamo.PaginatedStatusList:
     """
     
     Lists jobs by username.
@@ -40,7 +43,7 @@ def list_jobs_by_username(username: str, table_name: str,  username_index: str,
     Returns:
         dynamo.PaginatedStatusList: pag key if present and list of items
     """    
-    return dynamo.list_jobs_by_username(
+    return await dynamo.list_jobs_by_username_async(
         username=username,
         table_name=table_name,
         username_index=username_index,
@@ -48,7 +51,7 @@ def list_jobs_by_username(username: str, table_name: str,  username_index: str,
         limit=limit
     )
 
-def list_batch_by_batch_id(batch_id: str, table_name: str,  batch_id_index: str, pagination_key: Optional[PaginationKey], limit: int) -> dynamo.PaginatedStatusList:
+async def list_batch_by_batch_id(batch_id: str, table_name: str,  batch_id_index: str, pagination_key: Optional[PaginationKey], limit: int) -> dynamo.PaginatedStatusList:
     """
     
     Lists entries by batch id.
@@ -67,10 +70,154 @@ def list_batch_by_batch_id(batch_id: str, table_name: str,  batch_id_index: str,
     Returns:
         dynamo.PaginatedStatusList: The pag key and items
     """    
-    return dynamo.get_items_by_batch_id(
+    return await dynamo.get_items_by_batch_id_async(
         batch_id=batch_id,
         table_name=table_name,
         pagination_key=pagination_key,
         batch_id_index_name=batch_id_index,
         limit=limit
     )
+
+
+async def list_all_by_batch_id(batch_id: str, table_name: str, batch_id_index: str, page_size: int = 100) -> List[JobStatusTable]:
+    """
+
+    Lists every entry in a batch by reading through all pages.
+
+    Args:
+        batch_id (str): The batch ID
+        table_name (str): table name
+        batch_id_index (str): index name
+        page_size (int, optional): page size. Defaults to 100.
+
+    Returns:
+        List[JobStatusTable]: The items
+    """
+    items: List[JobStatusTable] = []
+    pagination_key: Optional[PaginationKey] = None
+    while True:
+        page, pagination_key = await list_batch_by_batch_id(
+            batch_id=batch_id,
+            table_name=table_name,
+            batch_id_index=batch_id_index,
+            pagination_key=pagination_key,
+            limit=page_size
+        )
+        items.extend(page)
+        if pagination_key is None:
+            return items
+
+
+async def get_batch_counters(batch_id: str, batch_table_name: str) -> Optional[BatchCounterTable]:
+    """
+
+    Gets the counter entry of a batch - a single read regardless of the batch
+    size.
+
+    Args:
+        batch_id (str): The batch ID
+        batch_table_name (str): batch counter table name
+
+    Returns:
+        Optional[BatchCounterTable]: The counts, None if the batch has no counter entry
+    """
+    return await dynamo.read_batch_counters_async(
+        batch_id=batch_id, batch_table_name=batch_table_name)
+
+
+async def get_batch_summary(batch_id: str, table_name: str, batch_id_index: str, batch_table_name: str) -> Optional[BatchCounterTable]:
+    """
+
+    Gets the status counts of a batch from its counter entry. Batches
+    launched before the counters were introduced have no counter entry - these
+    are counted from the batch entries instead.
+
+    Args:
+        batch_id (str): The batch ID
+        table_name (str): table name
+        batch_id_index (str): index name
+        batch_table_name (str): batch counter table name
+
+    Returns:
+        Optional[BatchCounterTable]: The counts, None if the batch doesn't exist
+    """
+    counters = await get_batch_counters(
+        batch_id=batch_id, batch_table_name=batch_table_name)
+    if counters is not None:
+        return counters
+
+    items = await list_all_by_batch_id(
+        batch_id=batch_id, table_name=table_name, batch_id_index=batch_id_index)
+    if len(items) == 0:
+        return None
+    counts: Dict[str, int] = {
+        field: 0 for field in BATCH_COUNTER_FIELD_MAP.values()}
+    for item in items:
+        counts[BATCH_COUNTER_FIELD_MAP[item.status]] += 1
+    return BatchCounterTable(
+        batch_id=batch_id,
+        username=items[0].username,
+        total=len(items),
+        **counts
+    )
+
+
+async def stream_job_status_events(
+    username: str,
+    initial: WatchedState,
+    subscription: StatusSubscription,
+    poller: StatusPoller,
+    keepalive_seconds: float,
+    max_seconds: float
+) -> AsyncGenerator[str, None]:
+    """
+
+    Produces the server sent events for a status stream. The current state is
+    sent first - a status event for a job or a summary event (the batch
+    counters) for a batch - then an event each time the state read by the
+    poller changes. The stream ends once the job/every job in the batch has
+    finished or after max_seconds.
+
+    The subscription is registered with the poller once the stream is started
+    (so a response which is never sent doesn't leave it polling) and
+    unsubscribed when the stream ends.
+
+    Args:
+        username (str): The user - states owned by other users are not sent
+        initial (WatchedState): The current job entry or batch counters
+        subscription (StatusSubscription): The subscription
+        poller (StatusPoller): The poller
+        keepalive_seconds (float): Keep alive interval while idle
+        max_seconds (float): Maximum stream duration
+
+    Returns:
+        AsyncGenerator[str, None]: The event stream
+    """
+    deadline = time.monotonic() + max_seconds
+    event_type = JobStatusStreamEventType.SUMMARY if isinstance(
+        initial, BatchCounterTable) else JobStatusStreamEventType.STATUS
+
+    poller.subscribe(subscription)
+    try:
+        current = initial
+        yield format_event(event_type, current)
+
+        while not is_finished(current):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                state = await asyncio.wait_for(subscription.queue.get(), timeout=min(keepalive_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield format_keepalive()
+                continue
+
+            # only changes are sent
+            if state.username != username or state == current:
+                continue
+            current = state
+            yield format_event(event_type, current)
+
+        yield format_event(JobStatusStreamEventType.END, JobStatusStreamEnd(complete=is_finished(current)))
+    finally:
+        poller.unsubscribe(subscription)
@@ -128,6 +128,53 @@ def user_list_batch_all(batch_id: str, client: TestClient) -> List[JobStatusTabl
     return items
 
 
+def user_batch_summary(client: TestClient, batch_id: str) -> Response:
+    endpoint = get_user_route(JobsUserActions.BATCH_SUMMARY)
+    params = {'batch_id': batch_id}
+    return client.get(
+        url=endpoint,
+        params=params
+    )
+
+
+def user_batch_summary_parsed(client: TestClient, batch_id: str) -> BatchCounterTable:
+    response = user_batch_summary(client=client, batch_id=batch_id)
+    assert response.status_code == 200, f"Expected 200 code for batch summary, got {response.status_code}. Text: {response.text}"
+    return GetBatchSummaryResponse.parse_obj(response.json()).summary
+
+
+def user_stream(client: TestClient, session_id: Optional[str] = None, batch_id: Optional[str] = None) -> Response:
+    endpoint = get_user_route(JobsUserActions.STREAM)
+    params = {}
+    if session_id is not None:
+        params['session_id'] = session_id
+    if batch_id is not None:
+        params['batch_id'] = batch_id
+    return client.get(
+        url=endpoint,
+        params=params
+    )
+
+
+StreamEvent = Tuple[str, Dict[str, Any]]
+
+
+def parse_stream_events(text: str) -> List[StreamEvent]:
+    # parses server sent events into (event, data) ignoring comments
+    events: List[StreamEvent] = []
+    for block in text.split("\n\n"):
+        event: Optional[str] = None
+        data: Optional[str] = None
+        for line in block.splitlines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = line[len("data: "):]
+        if event is not None and data is not None:
+            events.append((event, json.loads(data)))
+    return events
+
+
 def user_fetch_session_id_assert_missing(client: TestClient, session_id: str) -> None:
     response = user_fetch_session_id(client=client, session_id=session_id)
     assert response.status_code == 400, f"Expected 400 code for wrong session id, got {response.status_code}. Text: {response.text}"
@@ -145,6 +192,34 @@ def user_fetch_session_id_assert_correct(client: TestClient, session_id: str) ->
 # ADMIN
 # =====
 
+def admin_launch(client: TestClient, request: AdminLaunchJobRequest) -> Response:
+    endpoint = get_admin_route(JobsAdminActions.LAUNCH)
+    return client.post(
+        url=endpoint,
+        json=py_to_dict(request)
+    )
+
+
+def admin_launch_parsed(client: TestClient, request: AdminLaunchJobRequest) -> AdminLaunchJobResponse:
+    response = admin_launch(client=client, request=request)
+    assert response.status_code == 200, f"Expected 200 code for launch action, got {response.status_code}. Text: {response.text}"
+    return AdminLaunchJobResponse.parse_obj(response.json())
+
+
+def admin_launch_batch(client: TestClient, request: AdminLaunchJobBatchRequest) -> Response:
+    endpoint = get_admin_route(JobsAdminActions.LAUNCH_BATCH)
+    return client.post(
+        url=endpoint,
+        json=py_to_dict(request)
+    )
+
+
+def admin_launch_batch_parsed(client: TestClient, request: AdminLaunchJobBatchRequest) -> AdminLaunchJobBatchResponse:
+    response = admin_launch_batch(client=client, request=request)
+    assert response.status_code == 200, f"Expected 200 code for launch batch action, got {response.status_code}. Text: {response.text}"
+    return AdminLaunchJobBatchResponse.parse_obj(response.json())
+
+
 def admin_list(client: TestClient, pag_key: Optional[PaginationKey], limit: int, username_filter: Optional[str] = None) -> Response:
     endpoint = get_admin_route(JobsAdminActions.LIST)
     payload = AdminListJobsRequest(
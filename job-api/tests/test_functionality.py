@@ -1,15 +1,19 @@
 import tests.env_setup
 import pytest
 from fastapi.testclient import TestClient
-from moto import mock_dynamodb  # type: ignore
+from moto import mock_dynamodb, mock_sns, mock_sqs  # type: ignore
 from datetime import datetime
 import os
 from dataclasses import dataclass
 import boto3  # type: ignore
 from config import Config, get_settings, base_config
 from main import app
-from typing import Generator, Any
+from typing import Generator, Any, Dict, Tuple
 import service.jobs.admin as admin_service
+import dependencies.status_stream as status_stream_dependency
+import threading
+import json
+import time
 from ProvenaInterfaces.AsyncJobModels import *
 from KeycloakFastAPI.Dependencies import User, ProtectedRole
 from dependencies.dependencies import user_general_dependency, read_user_protected_role_dependency, read_write_user_protected_role_dependency, admin_user_protected_role_dependency
@@ -34,6 +38,7 @@ def global_config_provider() -> Config:
         batch_id_index_name="",
         prov_lodge_topic_arn="",
         global_list_index_name="",
+        batch_table_name="",
         registry_topic_arn="",
         report_topic_arn="",
     )
@@ -70,6 +75,7 @@ class JobTable():
 @dataclass
 class JobInfra():
     job_table: JobTable
+    batch_table_name: str
 
 
 def checkout_user(username: str) -> None:
@@ -222,10 +228,33 @@ def setup_job_status_table(id: str) -> JobTable:
     return setup_dynamodb_job_table(client=ddb_client, table_name=table_name)
 
 
+def setup_batch_counter_table(id: str) -> str:
+    # Sets up the batch counter table with unique id postfix
+    table_name = f"batch_table{id}"
+    boto3.client('dynamodb').create_table(
+        AttributeDefinitions=[
+            {
+                'AttributeName': 'batch_id',
+                'AttributeType': 'S'
+            },
+        ],
+        TableName=table_name,
+        KeySchema=[
+            {
+                'AttributeName': 'batch_id',
+                'KeyType': 'HASH'
+            }
+        ],
+        BillingMode='PAY_PER_REQUEST',
+    )
+    return table_name
+
+
 def setup_job_infra(id: str) -> JobInfra:
     # sets up ddb table and sqs queue
     return JobInfra(
-        job_table=setup_job_status_table(id)
+        job_table=setup_job_status_table(id),
+        batch_table_name=setup_batch_counter_table(id)
     )
 
 
@@ -249,7 +278,8 @@ def checkout_infra(config: Config, infra: JobInfra) -> Config:
         'status_table_name': infra.job_table.dynamo_table_name,
         'username_index_name': infra.job_table.username_index_name,
         'batch_id_index_name': infra.job_table.batch_id_index_name,
-        'global_list_index_name': infra.job_table.global_index_name
+        'global_list_index_name': infra.job_table.global_index_name,
+        'batch_table_name': infra.batch_table_name
     })
     new_config = Config(**config_dict)
 
@@ -764,3 +794,465 @@ def test_admin_list_batch(provide_global_config: Config) -> None:
     batch_one_list = admin_list_batch_all(batch_id=batch_one_id, client=client)
     assert len(
         batch_one_list) == batch_one_count, f"Expected {batch_one_count} entries, had {len(entries)} entries. Entries: {entries}."
+
+
+def setup_topic_queue(config: Config) -> Tuple[Config, str]:
+    """
+
+    Creates a prov lodge SNS topic with a subscribed SQS queue and checks out
+    the topic in the config.
+
+    Args:
+        config (Config): The existing config
+
+    Returns:
+        Tuple[Config, str]: The updated config and the queue url
+    """
+    topic_arn = boto3.client('sns').create_topic(
+        Name="prov-lodge")['TopicArn']
+    sqs = boto3.client('sqs')
+    queue_url = sqs.create_queue(QueueName="prov-lodge")['QueueUrl']
+    queue_arn = sqs.get_queue_attributes(
+        QueueUrl=queue_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+    boto3.client('sns').subscribe(
+        TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_arn)
+
+    config_dict = config.dict()
+    config_dict.update({'prov_lodge_topic_arn': topic_arn})
+    new_config = Config(**config_dict)
+    app.dependency_overrides[get_settings] = lambda: new_config
+    return new_config, queue_url
+
+
+def count_queue_messages(queue_url: str) -> int:
+    sqs = boto3.client('sqs')
+    count = 0
+    while True:
+        messages = sqs.receive_message(
+            QueueUrl=queue_url, MaxNumberOfMessages=10).get('Messages', [])
+        if len(messages) == 0:
+            return count
+        count += len(messages)
+
+
+@mock_dynamodb
+@mock_sns
+@mock_sqs
+def test_admin_launch_batch(provide_global_config: Config) -> None:
+    config = provide_global_config
+
+    # setup and checkout infra default table name
+    id = "default"
+    config = setup_checkout_infra(id=id, config=config)
+    config, queue_url = setup_topic_queue(config=config)
+
+    username1 = "user1"
+    checkout_user(username1)
+
+    job_payload = py_to_dict(ProvLodgeVersionPayload(from_version_id="1234", to_version_id="1234",
+                                                     version_activity_id="1234", linked_person_id="1234", item_subtype=ItemSubType.MODEL))
+
+    # launch more than one publish batch worth of jobs in a new batch
+    job_count = 25
+    launched = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        request_batch_id=True,
+        job_type=JobType.PROV_LODGE,
+        jobs=[AdminLaunchJobBatchItem(
+            job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload) for _ in range(job_count)]
+    ))
+    assert launched.batch_id is not None, "Expected batch id when requested."
+    assert launched.failures is None, f"Expected no failures, got {launched.failures}."
+    assert len(set(launched.session_ids)) == job_count
+
+    # every job is published and recorded as pending in the batch
+    assert count_queue_messages(queue_url) == job_count
+    entries = admin_list_batch_all(batch_id=launched.batch_id, client=client)
+    assert set(e.session_id for e in entries) == set(launched.session_ids)
+    assert all(e.status == JobStatus.PENDING for e in entries)
+    assert all(e.username == username1 for e in entries)
+
+    # add to the existing batch
+    added = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        add_to_batch=launched.batch_id,
+        job_type=JobType.PROV_LODGE,
+        jobs=[AdminLaunchJobBatchItem(
+            job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload)]
+    ))
+    assert added.batch_id == launched.batch_id
+    entries = admin_list_batch_all(batch_id=launched.batch_id, client=client)
+    assert len(entries) == job_count + 1
+
+    # an invalid payload rejects the whole batch
+    response = admin_launch_batch(client=client, request=AdminLaunchJobBatchRequest(
+        job_type=JobType.PROV_LODGE,
+        jobs=[
+            AdminLaunchJobBatchItem(
+                job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload),
+            AdminLaunchJobBatchItem(
+                job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload={"invalid": True})
+        ]
+    ))
+    assert response.status_code == 400, f"Expected 400 for invalid payload, got {response.status_code}."
+    assert "index 1" in response.text
+    assert count_queue_messages(queue_url) == 1
+
+
+@mock_dynamodb
+@mock_sns
+@mock_sqs
+def test_admin_launch_batch_reservation_failure(provide_global_config: Config, monkeypatch: pytest.MonkeyPatch) -> None:
+    config = provide_global_config
+
+    # setup and checkout infra default table name
+    id = "default"
+    config = setup_checkout_infra(id=id, config=config)
+    config, queue_url = setup_topic_queue(config=config)
+
+    username1 = "user1"
+    checkout_user(username1)
+
+    def job_payload(version_id: str) -> Dict[str, Any]:
+        return py_to_dict(ProvLodgeVersionPayload(from_version_id=version_id, to_version_id="1234",
+                                                  version_activity_id="1234", linked_person_id="1234", item_subtype=ItemSubType.MODEL))
+
+    # the status entry of one job can't be written
+    reserve_status_entry = admin_service.dynamo.reserve_status_entry
+
+    def failing_reserve_status_entry(entry: JobStatusTable, **kwargs: Any) -> bool:
+        if entry.payload["from_version_id"] == "fail":
+            raise Exception("Throttled.")
+        return reserve_status_entry(entry=entry, **kwargs)
+    monkeypatch.setattr(admin_service.dynamo,
+                        "reserve_status_entry", failing_reserve_status_entry)
+
+    launched = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        job_type=JobType.PROV_LODGE,
+        jobs=[AdminLaunchJobBatchItem(job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload(version_id))
+              for version_id in ["1", "fail", "2"]]
+    ))
+
+    # the other jobs are still launched
+    assert launched.failures is not None and len(launched.failures) == 1
+    failure = launched.failures[0]
+    assert failure.index == 1
+    assert failure.session_id is None
+    assert "Throttled" in failure.error
+    assert len(set(launched.session_ids)) == 2
+    assert count_queue_messages(queue_url) == 2
+    for session_id in launched.session_ids:
+        assert admin_fetch_session_id_assert_correct(
+            client=client, session_id=session_id).status == JobStatus.PENDING
+
+
+def setup_priority_queues(config: Config) -> Tuple[Config, str, str]:
+    """
+
+    Creates a prov lodge SNS topic with an interactive and a bulk SQS queue,
+    routed by the priority message attribute, and checks out the topic in the
+    config.
+
+    Args:
+        config (Config): The existing config
+
+    Returns:
+        Tuple[Config, str, str]: The updated config, the interactive queue url and the bulk queue url
+    """
+    topic_arn = boto3.client('sns').create_topic(
+        Name="prov-lodge")['TopicArn']
+    sqs = boto3.client('sqs')
+    queue_urls: List[str] = []
+    for priority in [JobPriority.INTERACTIVE, JobPriority.BULK]:
+        queue_url = sqs.create_queue(
+            QueueName=f"prov-lodge-{priority.value.lower()}")['QueueUrl']
+        queue_arn = sqs.get_queue_attributes(
+            QueueUrl=queue_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+        boto3.client('sns').subscribe(
+            TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_arn,
+            Attributes={'FilterPolicy': json.dumps(
+                {JOB_PRIORITY_ATTRIBUTE: [priority.value]})}
+        )
+        queue_urls.append(queue_url)
+
+    config_dict = config.dict()
+    config_dict.update({'prov_lodge_topic_arn': topic_arn})
+    new_config = Config(**config_dict)
+    app.dependency_overrides[get_settings] = lambda: new_config
+    return new_config, queue_urls[0], queue_urls[1]
+
+
+@mock_dynamodb
+@mock_sns
+@mock_sqs
+def test_admin_launch_priority(provide_global_config: Config) -> None:
+    config = provide_global_config
+
+    # setup and checkout infra default table name
+    id = "default"
+    config = setup_checkout_infra(id=id, config=config)
+    config, interactive_url, bulk_url = setup_priority_queues(config=config)
+
+    username1 = "user1"
+    checkout_user(username1)
+
+    job_payload = py_to_dict(ProvLodgeVersionPayload(from_version_id="1234", to_version_id="1234",
+                                                     version_activity_id="1234", linked_person_id="1234", item_subtype=ItemSubType.MODEL))
+
+    # single launches are interactive by default
+    admin_launch_parsed(client=client, request=AdminLaunchJobRequest(
+        job_type=JobType.PROV_LODGE,
+        job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY,
+        job_payload=job_payload
+    ))
+    # but can be lodged as bulk
+    admin_launch_parsed(client=client, request=AdminLaunchJobRequest(
+        job_type=JobType.PROV_LODGE,
+        job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY,
+        job_payload=job_payload,
+        priority=JobPriority.BULK
+    ))
+    assert count_queue_messages(interactive_url) == 1
+    assert count_queue_messages(bulk_url) == 1
+
+    # batches are bulk by default
+    batch = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        request_batch_id=True,
+        job_type=JobType.PROV_LODGE,
+        jobs=[AdminLaunchJobBatchItem(
+            job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload) for _ in range(3)]
+    ))
+    batch_interactive = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        job_type=JobType.PROV_LODGE,
+        jobs=[AdminLaunchJobBatchItem(
+            job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload) for _ in range(2)],
+        priority=JobPriority.INTERACTIVE
+    ))
+    assert count_queue_messages(interactive_url) == 2
+    assert count_queue_messages(bulk_url) == 3
+
+    # the priority is recorded against the reserved batch entries
+    expected = {id: JobPriority.BULK for id in batch.session_ids}
+    expected.update(
+        {id: JobPriority.INTERACTIVE for id in batch_interactive.session_ids})
+    for session_id, priority in expected.items():
+        entry = admin_fetch_session_id_assert_correct(
+            client=client, session_id=session_id)
+        assert entry.priority == priority
+
+
+def move_status_later(table_name: str, entries: List[JobStatusTable], statuses: List[JobStatus], delay: float) -> threading.Thread:
+    # moves each entry through the statuses on a background thread while the
+    # stream is open
+    def move() -> None:
+        table = boto3.resource('dynamodb').Table(table_name)
+        for status in statuses:
+            time.sleep(delay)
+            for entry in entries:
+                write_status_entry(table=table, entry=JobStatusTable(
+                    **{**entry.dict(), 'status': status}))
+
+    thread = threading.Thread(target=move)
+    thread.start()
+    return thread
+
+
+def move_counters_later(table_name: str, counters: List[BatchCounterTable], delay: float) -> threading.Thread:
+    # writes each of the batch counter states on a background thread while
+    # the stream is open
+    def move() -> None:
+        table = boto3.resource('dynamodb').Table(table_name)
+        for state in counters:
+            time.sleep(delay)
+            table.put_item(Item=py_to_dict(state))
+
+    thread = threading.Thread(target=move)
+    thread.start()
+    return thread
+
+
+@mock_dynamodb
+def test_user_stream(provide_global_config: Config) -> None:
+    config = provide_global_config
+
+    # setup and checkout infra default table name
+    id = "default"
+    config = setup_checkout_infra(id=id, config=config)
+
+    # short poll and duration for testing
+    config_dict = config.dict()
+    config_dict.update({
+        'status_stream_poll_seconds': 0.05,
+        'status_stream_max_seconds': 5.0,
+    })
+    config = Config(**config_dict)
+    app.dependency_overrides[get_settings] = lambda: config
+    status_stream_dependency.status_poller = None
+
+    username1 = "user1"
+    username2 = "user2"
+    checkout_user(username1)
+
+    # must provide exactly one of session id or batch id
+    assert user_stream(client=client).status_code == 400
+
+    # single job - current state then each transition, ending once finished
+    entry = add_blank_entry(username=username1, config=config)
+    thread = move_status_later(table_name=config.status_table_name, entries=[entry], statuses=[
+                               JobStatus.DEQUEUED, JobStatus.IN_PROGRESS, JobStatus.SUCCEEDED], delay=0.3)
+    response = user_stream(client=client, session_id=entry.session_id)
+    thread.join()
+    assert response.status_code == 200, f"Expected 200 for stream, got {response.status_code}. Text: {response.text}"
+    assert response.headers['content-type'].startswith("text/event-stream")
+    events = parse_stream_events(response.text)
+    statuses = [JobStatusTable.parse_obj(data).status for event,
+                data in events if event == JobStatusStreamEventType.STATUS.value]
+    assert statuses == [JobStatus.PENDING, JobStatus.DEQUEUED,
+                        JobStatus.IN_PROGRESS, JobStatus.SUCCEEDED]
+    assert events[-1] == (JobStatusStreamEventType.END.value,
+                          {"complete": True})
+
+    # finished jobs end immediately
+    response = user_stream(client=client, session_id=entry.session_id)
+    events = parse_stream_events(response.text)
+    assert len(events) == 2
+    assert events[-1] == (JobStatusStreamEventType.END.value,
+                          {"complete": True})
+
+    # batch - the counts then each change, ending once every job has finished
+    batch_id = admin_service.generate_unique_batch_id(
+        table_name=config.status_table_name, batch_id_index_name=config.batch_id_index_name)
+    counters = BatchCounterTable(
+        batch_id=batch_id, username=username1, total=3, pending=3)
+    boto3.resource('dynamodb').Table(config.batch_table_name).put_item(
+        Item=py_to_dict(counters))
+    thread = move_counters_later(table_name=config.batch_table_name, counters=[
+        BatchCounterTable(batch_id=batch_id, username=username1,
+                          total=3, in_progress=3),
+        BatchCounterTable(batch_id=batch_id, username=username1,
+                          total=3, succeeded=2, failed=1),
+    ], delay=0.3)
+    response = user_stream(client=client, batch_id=batch_id)
+    thread.join()
+    assert response.status_code == 200, f"Expected 200 for stream, got {response.status_code}. Text: {response.text}"
+    events = parse_stream_events(response.text)
+    summaries = [BatchCounterTable.parse_obj(data) for event,
+                 data in events if event == JobStatusStreamEventType.SUMMARY.value]
+    assert [(s.pending, s.in_progress, s.succeeded, s.failed)
+            for s in summaries] == [(3, 0, 0, 0), (0, 3, 0, 0), (0, 0, 2, 1)]
+    assert events[-1] == (JobStatusStreamEventType.END.value,
+                          {"complete": True})
+
+    # batches without counters can't be streamed
+    legacy_entry = add_blank_entry(
+        username=username1, config=config, gen_batch=True)
+    assert legacy_entry.batch_id
+    assert user_stream(
+        client=client, batch_id=legacy_entry.batch_id).status_code == 400
+
+    # unfinished job times out and can be reopened
+    config_dict.update({'status_stream_max_seconds': 0.5})
+    short_config = Config(**config_dict)
+    app.dependency_overrides[get_settings] = lambda: short_config
+    pending = add_blank_entry(username=username1, config=config)
+    events = parse_stream_events(user_stream(
+        client=client, session_id=pending.session_id).text)
+    assert events[-1] == (JobStatusStreamEventType.END.value,
+                          {"complete": False})
+
+    # missing and other users items are rejected
+    assert user_stream(
+        client=client, session_id="missing").status_code == 400
+    checkout_user(username2)
+    assert user_stream(
+        client=client, session_id=pending.session_id).status_code == 401
+    assert user_stream(
+        client=client, batch_id=batch_id).status_code == 401
+
+
+def test_stream_subscribes_once_started() -> None:
+    from service.jobs.user import stream_job_status_events
+    from helpers.status_stream import StatusPoller, StatusSubscription
+    import asyncio
+
+    poller = StatusPoller(table_name="status",
+                          batch_table_name="batch", poll_seconds=60)
+    entry = JobStatusTable(
+        session_id="1234",
+        username="user1",
+        job_type=JobType.PROV_LODGE,
+        job_sub_type=JobSubType.PROV_LODGE_WAKE_UP,
+        created_timestamp=0,
+        status=JobStatus.PENDING,
+        payload={}
+    )
+
+    async def run() -> None:
+        subscription = StatusSubscription(session_id=entry.session_id)
+        events = stream_job_status_events(username=entry.username, initial=entry, subscription=subscription,
+                                          poller=poller, keepalive_seconds=60, max_seconds=60)
+        # a response which is never sent doesn't leave a subscription behind
+        assert poller.subscriptions == set()
+        await events.__anext__()
+        assert poller.subscriptions == {subscription}
+        await events.aclose()
+        assert poller.subscriptions == set()
+
+    asyncio.run(run())
+
+
+@mock_dynamodb
+@mock_sns
+@mock_sqs
+def test_user_batch_summary(provide_global_config: Config) -> None:
+    config = provide_global_config
+
+    # setup and checkout infra default table name
+    id = "default"
+    config = setup_checkout_infra(id=id, config=config)
+    config, _ = setup_topic_queue(config=config)
+
+    username1 = "user1"
+    username2 = "user2"
+    checkout_user(username1)
+
+    job_payload = py_to_dict(ProvLodgeVersionPayload(from_version_id="1234", to_version_id="1234",
+                                                     version_activity_id="1234", linked_person_id="1234", item_subtype=ItemSubType.MODEL))
+
+    def launch_items(count: int) -> List[AdminLaunchJobBatchItem]:
+        return [AdminLaunchJobBatchItem(job_sub_type=JobSubType.LODGE_VERSION_ACTIVITY, job_payload=job_payload) for _ in range(count)]
+
+    # more than one reservation transaction worth of jobs
+    job_count = 120
+    launched = admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        request_batch_id=True, job_type=JobType.PROV_LODGE, jobs=launch_items(job_count)))
+    assert launched.batch_id is not None
+
+    summary = user_batch_summary_parsed(
+        client=client, batch_id=launched.batch_id)
+    assert summary.username == username1
+    assert summary.total == job_count
+    assert summary.pending == job_count
+    assert summary.succeeded == summary.failed == summary.in_progress == 0
+
+    # counters follow jobs added to the batch
+    admin_launch_batch_parsed(client=client, request=AdminLaunchJobBatchRequest(
+        add_to_batch=launched.batch_id, job_type=JobType.PROV_LODGE, jobs=launch_items(2)))
+    summary = user_batch_summary_parsed(
+        client=client, batch_id=launched.batch_id)
+    assert summary.total == summary.pending == job_count + 2
+
+    # batches without counters are counted from their entries
+    entry = add_blank_entry(username=username1, config=config, gen_batch=True)
+    assert entry.batch_id
+    add_blank_entry(username=username1, config=config,
+                    batch_id=entry.batch_id)
+    summary = user_batch_summary_parsed(client=client, batch_id=entry.batch_id)
+    assert summary.total == summary.pending == 2
+
+    # missing batch
+    assert user_batch_summary(
+        client=client, batch_id="missing").status_code == 400
+
+    # other users batch
+    checkout_user(username2)
+    assert user_batch_summary(
+        client=client, batch_id=launched.batch_id).status_code == 401
@@ -3,7 +3,7 @@ from fastapi import HTTPException
 from ProvenaInterfaces.RegistryModels import *
 from ProvenaInterfaces.RegistryAPI import *
 from dependencies.dependencies import secret_cache, User
-from helpers.keycloak_helpers import get_service_token
+from helpers.keycloak_helpers import get_service_token_async
 from dependencies.dependencies import get_user_context_header
 from helpers.async_requests import async_get_request
 from config import Config
@@ -61,7 +61,7 @@ async def untyped_validate_by_id(
     # proxy mode
     if request_style.service_account is not None:
         # get service token
-        token = get_service_token(secret_cache, config)
+        token = await get_service_token_async(secret_cache, config)
 
         # service account - are we using it directly or proxying?
         if request_style.service_account.direct_service:
@@ -210,7 +210,7 @@ async def validate_by_id(
     # proxy mode
     if request_style.service_account is not None:
         # get service token
-        token = get_service_token(secret_cache, config)
+        token = await get_service_token_async(secret_cache, config)
 
         # service account - are we using it directly or proxying?
         if request_style.service_account.direct_service:
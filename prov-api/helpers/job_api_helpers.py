@@ -2,7 +2,7 @@ from ProvenaInterfaces.AsyncJobAPI import *
 from config import Config
 from helpers.util import py_to_dict
 import httpx
-from helpers.keycloak_helpers import get_service_token
+from helpers.keycloak_helpers import get_service_token_async
 from dependencies.dependencies import secret_cache
 from helpers.async_requests import async_post_request, async_get_request
 
@@ -26,7 +26,7 @@ async def launch_generic_job(payload: AdminLaunchJobRequest, config: Config) ->
     request = py_to_dict(payload)
 
     # Use client auth
-    token = get_service_token(secret_cache=secret_cache, config=config)
+    token = await get_service_token_async(secret_cache=secret_cache, config=config)
 
     try:
         response = await async_post_request(
@@ -51,6 +51,50 @@ async def launch_generic_job(payload: AdminLaunchJobRequest, config: Config) ->
     return parsed
 
 
+async def launch_generic_job_batch(payload: AdminLaunchJobBatchRequest, config: Config) -> AdminLaunchJobBatchResponse:
+    """
+
+    Lodges the specified batch of job payloads using the job API in a single
+    request, returns the session IDs to monitor results
+
+    Args:
+        payload (AdminLaunchJobBatchRequest): The batch of jobs (at most MAX_LAUNCH_BATCH_SIZE)
+
+    Returns:
+        AdminLaunchJobBatchResponse: The session ids, batch id and any failures
+    """
+    base = config.job_api_endpoint
+    postfix = "/jobs/admin/launch_batch"
+    endpoint = base + postfix
+
+    request = py_to_dict(payload)
+
+    # Use client auth
+    token = await get_service_token_async(secret_cache=secret_cache, config=config)
+
+    try:
+        response = await async_post_request(
+            endpoint=endpoint,
+            params={},
+            token=token,
+            json_body=request
+        )
+    except Exception as e:
+        raise Exception(f"Failed to launch jobs using Job API, error: {e}.")
+
+    if response.status_code != 200:
+        raise Exception(
+            f"Non 200 status code ({response.status_code}) from Job API. Body: {response.text}.")
+    try:
+        parsed = AdminLaunchJobBatchResponse.parse_obj(response.json())
+    except Exception as e:
+        raise Exception(
+            f"Failed to parse launch job batch response despite 200OK code. Error: {e}."
+        )
+
+    return parsed
+
+
 async def submit_model_run_lodge_job(username: str, payload: ProvLodgeModelRunPayload, config: Config) -> str:
     """
     Lodges the specified job payload using the job API, returns the session ID
@@ -181,7 +225,7 @@ async def fetch_job_by_id_admin(session_id: str, config: Config) -> Optional[Job
     params = {"session_id": session_id}
 
     # Use client auth
-    token = get_service_token(secret_cache=secret_cache, config=config)
+    token = await get_service_token_async(secret_cache=secret_cache, config=config)
 
     try:
         response = await async_get_request(
@@ -35,6 +35,7 @@ from neo4j import GraphDatabase, Record, graph, basic_auth  # type: ignore
 from config import Config
 from typing import Optional, List, Any, Dict, Tuple, Callable
 import networkx  # type: ignore
+import threading
 from dependencies.dependencies import secret_cache
 from helpers.keycloak_helpers import retrieve_secret_value
 
@@ -44,6 +45,11 @@ IDENTIFIER_TAG = "id"
 # GraphDatabase.driver alias - doesn't like this type
 GraphDriver = Any
 
+# Drivers hold a connection pool and are thread safe so are shared across the
+# process - keyed by the connection uri and credentials
+graph_drivers: Dict[Tuple[str, str, str], GraphDriver] = {}
+graph_drivers_lock = threading.Lock()
+
 
 def produce_attribute_set(
     item_category: ItemCategory,
@@ -131,12 +137,35 @@ def connect_to_neo4j(config: Config) -> GraphDriver:
     )
 
 
+def get_graph_driver(config: Config) -> GraphDriver:
+    """
+    Returns the process wide Neo4j driver for the configured database,
+    connecting on first use. The driver is reused by every query and graph
+    manager rather than reconnecting each time.
+
+    Args:
+        config (Config): Configuration object containing Neo4j connection
+        details.
+
+    Returns:
+        GraphDatabase.driver: The shared Neo4j graph database driver object.
+    """
+    user, password = get_credentials(config)
+    key = (f"bolt://{config.neo4j_host}:{config.neo4j_port}", user, password)
+    with graph_drivers_lock:
+        driver = graph_drivers.get(key)
+        if driver is None:
+            driver = connect_to_neo4j(config)
+            graph_drivers[key] = driver
+        return driver
+
+
 def run_query(query: str, config: Config, driver: Optional[GraphDriver] = None) -> List[Record]:
     """
     Executes a Cypher query against the Neo4j database and returns the results.
 
-    This function creates a new driver connection if one is not provided,
-    executes the query, and closes the connection afterward.
+    This function uses the shared driver (see get_graph_driver) if one is not
+    provided.
 
     Args:
         query (str): The Cypher query to execute.
@@ -153,8 +182,7 @@ def run_query(query: str, config: Config, driver: Optional[GraphDriver] = None)
     if config.mock_graph_db:
         raise RuntimeError(
             "Asking for real data from graph DB during mock! Returning [].")
-    # Create driver
-    driver = connect_to_neo4j(config)
+    driver = driver or get_graph_driver(config)
     # open session
     with driver.session() as session:
         # make query
@@ -162,8 +190,6 @@ def run_query(query: str, config: Config, driver: Optional[GraphDriver] = None)
         # get all results using iterator for result
         # which provides records
         records: List[Record] = [r for r in result]
-    # close the driver since we are finished with it
-    driver.close()
     return records
 
 
@@ -1171,15 +1197,15 @@ class Neo4jGraphManager():
     def __init__(self, config: Config) -> None:
         """
 
-        Construct the driver and store config
+        Fetch the shared driver and store config
 
         Parameters
         ----------
         config : Config
             Config
         """
-        # Create driver
-        self.driver = connect_to_neo4j(config)
+        # Shared across managers - see get_graph_driver
+        self.driver = get_graph_driver(config)
         self._config = config
 
     def merge_add_graph_to_db(self, graph: NodeGraph) -> None:
@@ -1,7 +1,7 @@
 from ProvenaInterfaces.RegistryAPI import *
 from helpers.async_requests import *
 from config import Config
-from helpers.keycloak_helpers import get_service_token
+from helpers.keycloak_helpers import get_service_token_async
 from dependencies.dependencies import secret_cache, get_user_context_header
 from fastapi import HTTPException, Depends
 import json
@@ -46,7 +46,7 @@ async def seed_model_run(user_cipher: str, config: Config) -> SeededItem:
     endpoint = config.registry_api_endpoint + \
         '/registry/activity/model_run/proxy/seed'
     print("Getting service token")
-    token = get_service_token(secret_cache, config)
+    token = await get_service_token_async(secret_cache, config)
     print("Got service token")
 
     # make request
@@ -158,7 +158,7 @@ async def update_model_run_in_registry(
     if reason:
         params['reason'] = reason
 
-    token = get_service_token(secret_cache, config)
+    token = await get_service_token_async(secret_cache, config)
     json_body = json.loads(model_run_domain_info.json(exclude_none=True))
 
     # make request
@@ -283,7 +283,7 @@ async def fetch_item_from_registry_with_subtype(
     }
 
     # Fetch the actual thing and return it.
-    token = get_service_token(secret_cache, config)
+    token = await get_service_token_async(secret_cache, config)
 
     # make request
     response = await async_get_request(
@@ -1,7 +1,7 @@
 from EcsSqsPythonTools.JobRunner import ecs_job_worker
 from EcsSqsPythonTools.Settings import JobBaseSettings
 from EcsSqsPythonTools.Types import CallbackResponse
-from jobs.prov_jobs import job_dispatcher
+from jobs.prov_jobs import job_dispatcher, initialise_job_resources
 from ProvenaInterfaces.AsyncJobModels import *
 
 
@@ -14,5 +14,6 @@ def worker_callback(payload: JobSnsPayload, settings: JobBaseSettings) -> Callba
 
 def run() -> None:
     print("Launched.")
-    ecs_job_worker(worker_callback=worker_callback)
+    ecs_job_worker(worker_callback=worker_callback,
+                   initialise=initialise_job_resources)
     print("Complete.")
@@ -7,12 +7,14 @@ from helpers.workflows import register_and_lodge_provenance, lodge_provenance, u
 from helpers.entity_validators import RequestStyle, UserCipherProxy, ServiceAccountProxy
 from helpers.validate_model_run_record import validate_model_run_record
 from helpers.prov_helpers import create_to_graph, version_to_graph
-from helpers.job_api_helpers import launch_generic_job
-from helpers.prov_connector import Neo4jGraphManager
+from helpers.job_api_helpers import launch_generic_job_batch
+from helpers.prov_connector import Neo4jGraphManager, get_graph_driver
+from helpers.keycloak_helpers import retrieve_secret_value
+from dependencies.dependencies import secret_cache
 from helpers.generate_report_helpers import generate_report_helper, remove_file
 from helpers.s3_helpers import upload_file_to_s3, generate_presigned_url_for_report
 from ProvenaInterfaces.AsyncJobAPI import *
-from config import Config
+from config import get_settings
 from typing import cast
 import asyncio
 import os
@@ -44,6 +46,29 @@ def generate_failed_job(error: str) -> CallbackResponse:
     )
 
 
+def initialise_job_resources(settings: JobBaseSettings) -> None:
+    """
+    Sets up the resources reused by every job run by this worker process - the
+    parsed config (see get_settings), the secrets held in the secret cache and
+    the graph database driver - so that they are not built per job.
+
+    Parameters
+    ----------
+    settings : JobBaseSettings
+        The job settings
+    """
+    print("Parsing full API config from environment.")
+    config = get_settings()
+
+    print("Populating secret cache.")
+    retrieve_secret_value(
+        secret_arn=config.service_account_secret_arn, secret_cache=secret_cache)
+
+    if not config.mock_graph_db:
+        print("Connecting to graph database.")
+        get_graph_driver(config)
+
+
 def wake_up_handler(payload: JobSnsPayload, settings: JobBaseSettings) -> CallbackResponse:
     """
     Do nothing - wake up the job
@@ -95,7 +120,7 @@ def model_run_lodge_only_handler(payload: JobSnsPayload, settings: JobBaseSettin
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -192,7 +217,7 @@ def model_run_update_handler(payload: JobSnsPayload, settings: JobBaseSettings)
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -292,7 +317,7 @@ def model_run_update_lodge_only_handler(payload: JobSnsPayload, settings: JobBas
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -389,7 +414,7 @@ def model_run_lodge_handler(payload: JobSnsPayload, settings: JobBaseSettings) -
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -492,7 +517,7 @@ def creation_lodge_handler(payload: JobSnsPayload, settings: JobBaseSettings) ->
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -577,7 +602,7 @@ def model_run_batch_submit_handler(payload: JobSnsPayload, settings: JobBaseSett
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -597,31 +622,44 @@ def model_run_batch_submit_handler(payload: JobSnsPayload, settings: JobBaseSett
 
     print(f"Parsed specific payload: {batch_submit_payload}")
 
-    # Spinoff new jobs, noting the first gets a batch id, the rest reference it
-    first = True
-    batch_id: Optional[str] = None
-    for record in batch_submit_payload.records:
-        launch_payload = AdminLaunchJobRequest(
-            username=payload.username,
-            job_type=JobType.PROV_LODGE,
+    # Spinoff new jobs in chunks, noting the first chunk gets a batch id, the
+    # rest reference it
+    jobs = [
+        AdminLaunchJobBatchItem(
             job_sub_type=JobSubType.MODEL_RUN_PROV_LODGE,
             job_payload=py_to_dict(ProvLodgeModelRunPayload(
                 record=record,
                 revalidate=True,
                 # pass through encrypted payload for user info
                 user_info=batch_submit_payload.user_info
-            )),
-            request_batch_id=first,
+            ))
+        ) for record in batch_submit_payload.records
+    ]
+
+    batch_id: Optional[str] = None
+    failures: List[str] = []
+    for start in range(0, len(jobs), MAX_LAUNCH_BATCH_SIZE):
+        launch_payload = AdminLaunchJobBatchRequest(
+            username=payload.username,
+            job_type=JobType.PROV_LODGE,
+            jobs=jobs[start:start + MAX_LAUNCH_BATCH_SIZE],
+            request_batch_id=batch_id is None,
             add_to_batch=batch_id
         )
 
-        response = asyncio.run(launch_generic_job(
-            payload=launch_payload,
-            config=config
-        ))
+        try:
+            response = asyncio.run(launch_generic_job_batch(
+                payload=launch_payload,
+                config=config
+            ))
+        except Exception as e:
+            return CallbackResponse(
+                status=JobStatus.FAILED,
+                info=f"Failed to launch batch jobs (from record {start}). Error: {e}."
+            )
 
         # update batch id
-        if first:
+        if batch_id is None:
             batch_id = response.batch_id
 
             if batch_id is None:
@@ -631,8 +669,20 @@ def model_run_batch_submit_handler(payload: JobSnsPayload, settings: JobBaseSett
                     info=f"An error occurred: {err}"
                 )
 
-            # batch ID all good
-            first = False
+        for failure in response.failures or []:
+            failures.append(
+                f"Record {start + failure.index}: {failure.error}")
+
+    if len(failures) > 0:
+        return CallbackResponse(
+            status=JobStatus.FAILED,
+            info=f"Failed to distribute {len(failures)} of {len(jobs)} batch jobs to queue. Errors: {'; '.join(failures)}",
+            result=py_to_dict(
+                ProvLodgeBatchSubmitResult(
+                    batch_id=batch_id
+                )
+            ) if batch_id else None
+        )
 
     assert batch_id
     return CallbackResponse(
@@ -668,7 +718,7 @@ def version_lodge_handler(payload: JobSnsPayload, settings: JobBaseSettings) ->
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -743,7 +793,7 @@ def generate_report_handler(payload: JobSnsPayload, settings: JobBaseSettings) -
  
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -430,7 +430,7 @@ def generate_model_run_record(postfix: str, input_override: Optional[str] = None
     )
 
 
-def mocked_get_service_token(secret_cache: Any, config: Config) -> str:
+async def mocked_get_service_token_async(secret_cache: Any, config: Config) -> str:
     return "faketoken"
 
 
@@ -465,13 +465,13 @@ def test_upload_model_run(client: TestClient, service_config: Config, monkeypatc
     # mock the get service token function
     monkeypatch.setattr(
         registry_helpers,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
     monkeypatch.setattr(
         entity_validators,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
 
     # mock seed
@@ -734,13 +734,13 @@ def test_lineage_upstream(client: TestClient, service_config: Config, monkeypatc
     # mock the get service token function
     monkeypatch.setattr(
         registry_helpers,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
     monkeypatch.setattr(
         entity_validators,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
 
     # mock update of model run
@@ -1025,13 +1025,13 @@ def test_lineage_downstream(client: TestClient, service_config: Config, monkeypa
     # mock the get service token function
     monkeypatch.setattr(
         registry_helpers,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
     monkeypatch.setattr(
         entity_validators,
-        'get_service_token',
-        mocked_get_service_token
+        'get_service_token_async',
+        mocked_get_service_token_async
     )
 
     # mock update of model run
@@ -0,0 +1,33 @@
+from typing import Any, Dict, List, Set
+from config import get_settings
+from helpers.access_projection_helpers import reproject_item
+
+"""
+Lambda entry point (deployed from the registry API image) which maintains the
+access projection from the DynamoDB streams of the registry and auth tables.
+
+Both tables are keyed by id, so each record just reprojects the item from the
+current table contents - this is idempotent, so batches can be retried and
+records can be processed in any order.
+"""
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    config = get_settings()
+
+    failures: List[Dict[str, str]] = []
+    processed: Set[str] = set()
+    for record in event.get('Records', []):
+        sequence_number = record['dynamodb']['SequenceNumber']
+        try:
+            id = record['dynamodb']['Keys']['id']['S']
+            # several changes to the same item need only one reprojection
+            if id not in processed:
+                reproject_item(id=id, config=config)
+                processed.add(id)
+        except Exception as e:
+            print(f"Failed to reproject record {sequence_number}. Error: {e}.")
+            failures.append({'itemIdentifier': sequence_number})
+
+    # report partial batch failures so only these records are retried
+    return {'batchItemFailures': failures}
@@ -79,6 +79,11 @@ class Config(BaseConfig):
     # Dynamo DB table name where reg items lock information is persisted
     lock_table_name: str
 
+    # Dynamo DB table name of the per principal access projection (maintained
+    # from the registry/auth table streams) - if provided, general listing
+    # queries the items visible to the user directly
+    access_projection_table_name: Optional[str] = None
+
     # Auth api endpoint
     auth_api_endpoint: str
 
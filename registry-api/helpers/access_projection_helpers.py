@@ -0,0 +1,551 @@
+from ProvenaInterfaces.RegistryAPI import *
+from ProvenaInterfaces.RegistryModels import *
+from KeycloakFastAPI.Dependencies import User
+from fastapi import HTTPException
+from boto3.dynamodb.conditions import Key  # type: ignore
+from collections import deque
+from config import Config
+from helpers.dynamo_helpers import (
+    batch_get_entries,
+    get_table_from_name,
+    generate_index_name,
+    filter_to_filter_expression,
+    filter_options_to_filter_type,
+    remove_universal_key_attribute_from_item,
+    remove_none_values,
+    subtype_key,
+    updated_timestamp_key,
+    created_timestamp_key,
+    display_name_key,
+    SORT_TYPE_TO_KEY_MAP,
+)
+from helpers.auth_helpers import FETCH_ACTION_ACCEPTED_ROLES, evaluate_user_access, determine_user_access
+from typing import Deque, Tuple
+
+"""
+The access projection table materialises, for each registry item, one row per
+principal which can see (fetch) it:
+
+- user#<username> for the owner
+- group#<group id> for each group granted a fetch role
+- general if the general access settings grant a fetch role
+
+Rows are keyed by (principal, id) and carry the attributes the general list
+sorts/filters on, so "items visible to me" is a query per principal the user
+holds, merged in sort order. The table is maintained from the registry and
+auth table streams (see access_projection_streamer.py).
+"""
+
+# projection table keys/attributes
+principal_key = "principal"
+principal_subtype_key = "principal_subtype"
+id_key = "id"
+
+GENERAL_PRINCIPAL = "general"
+USER_PRINCIPAL_PREFIX = "user#"
+GROUP_PRINCIPAL_PREFIX = "group#"
+
+# item attributes copied into each projection row
+PROJECTED_ATTRIBUTES: List[str] = [
+    subtype_key,
+    updated_timestamp_key,
+    created_timestamp_key,
+    display_name_key,
+    "record_type",
+    "release_status",
+]
+
+# sort keys with (principal, sort key) and (principal_subtype, sort key) GSIs
+PROJECTION_SORT_KEYS: List[str] = [
+    updated_timestamp_key,
+    created_timestamp_key,
+    display_name_key,
+]
+
+# KEYS_ONLY GSI used to find all rows for an item
+PROJECTION_ID_INDEX = f"{id_key}-index"
+
+# the list sort types the projection can serve
+PROJECTION_SORT_TYPES: List[Optional[SortType]] = [
+    None,
+    SortType.UPDATED_TIME,
+    SortType.CREATED_TIME,
+    SortType.DISPLAY_NAME,
+]
+
+# lower bound on the rows read per partition query - small pages over several
+# principals would otherwise take many round trips
+PROJECTION_MIN_QUERY_LIMIT = 25
+
+# marks a projection pagination key (vs a registry table LastEvaluatedKey)
+PROJECTION_CURSORS_FIELD = "projection_cursors"
+PROJECTION_BOUNDARY_FIELD = "projection_boundary"
+
+
+def user_principal(username: str) -> str:
+    return USER_PRINCIPAL_PREFIX + username
+
+
+def group_principal(group_id: str) -> str:
+    return GROUP_PRINCIPAL_PREFIX + group_id
+
+
+def access_principals(access_settings: AccessSettings) -> Set[str]:
+    """
+    The principals which can fetch an item with the given access settings.
+
+    Parameters
+    ----------
+    access_settings : AccessSettings
+        The item's access settings
+
+    Returns
+    -------
+    Set[str]
+        The principals
+    """
+    # the owner can always see the item
+    principals = {user_principal(access_settings.owner)}
+
+    if evaluate_user_access(user_roles=access_settings.general, acceptable_roles=FETCH_ACTION_ACCEPTED_ROLES):
+        principals.add(GENERAL_PRINCIPAL)
+
+    for group_id, roles in access_settings.groups.items():
+        if evaluate_user_access(user_roles=roles, acceptable_roles=FETCH_ACTION_ACCEPTED_ROLES):
+            principals.add(group_principal(group_id))
+
+    return principals
+
+
+def user_principals(username: str, user_group_ids: Set[str]) -> List[str]:
+    """
+    The principals a user holds - their own, general and one per group.
+    """
+    return [user_principal(username), GENERAL_PRINCIPAL] + \
+        [group_principal(group_id) for group_id in sorted(user_group_ids)]
+
+
+def projection_rows(item: Dict[str, Any], principals: Set[str]) -> List[Dict[str, Any]]:
+    """
+    Builds the projection rows for the registry item - one per principal.
+    """
+    attributes = {
+        attribute: item[attribute] for attribute in PROJECTED_ATTRIBUTES if item.get(attribute) is not None
+    }
+    subtype = item.get(subtype_key)
+    rows: List[Dict[str, Any]] = []
+    for principal in sorted(principals):
+        row = {
+            principal_key: principal,
+            id_key: item[id_key],
+            **attributes
+        }
+        if subtype is not None:
+            row[principal_subtype_key] = f"{principal}#{subtype}"
+        rows.append(row)
+    return rows
+
+
+def get_access_projection_table(config: Config) -> Any:
+    if config.access_projection_table_name is None:
+        raise HTTPException(
+            status_code=500,
+            detail="The access projection table is not configured."
+        )
+    return get_table_from_name(table_name=config.access_projection_table_name)
+
+
+def get_entry_consistent(table: Any, id: str) -> Optional[Dict[str, Any]]:
+    # strongly consistent so that stream processing sees the write which
+    # triggered it
+    response = table.get_item(Key={id_key: id}, ConsistentRead=True)
+    return response.get('Item')
+
+
+def reproject_item(id: str, config: Config) -> None:
+    """
+    reproject_item
+
+    Brings the access projection rows for the item in line with its current
+    registry and auth entries - rows for principals which have lost access (or
+    for deleted items) are removed and the remaining rows rewritten with the
+    item's current attributes.
+
+    Idempotent, and doesn't depend on the order the registry/auth entries were
+    written in, so can be run for any change to either table.
+
+    Parameters
+    ----------
+    id : str
+        The item id
+    config : Config
+        The API config
+    """
+    projection_table = get_access_projection_table(config=config)
+
+    item = get_entry_consistent(
+        table=get_table_from_name(config.registry_table_name), id=id)
+    auth_entry = get_entry_consistent(
+        table=get_table_from_name(config.auth_table_name), id=id)
+
+    desired: List[Dict[str, Any]] = []
+    if item is not None and auth_entry is not None:
+        access_settings = AuthTableEntry.parse_obj(auth_entry).access_settings
+        desired = projection_rows(
+            item=item, principals=access_principals(access_settings))
+    desired_principals = set(row[principal_key] for row in desired)
+
+    # find the existing rows
+    existing_principals: Set[str] = set()
+    query_params: Dict[str, Any] = {
+        'IndexName': PROJECTION_ID_INDEX,
+        'KeyConditionExpression': Key(id_key).eq(id)
+    }
+    while True:
+        response = projection_table.query(**query_params)
+        existing_principals.update(row[principal_key]
+                                   for row in response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            break
+        query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    with projection_table.batch_writer() as batch:
+        for principal in existing_principals - desired_principals:
+            batch.delete_item(Key={principal_key: principal, id_key: id})
+        for row in desired:
+            batch.put_item(Item=row)
+
+
+# rebuild cursor fields - the table being scanned and its scan position
+REBUILD_PHASE_FIELD = "phase"
+REBUILD_KEY_FIELD = "key"
+# the auth table is scanned first, then the projection (for rows of items
+# which no longer have an auth entry)
+AUTH_REBUILD_PHASE = "auth"
+PROJECTION_REBUILD_PHASE = "projection"
+
+
+def rebuild_access_projection_page(config: Config, page_size: int, pagination_key: Optional[PaginationKey]) -> Tuple[int, Optional[PaginationKey]]:
+    """
+    rebuild_access_projection_page
+
+    Reprojects the items from one page of the rebuild scan (see
+    rebuild_access_projection) - every item with an auth entry, then every item
+    which has rows in the projection but no auth entry.
+
+    Parameters
+    ----------
+    config : Config
+        The API config
+    page_size : int
+        The number of entries to scan
+    pagination_key : Optional[PaginationKey]
+        The cursor returned by the previous page, None to start
+
+    Returns
+    -------
+    Tuple[int, Optional[PaginationKey]]
+        The number of items reprojected and the cursor for the next page -
+        None once the rebuild is complete
+
+    Raises
+    ------
+    HTTPException
+        400 if the pagination key is invalid
+    """
+    auth_table = get_table_from_name(config.auth_table_name)
+    phase: Optional[str] = AUTH_REBUILD_PHASE
+    start_key: Optional[Dict[str, Any]] = None
+    if pagination_key is not None:
+        phase = pagination_key.get(REBUILD_PHASE_FIELD)
+        start_key = pagination_key.get(REBUILD_KEY_FIELD)
+        if phase not in [AUTH_REBUILD_PHASE, PROJECTION_REBUILD_PHASE] or not (start_key is None or isinstance(start_key, dict)):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid access projection rebuild pagination key."
+            )
+
+    table = auth_table if phase == AUTH_REBUILD_PHASE else get_access_projection_table(
+        config=config)
+    scan_params: Dict[str, Any] = {
+        'ProjectionExpression': '#id',
+        'ExpressionAttributeNames': {'#id': id_key},
+        'Limit': page_size
+    }
+    if start_key is not None:
+        scan_params['ExclusiveStartKey'] = start_key
+    response = table.scan(**scan_params)
+    # an item has a projection row per principal
+    ids = list(dict.fromkeys(row[id_key] for row in response['Items']))
+    if phase == PROJECTION_REBUILD_PHASE:
+        # items with an auth entry were reprojected in the auth phase
+        ids = [id for id in ids if get_entry_consistent(
+            table=auth_table, id=id) is None]
+
+    for id in ids:
+        reproject_item(id=id, config=config)
+
+    next_key = response.get('LastEvaluatedKey')
+    if next_key is not None:
+        return len(ids), {REBUILD_PHASE_FIELD: phase, REBUILD_KEY_FIELD: next_key}
+    if phase == AUTH_REBUILD_PHASE:
+        return len(ids), {REBUILD_PHASE_FIELD: PROJECTION_REBUILD_PHASE, REBUILD_KEY_FIELD: None}
+    return len(ids), None
+
+
+def rebuild_access_projection(config: Config, page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """
+    rebuild_access_projection
+
+    Reprojects every item in the auth table, and every item with rows in the
+    projection. Used to populate the projection for existing items, or repair
+    it (e.g. after a restore).
+
+    Runs every page of the rebuild in turn - the admin API serves one page per
+    request (see rebuild_access_projection_page).
+
+    Parameters
+    ----------
+    config : Config
+        The API config
+    page_size : int
+        The number of entries to scan per page
+
+    Returns
+    -------
+    int
+        The number of items reprojected
+    """
+    count = 0
+    pagination_key: Optional[PaginationKey] = None
+    while True:
+        reprojected, pagination_key = rebuild_access_projection_page(
+            config=config, page_size=page_size, pagination_key=pagination_key)
+        count += reprojected
+        if pagination_key is None:
+            return count
+
+
+def projection_supports_query(sort_by: Optional[SortOptions], filter_by: Optional[FilterOptions], pagination_key: Optional[PaginationKey]) -> bool:
+    """
+    Can the general list query be served from the access projection?
+    """
+    # pagination keys must be used with the path which produced them
+    if pagination_key is not None and PROJECTION_CURSORS_FIELD not in pagination_key:
+        return False
+    if sort_by is not None and (sort_by.sort_type not in PROJECTION_SORT_TYPES or sort_by.begins_with is not None):
+        return False
+    if filter_by is not None and filter_options_to_filter_type(filter_by) not in [None, FilterType.ITEM_SUBTYPE]:
+        return False
+    return True
+
+
+class ProjectionPartition():
+    """
+    Pages through the items visible to one principal, in index order, fetching
+    as rows are consumed.
+    """
+
+    def __init__(self, table: Any, query_params: Dict[str, Any], key_attributes: List[str], start_key: Optional[Dict[str, Any]], page_size: int):
+        self.table = table
+        self.query_params = query_params
+        self.key_attributes = key_attributes
+        self.start_key = start_key
+        self.page_size = page_size
+
+        self.buffer: Deque[Dict[str, Any]] = deque()
+        self.next_key = start_key
+        self.exhausted = False
+        self.last_consumed: Optional[Dict[str, Any]] = None
+
+    def head(self) -> Optional[Dict[str, Any]]:
+        while not self.buffer and not self.exhausted:
+            params = dict(self.query_params)
+            params['Limit'] = self.page_size
+            if self.next_key is not None:
+                params['ExclusiveStartKey'] = self.next_key
+            response = self.table.query(**params)
+            self.buffer.extend(response['Items'])
+            self.next_key = response.get('LastEvaluatedKey')
+            self.exhausted = self.next_key is None
+        return self.buffer[0] if self.buffer else None
+
+    def pop(self) -> Dict[str, Any]:
+        row = self.buffer.popleft()
+        self.last_consumed = row
+        return row
+
+    @property
+    def done(self) -> bool:
+        return self.exhausted and not self.buffer
+
+    def cursor(self) -> Optional[Dict[str, Any]]:
+        # resume after the last consumed row
+        if self.last_consumed is None:
+            return self.start_key
+        return {attribute: self.last_consumed[attribute] for attribute in self.key_attributes}
+
+
+def list_visible_items_paginated(
+    config: Config,
+    user: User,
+    user_group_ids: Set[str],
+    sort_by: Optional[SortOptions],
+    filter_by: Optional[FilterOptions],
+    pagination_key: Optional[PaginationKey],
+    page_size: int,
+) -> Tuple[List[Dict[str, Any]], Optional[PaginationKey]]:
+    """
+    list_visible_items_paginated
+
+    Lists the registry items visible to the user from the access projection
+    (see projection_supports_query) - the user's principals are each queried
+    in index order and merged, so each page only reads rows the user can see.
+
+    The page's items are then fetched from the registry and their access is
+    confirmed against the auth table, so a lagging projection can't expose
+    items.
+
+    Parameters
+    ----------
+    config : Config
+        The API config
+    user : User
+        The user
+    user_group_ids : Set[str]
+        The user's groups
+    sort_by : Optional[SortOptions]
+        Sort options
+    filter_by : Optional[FilterOptions]
+        Filter options
+    pagination_key : Optional[PaginationKey]
+        Key returned by the previous page, if any
+    page_size : int
+        The page size
+
+    Returns
+    -------
+    Tuple[List[Dict[str, Any]], Optional[PaginationKey]]
+        The items and the pagination key for the next page (None if there are
+        no more)
+    """
+    table = get_access_projection_table(config=config)
+
+    sort_type = sort_by.sort_type if sort_by else None
+    sort_attribute = SORT_TYPE_TO_KEY_MAP[sort_type]
+    ascending = sort_by.ascending if sort_by else DEFAULT_SORTING_ASCENDING
+    subtype = filter_by.item_subtype if filter_by else None
+    partition_attribute = principal_subtype_key if subtype else principal_key
+
+    try:
+        filter_expression = filter_to_filter_expression(filter_by)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to generate query parameters. Error: {ve}"
+        )
+
+    cursors: Optional[Dict[str, Any]] = None
+    boundary: Optional[Dict[str, Any]] = None
+    if pagination_key is not None:
+        cursors = pagination_key[PROJECTION_CURSORS_FIELD]
+        boundary = pagination_key.get(PROJECTION_BOUNDARY_FIELD)
+
+    partitions: List[Tuple[str, ProjectionPartition]] = []
+    for principal in user_principals(username=user.username, user_group_ids=user_group_ids):
+        # principals missing from the cursors have been exhausted
+        if cursors is not None and principal not in cursors:
+            continue
+        partition_value = f"{principal}#{subtype.value}" if subtype else principal
+        partitions.append((principal, ProjectionPartition(
+            table=table,
+            query_params=remove_none_values({
+                'IndexName': generate_index_name(partition_key=partition_attribute, sort_key=sort_attribute),
+                'KeyConditionExpression': Key(partition_attribute).eq(partition_value),
+                'ScanIndexForward': ascending,
+                'FilterExpression': filter_expression,
+            }),
+            key_attributes=list(dict.fromkeys(
+                [principal_key, id_key, partition_attribute, sort_attribute])),
+            start_key=cursors.get(principal) if cursors else None,
+            page_size=max(page_size, PROJECTION_MIN_QUERY_LIMIT)
+        )))
+
+    # items at the previous page's boundary sort value which were already
+    # returned (an item visible through several principals appears in each)
+    boundary_value = boundary['value'] if boundary else None
+    boundary_ids = set(boundary['ids']) if boundary else set()
+
+    # merge the partitions in sort order
+    ids: List[str] = []
+    id_values: Dict[str, Any] = {}
+    try:
+        while len(ids) < page_size:
+            best: Optional[ProjectionPartition] = None
+            best_value: Any = None
+            for _, partition in partitions:
+                row = partition.head()
+                if row is None:
+                    continue
+                value = row[sort_attribute]
+                if best is None or (value < best_value if ascending else value > best_value):
+                    best = partition
+                    best_value = value
+            if best is None:
+                break
+
+            row = best.pop()
+            id = row[id_key]
+            if id in id_values or (best_value == boundary_value and id in boundary_ids):
+                continue
+            ids.append(id)
+            id_values[id] = best_value
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=(f"Failed to query the access projection. Error: {e}")
+        )
+
+    # next page
+    next_key: Optional[PaginationKey] = None
+    remaining = [(principal, partition)
+                 for principal, partition in partitions if not partition.done]
+    if remaining:
+        next_boundary: Optional[Dict[str, Any]] = boundary
+        if ids:
+            last_value = id_values[ids[-1]]
+            at_boundary = [id for id in ids if id_values[id] == last_value]
+            if boundary is not None and boundary_value == last_value:
+                at_boundary = list(boundary_ids) + at_boundary
+            next_boundary = {'value': last_value, 'ids': at_boundary}
+        next_key = {
+            PROJECTION_CURSORS_FIELD: {principal: partition.cursor() for principal, partition in remaining},
+            PROJECTION_BOUNDARY_FIELD: next_boundary,
+        }
+
+    if not ids:
+        return [], next_key
+
+    # fetch the items and confirm access
+    items = batch_get_entries(ids=ids, table_name=config.registry_table_name)
+    auth_entries = batch_get_entries(
+        ids=ids, table_name=config.auth_table_name)
+
+    visible: List[Dict[str, Any]] = []
+    for id in ids:
+        item = items.get(id)
+        auth_entry = auth_entries.get(id)
+        if item is None or auth_entry is None:
+            continue
+        access_settings = AuthTableEntry.parse_obj(auth_entry).access_settings
+        if access_settings.owner != user.username and not evaluate_user_access(
+            user_roles=determine_user_access(
+                access_settings=access_settings, user_group_ids=user_group_ids),
+            acceptable_roles=FETCH_ACTION_ACCEPTED_ROLES
+        ):
+            continue
+        visible.append(remove_universal_key_attribute_from_item(item))
+
+    return visible, next_key
@@ -8,6 +8,7 @@ from helpers.handle_helpers import *
 from helpers.custom_exceptions import SeedItemError, ItemTypeError
 from helpers.auth_helpers import *
 from helpers.lock_helpers import *
+from helpers.access_projection_helpers import projection_supports_query, list_visible_items_paginated
 from helpers.util import py_to_dict
 import json
 from typing import TypeVar, Type, Callable, Any
@@ -22,12 +23,6 @@ from helpers.type_validators import custom_type_validators, ValidatorFunc
 item_base_type = TypeVar('item_base_type', bound=ItemBase)
 item_domain_info_type = TypeVar('item_domain_info_type', bound=DomainInfoBase)
 
-# any of these roles will enable the specified action
-FETCH_ACTION_ACCEPTED_ROLES = [
-    METADATA_READ_ROLE, METADATA_WRITE_ROLE, ADMIN_ROLE]
-EDIT_ACTION_ACCEPTED_ROLES = [METADATA_WRITE_ROLE, ADMIN_ROLE]
-AUTH_ADMIN_ACCEPTED_ROLES = [ADMIN_ROLE]
-
 
 def item_list_validate_and_filter_helper(
     items: List[Dict[str, Any]],
@@ -1318,6 +1313,24 @@ def list_items_paginated(
     return (items, new_pagination_key)
 
 
+def list_registry_items_paginated(
+    config: Config,
+    sort_by: Optional[SortOptions],
+    filter_by: Optional[FilterOptions],
+    pagination_key: Optional[PaginationKey],
+    page_size: int,
+) -> Tuple[List[Dict[str, Any]], Optional[PaginationKey]]:
+    # table resources are per thread - resolve the registry table on the
+    # thread making the query (e.g. an AWS IO pool thread)
+    return list_items_paginated(
+        table=get_registry_table(config=config),
+        sort_by=sort_by,
+        filter_by=filter_by,
+        pagination_key=pagination_key,
+        page_size=page_size,
+    )
+
+
 def list_items_paginated_and_filter(
     config: Config,
     sort_by: Optional[SortOptions],
@@ -1327,6 +1340,25 @@ def list_items_paginated_and_filter(
     protected_roles: ProtectedRole,
 ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
 
+    # if the access projection is deployed, query only the items visible to the
+    # user (admins can see everything so use the registry table directly)
+    if (config.enforce_user_auth
+            and config.access_projection_table_name is not None
+            and not user_is_admin(protected_roles.user)
+            and projection_supports_query(sort_by=sort_by, filter_by=filter_by, pagination_key=pagination_key)):
+        return list_visible_items_paginated(
+            config=config,
+            user=protected_roles.user,
+            user_group_ids=get_user_group_id_set(
+                user=protected_roles.user,
+                config=config
+            ),
+            sort_by=sort_by,
+            filter_by=filter_by,
+            pagination_key=pagination_key,
+            page_size=page_size,
+        )
+
     # get the paginated item list using a ddb query
     items, returned_pagination_key = list_items_paginated(
         table=get_registry_table(config=config),
@@ -1497,6 +1529,139 @@ def describe_access_helper(
     )
 
 
+def available_roles_for_subtype(subtype: Optional[str]) -> Roles:
+    # mirrors the available roles of the subtype route configs - only datasets
+    # have data roles
+    if subtype == ItemSubType.DATASET.value:
+        return DATASET_ROLE_LIST
+    return ENTITY_BASE_ROLE_LIST
+
+
+def describe_access_batch_helper(
+    ids: List[str],
+    config: Config,
+    user: User,
+) -> DescribeAccessBatchResponse:
+    """
+
+    Describes the user's access to each of the given items, as
+    describe_access_helper would for each item's subtype.
+
+    The registry and auth entries are fetched with BatchGetItem and the user's
+    groups are fetched (at most) once.
+
+    Items with no authorisation configuration grant no roles.
+
+    Parameters
+    ----------
+    ids : List[str]
+        The item ids
+    config : Config
+        The API config
+    user : User
+        The user to describe access for
+
+    Returns
+    -------
+    DescribeAccessBatchResponse
+        The roles per present item and the ids which were not present
+
+    Raises
+    ------
+    HTTPException
+        Managed HTTP exception for known errors
+    """
+    unique_ids = list(dict.fromkeys(ids))
+
+    # check existence and find the subtype (which determines available roles)
+    try:
+        registry_entries = batch_get_entries(
+            ids=unique_ids,
+            table_name=config.registry_table_name,
+            attributes=['item_subtype']
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error occurred while trying to fetch items."
+        )
+
+    present_ids = [id for id in unique_ids if id in registry_entries]
+    missing = [id for id in unique_ids if id not in registry_entries]
+    available_roles: Dict[str, Roles] = {
+        id: available_roles_for_subtype(registry_entries[id].get('item_subtype')) for id in present_ids
+    }
+
+    # if the config specifies bypassing auth or the user is admin - always
+    # return all roles
+    if not config.enforce_user_auth or user_is_admin(user):
+        return DescribeAccessBatchResponse(
+            roles=available_roles,
+            missing=missing
+        )
+
+    # lookup the items in the auth table
+    try:
+        auth_entries = batch_get_entries(
+            ids=present_ids,
+            table_name=config.auth_table_name
+        )
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"An error occurred while trying to fetch the authorisation configuration of the objects. Access denied. Error: {e}."
+        )
+
+    # only fetched if an item isn't owned by the user
+    user_group_ids: Optional[Set[str]] = None
+
+    roles: Dict[str, Roles] = {}
+    for id in present_ids:
+        entry_raw = auth_entries.get(id)
+        if entry_raw is None:
+            # missing an authorisation configuration - no access granted
+            roles[id] = []
+            continue
+
+        try:
+            access_settings = AuthTableEntry.parse_obj(
+                entry_raw).access_settings
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"The auth entry for item ({id=}) was not a valid authorisation object, parse failure. Error: {e}."
+            )
+
+        # if owner, then return all access for all protection types
+        if access_settings.owner == user.username:
+            roles[id] = available_roles[id]
+            continue
+
+        if user_group_ids is None:
+            user_group_ids = get_user_group_id_set(
+                user=user,
+                config=config
+            )
+
+        # conservatively limit to only available roles
+        roles[id] = list(filter(
+            lambda role: role in available_roles[id],
+            determine_user_access(
+                access_settings=access_settings,
+                user_group_ids=user_group_ids
+            )
+        ))
+
+    return DescribeAccessBatchResponse(
+        roles=roles,
+        missing=missing
+    )
+
+
 def check_raw_item_subtype(
     id: str,
     item: dict[str, Any],
@@ -9,6 +9,12 @@ from helpers.dynamo_helpers import get_auth_entry, write_auth_table_entry
 from helpers.keycloak_helpers import get_service_token
 from dependencies.dependencies import secret_cache
 
+# any of these roles will enable the specified action
+FETCH_ACTION_ACCEPTED_ROLES = [
+    METADATA_READ_ROLE, METADATA_WRITE_ROLE, ADMIN_ROLE]
+EDIT_ACTION_ACCEPTED_ROLES = [METADATA_WRITE_ROLE, ADMIN_ROLE]
+AUTH_ADMIN_ACCEPTED_ROLES = [ADMIN_ROLE]
+
 
 def get_item_from_auth_table(id: str, config: Config) -> AuthTableEntry:
     """
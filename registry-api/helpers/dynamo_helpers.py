@@ -2,18 +2,18 @@ from dataclasses import dataclass
 from ProvenaInterfaces.RegistryAPI import *
 from ProvenaInterfaces.RegistryModels import *
 from fastapi import HTTPException
-import boto3  # type: ignore
 from config import Config
 from boto3.dynamodb.conditions import Attr, And, Key  # type: ignore
+from ProvenaSharedFunctionality.Services.aws_io import aws_io
+from ProvenaSharedFunctionality.Services.aws_clients import get_dynamodb_table
+from ProvenaSharedFunctionality.Services.dynamo import BatchGetError, batch_get_items
 import json
 
 
 def get_table_from_name(table_name: str) -> Any:
     """    get_table_from_name
-        Generates a dynamodb resource table to be 
-        used in the below methods. Uses the registry 
-        table name environment variable for target
-        table.
+        Returns the (cached, per thread) dynamodb resource 
+        table to be used in the below methods.
 
         Returns
         -------
@@ -26,9 +26,7 @@ def get_table_from_name(table_name: str) -> Any:
         Examples (optional)
         --------
     """
-    ddb_resource = boto3.resource('dynamodb')
-    table = ddb_resource.Table(table_name)
-    return table
+    return get_dynamodb_table(table_name)
 
 
 def get_auth_table(config: Config) -> Any:
@@ -501,6 +499,43 @@ def get_entry_raw(id: str, config: Config) -> Dict[str, Any]:
     )
 
 
+def batch_get_entries(ids: List[str], table_name: str, attributes: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    batch_get_entries
+
+    Fetches the items with the given ids from the table using BatchGetItem,
+    retrying any unprocessed keys.
+
+    Parameters
+    ----------
+    ids : List[str]
+        The ids to fetch - duplicates are ignored
+    table_name : str
+        The table to fetch from
+    attributes : Optional[List[str]], optional
+        Only fetch these attributes (the id is always included), by default
+        None (all attributes)
+
+    Returns
+    -------
+    Dict[str, Dict[str, Any]]
+        id -> item, for the ids which were found
+
+    Raises
+    ------
+    HTTPException
+        500 if the table could not be read
+    """
+    try:
+        return batch_get_items(
+            table_name=table_name, key_name='id', keys=ids, attributes=attributes)
+    except BatchGetError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f'Failed to access database. Error: {e}'
+        )
+
+
 def reduce_and_list(and_list: List[Any]) -> Union[And, Attr]:
     """Recursive method which applies And as a 
     reduction across the list of conditions.
@@ -855,3 +890,9 @@ def query_dbb(
 
     # returns None if doesn't exist.
     return (items, response.get("LastEvaluatedKey"))
+
+
+
+# Async variant for use from route handlers - runs on the shared AWS IO thread
+# pool so the handler doesn't block the event loop while waiting on DynamoDB
+get_entry_raw_async = aws_io(get_entry_raw)
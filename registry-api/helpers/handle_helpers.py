@@ -3,7 +3,7 @@ from fastapi import HTTPException
 from config import Config, HDL_PREFIX
 import httpx
 from random import randint
-from helpers.keycloak_helpers import get_service_token
+from helpers.keycloak_helpers import get_service_token_async
 from dependencies.dependencies import secret_cache
 from ProvenaInterfaces.HandleModels import *
 from ProvenaInterfaces.HandleAPI import MintRequest, MintResponse, ModifyRequest
@@ -82,7 +82,7 @@ async def get_empty_handle(secret_cache: SecretCache, config: Config) -> str:
 
         # get the service account token to make
         # request on behalf of user
-        token = get_service_token(secret_cache, config=config)
+        token = await get_service_token_async(secret_cache, config=config)
 
         async with httpx.AsyncClient(timeout=10.0) as client:
             mint_request = MintRequest(
@@ -159,7 +159,7 @@ async def update_handle(secret_cache: SecretCache, existing_handle: str, new_val
     if not config.mock_handle:
 
         # Generate service account token
-        token = get_service_token(secret_cache, config=config)
+        token = await get_service_token_async(secret_cache, config=config)
 
         async with httpx.AsyncClient(timeout=10.0) as client:
             modify_request = ModifyRequest(
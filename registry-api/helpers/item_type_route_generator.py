@@ -10,6 +10,7 @@ from config import Config, get_settings
 from ProvenaSharedFunctionality.Registry.RegistryRouteActions import *
 from helpers.workflow_helpers import *
 from route_models import *
+from ProvenaSharedFunctionality.Services.aws_io import run_aws_io
 
 
 def get_correct_dependency(level: RouteAccessLevel) -> Any:
@@ -199,7 +200,8 @@ def generate_router(
             )
 
             # this method ensures that the user has an appropriate fetch role
-            response: GenericFetchResponse = fetch_helper(
+            response: GenericFetchResponse = await run_aws_io(
+                fetch_helper,
                 id=id,
                 seed_allowed=seed_allowed,
                 item_model_type=route_config.item_model_type,
@@ -279,8 +281,9 @@ def generate_router(
             page_size = subtype_list_request.page_size
 
             # get the paginated item list using a ddb query
-            items, returned_pagination_key = list_items_paginated(
-                table=get_registry_table(config=config),
+            items, returned_pagination_key = await run_aws_io(
+                list_registry_items_paginated,
+                config=config,
                 sort_by=sort_by,
                 filter_by=filter_by,
                 pagination_key=pagination_key,
@@ -288,7 +291,8 @@ def generate_router(
             )
 
             # now use the auth and filter helper
-            generic_response = item_list_validate_and_filter_helper(
+            generic_response = await run_aws_io(
+                item_list_validate_and_filter_helper,
                 # pass through the items and pagination key
                 items=items,
                 pagination_key=returned_pagination_key,
@@ -1602,7 +1606,8 @@ def generate_router(
             user = proxy_user.user
 
             # this method ensures that the user has an appropriate fetch role
-            response: GenericFetchResponse = fetch_helper(
+            response: GenericFetchResponse = await run_aws_io(
+                fetch_helper,
                 id=id,
                 seed_allowed=seed_allowed,
                 item_model_type=route_config.item_model_type,
@@ -1,7 +1,7 @@
 from ProvenaInterfaces.AsyncJobAPI import *
 from config import Config
 from helpers.util import py_to_dict
-from helpers.keycloak_helpers import get_service_token
+from helpers.keycloak_helpers import get_service_token_async
 from dependencies.dependencies import secret_cache
 from helpers.async_requests import async_post_request
 
@@ -25,7 +25,7 @@ async def launch_generic_job(payload: AdminLaunchJobRequest, config: Config) ->
     request = py_to_dict(payload)
 
     # Use client auth
-    token = get_service_token(secret_cache=secret_cache, config=config)
+    token = await get_service_token_async(secret_cache=secret_cache, config=config)
 
     try:
         response = await async_post_request(
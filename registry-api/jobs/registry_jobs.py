@@ -4,7 +4,7 @@ from EcsSqsPythonTools.Settings import JobBaseSettings
 from EcsSqsPythonTools.Workflow import parse_job_specific_payload
 from helpers.util import py_to_dict
 from ProvenaInterfaces.AsyncJobAPI import *
-from config import Config
+from config import get_settings
 from typing import cast
 from helpers.handle_helpers import mint_self_describing_handle
 from helpers.auth_helpers import seed_auth_configuration
@@ -13,6 +13,8 @@ from helpers.action_helpers import create_seed_history
 from helpers.lock_helpers import seed_lock_configuration
 from helpers.time_helpers import get_timestamp
 from helpers.dynamo_helpers import *
+from helpers.keycloak_helpers import retrieve_secret_value
+from dependencies.dependencies import secret_cache
 from ProvenaInterfaces.RegistryModels import METADATA_READ_ROLE, ItemCreate, CreateDomainInfo, RecordType
 import json
 import asyncio
@@ -28,6 +30,25 @@ def generate_failed_job(error: str) -> CallbackResponse:
     )
 
 
+def initialise_job_resources(settings: JobBaseSettings) -> None:
+    """
+    Sets up the resources reused by every job run by this worker process - the
+    parsed config (see get_settings) and the secrets held in the secret cache
+    - so that they are not built per job.
+
+    Parameters
+    ----------
+    settings : JobBaseSettings
+        The job settings
+    """
+    print("Parsing full API config from environment.")
+    config = get_settings()
+
+    print("Populating secret cache.")
+    retrieve_secret_value(
+        secret_arn=config.service_account_secret_arn, secret_cache=secret_cache)
+
+
 def wake_up_handler(payload: JobSnsPayload, settings: JobBaseSettings) -> CallbackResponse:
     """
     Do nothing - wake up the job
@@ -69,7 +90,7 @@ def create_activity_handler(payload: JobSnsPayload, settings: JobBaseSettings) -
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -188,7 +209,7 @@ def version_activity_handler(payload: JobSnsPayload, settings: JobBaseSettings)
 
     print("Parsing full API config from environment.")
     try:
-        config = Config()
+        config = get_settings()
     except Exception as e:
         return CallbackResponse(
             status=JobStatus.FAILED,
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends
 from helpers.config_response import generate_config_route
-from config import base_config
+from config import base_config, get_settings, Config
 from typing import Optional, Dict
 from KeycloakFastAPI.Dependencies import User
 from dependencies.dependencies import admin_user_protected_role_dependency
+from ProvenaInterfaces.RegistryAPI import AccessProjectionRebuildRequest, AccessProjectionRebuildResponse, Status
+from ProvenaSharedFunctionality.Services.aws_io import run_aws_io
+from fastapi import HTTPException
+from helpers.access_projection_helpers import rebuild_access_projection_page
 router = APIRouter()
 
 # Add the config route
@@ -27,3 +31,43 @@ async def trigger_error(
             f"Monitoring enabled: {base_config.monitoring_enabled}, and required DSN: {base_config.sentry_dsn}."
         }
     return None
+
+
+@router.post("/access_projection/rebuild", response_model=AccessProjectionRebuildResponse, operation_id="registry_admin_rebuild_access_projection")
+async def rebuild_access_projection_route(
+    request: AccessProjectionRebuildRequest,
+    user: User = Depends(admin_user_protected_role_dependency),
+    config: Config = Depends(get_settings)
+) -> AccessProjectionRebuildResponse:
+    """
+    Admin only endpoint which reprojects registry items into the access
+    projection table - used to populate the projection after it is first
+    deployed, or to repair it (e.g. after a restore).
+
+    The rebuild is paginated so each request does a bounded amount of work -
+    start without a pagination key, then pass the returned pagination key
+    until none is returned.
+
+    Returns
+    -------
+    AccessProjectionRebuildResponse
+        The number of items reprojected and the pagination key to continue
+    """
+    if config.access_projection_table_name is None:
+        raise HTTPException(
+            status_code=400,
+            detail="The access projection is not enabled for this deployment."
+        )
+
+    count, pagination_key = await run_aws_io(
+        rebuild_access_projection_page,
+        config=config,
+        page_size=request.page_size,
+        pagination_key=request.pagination_key
+    )
+    return AccessProjectionRebuildResponse(
+        status=Status(
+            success=True, details=f"Successfully reprojected {count} items."),
+        reprojected_count=count,
+        pagination_key=pagination_key
+    )
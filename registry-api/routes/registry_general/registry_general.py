@@ -6,10 +6,11 @@ from ProvenaInterfaces.SharedTypes import VersionDetails
 from ProvenaSharedFunctionality.Registry.RegistryRouteActions import PROV_SERVICE_ROLE_NAME, DATA_STORE_SERVICE_ROLE_NAME
 from helpers.action_helpers import *
 from helpers.action_helpers import list_items_paginated
-from helpers.dynamo_helpers import get_entry_raw
+from helpers.dynamo_helpers import get_entry_raw_async
 from helpers.auth_helpers import special_permission_check
 from helpers.lock_helpers import get_lock_status
 from config import Config, get_settings
+from ProvenaSharedFunctionality.Services.aws_io import run_aws_io
 
 router = APIRouter()
 
@@ -28,7 +29,9 @@ async def list_registry_items(
     pagination_key = general_list_request.pagination_key
     page_size = general_list_request.page_size
 
-    items, returned_pagination_key = list_items_paginated_and_filter(
+    # the listing makes several table (and auth) requests - off the event loop
+    items, returned_pagination_key = await run_aws_io(
+        list_items_paginated_and_filter,
         config=config,
         sort_by=sort_by,
         filter_by=filter_by,
@@ -59,7 +62,7 @@ async def fetch_item(
 
     # Try an untyped lookup into dynamodb
     try:
-        item = get_entry_raw(
+        item = await get_entry_raw_async(
             id=id,
             config=config
         )
@@ -73,7 +76,8 @@ async def fetch_item(
         )
 
     # now make sure the user is allowed to read the contents of the item metadata
-    roles = describe_access_helper(
+    roles = (await run_aws_io(
+        describe_access_helper,
         id=id,
         config=config,
         user=protected_roles.user,
@@ -81,7 +85,7 @@ async def fetch_item(
         available_roles=FETCH_ACTION_ACCEPTED_ROLES,
         # don't look it up again - we already know it's present
         already_checked_existence=True
-    ).roles
+    )).roles
 
     # the user can fetch the record iff they have at least one of the acceptable roles
     access = evaluate_user_access(
@@ -103,6 +107,42 @@ async def fetch_item(
     )
 
 
+@router.post("/describe_access_batch", response_model=DescribeAccessBatchResponse, operation_id="describe_access_batch")
+async def describe_access_batch(
+    request: DescribeAccessBatchRequest,
+    config: Config = Depends(get_settings),
+    protected_roles: ProtectedRole = Depends(
+        read_user_protected_role_dependency)
+) -> DescribeAccessBatchResponse:
+    """    describe_access_batch
+        Describes the user's access to each of the given items (of any
+        subtype) in one request, e.g. to authorise a lineage graph.
+
+        Arguments
+        ----------
+        request : DescribeAccessBatchRequest
+            The ids to describe access to
+
+        Returns
+        -------
+         : DescribeAccessBatchResponse
+            The roles the user has per item and any ids which were not
+            present in the registry
+
+        See Also (optional)
+        --------
+
+        Examples (optional)
+        --------
+    """
+    return await run_aws_io(
+        describe_access_batch_helper,
+        ids=request.ids,
+        config=config,
+        user=protected_roles.user
+    )
+
+
 @router.get("/proxy/fetch", response_model=UntypedFetchResponse, operation_id="proxy_fetch", include_in_schema=False)
 async def proxy_fetch_item(
     id: str,
@@ -128,7 +168,7 @@ async def proxy_fetch_item(
 
     # Try an untyped lookup into dynamodb
     try:
-        item = get_entry_raw(
+        item = await get_entry_raw_async(
             id=id,
             config=config
         )
@@ -142,7 +182,8 @@ async def proxy_fetch_item(
         )
 
     # now make sure the user is allowed to read the contents of the item metadata
-    special_roles = describe_access_helper(
+    special_roles = (await run_aws_io(
+        describe_access_helper,
         id=id,
         config=config,
         user=user,
@@ -152,7 +193,7 @@ async def proxy_fetch_item(
         already_checked_existence=True,
         # use service proxy style lookups
         service_proxy=True
-    ).roles
+    )).roles
 
     # the user can fetch the record iff they have at least one of the acceptable roles
     access = evaluate_user_access(
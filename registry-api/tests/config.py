@@ -5,6 +5,7 @@ from ProvenaSharedFunctionality.Registry.RegistryRouteActions import RouteAction
 test_resource_table_name = "testregistryresource"
 test_lock_table_name = "testregistrylock"
 test_auth_table_name = "testregistryauth"
+test_access_projection_table_name = "testregistryaccessprojection"
 
 NUM_FAKE_ENTRIES = 100  # Implement batch put for very large writing
 test_email = "testuser@gmail.com"
@@ -679,6 +679,56 @@ def setup_dynamodb_registry_table(client: Any, table_name: str) -> None:
     )
 
 
+def setup_dynamodb_access_projection_table(client: Any, table_name: str = test_access_projection_table_name) -> None:
+    """
+    Use boto client to produce a dynamodb table which mirrors the access
+    projection table (see the AccessProjectionTable construct) for testing.
+
+    Parameters
+    ----------
+    client : Any
+        The mocked dynamo db client
+    table_name : str, optional
+        The name of the table, by default test_access_projection_table_name
+    """
+    sort_keys = [('updated_timestamp', 'N'),
+                 ('created_timestamp', 'N'), ('display_name', 'S')]
+    indexes: List[Dict[str, Any]] = [
+        {
+            'IndexName': 'id-index',
+            'KeySchema': [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            'Projection': {'ProjectionType': 'KEYS_ONLY'},
+        }
+    ]
+    for partition_key in ['principal', 'principal_subtype']:
+        for sort_key, _ in sort_keys:
+            indexes.append({
+                'IndexName': f'{partition_key}-{sort_key}-index',
+                'KeySchema': [
+                    {'AttributeName': partition_key, 'KeyType': 'HASH'},
+                    {'AttributeName': sort_key, 'KeyType': 'RANGE'},
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+            })
+
+    client.create_table(
+        AttributeDefinitions=[
+            {'AttributeName': 'principal', 'AttributeType': 'S'},
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'principal_subtype', 'AttributeType': 'S'},
+        ] + [
+            {'AttributeName': sort_key, 'AttributeType': attribute_type} for sort_key, attribute_type in sort_keys
+        ],
+        TableName=table_name,
+        KeySchema=[
+            {'AttributeName': 'principal', 'KeyType': 'HASH'},
+            {'AttributeName': 'id', 'KeyType': 'RANGE'},
+        ],
+        BillingMode='PAY_PER_REQUEST',
+        GlobalSecondaryIndexes=indexes,
+    )
+
+
 def create_dynamodb_table(ddb_client: Any, table_name: str = test_resource_table_name) -> None:
     """
     Given a dynamodb client and table name, will produce a dynamo table which is
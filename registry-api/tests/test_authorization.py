@@ -49,6 +49,7 @@ def override_config_dependency(provide_global_config: Config) -> Generator:
 read_role_secured_endpoints = [
     ("/check-access/check-read-access", "GET"),
     ("/registry/general/list", "POST"),
+    ("/registry/general/describe_access_batch", "POST"),
 ]
 
 write_role_secured_endpoints = [
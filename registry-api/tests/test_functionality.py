@@ -2181,6 +2181,253 @@ def test_auth_implicit_group_access_and_owner(params: RouteParameters, override_
                         auth_payload=auth_payload, params=params)
 
 
+@mock_dynamodb
+def test_describe_access_batch(override_enforce_user_auth_dependency: Generator, monkeypatch: Any) -> None:
+    owner = TestingUser("Penny")
+    other = TestingUser("Bruno")
+    test_group = 'batch_test_group'
+
+    def set_active_user(user: TestingUser, groups: List[str]) -> None:
+        put_context_mock(
+            app,
+            username=user.name,
+            roles=['test-role'],
+            access_token="faketoken1234",
+            email=user.name
+        )
+        set_read_write_protected_role(app=app, username=user.name)
+        mock_user_group_set(user_groups=groups, monkeypatch=monkeypatch)
+
+    def describe_access_batch(ids: List[str]) -> DescribeAccessBatchResponse:
+        response = client.post(
+            "/registry/general/describe_access_batch", json={'ids': ids})
+        assert response.status_code == 200, response.text
+        return DescribeAccessBatchResponse.parse_obj(response.json())
+
+    default_table_setup()
+
+    # * owner creates a dataset and an organisation, the organisation is
+    # private, the dataset readable by the group only
+    set_active_user(user=owner, groups=[])
+    dataset_params = get_item_subtype_route_params(ItemSubType.DATASET)
+    org_params = get_item_subtype_route_params(ItemSubType.ORGANISATION)
+    dataset = ItemBase.parse_obj(
+        create_one_item_successfully(client=client, params=dataset_params))
+    org = ItemBase.parse_obj(
+        create_one_item_successfully(client=client, params=org_params))
+    remove_general_access_from_item(
+        client=client, item=org, params=org_params)
+    set_general_access_roles(
+        client=client, item=dataset, params=dataset_params, general_access_roles=[])
+    set_group_access_roles(client=client, item=dataset, params=dataset_params, group_access_roles={
+        test_group: ['metadata-read', 'dataset-data-read']
+    })
+
+    ids = [dataset.id, org.id, "missing-id", dataset.id]
+
+    # * the owner has all of each subtype's roles, missing ids are reported
+    owner_access = describe_access_batch(ids)
+    assert set(owner_access.roles[dataset.id]) == set(DATASET_ROLE_LIST)
+    assert set(owner_access.roles[org.id]) == set(ENTITY_BASE_ROLE_LIST)
+    assert owner_access.missing == ["missing-id"]
+
+    # * batch matches the single item evaluation
+    assert set(owner_access.roles[dataset.id]) == set(evaluate_access(
+        client=client, id=dataset.id, params=dataset_params).roles)
+
+    # * another user has no access outside the group
+    set_active_user(user=other, groups=[])
+    other_access = describe_access_batch(ids)
+    assert other_access.roles == {dataset.id: [], org.id: []}
+
+    # * group membership grants the group roles
+    set_active_user(user=other, groups=[test_group])
+    group_access = describe_access_batch(ids)
+    assert set(group_access.roles[dataset.id]) == {
+        'metadata-read', 'dataset-data-read'}
+    assert group_access.roles[org.id] == []
+    assert set(group_access.roles[dataset.id]) == set(evaluate_access(
+        client=client, id=dataset.id, params=dataset_params).roles)
+
+    # * request size is bounded
+    response = client.post(
+        "/registry/general/describe_access_batch", json={'ids': []})
+    assert response.status_code == 422
+    response = client.post("/registry/general/describe_access_batch", json={
+        'ids': [f"id-{i}" for i in range(MAX_DESCRIBE_ACCESS_BATCH_SIZE + 1)]})
+    assert response.status_code == 422
+
+
+@mock_dynamodb
+def test_access_projection_listing(override_enforce_user_auth_dependency: Generator, provide_enforce_user_auth_config: Config, monkeypatch: Any) -> None:
+    import access_projection_streamer
+    import helpers.action_helpers
+    from helpers.access_projection_helpers import rebuild_access_projection, PROJECTION_ID_INDEX
+    from boto3.dynamodb.conditions import Key  # type: ignore
+
+    owner = TestingUser("Penny")
+    other = TestingUser("Bruno")
+    test_group = 'projection_test_group'
+
+    def set_active_user(user: TestingUser, groups: List[str]) -> None:
+        put_context_mock(
+            app,
+            username=user.name,
+            roles=['test-role'],
+            access_token="faketoken1234",
+            email=user.name
+        )
+        set_read_write_protected_role(app=app, username=user.name)
+        mock_user_group_set(user_groups=groups, monkeypatch=monkeypatch)
+
+    projection_config = provide_enforce_user_auth_config.copy(
+        update={'access_projection_table_name': test_access_projection_table_name})
+    monkeypatch.setattr(access_projection_streamer,
+                        "get_settings", lambda: projection_config)
+
+    def list_items(config: Config, request: GeneralListRequest) -> List[Dict[str, Any]]:
+        app.dependency_overrides[get_settings] = lambda: config
+        return general_list_exhaust(client=client, general_list_request=request)
+
+    def stream_event(ids: List[str]) -> Dict[str, Any]:
+        return {'Records': [{'dynamodb': {'Keys': {'id': {'S': id}}, 'SequenceNumber': str(i)}} for i, id in enumerate(ids)]}
+
+    def projected_principals(id: str) -> Set[str]:
+        table = boto3.resource('dynamodb').Table(
+            test_access_projection_table_name)
+        response = table.query(IndexName=PROJECTION_ID_INDEX,
+                               KeyConditionExpression=Key('id').eq(id))
+        return set(row['principal'] for row in response['Items'])
+
+    # moto pages through indexes in write order rather than index order - use
+    # distinct increasing timestamps and project in write order so that multi
+    # page (ascending) listing is meaningful
+    timestamps = iter(range(1000000, 2000000))
+    monkeypatch.setattr(helpers.action_helpers,
+                        "get_timestamp", lambda: next(timestamps))
+
+    default_table_setup()
+    setup_dynamodb_access_projection_table(client=boto3.client('dynamodb'))
+
+    # * owner creates organisations and datasets - one private organisation
+    # and one group only dataset
+    set_active_user(user=owner, groups=[])
+    org_params = get_item_subtype_route_params(ItemSubType.ORGANISATION)
+    dataset_params = get_item_subtype_route_params(ItemSubType.DATASET)
+    orgs = [ItemBase.parse_obj(create_one_item_successfully(
+        client=client, params=org_params)) for _ in range(4)]
+    datasets = [ItemBase.parse_obj(create_one_item_successfully(
+        client=client, params=dataset_params)) for _ in range(3)]
+    remove_general_access_from_item(
+        client=client, item=orgs[0], params=org_params)
+    set_general_access_roles(
+        client=client, item=datasets[0], params=dataset_params, general_access_roles=[])
+    set_group_access_roles(client=client, item=datasets[0], params=dataset_params, group_access_roles={
+        test_group: ['metadata-read']
+    })
+
+    # * the other user creates a private organisation
+    set_active_user(user=other, groups=[])
+    other_org = ItemBase.parse_obj(
+        create_one_item_successfully(client=client, params=org_params))
+    remove_general_access_from_item(
+        client=client, item=other_org, params=org_params)
+
+    # * the stream handler projects the changes, a rebuild is a no-op
+    ids = [item.id for item in orgs + datasets + [other_org]]
+    assert access_projection_streamer.handler(
+        event=stream_event(ids + ids[:2]), context=None) == {'batchItemFailures': []}
+    assert projected_principals(datasets[0].id) == {
+        f"user#{owner.name}", f"group#{test_group}"}
+    assert projected_principals(orgs[1].id) == {
+        f"user#{owner.name}", "general"}
+    assert rebuild_access_projection(config=projection_config) == len(ids)
+
+    # * the projection lists the same items as filtering the registry, without
+    # duplicates across pages
+    created_ascending = SortOptions(
+        sort_type=SortType.CREATED_TIME, ascending=True)
+    list_requests = [
+        GeneralListRequest(page_size=2, sort_by=created_ascending),
+        GeneralListRequest(page_size=1, sort_by=created_ascending, filter_by=FilterOptions(
+            item_subtype=ItemSubType.ORGANISATION)),
+        GeneralListRequest(page_size=100),
+        GeneralListRequest(page_size=100, sort_by=SortOptions(
+            sort_type=SortType.DISPLAY_NAME, ascending=True)),
+    ]
+    users: List[Tuple[TestingUser, List[str]]] = [
+        (owner, []), (other, []), (other, [test_group])]
+    for user, groups in users:
+        set_active_user(user=user, groups=groups)
+        for list_request in list_requests:
+            expected = list_items(
+                config=provide_enforce_user_auth_config, request=list_request.copy(update={'page_size': 100}))
+            projected = list_items(
+                config=projection_config, request=list_request.copy())
+            projected_ids = [item['id'] for item in projected]
+            expected_ids = [item['id'] for item in expected]
+            assert len(projected_ids) == len(set(projected_ids))
+            assert set(projected_ids) == set(expected_ids)
+            # ties (e.g. display names) can be in either order
+            if list_request.sort_by == created_ascending:
+                assert projected_ids == expected_ids
+
+    set_active_user(user=other, groups=[test_group])
+    visible = [item['id'] for item in list_items(
+        config=projection_config, request=GeneralListRequest(page_size=2, sort_by=created_ascending))]
+    assert datasets[0].id in visible
+    assert orgs[0].id not in visible
+    assert other_org.id in visible
+
+    # * access changes and deletions are applied from the streams
+    set_active_user(user=owner, groups=[])
+    set_group_access_roles(client=client, item=datasets[0],
+                           params=dataset_params, group_access_roles={})
+    boto3.resource('dynamodb').Table(
+        test_resource_table_name).delete_item(Key={'id': orgs[1].id})
+
+    result = access_projection_streamer.handler(
+        event=stream_event([datasets[0].id, orgs[1].id]), context=None)
+    assert result == {'batchItemFailures': []}
+    assert projected_principals(datasets[0].id) == {f"user#{owner.name}"}
+    assert projected_principals(orgs[1].id) == set()
+
+    set_active_user(user=other, groups=[test_group])
+    visible = [item['id'] for item in list_items(
+        config=projection_config, request=GeneralListRequest(page_size=2, sort_by=created_ascending))]
+    assert datasets[0].id not in visible
+    assert orgs[1].id not in visible
+
+    # * the admin rebuild runs a page at a time and removes the rows of items
+    # without an auth entry
+    boto3.resource('dynamodb').Table(
+        test_auth_table_name).delete_item(Key={'id': other_org.id})
+    assert projected_principals(other_org.id) != set()
+    app.dependency_overrides[admin_user_protected_role_dependency] = user_protected_dependency_override
+    app.dependency_overrides[get_settings] = lambda: projection_config
+    reprojected = 0
+    pages = 0
+    rebuild_request = AccessProjectionRebuildRequest(page_size=2)
+    while True:
+        response = client.post(
+            "/admin/access_projection/rebuild", json=json.loads(rebuild_request.json()))
+        check_status_success_true(response)
+        rebuild_response = AccessProjectionRebuildResponse.parse_obj(
+            response.json())
+        reprojected += rebuild_response.reprojected_count
+        pages += 1
+        if rebuild_response.pagination_key is None:
+            break
+        rebuild_request.pagination_key = rebuild_response.pagination_key
+    assert pages > 1
+    assert reprojected == len(ids)
+    assert projected_principals(other_org.id) == set()
+
+    response = client.post("/admin/access_projection/rebuild",
+                           json={'pagination_key': {'phase': 'unknown'}})
+    assert response.status_code == 400
+
+
 @mock_dynamodb
 @pytest.mark.parametrize("params", route_params, ids=make_specialised_list("History"))
 def test_history(params: RouteParameters) -> None:
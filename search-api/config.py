@@ -72,6 +72,24 @@ class Config(BaseConfig):
     default_query_size: int = 10
     max_query_size: int = 50
 
+    # short lived query result cache (per process) - absorbs type-ahead bursts
+    query_cache_enabled: bool = True
+    query_cache_ttl_seconds: int = 10
+    query_cache_max_entries: int = 512
+
+    # cursor pagination - point in time keep alive between page requests and
+    # the unique field used to break score ties for search_after
+    pit_keep_alive: str = "2m"
+    pagination_tiebreaker_field: str = "id.keyword"
+
+    # max number of buckets returned per facet
+    max_facet_buckets: int = 20
+
+    # registry API (no trailing slash) - used to check the user's access to
+    # hydrated results, which are not hydrated if this is not set
+    registry_api_endpoint: Optional[str] = None
+    registry_access_timeout_seconds: float = 10.0
+
     aws_region: str = "ap-southeast-2"
 
     TEMP_FILE_LOCATION: str = "/tmp"
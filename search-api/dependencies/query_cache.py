@@ -0,0 +1,18 @@
+from config import Config, get_settings
+from helpers.query_cache import SearchQueryCache
+from fastapi import Depends
+from typing import Optional
+
+# The cache is shared by all requests handled by this process
+query_cache: Optional[SearchQueryCache] = None
+
+
+def get_query_cache(config: Config = Depends(get_settings)) -> SearchQueryCache:
+    global query_cache
+    if query_cache is None:
+        query_cache = SearchQueryCache(
+            ttl_seconds=config.query_cache_ttl_seconds,
+            max_entries=config.query_cache_max_entries,
+            enabled=config.query_cache_enabled
+        )
+    return query_cache
@@ -0,0 +1,84 @@
+import httpx
+from typing import Any, Dict, List, Set
+from KeycloakFastAPI.Dependencies import User
+from ProvenaInterfaces.RegistryAPI import DescribeAccessBatchRequest, DescribeAccessBatchResponse, MAX_DESCRIBE_ACCESS_BATCH_SIZE
+from ProvenaInterfaces.RegistryModels import METADATA_READ_ROLE
+from config import Config
+
+DESCRIBE_ACCESS_BATCH_PATH = "/registry/general/describe_access_batch"
+
+
+async def metadata_readable_ids(ids: List[str], user: User, config: Config) -> Set[str]:
+    """
+
+    Works out which of the given registry items the user can read the metadata
+    of, using the registry's batch describe access endpoint on behalf of the
+    user (with their token).
+
+    The search projection includes metadata (e.g. the display name and owner)
+    so is only returned for these items.
+
+    Args:
+        ids (List[str]): The registry item ids
+        user (User): The user making the search
+        config (Config): The API config
+
+    Raises:
+        Exception: If the registry is not configured or the request fails
+
+    Returns:
+        Set[str]: The ids of items the user has metadata read access to
+    """
+    if config.registry_api_endpoint is None:
+        raise Exception(
+            "The registry API endpoint is not configured - cannot check access to search results.")
+
+    unique_ids = list(dict.fromkeys(ids))
+    readable: Set[str] = set()
+    async with httpx.AsyncClient(timeout=config.registry_access_timeout_seconds) as client:
+        for start in range(0, len(unique_ids), MAX_DESCRIBE_ACCESS_BATCH_SIZE):
+            request = DescribeAccessBatchRequest(
+                ids=unique_ids[start:start + MAX_DESCRIBE_ACCESS_BATCH_SIZE])
+            response = await client.post(
+                config.registry_api_endpoint + DESCRIBE_ACCESS_BATCH_PATH,
+                json=request.dict(),
+                headers={'Authorization': 'Bearer ' + user.access_token}
+            )
+            if response.status_code != 200:
+                raise Exception(
+                    f"Registry describe access request failed with status code {response.status_code}. Details: {response.text}.")
+            described = DescribeAccessBatchResponse.parse_obj(response.json())
+            readable.update(
+                id for id, roles in described.roles.items()
+                if METADATA_READ_ROLE in roles
+            )
+    return readable
+
+
+async def readable_hit_ids(hits: List[Dict[str, Any]], user: User, config: Config, warnings: List[str]) -> Set[str]:
+    """
+
+    Works out which search hits the user can read the metadata of - see
+    metadata_readable_ids. These are the only hits which can be hydrated, or
+    returned for metadata filtered searches. If access can't be checked no
+    hits are readable and a warning is added.
+
+    Args:
+        hits (List[Dict[str, Any]]): The search hits
+        user (User): The user making the search
+        config (Config): The API config
+        warnings (List[str]): The response warnings
+
+    Returns:
+        Set[str]: The ids of readable hits
+    """
+    ids = [hit['_source']['id']
+           for hit in hits if 'id' in hit.get('_source', {})]
+    if len(ids) == 0:
+        return set()
+    try:
+        return await metadata_readable_ids(ids=ids, user=user, config=config)
+    except Exception as e:
+        warnings.append(
+            f"Access to the results could not be checked, so they were not hydrated and metadata filtered results were withheld. {e}")
+        return set()
@@ -0,0 +1,182 @@
+import base64
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from opensearchpy import OpenSearch
+from pydantic import BaseModel
+from config import Config
+from ProvenaInterfaces.SearchAPI import StructuredSearchFilters
+
+
+class SearchCursor(BaseModel):
+    # The point in time the pages are read from - keeps the result set stable
+    pit_id: str
+
+    # Sort values of the last hit of the previous page (None for first page)
+    search_after: Optional[List[Any]]
+
+    # The search being paged - must match subsequent requests
+    query: str
+    subtype_filter: Optional[str]
+    filters: Optional[StructuredSearchFilters] = None
+    hydrate: bool
+    size: int
+
+
+def encode_cursor(cursor: SearchCursor) -> str:
+    return base64.urlsafe_b64encode(cursor.json().encode('utf-8')).decode('utf-8')
+
+
+def decode_cursor(raw: str) -> SearchCursor:
+    try:
+        return SearchCursor.parse_raw(base64.urlsafe_b64decode(raw.encode('utf-8')))
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid search cursor, error: {e}."
+        )
+
+
+def pagination_sort(config: Config) -> List[Dict[str, Any]]:
+    # relevance ordered with a unique tiebreaker so that search_after is stable
+    return [
+        {"_score": "desc"},
+        {config.pagination_tiebreaker_field: "asc"},
+    ]
+
+
+def with_page(body: Dict[str, Any], page: SearchCursor, config: Config) -> Dict[str, Any]:
+    """
+
+    Adds the point in time, sort and search_after parameters to a query body.
+    The index must not be specified on point in time searches.
+
+    Args:
+        body (Dict[str, Any]): The query body
+        page (SearchCursor): The page being requested
+        config (Config): The API config
+
+    Returns:
+        Dict[str, Any]: The paged query body
+    """
+    body["pit"] = {"id": page.pit_id, "keep_alive": config.pit_keep_alive}
+    body["sort"] = pagination_sort(config)
+    if page.search_after is not None:
+        body["search_after"] = page.search_after
+    return body
+
+
+async def resolve_page(
+    cursor: Optional[str],
+    paginate: bool,
+    query: str,
+    subtype_filter: Optional[str],
+    hydrate: bool,
+    size: int,
+    index: str,
+    config: Config,
+    client: OpenSearch,
+    filters: Optional[StructuredSearchFilters] = None,
+) -> Optional[SearchCursor]:
+    """
+
+    Works out which page (if any) is being requested.
+
+    If a cursor is provided the search it describes is continued - the query
+    and filters must match. If paginate is set without a cursor a new
+    point in time is opened and the first page is requested. Otherwise the
+    search is not paginated.
+
+    Args:
+        cursor (Optional[str]): The next_cursor from a previous response
+        paginate (bool): Whether to start a paginated search
+        query (str): The normalised query
+        subtype_filter (Optional[str]): The subtype filter if any
+        hydrate (bool): Whether results are hydrated
+        size (int): The page size
+        index (str): The index to open the point in time against
+        config (Config): The API config
+        client (OpenSearch): The search client
+        filters (Optional[StructuredSearchFilters], optional): Structured filters if any. Defaults to None.
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid or does not match the query
+
+    Returns:
+        Optional[SearchCursor]: The page to request, None if not paginated
+    """
+    if cursor is not None:
+        page = decode_cursor(cursor)
+        if page.query != query or page.subtype_filter != subtype_filter or page.filters != filters:
+            raise HTTPException(
+                status_code=400,
+                detail=f"The provided cursor does not match the query and filters it was issued for."
+            )
+        # the cursor is client supplied - keep the page size within the
+        # configured bounds
+        page.size = max(1, min(page.size, config.max_query_size))
+        return page
+
+    if not paginate:
+        return None
+
+    try:
+        response = await run_in_threadpool(
+            client.create_pit,
+            index=index,
+            params={"keep_alive": config.pit_keep_alive}
+        )
+        pit_id = response['pit_id']
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to open point in time for paginated search, error: {e}"
+        )
+
+    return SearchCursor(
+        pit_id=pit_id,
+        search_after=None,
+        query=query,
+        subtype_filter=subtype_filter,
+        filters=filters,
+        hydrate=hydrate,
+        size=size,
+    )
+
+
+async def next_page_cursor(results: Dict[str, Any], page: SearchCursor, client: OpenSearch) -> Optional[str]:
+    """
+
+    Produces the cursor for the page following the given results. When the
+    results are the final page the point in time is closed and no cursor is
+    returned.
+
+    Args:
+        results (Dict[str, Any]): The OpenSearch response for the page
+        page (SearchCursor): The page which was requested
+        client (OpenSearch): The search client
+
+    Returns:
+        Optional[str]: The encoded next cursor, if there may be more results
+    """
+    hits: List[Dict[str, Any]] = results.get('hits', {}).get('hits') or []
+    # the point in time id can change between requests
+    pit_id = results.get('pit_id') or page.pit_id
+
+    if len(hits) < page.size:
+        try:
+            await run_in_threadpool(client.delete_pit, body={"pit_id": [pit_id]})
+        except Exception as e:
+            # the point in time will expire after the keep alive anyway
+            print(f"Failed to close point in time, error: {e}. Continuing.")
+        return None
+
+    return encode_cursor(SearchCursor(
+        pit_id=pit_id,
+        search_after=hits[-1]['sort'],
+        query=page.query,
+        subtype_filter=page.subtype_filter,
+        filters=page.filters,
+        hydrate=page.hydrate,
+        size=page.size,
+    ))
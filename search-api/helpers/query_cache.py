@@ -0,0 +1,197 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from cachetools import TTLCache
+from fastapi.concurrency import run_in_threadpool
+from ProvenaInterfaces.SearchAPI import LatencyHistogramBucket, SearchQueryMetrics, StructuredSearchFilters, SearchFacet
+
+# Cache key is a normalised, hashable description of the search
+QueryCacheKey = Tuple[Any, ...]
+
+# Upper bounds (ms) of the OpenSearch latency histogram buckets - an overflow
+# bucket is added above the last bound
+LATENCY_BUCKETS_MS: List[float] = [
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000
+]
+
+
+def normalise_query(query: str, lowercase: bool = True) -> str:
+    """
+
+    Normalises the query text so that near identical type-ahead queries share
+    a cache entry. The linearised field is queried with the standard analyser
+    which is case insensitive and ignores repeated whitespace, so this does not
+    change the search results. Queries which may hit keyword fields should not
+    be lowercased.
+
+    Args:
+        query (str): The raw query text
+        lowercase (bool, optional): Whether to lowercase the query. Defaults to True.
+
+    Returns:
+        str: The normalised query
+    """
+    collapsed = " ".join(query.split())
+    return collapsed.lower() if lowercase else collapsed
+
+
+def build_query_cache_key(
+    index: str,
+    query: str,
+    size: int,
+    roles: List[str],
+    subtype_filter: Optional[str] = None,
+    hydrate: bool = False,
+    filters: Optional[StructuredSearchFilters] = None,
+    facets: Optional[List[SearchFacet]] = None,
+) -> QueryCacheKey:
+    """
+
+    Builds the cache key for a search. The user's roles are included as the
+    access scope so that results are never shared between users with
+    different access.
+
+    Args:
+        index (str): The index being searched
+        query (str): The normalised query text
+        size (int): The number of records requested
+        roles (List[str]): The roles of the requesting user
+        subtype_filter (Optional[str], optional): The subtype filter if any. Defaults to None.
+        hydrate (bool, optional): Whether projections are included. Defaults to False.
+        filters (Optional[StructuredSearchFilters], optional): Structured filters if any. Defaults to None.
+        facets (Optional[List[SearchFacet]], optional): Requested facets if any. Defaults to None.
+
+    Returns:
+        QueryCacheKey: The hashable key
+    """
+    return (
+        index,
+        normalise_query(query, lowercase=False),
+        subtype_filter,
+        size,
+        hydrate,
+        tuple(sorted(filters.dict(exclude_none=True).items())
+              ) if filters else (),
+        tuple(sorted(set(facets))) if facets else (),
+        tuple(sorted(set(roles))),
+    )
+
+
+class LatencyHistogram():
+    def __init__(self, buckets_ms: List[float] = LATENCY_BUCKETS_MS) -> None:
+        self.buckets_ms = buckets_ms
+        # final count is the overflow bucket
+        self.counts: List[int] = [0] * (len(buckets_ms) + 1)
+        self.total_ms: float = 0.0
+        self.count: int = 0
+
+    def observe(self, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        for i, bound in enumerate(self.buckets_ms):
+            if duration_ms <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def buckets(self) -> List[LatencyHistogramBucket]:
+        bounds: List[Optional[float]] = [*self.buckets_ms, None]
+        return [
+            LatencyHistogramBucket(upper_bound_ms=bound, count=count)
+            for bound, count in zip(bounds, self.counts)
+        ]
+
+
+class SearchQueryCache():
+    """
+
+    Short lived cache of OpenSearch query responses.
+
+    Identical queries which arrive while a matching query is already in flight
+    wait on the in flight request rather than making another upstream call.
+    The blocking OpenSearch call is run in the thread pool so that the event
+    loop is free to coalesce concurrent requests.
+
+    All state is only mutated from the event loop thread.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.cache: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+        self.in_flight: Dict[QueryCacheKey, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.latency = LatencyHistogram()
+
+    async def query(self, key: QueryCacheKey, search: Callable[[], Any]) -> Any:
+        """
+
+        Returns the cached response for the key if present, otherwise waits on
+        an identical in flight search or runs the search.
+
+        Args:
+            key (QueryCacheKey): The cache key for the search
+            search (Callable[[], Any]): Blocking function which runs the search
+
+        Returns:
+            Any: The OpenSearch response
+        """
+        if not self.enabled:
+            return await self.timed_search(search)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            # shield so that a cancelled waiter does not cancel the shared result
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            result = await self.timed_search(search)
+        except BaseException as e:
+            # propagate the outcome to any coalesced waiters
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # mark as retrieved - there may be no coalesced waiters
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self.in_flight[key]
+
+        self.cache[key] = result
+        future.set_result(result)
+        return result
+
+    async def timed_search(self, search: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return await run_in_threadpool(search)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.latency.observe((time.perf_counter() - start) * 1000)
+
+    def metrics(self) -> SearchQueryMetrics:
+        return SearchQueryMetrics(
+            cache_hits=self.hits,
+            cache_misses=self.misses,
+            coalesced_waits=self.coalesced,
+            upstream_failures=self.failures,
+            cached_entries=len(self.cache),
+            upstream_request_count=self.latency.count,
+            upstream_latency_total_ms=self.latency.total_ms,
+            upstream_latency_histogram=self.latency.buckets(),
+        )
@@ -1,13 +1,37 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from config import Config
 from opensearchpy import OpenSearch
+from ProvenaInterfaces.SearchAPI import SEARCH_PROJECTION_FIELD, SEARCH_STRUCTURED_FIELD, SearchResultProjection, StructuredSearchFilters, SearchFacet, FacetBucket
+from helpers.pagination import SearchCursor, with_page
 
 # Type alias query response for now
 QueryResponse = Any
 
 
-def text_multi_match_query_with_field_filter(match_text: str, match_filter: str, search_fields: List[str], must_match_field: str, size: int) -> Dict[str, Any]:
-    return {
+def source_fields(hydrate: bool) -> List[str]:
+    """
+
+    Determines which _source fields to return from the index. Only the id is
+    needed unless the results are being hydrated with the stored projection.
+
+    Args:
+        hydrate (bool): Whether to include the search projection
+
+    Returns:
+        List[str]: The _source includes
+    """
+    return ["id", SEARCH_PROJECTION_FIELD] if hydrate else ["id"]
+
+
+def with_source_fields(body: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    # restricts the returned document contents when fields are specified
+    if fields is not None:
+        body["_source"] = {"includes": fields}
+    return body
+
+
+def text_multi_match_query_with_field_filter(match_text: str, match_filter: str, search_fields: List[str], must_match_field: str, size: int, source: Optional[List[str]] = None) -> Dict[str, Any]:
+    return with_source_fields({
         "size": size,
         "query":
             {
@@ -44,11 +68,11 @@ def text_multi_match_query_with_field_filter(match_text: str, match_filter: str,
                     ]
                 }
             }
-    }
+    }, source)
 
 
-def text_multi_match_query(match_text: str, fields: List[str], size: int) -> Dict[str, Any]:
-    return {
+def text_multi_match_query(match_text: str, fields: List[str], size: int, source: Optional[List[str]] = None) -> Dict[str, Any]:
+    return with_source_fields({
         "size": size,
         "query": {
             "multi_match": {
@@ -73,11 +97,11 @@ def text_multi_match_query(match_text: str, fields: List[str], size: int) -> Dic
                 "slop": 2
             }
         }
-    }
+    }, source)
 
 
-def linearised_query(match_text: str, size: int, config: Config) -> Dict[str, Any]:
-    return {
+def linearised_query(match_text: str, size: int, config: Config, source: Optional[List[str]] = None) -> Dict[str, Any]:
+    return with_source_fields({
         "size": size,
         "query": {
             "match": {
@@ -100,11 +124,11 @@ def linearised_query(match_text: str, size: int, config: Config) -> Dict[str, An
                 }
             }
         }
-    }
+    }, source)
 
 
-def linearised_query_with_filter(match_text: str, must_match_field: str, match_filter: str, size: int, config: Config) -> Dict[str, Any]:
-    return {
+def linearised_query_with_filter(match_text: str, must_match_field: str, match_filter: str, size: int, config: Config, source: Optional[List[str]] = None) -> Dict[str, Any]:
+    return with_source_fields({
         "size": size,
         "query":
             {
@@ -138,58 +162,211 @@ def linearised_query_with_filter(match_text: str, must_match_field: str, match_f
                     ]
                 }
             }
+    }, source)
+
+
+def structured_field(field: str) -> str:
+    return f"{SEARCH_STRUCTURED_FIELD}.{field}"
+
+
+def structured_filter_clauses(filters: StructuredSearchFilters) -> List[Dict[str, Any]]:
+    """
+
+    Converts the structured filters into OpenSearch filter context clauses.
+    These do not contribute to scoring and are cacheable by OpenSearch.
+
+    Args:
+        filters (StructuredSearchFilters): The requested filters
+
+    Returns:
+        List[Dict[str, Any]]: The filter clauses (empty if no filters)
+    """
+    clauses: List[Dict[str, Any]] = []
+
+    # exact keyword matches
+    terms: Dict[str, Optional[str]] = {
+        "item_category": filters.item_category.value if filters.item_category else None,
+        "record_type": filters.record_type.value if filters.record_type else None,
+        "owner_username": filters.owner_username,
+        "dataset_template_ids": filters.dataset_template_id,
+        "workflow_template_ids": filters.workflow_template_id,
+        "study_ids": filters.study_id,
+    }
+    for field, value in terms.items():
+        if value is not None:
+            clauses.append({"term": {structured_field(field): value}})
+
+    # inclusive timestamp ranges
+    ranges: Dict[str, Tuple[Optional[int], Optional[int]]] = {
+        "created_timestamp": (filters.created_after, filters.created_before),
+        "updated_timestamp": (filters.updated_after, filters.updated_before),
+    }
+    for field, (lower, upper) in ranges.items():
+        bounds: Dict[str, int] = {}
+        if lower is not None:
+            bounds["gte"] = lower
+        if upper is not None:
+            bounds["lte"] = upper
+        if len(bounds) > 0:
+            clauses.append({"range": {structured_field(field): bounds}})
+
+    return clauses
+
+
+def filters_match_metadata(filters: Optional[StructuredSearchFilters]) -> bool:
+    """
+
+    Do the filters match on item metadata (anything other than the item
+    category and record type)? The ids of items returned by these reveal the
+    metadata, so they are restricted to items the user can read.
+
+    Args:
+        filters (Optional[StructuredSearchFilters]): The requested filters
+
+    Returns:
+        bool: True if any metadata filter is set
+    """
+    if filters is None:
+        return False
+    return any(
+        value is not None
+        for field, value in filters.dict(exclude={"item_category", "record_type"}).items()
+    )
+
+
+def with_structured_filters(body: Dict[str, Any], filters: Optional[StructuredSearchFilters]) -> Dict[str, Any]:
+    # wraps the scored query so that matches must also pass the filters
+    clauses = structured_filter_clauses(filters) if filters else []
+    if len(clauses) > 0:
+        body["query"] = {
+            "bool": {
+                "must": [body["query"]],
+                "filter": clauses
+            }
+        }
+    return body
+
+
+def with_facets(body: Dict[str, Any], facets: Optional[List[SearchFacet]], config: Config) -> Dict[str, Any]:
+    # counts matching documents per value of each requested facet
+    if facets:
+        body["aggs"] = {
+            facet.value: {
+                "terms": {
+                    "field": structured_field(facet.value),
+                    "size": config.max_facet_buckets
+                }
+            }
+            for facet in facets
+        }
+    return body
+
+
+def parse_facets(results: Dict[str, Any], facets: Optional[List[SearchFacet]]) -> Optional[Dict[SearchFacet, List[FacetBucket]]]:
+    """
+
+    Pulls the facet bucket counts out of the search response aggregations.
+
+    Args:
+        results (Dict[str, Any]): The search response
+        facets (Optional[List[SearchFacet]]): The requested facets
+
+    Returns:
+        Optional[Dict[SearchFacet, List[FacetBucket]]]: Buckets per facet, None if no facets requested
+    """
+    if not facets:
+        return None
+    aggregations = results.get('aggregations', {})
+    return {
+        facet: [
+            FacetBucket(key=str(bucket['key']), count=bucket['doc_count'])
+            for bucket in aggregations.get(facet.value, {}).get('buckets', [])
+        ]
+        for facet in facets
     }
 
 
-def multi_match_query_index(index: str, query: str, fields: List[str], size: int, config: Config, client: OpenSearch) -> Any:
+def run_search(body: Dict[str, Any], index: str, config: Config, client: OpenSearch, page: Optional[SearchCursor] = None, filters: Optional[StructuredSearchFilters] = None, facets: Optional[List[SearchFacet]] = None) -> Any:
+    body = with_facets(
+        body=with_structured_filters(body=body, filters=filters),
+        facets=facets,
+        config=config
+    )
+    # point in time searches target the point in time rather than the index
+    if page is None:
+        return client.search(body=body, index=index)
+    return client.search(body=with_page(body=body, page=page, config=config))
+
+
+def multi_match_query_index(index: str, query: str, fields: List[str], size: int, config: Config, client: OpenSearch, source: Optional[List[str]] = None, page: Optional[SearchCursor] = None) -> Any:
     print(
         f"Searching for query {query} on index {index} with fields {fields}.")
-    return client.search(
+    return run_search(
         body=text_multi_match_query(
             size=size,
             match_text=query,
             fields=fields,
+            source=source,
         ),
         index=index,
+        config=config,
+        client=client,
+        page=page
     )
 
 
-def query_linearised_index(index: str, query: str, size: int, config: Config, client: OpenSearch) -> Any:
+def query_linearised_index(index: str, query: str, size: int, config: Config, client: OpenSearch, source: Optional[List[str]] = None, page: Optional[SearchCursor] = None, filters: Optional[StructuredSearchFilters] = None, facets: Optional[List[SearchFacet]] = None) -> Any:
     print(
         f"Searching for query {query} using linearised/ngram index {index}.")
-    return client.search(
-        body=linearised_query(match_text=query, size=size, config=config),
+    return run_search(
+        body=linearised_query(match_text=query, size=size,
+                              config=config, source=source),
         index=index,
+        config=config,
+        client=client,
+        page=page,
+        filters=filters,
+        facets=facets
     )
 
 
-def query_linearised_index_with_filter(index: str, query: str, must_match_text: str, must_match_field: str, size: int, config: Config, client: OpenSearch) -> Any:
+def query_linearised_index_with_filter(index: str, query: str, must_match_text: str, must_match_field: str, size: int, config: Config, client: OpenSearch, source: Optional[List[str]] = None, page: Optional[SearchCursor] = None, filters: Optional[StructuredSearchFilters] = None, facets: Optional[List[SearchFacet]] = None) -> Any:
     print(
         f"Searching for query {query} using linearised/ngram index {index}.")
-    return client.search(
+    return run_search(
         body=linearised_query_with_filter(
             match_text=query,
             size=size,
             config=config,
             must_match_field=must_match_field,
-            match_filter=must_match_text
+            match_filter=must_match_text,
+            source=source
         ),
         index=index,
+        config=config,
+        client=client,
+        page=page,
+        filters=filters,
+        facets=facets
     )
 
 
-def multi_match_query_index_with_filter(index: str, query: str, must_match_text: str, must_match_field: str, fields: List[str], size: int, config: Config, client: OpenSearch) -> Any:
+def multi_match_query_index_with_filter(index: str, query: str, must_match_text: str, must_match_field: str, fields: List[str], size: int, config: Config, client: OpenSearch, source: Optional[List[str]] = None, page: Optional[SearchCursor] = None) -> Any:
     print(
         f"Searching for query {query} on index {index} with fields {fields}.")
-    return client.search(
+    return run_search(
         body=text_multi_match_query_with_field_filter(
             size=size,
             match_text=query,
             search_fields=fields,
             match_filter=must_match_text,
-            must_match_field=must_match_field
+            must_match_field=must_match_field,
+            source=source
         ),
         index=index,
+        config=config,
+        client=client,
+        page=page
     )
 
 
@@ -209,3 +386,21 @@ def delete_document(index: str, id: str, config: Config, client: OpenSearch) ->
 
 def delete_index(index: str, config: Config, client: OpenSearch) -> Any:
     return client.indices.delete(index=index)
+
+
+def parse_projection(hit: Dict[str, Any]) -> Optional[SearchResultProjection]:
+    """
+
+    Pulls the stored search projection out of a search hit, if present.
+    Documents indexed before projections were introduced will not have one.
+
+    Args:
+        hit (Dict[str, Any]): The search hit
+
+    Returns:
+        Optional[SearchResultProjection]: The parsed projection or None
+    """
+    raw = hit.get('_source', {}).get(SEARCH_PROJECTION_FIELD)
+    if raw is None:
+        return None
+    return SearchResultProjection.parse_obj(raw)
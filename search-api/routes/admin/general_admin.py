@@ -3,7 +3,11 @@ from helpers.config_response import generate_config_route
 from config import base_config
 from typing import Optional, Dict
 from KeycloakFastAPI.Dependencies import User
-from dependencies.dependencies import sys_admin_read_write_user_protected_role_dependency
+from dependencies.dependencies import sys_admin_read_write_user_protected_role_dependency, sys_admin_read_user_protected_role_dependency
+from dependencies.query_cache import get_query_cache
+from helpers.query_cache import SearchQueryCache
+from ProvenaInterfaces.SearchAPI import SearchQueryMetricsResponse
+from ProvenaInterfaces.SharedTypes import Status
 router = APIRouter()
 
 # Add the config route 
@@ -26,4 +30,19 @@ async def trigger_error(
                 "message": f"Monitoring is disabled by configuration. Not going to trigger fake error. " +
                     f"Monitoring enabled: {base_config.monitoring_enabled}, and required DSN: {base_config.sentry_dsn}."
             }
-    return None
\ No newline at end of file
+    return None
+
+
+# Search cache and OpenSearch latency metrics for this process
+@router.get("/search-metrics", response_model=SearchQueryMetricsResponse, operation_id="search_metrics")
+async def search_metrics(
+    query_cache: SearchQueryCache = Depends(get_query_cache),
+    user: User = Depends(sys_admin_read_user_protected_role_dependency)
+) -> SearchQueryMetricsResponse:
+    return SearchQueryMetricsResponse(
+        status=Status(
+            success=True,
+            details="Metrics are reported for the serving process only."
+        ),
+        metrics=query_cache.metrics()
+    )
@@ -1,14 +1,18 @@
 from dependencies.dependencies import search_entity_registry_protected_role_dependency
 from dependencies.open_search_client import get_search_client
+from dependencies.query_cache import get_query_cache
 from config import Config, get_settings
 from opensearchpy import OpenSearch
 from KeycloakFastAPI.Dependencies import ProtectedRole
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from ProvenaInterfaces.SearchAPI import *
 from ProvenaInterfaces.SharedTypes import Status
 from ProvenaInterfaces.RegistryModels import ALL_SEARCHABLE_FIELDS, ItemSubType
 from helpers.search_helpers import *
-from typing import Optional
+from helpers.query_cache import SearchQueryCache, build_query_cache_key, normalise_query
+from helpers.pagination import resolve_page, next_page_cursor
+from helpers.access_helpers import readable_hit_ids
+from typing import Optional, Set
 
 
 router = APIRouter()
@@ -21,7 +25,13 @@ async def search_entity_registry(
     query: str,
     subtype_filter: Optional[ItemSubType] = None,
     record_limit: Optional[int] = None,
+    hydrate: bool = False,
+    paginate: bool = False,
+    cursor: Optional[str] = None,
+    filters: StructuredSearchFilters = Depends(),
+    facets: Optional[List[SearchFacet]] = Query(None),
     search_client: OpenSearch = Depends(get_search_client),
+    query_cache: SearchQueryCache = Depends(get_query_cache),
     config: Config = Depends(get_settings),
     role: ProtectedRole = Depends(
         search_entity_registry_protected_role_dependency),
@@ -39,38 +49,80 @@ async def search_entity_registry(
     size = min(
         record_limit, config.max_query_size) if record_limit else config.default_query_size
 
-    if subtype_filter is None:
-        try:
-            results: Dict[str, Any] = query_linearised_index(
-                index=config.registry_index,
-                query=query,
-                config=config,
-                client=search_client,
-                size=size
-            )
+    # normalised so that near identical type-ahead queries share a cache entry
+    normalised_query = normalise_query(query)
 
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to search, error: {e}"
-            )
-    else:
-        try:
-            results = query_linearised_index_with_filter(
+    # work out if this is a paginated search - continuing from a cursor reuses
+    # the page size and hydration of the original request
+    page = await resolve_page(
+        cursor=cursor,
+        paginate=paginate,
+        query=normalised_query,
+        subtype_filter=subtype_filter.value if subtype_filter else None,
+        hydrate=hydrate,
+        size=size,
+        index=config.registry_index,
+        config=config,
+        client=search_client,
+        filters=filters
+    )
+    if page is not None:
+        size = page.size
+        hydrate = page.hydrate
+
+    # only pull back the id unless hydrating with the stored projection
+    source = source_fields(hydrate=hydrate)
+
+    def search() -> Dict[str, Any]:
+        if subtype_filter is None:
+            return query_linearised_index(
                 index=config.registry_index,
-                query=query,
+                query=normalised_query,
                 config=config,
                 client=search_client,
                 size=size,
-                must_match_text=subtype_filter.value,
-                must_match_field=item_subtype_field
+                source=source,
+                page=page,
+                filters=filters,
+                facets=facets
             )
+        return query_linearised_index_with_filter(
+            index=config.registry_index,
+            query=normalised_query,
+            config=config,
+            client=search_client,
+            size=size,
+            must_match_text=subtype_filter.value,
+            must_match_field=item_subtype_field,
+            source=source,
+            page=page,
+            filters=filters,
+            facets=facets
+        )
 
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to search, error: {e}"
+    try:
+        if page is not None:
+            # pages are tied to a point in time so are never cached
+            results: Dict[str, Any] = await query_cache.timed_search(search)
+        else:
+            results = await query_cache.query(
+                key=build_query_cache_key(
+                    index=config.registry_index,
+                    query=normalised_query,
+                    size=size,
+                    roles=user.roles,
+                    subtype_filter=subtype_filter.value if subtype_filter else None,
+                    hydrate=hydrate,
+                    filters=filters,
+                    facets=facets
+                ),
+                search=search
             )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to search, error: {e}"
+        )
 
     # filter results based on auth?? Other hooks?
     # TODO
@@ -89,13 +141,25 @@ async def search_entity_registry(
         )
 
     warnings: List[str] = []
+
+    # the projection includes item metadata so is only returned for items the
+    # user can read the metadata of - as are the results of metadata filters
+    metadata_filtered = filters_match_metadata(filters)
+    readable_ids: Set[str] = await readable_hit_ids(
+        hits=hits, user=user, config=config, warnings=warnings) if hydrate or metadata_filtered else set()
+    if metadata_filtered:
+        hits = [hit for hit in hits if hit.get(
+            '_source', {}).get('id') in readable_ids]
+
     output_results: List[QueryResult] = []
     for hit in hits:
         try:
             output_results.append(QueryResult(
                 # id field for registry items is just id
                 id=hit['_source']['id'],
-                score=hit['_score']
+                score=hit['_score'],
+                projection=parse_projection(
+                    hit) if hit['_source']['id'] in readable_ids else None
             ))
         except Exception as e:
             warnings.append(
@@ -107,5 +171,8 @@ async def search_entity_registry(
             details=f"Returned {len(output_results)} results with {'no' if len(warnings) == 0 else len(warnings)} issues."
         ),
         results=output_results,
-        warnings=warnings if len(warnings) > 0 else None
+        warnings=warnings if len(warnings) > 0 else None,
+        facets=parse_facets(results=results, facets=facets),
+        next_cursor=await next_page_cursor(
+            results=results, page=page, client=search_client) if page is not None else None
     )
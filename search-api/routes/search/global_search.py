@@ -1,5 +1,6 @@
 from dependencies.dependencies import search_global_protected_role_dependency
 from dependencies.open_search_client import get_search_client
+from dependencies.query_cache import get_query_cache
 from config import Config, get_settings
 from opensearchpy import OpenSearch
 from KeycloakFastAPI.Dependencies import ProtectedRole
@@ -8,6 +9,10 @@ from ProvenaInterfaces.SearchAPI import *
 from ProvenaInterfaces.SharedTypes import Status
 
 from helpers.search_helpers import *
+from helpers.query_cache import SearchQueryCache, build_query_cache_key, normalise_query
+from helpers.pagination import resolve_page, next_page_cursor
+from helpers.access_helpers import readable_hit_ids
+from typing import Set
 
 
 router = APIRouter()
@@ -19,7 +24,11 @@ router = APIRouter()
 async def search_global(
     query: str,
     record_limit: Optional[int] = None,
+    hydrate: bool = False,
+    paginate: bool = False,
+    cursor: Optional[str] = None,
     search_client: OpenSearch = Depends(get_search_client),
+    query_cache: SearchQueryCache = Depends(get_query_cache),
     config: Config = Depends(get_settings),
     role: ProtectedRole = Depends(search_global_protected_role_dependency),
 ) -> MixedQueryResults:
@@ -34,16 +43,54 @@ async def search_global(
     # could cause duplicates
     searchable_fields = ["*"]
 
-    try:
-        results: Dict[str, Any] = multi_match_query_index(
+    # normalised so that near identical type-ahead queries share a cache entry
+    # - not lowercased as the wildcard fields include keyword fields
+    normalised_query = normalise_query(query, lowercase=False)
+
+    # work out if this is a paginated search - continuing from a cursor reuses
+    # the page size and hydration of the original request
+    page = await resolve_page(
+        cursor=cursor,
+        paginate=paginate,
+        query=normalised_query,
+        subtype_filter=None,
+        hydrate=hydrate,
+        size=size,
+        index=config.global_index,
+        config=config,
+        client=search_client
+    )
+    if page is not None:
+        size = page.size
+        hydrate = page.hydrate
+
+    def search() -> Dict[str, Any]:
+        return multi_match_query_index(
             index=config.global_index,
-            query=query,
+            query=normalised_query,
             fields=searchable_fields,
             config=config,
             client=search_client,
-            size=size
+            size=size,
+            source=source_fields(hydrate=hydrate),
+            page=page
         )
 
+    try:
+        if page is not None:
+            # pages are tied to a point in time so are never cached
+            results: Dict[str, Any] = await query_cache.timed_search(search)
+        else:
+            results = await query_cache.query(
+                key=build_query_cache_key(
+                    index=config.global_index,
+                    query=normalised_query,
+                    size=size,
+                    roles=user.roles,
+                    hydrate=hydrate
+                ),
+                search=search
+            )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -67,6 +114,12 @@ async def search_global(
         )
 
     warnings: List[str] = []
+
+    # the projection includes item metadata so is only returned for items the
+    # user can read the metadata of
+    readable_ids: Set[str] = await readable_hit_ids(
+        hits=hits, user=user, config=config, warnings=warnings) if hydrate else set()
+
     output_results: List[QueryResult] = []
     for hit in hits:
         try:
@@ -84,7 +137,9 @@ async def search_global(
                 # id field for registry items is just id
                 id=record_id,
                 score=hit['_score'],
-                type=type
+                type=type,
+                projection=parse_projection(
+                    hit) if record_id in readable_ids else None
             ))
         except Exception as e:
             warnings.append(
@@ -96,5 +151,7 @@ async def search_global(
             details=f"Returned {len(output_results)} results with {'no' if len(warnings) == 0 else len(warnings)} issues."
         ),
         results=output_results,
-        warnings=warnings if len(warnings) > 0 else None
+        warnings=warnings if len(warnings) > 0 else None,
+        next_cursor=await next_page_cursor(
+            results=results, page=page, client=search_client) if page is not None else None
     )
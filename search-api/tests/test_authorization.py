@@ -17,6 +17,7 @@ client = TestClient(app)
 
 read_role_secured_endpoints = [
     ("/check-access/check-read-access", "GET"),
+    ("/admin/search-metrics", "GET"),
 ]
 
 write_role_secured_endpoints = [
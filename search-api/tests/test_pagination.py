@@ -0,0 +1,105 @@
+import tests.env_setup
+from typing import Any, Dict, List
+import pytest
+from fastapi import HTTPException
+from config import Config
+from helpers.pagination import *
+
+config = Config(
+    search_domain="",
+    registry_index="registry",
+    global_index="global",
+    linearised_field="body",
+)
+
+
+class FakePitClient():
+    # Records point in time open/close calls made by the pagination helpers
+    def __init__(self) -> None:
+        self.opened: List[str] = []
+        self.closed: List[Any] = []
+
+    def create_pit(self, index: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.opened.append(index)
+        return {"pit_id": "pit-1"}
+
+    def delete_pit(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        self.closed.append(body)
+        return {}
+
+
+def hits(count: int) -> Dict[str, Any]:
+    return {
+        "pit_id": "pit-2",
+        "hits": {"hits": [
+            {"_source": {"id": str(i)}, "_score": 1.0, "sort": [1.0, str(i)]}
+            for i in range(count)
+        ]}
+    }
+
+
+@pytest.mark.asyncio
+async def test_unpaginated_search() -> None:
+    client = FakePitClient()
+    page = await resolve_page(cursor=None, paginate=False, query="q", subtype_filter=None,
+                              hydrate=False, size=5, index="registry", config=config, client=client)  # type: ignore
+    assert page is None
+    assert client.opened == []
+
+
+@pytest.mark.asyncio
+async def test_cursor_round_trip() -> None:
+    client = FakePitClient()
+    page = await resolve_page(cursor=None, paginate=True, query="q", subtype_filter="MODEL",
+                              hydrate=True, size=2, index="registry", config=config, client=client)  # type: ignore
+    assert page is not None
+    assert page.pit_id == "pit-1"
+    assert page.search_after is None
+    assert client.opened == ["registry"]
+
+    body = with_page(body={"size": 2}, page=page, config=config)
+    assert body["pit"]["id"] == "pit-1"
+    assert "search_after" not in body
+
+    # full page - expect a cursor using the latest pit id and last sort values
+    cursor = await next_page_cursor(results=hits(2), page=page, client=client)  # type: ignore
+    assert cursor is not None
+    next_page = await resolve_page(cursor=cursor, paginate=False, query="q", subtype_filter="MODEL",
+                                   hydrate=False, size=50, index="registry", config=config, client=client)  # type: ignore
+    assert next_page is not None
+    assert next_page.pit_id == "pit-2"
+    assert next_page.search_after == [1.0, "1"]
+    # the original page size and hydration carry through
+    assert next_page.size == 2
+    assert next_page.hydrate
+
+    # partial page - the point in time is closed and no cursor returned
+    assert await next_page_cursor(results=hits(1), page=next_page, client=client) is None  # type: ignore
+    assert client.closed == [{"pit_id": ["pit-2"]}]
+
+
+@pytest.mark.asyncio
+async def test_cursor_must_match_query() -> None:
+    client = FakePitClient()
+    cursor = encode_cursor(SearchCursor(pit_id="pit", search_after=[
+                           1.0, "a"], query="q", subtype_filter=None, hydrate=False, size=2))
+    with pytest.raises(HTTPException) as e:
+        await resolve_page(cursor=cursor, paginate=False, query="other", subtype_filter=None,
+                           hydrate=False, size=2, index="registry", config=config, client=client)  # type: ignore
+    assert e.value.status_code == 400
+
+    with pytest.raises(HTTPException) as e:
+        decode_cursor("not a cursor")
+    assert e.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_cursor_page_size_is_bounded() -> None:
+    client = FakePitClient()
+    # a hand crafted cursor can't exceed the max query size
+    cursor = encode_cursor(SearchCursor(pit_id="pit", search_after=[
+                           1.0, "a"], query="q", subtype_filter=None, hydrate=False, size=100000))
+    page = await resolve_page(cursor=cursor, paginate=False, query="q", subtype_filter=None,
+                              hydrate=False, size=2, index="registry", config=config, client=client)  # type: ignore
+    assert page is not None
+    assert page.size == config.max_query_size
@@ -0,0 +1,114 @@
+import tests.env_setup
+import asyncio
+import threading
+from typing import Any, Dict, List
+import pytest
+from helpers.query_cache import SearchQueryCache, build_query_cache_key, normalise_query
+
+
+def test_normalise_query() -> None:
+    assert normalise_query("  Coral   Reef ") == "coral reef"
+    assert normalise_query(" ID  1234 ", lowercase=False) == "ID 1234"
+
+
+def test_cache_key_scoped_by_roles() -> None:
+    base = build_query_cache_key(
+        index="registry", query="coral", size=10, roles=["a", "b"])
+
+    # role order is irrelevant
+    assert base == build_query_cache_key(
+        index="registry", query="coral", size=10, roles=["b", "a"])
+
+    # but differing access scope, filters or sizes are distinct
+    assert base != build_query_cache_key(
+        index="registry", query="coral", size=10, roles=["a"])
+    assert base != build_query_cache_key(
+        index="registry", query="coral", size=10, roles=["a", "b"], subtype_filter="MODEL")
+    assert base != build_query_cache_key(
+        index="registry", query="coral", size=20, roles=["a", "b"])
+
+
+@pytest.mark.asyncio
+async def test_cache_hit() -> None:
+    cache = SearchQueryCache(ttl_seconds=60, max_entries=10)
+    calls: List[int] = []
+
+    def search() -> Dict[str, Any]:
+        calls.append(1)
+        return {"hits": {"hits": []}}
+
+    key = build_query_cache_key(
+        index="registry", query="coral", size=10, roles=[])
+    first = await cache.query(key=key, search=search)
+    second = await cache.query(key=key, search=search)
+
+    assert first == second
+    assert len(calls) == 1
+    metrics = cache.metrics()
+    assert metrics.cache_hits == 1
+    assert metrics.cache_misses == 1
+    assert metrics.upstream_request_count == 1
+    assert sum(b.count for b in metrics.upstream_latency_histogram) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_coalesce() -> None:
+    cache = SearchQueryCache(ttl_seconds=60, max_entries=10)
+    release = threading.Event()
+    calls: List[int] = []
+
+    def slow_search() -> Dict[str, Any]:
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"hits": {"hits": []}}
+
+    key = build_query_cache_key(
+        index="registry", query="coral", size=10, roles=[])
+    tasks = [asyncio.create_task(cache.query(key=key, search=slow_search))
+             for _ in range(5)]
+    # let all tasks reach the cache before the search completes
+    await asyncio.sleep(0.1)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert all(r == results[0] for r in results)
+    assert cache.metrics().coalesced_waits == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_propagate_and_are_not_cached() -> None:
+    cache = SearchQueryCache(ttl_seconds=60, max_entries=10)
+    release = threading.Event()
+
+    def failing_search() -> Dict[str, Any]:
+        release.wait(timeout=5)
+        raise Exception("Upstream failure")
+
+    key = build_query_cache_key(
+        index="registry", query="coral", size=10, roles=[])
+    tasks = [asyncio.create_task(cache.query(key=key, search=failing_search))
+             for _ in range(2)]
+    await asyncio.sleep(0.1)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(r, Exception) for r in results)
+    assert cache.metrics().upstream_failures == 1
+    assert cache.metrics().cached_entries == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_always_searches() -> None:
+    cache = SearchQueryCache(ttl_seconds=60, max_entries=10, enabled=False)
+    calls: List[int] = []
+
+    def search() -> Dict[str, Any]:
+        calls.append(1)
+        return {}
+
+    key = build_query_cache_key(
+        index="registry", query="coral", size=10, roles=[])
+    await cache.query(key=key, search=search)
+    await cache.query(key=key, search=search)
+    assert len(calls) == 2
@@ -0,0 +1,191 @@
+import tests.env_setup
+from typing import Any, Dict, List, Generator, Set
+import pytest
+from fastapi.testclient import TestClient
+from KeycloakFastAPI.Dependencies import User, ProtectedRole
+from ProvenaInterfaces.SearchAPI import *
+from config import Config, get_settings
+from dependencies.dependencies import search_entity_registry_protected_role_dependency
+from dependencies.open_search_client import get_search_client
+from dependencies.query_cache import get_query_cache
+from helpers.query_cache import SearchQueryCache
+from helpers.search_helpers import *
+import helpers.access_helpers as access_helpers
+from main import app
+
+config = Config(
+    search_domain="",
+    registry_index="registry",
+    global_index="global",
+    linearised_field="body",
+)
+
+client = TestClient(app)
+
+
+class FakeSearchClient():
+    # Records search bodies and returns a canned response
+    def __init__(self, response: Dict[str, Any]) -> None:
+        self.response = response
+        self.bodies: List[Dict[str, Any]] = []
+
+    def search(self, body: Dict[str, Any], index: Optional[str] = None) -> Dict[str, Any]:
+        self.bodies.append(body)
+        return self.response
+
+
+async def protected_role_override() -> ProtectedRole:
+    return ProtectedRole(
+        access_roles=['test-role'],
+        user=User(username="user", roles=['test-role'],
+                  access_token="faketoken1234", email="user@gmail.com")
+    )
+
+
+@pytest.fixture(scope="function")
+def fake_search() -> Generator[FakeSearchClient, None, None]:
+    fake = FakeSearchClient(response={
+        "hits": {"hits": [{
+            "_source": {
+                "id": "1234",
+                "projection": {"display_name": "Example", "item_subtype": "MODEL"}
+            },
+            "_score": 1.5
+        }]},
+        "aggregations": {
+            "record_type": {"buckets": [{"key": "COMPLETE_ITEM", "doc_count": 3}]}
+        }
+    })
+    app.dependency_overrides[get_settings] = lambda: config
+    app.dependency_overrides[get_search_client] = lambda: fake
+    app.dependency_overrides[get_query_cache] = lambda: SearchQueryCache(
+        ttl_seconds=60, max_entries=10)
+    app.dependency_overrides[search_entity_registry_protected_role_dependency] = protected_role_override
+    yield fake
+    app.dependency_overrides = {}
+
+
+def test_no_filters_leaves_query_unchanged() -> None:
+    body = linearised_query(match_text="coral", size=5, config=config)
+    original_query = body["query"]
+    assert with_structured_filters(
+        body=body, filters=StructuredSearchFilters())["query"] == original_query
+
+
+def test_structured_filter_clauses() -> None:
+    clauses = structured_filter_clauses(StructuredSearchFilters(
+        owner_username="user",
+        dataset_template_id="template",
+        created_after=100,
+        updated_before=200,
+    ))
+    assert {"term": {"structured.owner_username": "user"}} in clauses
+    assert {"term": {"structured.dataset_template_ids": "template"}} in clauses
+    assert {"range": {"structured.created_timestamp": {"gte": 100}}} in clauses
+    assert {"range": {"structured.updated_timestamp": {"lte": 200}}} in clauses
+    assert len(clauses) == 4
+
+
+def readable(ids: Set[str]) -> Any:
+    # replaces the registry access check with a fixed set of readable ids
+    async def metadata_readable_ids(**kwargs: Any) -> Set[str]:
+        return ids
+    return metadata_readable_ids
+
+
+def test_search_route_filters_and_facets(fake_search: FakeSearchClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(access_helpers, "metadata_readable_ids",
+                        readable({"1234"}))
+    response = client.get("/search/entity-registry", params={
+        "query": "  Coral  ",
+        "owner_username": "user",
+        "created_after": 100,
+        "facets": ["record_type", "item_subtype"],
+        "hydrate": True,
+    })
+    assert response.status_code == 200, response.text
+    results = QueryResults.parse_obj(response.json())
+
+    # the body sent to open search
+    body = fake_search.bodies[0]
+    assert body["query"]["bool"]["must"][0]["match"]["body"]["query"] == "coral"
+    assert {"term": {"structured.owner_username": "user"}
+            } in body["query"]["bool"]["filter"]
+    assert set(body["aggs"].keys()) == {"record_type", "item_subtype"}
+    assert body["_source"]["includes"] == ["id", SEARCH_PROJECTION_FIELD]
+
+    # the parsed response
+    assert results.results is not None
+    assert results.results[0].projection is not None
+    assert results.results[0].projection.display_name == "Example"
+    assert results.facets is not None
+    assert results.facets[SearchFacet.RECORD_TYPE] == [
+        FacetBucket(key="COMPLETE_ITEM", count=3)]
+    assert results.facets[SearchFacet.ITEM_SUBTYPE] == []
+
+
+def test_filters_match_metadata() -> None:
+    assert not filters_match_metadata(None)
+    assert not filters_match_metadata(StructuredSearchFilters(
+        item_category=ItemCategory.ENTITY, record_type=RecordType.COMPLETE_ITEM))
+    assert filters_match_metadata(
+        StructuredSearchFilters(owner_username="user"))
+    assert filters_match_metadata(StructuredSearchFilters(created_after=100))
+
+
+def test_search_route_metadata_filters_only_return_readable_items(fake_search: FakeSearchClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    # the owner filter would reveal who owns the item
+    monkeypatch.setattr(access_helpers, "metadata_readable_ids", readable(set()))
+    response = client.get("/search/entity-registry",
+                          params={"query": "coral", "owner_username": "other"})
+    assert response.status_code == 200, response.text
+    assert QueryResults.parse_obj(response.json()).results == []
+
+    # category and record type filters don't need an access check
+    response = client.get("/search/entity-registry",
+                          params={"query": "coral", "record_type": "COMPLETE_ITEM"})
+    assert response.status_code == 200, response.text
+    results = QueryResults.parse_obj(response.json()).results
+    assert results is not None and [r.id for r in results] == ["1234"]
+
+
+def test_search_route_rejects_metadata_facets(fake_search: FakeSearchClient) -> None:
+    response = client.get("/search/entity-registry",
+                          params={"query": "coral", "facets": ["owner_username"]})
+    assert response.status_code == 422
+
+
+def test_search_route_default_source(fake_search: FakeSearchClient) -> None:
+    response = client.get("/search/entity-registry", params={"query": "coral"})
+    assert response.status_code == 200, response.text
+    body = fake_search.bodies[0]
+    # unfiltered searches are not wrapped and only return ids
+    assert "bool" not in body["query"]
+    assert "aggs" not in body
+    assert body["_source"]["includes"] == ["id"]
+    assert QueryResults.parse_obj(
+        response.json()).results[0].projection is None  # type: ignore
+
+
+def test_search_route_hydrates_only_readable_items(fake_search: FakeSearchClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    # no metadata read access - the id is still returned but not the projection
+    monkeypatch.setattr(access_helpers, "metadata_readable_ids", readable(set()))
+    response = client.get("/search/entity-registry",
+                          params={"query": "coral", "hydrate": True})
+    assert response.status_code == 200, response.text
+    results = QueryResults.parse_obj(response.json())
+    assert results.results is not None
+    assert results.results[0].id == "1234"
+    assert results.results[0].projection is None
+    assert results.warnings is None
+
+
+def test_search_route_hydration_requires_access_check(fake_search: FakeSearchClient) -> None:
+    # the registry endpoint is not configured so access can't be checked
+    response = client.get("/search/entity-registry",
+                          params={"query": "coral", "hydrate": True})
+    assert response.status_code == 200, response.text
+    results = QueryResults.parse_obj(response.json())
+    assert results.results is not None
+    assert results.results[0].projection is None
+    assert results.warnings is not None and len(results.warnings) == 1
@@ -0,0 +1,84 @@
+import typer
+import os
+import logging
+from typing import Optional
+
+# Indexing throughput benchmark for the record streamer.
+#
+# Replays synthetic registry DynamoDB stream events through the real lambda
+# handler against either an in process OpenSearch stub (with optional latency
+# and failure injection) or a local OpenSearch container, e.g.
+#
+# docker run -p 9200:9200 -e "discovery.type=single-node" -e "DISABLE_SECURITY_PLUGIN=true" opensearchproject/opensearch:2
+# python benchmark.py --events 5000 --opensearch-url http://localhost:9200
+
+app = typer.Typer()
+
+
+@app.command()
+def benchmark(
+    events: int = typer.Option(
+        1000, help="The number of stream events to replay."),
+    batch_size: int = typer.Option(
+        100, help="Stream records per handler invocation (the event source mapping batch size)."),
+    remove_fraction: float = typer.Option(
+        0.0, help="Fraction of events which are REMOVE events."),
+    seed_fraction: float = typer.Option(
+        0.0, help="Fraction of events which are seed items."),
+    max_retries: int = typer.Option(
+        3, help="Retries of a partially failed batch before the remaining records are dropped."),
+    latency_ms: float = typer.Option(
+        0.0, help="Injected latency per request to the stub index."),
+    failure_rate: float = typer.Option(
+        0.0, help="Fraction of stub index requests which fail with a 500."),
+    opensearch_url: Optional[str] = typer.Option(
+        None, help="Target a local OpenSearch (e.g. http://localhost:9200) instead of the in process stub."),
+    index: str = typer.Option(
+        "benchmark-registry", help="The index to write to."),
+    random_seed: int = typer.Option(
+        42, help="Seed for the event mix and injected failures."),
+) -> None:
+    # the streamer reads its config and AWS credentials at import time
+    os.environ.setdefault("SEARCH_DOMAIN_NAME",
+                          opensearch_url or "http://stub-opensearch")
+    os.environ.setdefault("SEARCH_INDEX", index)
+    os.environ.setdefault("RECORD_ID_FIELD", "id")
+    os.environ.setdefault("ITEM_TYPE", "REGISTRY_ITEM")
+    os.environ.setdefault("LINEARISED_FIELD", "fields")
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+
+    import requests
+    import lambda_function
+    from helpers.benchmark import StubOpenSearch, RecordingRequests, generate_stream_events, run_stream
+
+    # per record logging would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"Generating {events} stream events...")
+    stream_events = generate_stream_events(
+        count=events,
+        remove_fraction=remove_fraction,
+        seed_fraction=seed_fraction,
+        random_seed=random_seed
+    )
+
+    backend = requests if opensearch_url else StubOpenSearch(
+        latency_ms=latency_ms, failure_rate=failure_rate, random_seed=random_seed)
+    recorder = RecordingRequests(backend=backend)
+    lambda_function.requests = recorder  # type: ignore
+
+    print(
+        f"Replaying against {opensearch_url or 'in process stub'} (index {lambda_function.index})...")
+    report = run_stream(
+        handler=lambda_function.handler,
+        events=stream_events,
+        batch_size=batch_size,
+        max_retries=max_retries,
+        recorder=recorder
+    )
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    app()
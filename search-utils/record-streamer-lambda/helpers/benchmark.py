@@ -0,0 +1,357 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import requests
+from boto3.dynamodb.types import TypeSerializer  # type: ignore
+from ProvenaInterfaces.RegistryModels import *
+from ProvenaInterfaces.TestConfig import route_params
+
+# Lambda handler signature of the record streamer
+StreamHandler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+
+BENCHMARK_OWNER = "benchmark-user"
+
+
+# ===============
+# Event factories
+# ===============
+
+
+def build_registry_item(params_index: int, item_number: int, seed: bool = False) -> Dict[str, Any]:
+    """
+
+    Builds a valid registry item (as stored in the registry table) from the
+    model examples in the shared test config.
+
+    Args:
+        params_index (int): Index into the test config route params (selects the subtype)
+        item_number (int): Unique number used to derive the id
+        seed (bool, optional): Produce a seed item rather than complete item. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: The JSON compatible item
+    """
+    params = route_params[params_index % len(route_params)]
+    now = int(time.time())
+    record_info: Dict[str, Any] = {
+        "id": f"10378.1/benchmark-{item_number}",
+        "owner_username": BENCHMARK_OWNER,
+        "created_timestamp": now,
+        "updated_timestamp": now,
+        "item_category": params.category.value,
+        "item_subtype": params.subtype.value,
+        "record_type": RecordType.SEED_ITEM.value if seed else RecordType.COMPLETE_ITEM.value,
+    }
+    if seed:
+        return json.loads(SeededItem.parse_obj(record_info).json(exclude_none=True))
+
+    domain_info = params.model_examples.domain_info[0]
+    model_type = MODEL_TYPE_MAP[(params.category, params.subtype)]
+    item = model_type.parse_obj({
+        **domain_info.dict(),
+        **record_info,
+        "history": [{
+            "id": 0,
+            "timestamp": now,
+            "reason": "Benchmark item",
+            "username": BENCHMARK_OWNER,
+            "item": domain_info.dict()
+        }]
+    })
+    return json.loads(item.json(exclude_none=True))
+
+
+def to_dynamo_image(item: Dict[str, Any]) -> Dict[str, Any]:
+    # dynamo does not support floats - the registry stores them as decimals
+    serializer = TypeSerializer()
+    safe = json.loads(json.dumps(item), parse_float=Decimal)
+    return {k: serializer.serialize(v) for k, v in safe.items()}
+
+
+def build_stream_record(item: Dict[str, Any], event_name: str, sequence_number: int) -> Dict[str, Any]:
+    """
+
+    Wraps a registry item in the DynamoDB stream record format delivered to the
+    streamer lambda.
+
+    Args:
+        item (Dict[str, Any]): The registry item
+        event_name (str): INSERT, MODIFY or REMOVE
+        sequence_number (int): The stream sequence number
+
+    Returns:
+        Dict[str, Any]: The stream record
+    """
+    image = to_dynamo_image(item)
+    dynamodb: Dict[str, Any] = {
+        "Keys": {"id": image["id"]},
+        "SequenceNumber": str(sequence_number),
+        "StreamViewType": "NEW_AND_OLD_IMAGES",
+    }
+    if event_name == "REMOVE":
+        dynamodb["OldImage"] = image
+    else:
+        dynamodb["NewImage"] = image
+    return {
+        "eventID": str(uuid.uuid4()),
+        "eventName": event_name,
+        "eventSource": "aws:dynamodb",
+        "dynamodb": dynamodb,
+    }
+
+
+def generate_stream_events(count: int, remove_fraction: float = 0.0, seed_fraction: float = 0.0, random_seed: int = 42) -> List[Dict[str, Any]]:
+    """
+
+    Generates synthetic stream records cycling through every registry subtype.
+
+    Args:
+        count (int): Number of records
+        remove_fraction (float, optional): Fraction of REMOVE events. Defaults to 0.0.
+        seed_fraction (float, optional): Fraction of seed items. Defaults to 0.0.
+        random_seed (int, optional): Seed for reproducible event mixes. Defaults to 42.
+
+    Returns:
+        List[Dict[str, Any]]: The stream records in sequence order
+    """
+    rng = random.Random(random_seed)
+    events: List[Dict[str, Any]] = []
+    # items are built once per subtype/seed combination and then re-identified
+    templates: Dict[Tuple[int, bool], Dict[str, Any]] = {}
+    for i in range(count):
+        params_index = i % len(route_params)
+        seed = rng.random() < seed_fraction
+        template = templates.get((params_index, seed))
+        if template is None:
+            template = build_registry_item(
+                params_index=params_index, item_number=i, seed=seed)
+            templates[(params_index, seed)] = template
+        item = {**template, "id": f"10378.1/benchmark-{i}"}
+        event_name = "REMOVE" if rng.random() < remove_fraction else "INSERT"
+        events.append(build_stream_record(
+            item=item, event_name=event_name, sequence_number=i))
+    return events
+
+
+# =====================
+# Index request backends
+# =====================
+
+
+class StubResponse():
+    def __init__(self, status_code: int, url: str) -> None:
+        self.status_code = status_code
+        self.url = url
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self.status_code} Stub error for url: {self.url}")
+
+
+class StubOpenSearch():
+    """
+
+    In process stand in for the OpenSearch document API. Stores documents in
+    memory and can inject latency and failures.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, failure_rate: float = 0.0, random_seed: int = 42) -> None:
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.rng = random.Random(random_seed)
+        self.documents: Dict[str, Any] = {}
+
+    def respond(self, url: str) -> Optional[StubResponse]:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+        if self.rng.random() < self.failure_rate:
+            return StubResponse(status_code=500, url=url)
+        return None
+
+    def put(self, url: str, json: Any = None, **kwargs: Any) -> StubResponse:
+        failure = self.respond(url)
+        if failure:
+            return failure
+        self.documents[url.rsplit('/', 1)[-1]] = json
+        return StubResponse(status_code=201, url=url)
+
+    def delete(self, url: str, **kwargs: Any) -> StubResponse:
+        failure = self.respond(url)
+        if failure:
+            return failure
+        self.documents.pop(url.rsplit('/', 1)[-1], None)
+        return StubResponse(status_code=200, url=url)
+
+    def post(self, url: str, data: Any = None, **kwargs: Any) -> StubResponse:
+        # bulk requests are accepted but only counted
+        failure = self.respond(url)
+        if failure:
+            return failure
+        return StubResponse(status_code=200, url=url)
+
+
+@dataclass
+class IndexRequestStats():
+    requests: int = 0
+    failed_requests: int = 0
+    # documents carried by each request (1 for single document requests)
+    documents_per_request: List[int] = field(default_factory=list)
+    latencies_ms: List[float] = field(default_factory=list)
+
+
+def bulk_document_count(data: Any) -> int:
+    # bulk bodies are NDJSON with an action line per document (plus source
+    # lines for index operations)
+    if data is None:
+        return 0
+    text = data.decode('utf-8') if isinstance(data, bytes) else str(data)
+    actions = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        parsed = json.loads(line)
+        if isinstance(parsed, dict) and len(parsed) == 1 and next(iter(parsed)) in ("index", "create", "update", "delete"):
+            actions += 1
+    return actions
+
+
+class RecordingRequests():
+    """
+
+    Replacement for the requests module used by the streamer which forwards to
+    a backend (the real requests module or a StubOpenSearch) and records
+    request counts, latencies and documents per request.
+    """
+    exceptions = requests.exceptions
+
+    def __init__(self, backend: Any) -> None:
+        self.backend = backend
+        self.stats = IndexRequestStats()
+
+    def record(self, call: Callable[[], Any], documents: int) -> Any:
+        start = time.perf_counter()
+        response = call()
+        self.stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+        self.stats.requests += 1
+        self.stats.documents_per_request.append(documents)
+        if response.status_code >= 400:
+            self.stats.failed_requests += 1
+        return response
+
+    def put(self, url: str, **kwargs: Any) -> Any:
+        return self.record(lambda: self.backend.put(url, **kwargs), documents=1)
+
+    def delete(self, url: str, **kwargs: Any) -> Any:
+        return self.record(lambda: self.backend.delete(url, **kwargs), documents=1)
+
+    def post(self, url: str, **kwargs: Any) -> Any:
+        documents = bulk_document_count(
+            kwargs.get('data')) if url.rstrip('/').endswith('_bulk') else 1
+        return self.record(lambda: self.backend.post(url, **kwargs), documents=documents)
+
+
+# ================
+# Stream simulation
+# ================
+
+
+@dataclass
+class BenchmarkReport():
+    events: int
+    batch_size: int
+    duration_seconds: float
+    invocations: int
+    retried_invocations: int
+    reprocessed_events: int
+    dropped_events: int
+    index_stats: IndexRequestStats
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        stats = self.index_stats
+        docs = stats.documents_per_request or [0]
+        latencies = sorted(stats.latencies_ms) or [0.0]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return f"""
+    Events: {self.events} (stream batch size {self.batch_size})
+    Duration: {self.duration_seconds:.2f}s
+    Throughput: {self.events_per_second:.1f} events/s
+
+    Handler invocations: {self.invocations}
+    Retried invocations: {self.retried_invocations}
+    Reprocessed events: {self.reprocessed_events}
+    Dropped events (retries exhausted): {self.dropped_events}
+
+    Index requests: {stats.requests} ({stats.failed_requests} failed)
+    Documents per request: mean {statistics.mean(docs):.1f}, max {max(docs)}
+    Request latency: p50 {statistics.median(latencies):.2f}ms, p95 {p95:.2f}ms
+    """
+
+
+def run_stream(handler: StreamHandler, events: List[Dict[str, Any]], batch_size: int, max_retries: int, recorder: RecordingRequests) -> BenchmarkReport:
+    """
+
+    Feeds the events through the handler in stream batches. Partial batch
+    failures are retried the way Lambda does with ReportBatchItemFailures -
+    the batch is checkpointed at the earliest failed record and redelivered
+    from there.
+
+    Args:
+        handler (StreamHandler): The streamer lambda handler
+        events (List[Dict[str, Any]]): The stream records
+        batch_size (int): Records per invocation
+        max_retries (int): Retry attempts per batch before records are dropped
+        recorder (RecordingRequests): The request recorder installed in the streamer
+
+    Returns:
+        BenchmarkReport: The results
+    """
+    invocations = 0
+    retried = 0
+    reprocessed = 0
+    dropped = 0
+
+    start = time.perf_counter()
+    for offset in range(0, len(events), batch_size):
+        batch = events[offset:offset + batch_size]
+        attempt = 0
+        while True:
+            invocations += 1
+            response = handler({"Records": batch}, None)
+            failed_ids = set(
+                failure['itemIdentifier'] for failure in response.get('batchItemFailures', [])
+            )
+            if len(failed_ids) == 0:
+                break
+
+            # checkpoint at the earliest failure
+            first_failure = next(i for i, record in enumerate(
+                batch) if record['eventID'] in failed_ids)
+            batch = batch[first_failure:]
+
+            if attempt >= max_retries:
+                dropped += len(batch)
+                break
+            attempt += 1
+            retried += 1
+            reprocessed += len(batch)
+
+    return BenchmarkReport(
+        events=len(events),
+        batch_size=batch_size,
+        duration_seconds=time.perf_counter() - start,
+        invocations=invocations,
+        retried_invocations=retried,
+        reprocessed_events=reprocessed,
+        dropped_events=dropped,
+        index_stats=recorder.stats,
+    )
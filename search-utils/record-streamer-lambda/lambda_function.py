@@ -7,6 +7,7 @@ from config import config, SearchableObject
 from requests_aws4auth import AWS4Auth  # type: ignore
 import json
 from ProvenaInterfaces.RegistryModels import *
+from ProvenaInterfaces.SearchAPI import SEARCH_PROJECTION_FIELD, SEARCH_STRUCTURED_FIELD, SearchResultProjection, StructuredSearchFields, build_search_projection, build_structured_fields
 
 # setup credentials for https requests to the search domain
 region = config.aws_region
@@ -41,10 +42,19 @@ FAIL_ON_DELETE_ISSUE = False
 FAIL_ON_INDEX_ISSUE = True
 
 
-def linearise_search_object(object: Dict[str, str]) -> Dict[str, str]:
+def linearise_search_object(object: Dict[str, str], projection: Optional[SearchResultProjection] = None, structured: Optional[StructuredSearchFields] = None) -> Dict[str, Any]:
     # retains item subtype if present
     output = " ".join(object.values())
-    return {config.linearised_field: output, "item_subtype": object.get("item_subtype") or "", "id": object.get("id") or ""}
+    linearised: Dict[str, Any] = {config.linearised_field: output, "item_subtype": object.get(
+        "item_subtype") or "", "id": object.get("id") or ""}
+    # store the compact projection so hydrated searches can render results
+    # without fetching from the registry
+    if projection is not None:
+        linearised[SEARCH_PROJECTION_FIELD] = projection.dict()
+    # typed fields used for filtering and facets
+    if structured is not None:
+        linearised[SEARCH_STRUCTURED_FIELD] = structured.dict()
+    return linearised
 
 
 def delete_document_from_index(id: str, event_id: str, error_ids: List[str]) -> bool:
@@ -70,7 +80,7 @@ def delete_document_from_index(id: str, event_id: str, error_ids: List[str]) ->
     return True
 
 
-def lodge_document_into_index(id: str, event_id: str, object: Dict[str, str], error_ids: List[str]) -> bool:
+def lodge_document_into_index(id: str, event_id: str, object: Dict[str, Any], error_ids: List[str]) -> bool:
     try:
         response = requests.put(url + id, auth=awsauth,
                                 json=object, headers=headers)
@@ -206,6 +216,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
             # ready to pull out search object
             search_object: Dict[str, str] = {}
+            projection: Optional[SearchResultProjection] = None
+            structured: Optional[StructuredSearchFields] = None
+            # the fully parsed item (not present for seed items)
+            parsed_item: Optional[BaseModel] = None
 
             # now parse as the desired object type
             if config.item_type == SearchableObject.REGISTRY_ITEM:
@@ -280,6 +294,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     # get the searchable object
                     try:
                         search_object = full_item.get_search_ready_object()
+                        parsed_item = full_item
                     except Exception as e:
                         fail_with_error(
                             id=event_id,
@@ -297,6 +312,22 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     index_fail_count += 1
                     continue
 
+                # build the compact projection used by hydrated searches and the
+                # typed fields used by filtered searches
+                try:
+                    projection = build_search_projection(
+                        record_info=record_info,
+                        search_object=search_object
+                    )
+                    structured = build_structured_fields(
+                        record_info=record_info,
+                        item=parsed_item
+                    )
+                except Exception as e:
+                    # the projection is an optimisation - still index the item
+                    log.warning(
+                        f"Failed to build search projection or structured fields for item with {id = }, indexing without them. Error {e}.")
+
                 # lodge the search object
                 log.debug("Parsed searchable item - ready to lodge")
                 try:
@@ -311,7 +342,8 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 continue
 
             # linearise item to simplify search query and allow for fuzziness etc
-            linearised = linearise_search_object(object=search_object)
+            linearised = linearise_search_object(
+                object=search_object, projection=projection, structured=structured)
             # lodge the item
             success = lodge_document_into_index(
                 id=sanitized_id,
@@ -1,10 +1,15 @@
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 import requests
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from jose import JWTError, jwt
 from jose.constants import ALGORITHMS
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 
 class TokenData(BaseModel):
@@ -95,27 +100,251 @@ def retrieve_keycloak_public_key(auth_endpoint: str):
         raise err
 
 
+def keycloak_jwks_url(keycloak_endpoint: str) -> str:
+    # the realm's signing keys - keycloak_endpoint is the realm endpoint
+    return f"{keycloak_endpoint.rstrip('/')}/protocol/openid-connect/certs"
+
+
+class JwksClient():
+    """
+    Provides the realm's token signing keys from its JWKS endpoint, cached by
+    key id (kid).
+
+    Keys are fetched lazily on first use and then refreshed in the background
+    every refresh_interval_seconds. A token signed with an unknown kid (e.g.
+    after keycloak rotates its keys) triggers an immediate refresh, at most
+    once every min_refresh_interval_seconds so that bad tokens can't flood
+    keycloak.
+    """
+
+    def __init__(self, jwks_url: str, refresh_interval_seconds: float = 3600, min_refresh_interval_seconds: float = 30, timeout: float = 3) -> None:
+        self.jwks_url = jwks_url
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self.timeout = timeout
+
+        # kid -> JWK
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        # monotonic time of the last refresh attempt, if any
+        self.last_refresh: Optional[float] = None
+        self.lock = threading.Lock()
+        self.refresh_thread: Optional[threading.Thread] = None
+
+    def fetch_keys(self) -> Dict[str, Dict[str, Any]]:
+        error_message = f"Error fetching signing keys from keycloak endpoint {self.jwks_url}."
+        try:
+            r = requests.get(self.jwks_url, timeout=self.timeout)
+            r.raise_for_status()
+            keys = r.json()['keys']
+        except Exception as e:
+            print(error_message)
+            print("Error:", e)
+            raise e
+        return {key['kid']: key for key in keys if key.get('use', 'sig') == 'sig' and 'kid' in key}
+
+    def refresh(self, force: bool) -> None:
+        """
+        Refetches the keys unless they were fetched within the minimum refresh
+        interval (or the refresh interval, if not forced). Keys are kept if
+        the fetch fails.
+        """
+        with self.lock:
+            now = time.monotonic()
+            min_interval = self.min_refresh_interval_seconds if force else self.refresh_interval_seconds
+            if self.last_refresh is not None and now - self.last_refresh < min_interval:
+                return
+            self.last_refresh = now
+            try:
+                self.keys = self.fetch_keys()
+            except Exception:
+                # keep using the current keys
+                pass
+            self.start_background_refresh()
+
+    def start_background_refresh(self) -> None:
+        if self.refresh_thread is not None:
+            return
+        self.refresh_thread = threading.Thread(
+            target=self.background_refresh, name="jwks-refresh", daemon=True)
+        self.refresh_thread.start()
+
+    def background_refresh(self) -> None:
+        while True:
+            time.sleep(self.refresh_interval_seconds)
+            self.refresh(force=False)
+
+    def get_cached_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        The key for the kid if it is already known - never fetches. Tokens
+        without a kid use the only key, if there is exactly one.
+        """
+        keys = self.keys
+        if kid is None:
+            return next(iter(keys.values())) if len(keys) == 1 else None
+        return keys.get(kid)
+
+    def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        The key for the kid, fetching the keys if it is not known (subject to
+        the minimum refresh interval). This blocks while fetching.
+        """
+        key = self.get_cached_key(kid)
+        if key is None:
+            self.refresh(force=True)
+            key = self.get_cached_key(kid)
+        return key
+
+
+class VerifiedTokenCache():
+    """
+    A bounded LRU cache of the payloads of tokens which have already been
+    decoded and verified, keyed by a hash of the raw token. Entries are only
+    returned until the token expires, so repeat calls with the same token skip
+    signature verification but expired tokens are still rejected.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        # token hash -> (payload, exp)
+        self.entries: OrderedDict[str, Tuple[Dict[Any, Any], float]] = OrderedDict()
+
+    @staticmethod
+    def token_key(raw_token: str) -> str:
+        return hashlib.sha256(raw_token.encode('utf-8')).hexdigest()
+
+    def get(self, raw_token: str) -> Optional[Dict[Any, Any]]:
+        key = self.token_key(raw_token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            payload, exp = entry
+            if time.time() >= exp:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return payload
+
+    def put(self, raw_token: str, payload: Dict[Any, Any]) -> None:
+        exp = payload.get("exp")
+        # tokens without an expiry are not cached
+        if self.max_size <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self.token_key(raw_token)
+        with self.lock:
+            self.entries[key] = (payload, float(exp))
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+
 class KeycloakAuth():
 
-    def __init__(self, keycloak_endpoint: Optional[str] = None, test_mode: bool = False):
+    def __init__(self, keycloak_endpoint: Optional[str] = None, test_mode: bool = False, verified_token_cache_size: int = 1024, jwks_refresh_interval_seconds: float = 3600, jwks_min_refresh_interval_seconds: float = 30):
         # Establish the kc endpoint
         self.keycloak_endpoint = keycloak_endpoint
 
         # are we in test mode?
         self._test_mode = test_mode
 
-        # Get public key from keycloak endpoint
+        # Signing keys come from the realm's JWKS endpoint - these are only
+        # fetched when the first token is validated
+        self.jwks: Optional[JwksClient] = None
         if not test_mode:
             assert keycloak_endpoint, "In non test mode, must supply keycloak endpoint so that the public key can be identified"
-            self.public_key = retrieve_keycloak_public_key(
-                self.keycloak_endpoint)
-        else:
-            self.public_key = ""
+            self.jwks = JwksClient(
+                jwks_url=keycloak_jwks_url(keycloak_endpoint),
+                refresh_interval_seconds=jwks_refresh_interval_seconds,
+                min_refresh_interval_seconds=jwks_min_refresh_interval_seconds
+            )
 
         # Setup the authorisation scheme
         self.token_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+        # Tokens which have already been verified
+        self.verified_tokens = VerifiedTokenCache(
+            max_size=verified_token_cache_size)
+
+        # The dependency callables are built once so that FastAPI can reuse
+        # dependency results within a request (it caches by callable) - the
+        # token is then only decoded once per request
+        self.token_dependency = self.build_token_dependency()
+        self.user_dependency = self.build_user_dependency()
+        self.any_protected_role_dependencies: Dict[Tuple[str, ...], Callable] = {}
+        self.all_protected_role_dependencies: Dict[Tuple[str, ...], Callable] = {}
+
+    async def get_signing_key(self, raw_token: str) -> Any:
+        """
+        The key which signed the token (by its kid). Raises JWTError if it
+        is not one of the realm's keys.
+        """
+        if self.jwks is None:
+            # signatures are not verified in test mode
+            return ""
+        kid = jwt.get_unverified_header(raw_token).get("kid")
+        key = self.jwks.get_cached_key(kid)
+        if key is None:
+            # fetching the keys blocks
+            key = await run_in_threadpool(self.jwks.get_key, kid)
+        if key is None:
+            raise JWTError(f"Token signing key {kid} is not known.")
+        return key
+
+    async def decode_token(self, raw_token: str) -> Dict[Any, Any]:
+        """
+        Decodes and validates the raw token, reusing the result for tokens
+        which have already been verified (until they expire).
+
+        Raises JWTError if the token is invalid.
+        """
+        jwt_payload = self.verified_tokens.get(raw_token)
+        if jwt_payload is not None:
+            return jwt_payload
+
+        # this is currently locally validating the token
+        # It is our responsibility to choose whether to honour the expiration date
+        # etc
+        jwt_payload = jwt.decode(
+            raw_token,
+            await self.get_signing_key(raw_token),
+            algorithms=[ALGORITHMS.RS256],
+            options={
+                # only verify signature if not in test mode
+                "verify_signature": not self._test_mode,
+                "verify_aud": False,
+                # always validate expiry
+                "exp": True
+            }
+        )
+        self.verified_tokens.put(raw_token, jwt_payload)
+        return jwt_payload
+
     def get_token_dependency(self):
+        return self.token_dependency
+
+    def get_user_dependency(self):
+        return self.user_dependency
+
+    def get_any_protected_role_dependency(self, allowed_roles: List[str]):
+        key = tuple(allowed_roles)
+        dependency = self.any_protected_role_dependencies.get(key)
+        if dependency is None:
+            dependency = self.build_any_protected_role_dependency(
+                allowed_roles=list(allowed_roles))
+            self.any_protected_role_dependencies[key] = dependency
+        return dependency
+
+    def get_all_protected_role_dependency(self, required_roles: List[str]):
+        key = tuple(required_roles)
+        dependency = self.all_protected_role_dependencies.get(key)
+        if dependency is None:
+            dependency = self.build_all_protected_role_dependency(
+                required_roles=list(required_roles))
+            self.all_protected_role_dependencies[key] = dependency
+        return dependency
+
+    def build_token_dependency(self):
         async def get_token(raw_token: str = Depends(self.token_scheme)):
             """
             Function Description
@@ -160,21 +389,7 @@ class KeycloakAuth():
             )
 
             try:
-                # this is currently locally validating the token
-                # It is our responsibility to choose whether to honour the expiration date
-                # etc
-                jwt_payload = jwt.decode(
-                    raw_token,
-                    self.public_key,
-                    algorithms=[ALGORITHMS.RS256],
-                    options={
-                        # only verify signature if not in test mode
-                        "verify_signature": not self._test_mode,
-                        "verify_aud": False,
-                        # always validate expiry
-                        "exp": True
-                    }
-                )
+                jwt_payload = await self.decode_token(raw_token)
                 token_data = TokenData(
                     token_data=jwt_payload,
                     access_token=raw_token,
@@ -186,8 +401,8 @@ class KeycloakAuth():
             return token_data
         return get_token
 
-    def get_user_dependency(self):
-        async def get_user(token_data: TokenData = Depends(self.get_token_dependency())):
+    def build_user_dependency(self):
+        async def get_user(token_data: TokenData = Depends(self.token_dependency)):
             """
             Function Description
             --------------------
@@ -243,8 +458,8 @@ class KeycloakAuth():
             return User(username=username, roles=roles, access_token=token_data.access_token, email=email)
         return get_user
 
-    def get_any_protected_role_dependency(self, allowed_roles: List[str]):
-        async def get_protected_role(user: User = Depends(self.get_user_dependency())) -> ProtectedRole:
+    def build_any_protected_role_dependency(self, allowed_roles: List[str]):
+        async def get_protected_role(user: User = Depends(self.user_dependency)) -> ProtectedRole:
             """
             Function Description
             --------------------
@@ -297,8 +512,8 @@ class KeycloakAuth():
                 raise credentials_exception
         return get_protected_role
 
-    def get_all_protected_role_dependency(self, required_roles: List[str]):
-        async def get_protected_role(user: User = Depends(self.get_user_dependency())) -> ProtectedRole:
+    def build_all_protected_role_dependency(self, required_roles: List[str]):
+        async def get_protected_role(user: User = Depends(self.user_dependency)) -> ProtectedRole:
             """
             Function Description
             --------------------
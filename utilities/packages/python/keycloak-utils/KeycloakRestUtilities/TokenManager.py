@@ -1,12 +1,15 @@
 import webbrowser
 from ProvenaInterfaces.DataStoreAPI import *
 import requests as rq
+import os
+import threading
 import time
 from jose import jwt  # type: ignore
 from jose.constants import ALGORITHMS  # type: ignore
 from KeycloakRestUtilities.Token import BearerAuth
 from pydantic import BaseModel
 from enum import Enum
+from dataclasses import dataclass
 
 
 # Model for storing and serialising tokens
@@ -28,6 +31,20 @@ class StageTokens(BaseModel):
 
 LOCAL_STORAGE_DEFAULT = ".tokens.json"
 
+# Access tokens are refreshed in the background once they have less than this
+# long remaining, and are not used within EXPIRY_MARGIN_DEFAULT of expiry
+REFRESH_AHEAD_DEFAULT = 60
+EXPIRY_MARGIN_DEFAULT = 10
+# How long to wait after a failed background refresh before trying again
+BACKGROUND_RETRY_SECONDS = 5
+
+
+@dataclass
+class ValidatedToken:
+    # The access token which passed validation and its exp claim
+    access_token: str
+    expiry: float
+
 
 class DeviceFlowManager:
     def __init__(
@@ -37,7 +54,9 @@ class DeviceFlowManager:
         client_id: str = "admin-tools",
         local_storage_location: str = LOCAL_STORAGE_DEFAULT,
         scopes: List[str] = [],
-        token_refresh: bool = False
+        token_refresh: bool = False,
+        refresh_ahead_seconds: float = REFRESH_AHEAD_DEFAULT,
+        expiry_margin_seconds: float = EXPIRY_MARGIN_DEFAULT
     ) -> None:
         """    __init__
             Generates a helper class for managing authorisation. 
@@ -48,6 +67,12 @@ class DeviceFlowManager:
             as required. You can use this in the requests auth argument to enable dynamic token 
             generation as required (even through multiple refreshes).
 
+            Once validated, the access token is reused from memory until it nears
+            expiry - it is refreshed in a background thread when it has less than
+            refresh_ahead_seconds remaining. Local storage is only read/written
+            when tokens are generated or refreshed. The manager can be shared
+            across threads.
+
             Arguments
             ----------
             stage : str
@@ -64,6 +89,12 @@ class DeviceFlowManager:
                 The scopes, by default []
             token_refresh: bool 
                 Force an invalidation of cached credentials, by default False.
+            refresh_ahead_seconds : float, optional
+                Refresh the access token in the background once it has less than
+                this many seconds remaining, by default 60
+            expiry_margin_seconds : float, optional
+                Don't use an access token within this many seconds of expiry,
+                by default 10
 
             See Also (optional)
             --------
@@ -78,6 +109,19 @@ class DeviceFlowManager:
         self.stage_tokens: Optional[Tokens] = None
         self.public_key: Optional[str] = None
         self.scopes: List[str] = scopes
+        self.tokens: Optional[Tokens] = None
+
+        # in memory validation state
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.validated_token: Optional[ValidatedToken] = None
+
+        # held while validating/replacing tokens - re-entrant as token
+        # generation refreshes and validates
+        self.lock = threading.RLock()
+        self.background_refresh: Optional[threading.Thread] = None
+        self.next_background_refresh: float = 0.0
+        self.state_lock = threading.Lock()
 
         # pull out stage
         try:
@@ -224,9 +268,12 @@ class DeviceFlowManager:
             )
             existing_tokens.stages[stage] = self.tokens
 
-        # Dump the file into storage
-        with open(self.token_storage_location, 'w') as f:
+        # Dump the file into storage - replace rather than overwrite in place
+        # so concurrent readers never see a partial file
+        temporary_location = f"{self.token_storage_location}.{os.getpid()}.tmp"
+        with open(temporary_location, 'w') as f:
             f.write(existing_tokens.json())
+        os.replace(temporary_location, self.token_storage_location)
 
     def get_tokens(self) -> None:
         """    get_tokens
@@ -422,6 +469,10 @@ class DeviceFlowManager:
             Also performs a refresh if the token has expired.
             Will try to sign back in if the refresh fails.  
 
+            A previously validated access token is returned from memory
+            (starting a background refresh if it is close to expiry), so
+            repeated calls are cheap.
+
             Returns
             -------
              : BearerAuth
@@ -441,29 +492,112 @@ class DeviceFlowManager:
             Examples (optional)
             --------
         """
-        # make auth object using access_token
-        if (self.tokens is None or self.public_key is None):
-            raise Exception(
-                "cannot generate bearer auth object without access token or public key")
+        # fast path - token already validated and not near expiry
+        access_token = self.cached_access_token()
+        if access_token is not None:
+            return BearerAuth(token=access_token)
 
-        assert self.tokens
-        assert self.public_key
+        with self.lock:
+            # another thread may have refreshed while we waited
+            access_token = self.cached_access_token()
+            if access_token is not None:
+                return BearerAuth(token=access_token)
+
+            # make auth object using access_token
+            if (self.tokens is None or self.public_key is None):
+                raise Exception(
+                    "cannot generate bearer auth object without access token or public key")
+
+            assert self.tokens
+            assert self.public_key
 
-        try:
-            self.validate_token()
-        except Exception as e:
-            print(f"Token validation failed due to error: {e}")
             try:
-                self.perform_token_refresh()
-                self.validate_token()
+                access_token = self.validate_current_token()
             except Exception as e:
+                print(f"Token validation failed due to error: {e}")
                 try:
-                    self.get_tokens()
-                    self.validate_token()
+                    self.perform_token_refresh()
+                    access_token = self.validate_current_token()
                 except Exception as e:
-                    raise Exception(
-                        f"Device log in failed, access token expired/invalid, and refresh failed. Error: {e}")
-        return BearerAuth(token=self.tokens.access_token)
+                    try:
+                        self.get_tokens()
+                        access_token = self.validate_current_token()
+                    except Exception as e:
+                        raise Exception(
+                            f"Device log in failed, access token expired/invalid, and refresh failed. Error: {e}")
+            return BearerAuth(token=access_token)
+
+    def cached_access_token(self) -> Optional[str]:
+        """    cached_access_token
+            Returns the current access token if it has already been
+            validated and is not within the expiry margin, without
+            blocking. Starts a background refresh if the token is within
+            refresh_ahead_seconds of expiry.
+
+            Returns
+            -------
+             : Optional[str]
+                The access token, None if it needs (re)validation
+        """
+        tokens = self.tokens
+        validated = self.validated_token
+        if tokens is None or validated is None or validated.access_token != tokens.access_token:
+            return None
+
+        remaining = validated.expiry - time.time()
+        if remaining <= self.expiry_margin_seconds:
+            return None
+        if remaining <= self.refresh_ahead_seconds:
+            self.start_background_refresh()
+        return tokens.access_token
+
+    def validate_current_token(self) -> str:
+        """    validate_current_token
+            Validates the instance's access token, which must not be
+            within the expiry margin.
+
+            Returns
+            -------
+             : str
+                The validated access token
+
+            Raises
+            ------
+            Exception
+                If the token is invalid or about to expire
+        """
+        self.validate_token()
+        access_token = self.cached_access_token()
+        if access_token is None:
+            raise Exception("Access token is about to expire.")
+        return access_token
+
+    def start_background_refresh(self) -> None:
+        with self.state_lock:
+            if self.background_refresh is not None or time.time() < self.next_background_refresh:
+                return
+            self.background_refresh = threading.Thread(
+                target=self.run_background_refresh, name="token-refresh", daemon=True)
+            self.background_refresh.start()
+
+    def run_background_refresh(self) -> None:
+        succeeded = False
+        try:
+            with self.lock:
+                validated = self.validated_token
+                # check that a refresh is still due
+                if validated is None or validated.expiry - time.time() <= self.refresh_ahead_seconds:
+                    self.perform_token_refresh()
+                    self.validate_token()
+            succeeded = True
+        except Exception as e:
+            # get_auth will refresh (or sign in again) once the token expires
+            print(f"Background token refresh failed due to error: {e}")
+        finally:
+            with self.state_lock:
+                self.background_refresh = None
+                if not succeeded:
+                    self.next_background_refresh = time.time() + BACKGROUND_RETRY_SECONDS
 
     def retrieve_keycloak_public_key(self) -> None:
         """
@@ -638,3 +772,12 @@ class DeviceFlowManager:
                 "exp": True
             }
         )
+
+        # remember the validated token so get_auth can skip validation until
+        # it nears expiry
+        expiry = jwt_payload.get('exp')
+        if isinstance(expiry, (int, float)):
+            self.validated_token = ValidatedToken(
+                access_token=test_tokens.access_token,
+                expiry=float(expiry)
+            )
@@ -17,17 +17,22 @@ class JobsUserActions(str, Enum):
     FETCH = "FETCH"
     LIST = "LIST"
     LIST_BATCH = "LIST_BATCH"
+    STREAM = "STREAM"
+    BATCH_SUMMARY = "BATCH_SUMMARY"
 
 
 JOBS_USER_ACTIONS_MAP: Dict[JobsUserActions, str] = {
     JobsUserActions.FETCH: "/fetch",
     JobsUserActions.LIST: "/list",
     JobsUserActions.LIST_BATCH: "/list_batch",
+    JobsUserActions.STREAM: "/stream",
+    JobsUserActions.BATCH_SUMMARY: "/batch_summary",
 }
 
 
 class JobsAdminActions(str, Enum):
     LAUNCH = "LAUNCH"
+    LAUNCH_BATCH = "LAUNCH_BATCH"
     FETCH = "FETCH"
     LIST = "LIST"
     LIST_BATCH = "LIST_BATCH"
@@ -35,6 +40,7 @@ class JobsAdminActions(str, Enum):
 
 JOBS_ADMIN_ACTIONS_MAP: Dict[JobsAdminActions, str] = {
     JobsAdminActions.LAUNCH: "/launch",
+    JobsAdminActions.LAUNCH_BATCH: "/launch_batch",
     JobsAdminActions.FETCH: "/fetch",
     JobsAdminActions.LIST: "/list",
     JobsAdminActions.LIST_BATCH: "/list_batch",
@@ -98,6 +104,44 @@ class ListJobsResponse(BaseModel):
     jobs: List[JobStatusTable]
     pagination_key: Optional[PaginationKey]
 
+# -----------------
+# get batch summary
+# -----------------
+
+# req
+# GET
+
+# resp
+
+
+class GetBatchSummaryResponse(BaseModel):
+    summary: BatchCounterTable
+
+# -----------------
+# stream job status
+# -----------------
+
+# req
+# GET - one of session_id or batch_id
+
+# resp
+# text/event-stream - for a job, a status event (JobStatusTable) for its
+# current state then for each status transition. For a batch, a summary event
+# (BatchCounterTable) for its current counts then each time they change. Then
+# an end event
+
+
+class JobStatusStreamEventType(str, Enum):
+    STATUS = "status"
+    SUMMARY = "summary"
+    END = "end"
+
+
+class JobStatusStreamEnd(BaseModel):
+    # True iff all jobs finished, otherwise the stream timed out and can be
+    # reopened
+    complete: bool
+
 # ----------
 # retry job
 # ----------
@@ -135,6 +179,8 @@ class AdminLaunchJobRequest(BaseModel):
     job_sub_type: JobSubType
     # Validated against job types expected payload
     job_payload: Dict[str, Any]
+    # Which queue lane to schedule on?
+    priority: JobPriority = JobPriority.INTERACTIVE
 
     @root_validator(pre=False, skip_on_failure=True)
     def check_batch_setup(cls: Any, values: Dict[str, Any]) -> Dict[str, Any]:
@@ -159,6 +205,79 @@ class AdminLaunchJobResponse(BaseModel):
     # if requested, return the batch id
     batch_id: Optional[str] = None
 
+# -----------------
+# launch job batch
+# -----------------
+
+# Maximum number of jobs in a single launch batch request
+MAX_LAUNCH_BATCH_SIZE = 1000
+
+# req
+# POST
+
+
+class AdminLaunchJobBatchItem(BaseModel):
+    # What subtype?
+    job_sub_type: JobSubType
+    # Validated against job types expected payload
+    job_payload: Dict[str, Any]
+
+
+class AdminLaunchJobBatchRequest(BaseModel):
+    # Who are these being lodged for? Defaults to token username
+    username: Optional[str] = None
+    # Do they need a (shared) batch id?
+    request_batch_id: bool = False
+    # Are they part of an existing batch?
+    add_to_batch: Optional[str] = None
+    # What type of job? All jobs in the request share a type
+    job_type: JobType
+    # The jobs to launch
+    jobs: List[AdminLaunchJobBatchItem]
+    # Which queue lane to schedule on? Batches default to the bulk lane
+    priority: JobPriority = JobPriority.BULK
+
+    @root_validator(pre=False, skip_on_failure=True)
+    def check_batch_setup(cls: Any, values: Dict[str, Any]) -> Dict[str, Any]:
+        request_batch_id: bool = values['request_batch_id']
+        add_to_batch: Optional[str] = values['add_to_batch']
+        jobs: List[AdminLaunchJobBatchItem] = values['jobs']
+
+        if request_batch_id:
+            if add_to_batch is not None:
+                raise ValueError(
+                    "Cannot specify both a new batch and an existing batch id.")
+
+        if len(jobs) == 0 or len(jobs) > MAX_LAUNCH_BATCH_SIZE:
+            raise ValueError(
+                f"Must launch between 1 and {MAX_LAUNCH_BATCH_SIZE} jobs per request.")
+
+        return values
+
+
+# resp
+
+
+class AdminLaunchJobBatchFailure(BaseModel):
+    # position of the job in the request
+    index: int
+    # the session id allocated to the job - its status is marked FAILED. None
+    # if the job could not be reserved (it has no status entry)
+    session_id: Optional[str] = None
+    error: str
+
+
+class AdminLaunchJobBatchResponse(BaseModel):
+    # session ids (unique) in request order - jobs which could not be
+    # reserved are only listed in the failures
+    session_ids: List[str]
+
+    # if requested, return the batch id
+    batch_id: Optional[str] = None
+
+    # jobs which could not be published
+    failures: Optional[List[AdminLaunchJobBatchFailure]] = None
+
 # -------
 # get job
 # -------
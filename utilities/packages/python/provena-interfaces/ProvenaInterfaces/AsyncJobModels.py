@@ -56,6 +56,17 @@ class JobStatus(str, Enum):
     FAILED = "FAILED"
 
 
+class JobPriority(str, Enum):
+    # user facing work which someone is waiting on
+    INTERACTIVE = "INTERACTIVE"
+    # large volumes of background work e.g. batch launches
+    BULK = "BULK"
+
+
+# The SNS message attribute which routes jobs to the queue for their priority
+JOB_PRIORITY_ATTRIBUTE = "priority"
+
+
 class JobTableBase(BaseModel):
     # partition key
     session_id: str
@@ -79,6 +90,9 @@ class JobTableBase(BaseModel):
     # job sub type
     job_sub_type: JobSubType
 
+    # which queue lane is this job scheduled on?
+    priority: JobPriority = JobPriority.INTERACTIVE
+
     # universal gsi field
     gsi_status: str = GSI_VALUE
 
@@ -100,6 +114,37 @@ class JobStatusTable(JobTableBase):
     # If the result has completed successfully, payload associated with it
     result: Optional[Dict[str, Any]]
 
+# Batch Counter Table Entry
+
+
+class BatchCounterTable(BaseModel):
+    # partition key
+    batch_id: str
+
+    # who owns this batch?
+    username: str
+
+    # number of jobs added to the batch
+    total: int = 0
+
+    # number of jobs currently in each status - updated in the same transaction
+    # as each status change
+    pending: int = 0
+    dequeued: int = 0
+    in_progress: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+
+# The batch counter table field for each status
+BATCH_COUNTER_FIELD_MAP: Dict[JobStatus, str] = {
+    JobStatus.PENDING: "pending",
+    JobStatus.DEQUEUED: "dequeued",
+    JobStatus.IN_PROGRESS: "in_progress",
+    JobStatus.SUCCEEDED: "succeeded",
+    JobStatus.FAILED: "failed",
+}
+
 # =====================
 # JOB SUB TYPE PAYLOADS
 # =====================
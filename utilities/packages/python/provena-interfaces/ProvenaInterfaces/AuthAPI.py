@@ -1,6 +1,6 @@
 import string
 from typing import List, Optional, Tuple, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, validator
 from enum import Enum
 # Interface exports prefer relative imports
 # where as pip install prefers module level import
@@ -445,6 +445,9 @@ class DescribeGroupResponse(StatusResponse):
 
 class ListMembersResponse(StatusResponse):
     group: Optional[UserGroup]
+    # username -> linked registry person ID, for members with a link (only
+    # included if requested)
+    person_links: Optional[Dict[str, str]]
 
 
 class ListUserMembershipResponse(StatusResponse):
@@ -589,6 +592,27 @@ class AdminLinkUserLookupResponse(BaseModel):
     # included to specify if the link existed
     success: bool
 
+# Admin -> Lookup batch
+
+MAX_LINK_LOOKUP_BATCH_SIZE = 500
+
+
+class AdminLinkUserLookupBatchRequest(BaseModel):
+    # the usernames to lookup
+    usernames: List[str]
+
+    @validator('usernames')
+    def validate_batch_size(cls, usernames: List[str]) -> List[str]:
+        if len(usernames) == 0 or len(usernames) > MAX_LINK_LOOKUP_BATCH_SIZE:
+            raise ValueError(
+                f"Must request between 1 and {MAX_LINK_LOOKUP_BATCH_SIZE} usernames.")
+        return usernames
+
+
+class AdminLinkUserLookupBatchResponse(BaseModel):
+    # username -> person ID for each requested username with a valid link
+    person_ids: Dict[str, str]
+
 # Admin -> Assign
 
 
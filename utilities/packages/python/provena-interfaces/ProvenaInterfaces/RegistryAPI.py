@@ -58,6 +58,29 @@ class DescribeAccessResponse(BaseModel):
     roles: Roles
 
 
+# Maximum number of ids in a single describe access batch request
+MAX_DESCRIBE_ACCESS_BATCH_SIZE = 500
+
+
+class DescribeAccessBatchRequest(BaseModel):
+    # the ids to describe the user's access to (duplicates are ignored)
+    ids: List[str]
+
+    @validator('ids')
+    def check_batch_size(cls: Any, ids: List[str]) -> List[str]:
+        if len(ids) == 0 or len(ids) > MAX_DESCRIBE_ACCESS_BATCH_SIZE:
+            raise ValueError(
+                f"Must describe access for between 1 and {MAX_DESCRIBE_ACCESS_BATCH_SIZE} ids per request.")
+        return ids
+
+
+class DescribeAccessBatchResponse(BaseModel):
+    # id -> the roles the user has against the item
+    roles: Dict[str, Roles]
+    # ids which were not present in the registry
+    missing: List[str]
+
+
 class AuthRolesResponse(BaseModel):
     # the list of available roles for a given type
     roles: List[DescribedRole]
@@ -237,6 +260,31 @@ class PaginatedDatasetListResponse(StatusResponse):
     pagination_key: Optional[PaginationKey]
 
 
+# Maximum number of items scanned by a single access projection rebuild call
+MAX_ACCESS_PROJECTION_REBUILD_PAGE_SIZE = 100
+
+
+class AccessProjectionRebuildRequest(BaseModel):
+    # Returned by the previous call - omit to start a rebuild
+    pagination_key: Optional[PaginationKey]
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    @validator('page_size')
+    def check_page_size(cls: Any, page_size: int) -> int:
+        if page_size < 1 or page_size > MAX_ACCESS_PROJECTION_REBUILD_PAGE_SIZE:
+            raise ValueError(
+                f"Page size must be between 1 and {MAX_ACCESS_PROJECTION_REBUILD_PAGE_SIZE}.")
+        return page_size
+
+
+class AccessProjectionRebuildResponse(StatusResponse):
+    # the number of items reprojected by this call
+    reprojected_count: int
+    # Pass to the next call to continue the rebuild - not returned once the
+    # rebuild is complete
+    pagination_key: Optional[PaginationKey]
+
+
 class UpdateResponse(StatusResponse):
     # if this item has provenance enabled versioning AND the update was from
     # seed -> complete
@@ -4,8 +4,30 @@ from enum import Enum
 
 try:
     from ProvenaInterfaces.SharedTypes import StatusResponse
+    from ProvenaInterfaces.RegistryModels import RecordInfo, ItemCategory, RecordType, WorkflowTemplateDomainInfo, ModelRunDomainInfo
 except:
     from .SharedTypes import StatusResponse
+    from .RegistryModels import RecordInfo, ItemCategory, RecordType, WorkflowTemplateDomainInfo, ModelRunDomainInfo
+
+# The field in each indexed document which holds the compact search projection
+SEARCH_PROJECTION_FIELD = "projection"
+
+# The field in each indexed document which holds the typed, filterable fields
+SEARCH_STRUCTURED_FIELD = "structured"
+
+# Search ready fields which are already represented at the top level of the
+# projection and therefore are not repeated in key_fields
+PROJECTION_BASE_FIELDS = [
+    'id',
+    'item_category',
+    'item_subtype',
+    'owner_username',
+    'display_name',
+    'user_metadata',
+]
+
+# Key field values are truncated to keep the stored projection compact
+PROJECTION_KEY_FIELD_MAX_LENGTH = 256
 
 
 class SearchResultType(str, Enum):
@@ -13,10 +35,153 @@ class SearchResultType(str, Enum):
     REGISTRY_ITEM = "REGISTRY_ITEM"
 
 
+class SearchResultProjection(BaseModel):
+    # Compact, render ready view of an indexed record. This is written into the
+    # index by the record streamer so that a page of search results can be
+    # displayed without fetching every item from the registry.
+    display_name: Optional[str]
+    item_category: Optional[str]
+    item_subtype: Optional[str]
+    record_type: Optional[str]
+    owner_username: Optional[str]
+    created_timestamp: Optional[int]
+    updated_timestamp: Optional[int]
+
+    # subtype specific search ready fields (truncated)
+    key_fields: Optional[Dict[str, str]]
+
+
+def build_search_projection(record_info: RecordInfo, search_object: Dict[str, str]) -> SearchResultProjection:
+    """
+
+    Builds the compact projection stored alongside the linearised search
+    document.
+
+    Args:
+        record_info (RecordInfo): The parsed record info of the item
+        search_object (Dict[str, str]): The search ready object of the item
+
+    Returns:
+        SearchResultProjection: The projection to store in the index
+    """
+    key_fields: Dict[str, str] = {}
+    for field, value in search_object.items():
+        if field in PROJECTION_BASE_FIELDS or not value:
+            continue
+        key_fields[field] = str(value)[:PROJECTION_KEY_FIELD_MAX_LENGTH]
+
+    return SearchResultProjection(
+        display_name=search_object.get('display_name'),
+        item_category=record_info.item_category.value,
+        item_subtype=record_info.item_subtype.value,
+        record_type=record_info.record_type.value,
+        owner_username=record_info.owner_username,
+        created_timestamp=record_info.created_timestamp,
+        updated_timestamp=record_info.updated_timestamp,
+        key_fields=key_fields if len(key_fields) > 0 else None
+    )
+
+
+class StructuredSearchFields(BaseModel):
+    # Typed fields indexed alongside the linearised field so that searches can
+    # be filtered and faceted within OpenSearch. Ids are keywords and
+    # timestamps are epoch second dates.
+    item_category: str
+    item_subtype: str
+    record_type: str
+    owner_username: str
+    created_timestamp: int
+    updated_timestamp: int
+
+    # related registry items
+    dataset_template_ids: List[str] = []
+    workflow_template_ids: List[str] = []
+    study_ids: List[str] = []
+
+
+def build_structured_fields(record_info: RecordInfo, item: Optional[BaseModel] = None) -> StructuredSearchFields:
+    """
+
+    Builds the typed search fields of a registry item, including the ids of
+    related dataset templates, workflow templates and studies.
+
+    Args:
+        record_info (RecordInfo): The parsed record info of the item
+        item (Optional[BaseModel], optional): The fully parsed item, None for seed items. Defaults to None.
+
+    Returns:
+        StructuredSearchFields: The fields to store in the index
+    """
+    dataset_template_ids: List[str] = []
+    workflow_template_ids: List[str] = []
+    study_ids: List[str] = []
+
+    if isinstance(item, WorkflowTemplateDomainInfo):
+        dataset_template_ids = [
+            t.template_id for t in item.input_templates + item.output_templates
+        ]
+    elif isinstance(item, ModelRunDomainInfo):
+        record = item.record
+        workflow_template_ids = [record.workflow_template_id]
+        dataset_template_ids = [
+            d.dataset_template_id for d in record.inputs + record.outputs
+        ]
+        if record.study_id is not None:
+            study_ids = [record.study_id]
+
+    return StructuredSearchFields(
+        item_category=record_info.item_category.value,
+        item_subtype=record_info.item_subtype.value,
+        record_type=record_info.record_type.value,
+        owner_username=record_info.owner_username,
+        created_timestamp=record_info.created_timestamp,
+        updated_timestamp=record_info.updated_timestamp,
+        # remove duplicates whilst preserving order
+        dataset_template_ids=list(dict.fromkeys(dataset_template_ids)),
+        workflow_template_ids=workflow_template_ids,
+        study_ids=study_ids,
+    )
+
+
+class StructuredSearchFilters(BaseModel):
+    # Filters applied to the structured fields - all provided filters must
+    # match. Timestamps are inclusive unix epoch seconds. Filters other than
+    # the item category and record type match on item metadata, so when used
+    # only items the user can read the metadata of are returned.
+    item_category: Optional[ItemCategory] = None
+    record_type: Optional[RecordType] = None
+    owner_username: Optional[str] = None
+    created_after: Optional[int] = None
+    created_before: Optional[int] = None
+    updated_after: Optional[int] = None
+    updated_before: Optional[int] = None
+    dataset_template_id: Optional[str] = None
+    workflow_template_id: Optional[str] = None
+    study_id: Optional[str] = None
+
+
+class SearchFacet(str, Enum):
+    # values are the structured field which is aggregated. Counts are over
+    # every matching item regardless of access, so only fields which don't
+    # reveal item metadata can be faceted.
+    ITEM_CATEGORY = "item_category"
+    ITEM_SUBTYPE = "item_subtype"
+    RECORD_TYPE = "record_type"
+
+
+class FacetBucket(BaseModel):
+    key: str
+    count: int
+
+
 class QueryResult(BaseModel):
     id: str
     score: float
 
+    # only included when the search is hydrated - may still be missing for
+    # documents indexed before projections were introduced
+    projection: Optional[SearchResultProjection] = None
+
 
 class MixedQueryResult(QueryResult):
     type: SearchResultType
@@ -25,8 +190,38 @@ class MixedQueryResult(QueryResult):
 class QueryResults(StatusResponse):
     results: Optional[List[QueryResult]]
     warnings: Optional[List[str]]
+    # provided for paginated searches when there may be further results
+    next_cursor: Optional[str] = None
+    # counts of matching items for each requested facet
+    facets: Optional[Dict[SearchFacet, List[FacetBucket]]] = None
 
 
 class MixedQueryResults(StatusResponse):
     results: Optional[List[MixedQueryResult]]
     warnings: Optional[List[str]]
+    # provided for paginated searches when there may be further results
+    next_cursor: Optional[str] = None
+
+
+class LatencyHistogramBucket(BaseModel):
+    # upper bound of the bucket in milliseconds - None is the overflow bucket
+    upper_bound_ms: Optional[float]
+    count: int
+
+
+class SearchQueryMetrics(BaseModel):
+    # These are per process (i.e. per lambda container) counters
+    cache_hits: int
+    cache_misses: int
+    coalesced_waits: int
+    upstream_failures: int
+    cached_entries: int
+
+    # latency of search requests made to OpenSearch
+    upstream_request_count: int
+    upstream_latency_total_ms: float
+    upstream_latency_histogram: List[LatencyHistogramBucket]
+
+
+class SearchQueryMetricsResponse(StatusResponse):
+    metrics: SearchQueryMetrics
@@ -0,0 +1,83 @@
+from ProvenaInterfaces.SearchAPI import *
+from ProvenaInterfaces.RegistryModels import RecordInfo, ItemCategory, ItemSubType, RecordType, ModelRunWorkflowTemplateDomainInfo, TemplateResource
+
+
+def example_record_info() -> RecordInfo:
+    return RecordInfo(
+        id="1234",
+        owner_username="user",
+        created_timestamp=100,
+        updated_timestamp=200,
+        item_category=ItemCategory.AGENT,
+        item_subtype=ItemSubType.ORGANISATION,
+        record_type=RecordType.COMPLETE_ITEM,
+    )
+
+
+def test_build_search_projection() -> None:
+    record_info = example_record_info()
+    search_object = {
+        'id': "1234",
+        'item_category': "AGENT",
+        'item_subtype': "ORGANISATION",
+        'owner_username': "user",
+        'display_name': "Example org",
+        'user_metadata': "",
+        'name': "Example org name",
+        'ror': "",
+        'description': "x" * (PROJECTION_KEY_FIELD_MAX_LENGTH * 2),
+    }
+
+    projection = build_search_projection(
+        record_info=record_info, search_object=search_object)
+
+    assert projection.display_name == "Example org"
+    assert projection.item_subtype == ItemSubType.ORGANISATION.value
+    assert projection.record_type == RecordType.COMPLETE_ITEM.value
+    assert projection.created_timestamp == 100
+    assert projection.updated_timestamp == 200
+
+    # base fields are not repeated and empty values are dropped
+    assert projection.key_fields is not None
+    assert set(projection.key_fields.keys()) == {'name', 'description'}
+    assert len(projection.key_fields['description']
+               ) == PROJECTION_KEY_FIELD_MAX_LENGTH
+
+
+def test_build_search_projection_seed_item() -> None:
+    # seed items have no display name or domain info
+    record_info = example_record_info()
+    projection = build_search_projection(
+        record_info=record_info, search_object=record_info.get_search_ready_object())
+
+    assert projection.display_name is None
+    assert projection.key_fields is None
+
+    # round trips through the stored index format
+    result = QueryResult(id="1234", score=1.0,
+                         projection=SearchResultProjection.parse_obj(projection.dict()))
+    assert result.projection == projection
+
+
+def test_build_structured_fields() -> None:
+    record_info = example_record_info()
+
+    # seed items only have record info
+    structured = build_structured_fields(record_info=record_info)
+    assert structured.owner_username == "user"
+    assert structured.created_timestamp == 100
+    assert structured.dataset_template_ids == []
+
+    # workflow templates relate to their (deduplicated) dataset templates
+    template = ModelRunWorkflowTemplateDomainInfo(
+        display_name="template",
+        software_id="software",
+        input_templates=[TemplateResource(
+            template_id="a"), TemplateResource(template_id="b")],
+        output_templates=[TemplateResource(template_id="a")],
+    )
+    structured = build_structured_fields(
+        record_info=record_info, item=template)
+    assert structured.dataset_template_ids == ["a", "b"]
+    assert structured.workflow_template_ids == []
+    assert structured.study_ids == []
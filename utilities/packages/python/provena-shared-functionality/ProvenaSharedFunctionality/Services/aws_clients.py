@@ -0,0 +1,130 @@
+from typing import Any, Dict, Optional, Tuple
+import boto3  # type: ignore
+import os
+import threading
+
+"""
+Process wide registry of boto3 clients and resources.
+
+Creating a client or resource resolves the endpoint and credential chain and
+loads the service model - several milliseconds, which helpers used to spend on
+every call. These are instead created lazily on first use and reused.
+
+Clients are thread safe, so one is shared across the process. Resources (and
+their tables) are not, so each thread gets its own - threads are long lived
+(the event loop, the AWS IO pool, the anyio thread pool) so these are reused
+just the same.
+
+Both are keyed by service and region (AWS_REGION/AWS_DEFAULT_REGION at call
+time), so changing region e.g. between tests is respected.
+"""
+
+ClientKey = Tuple[str, Optional[str]]
+
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[ClientKey, Any] = {}
+_lock = threading.Lock()
+_thread_local = threading.local()
+
+
+def current_region() -> Optional[str]:
+    return os.getenv("AWS_REGION") or os.getenv("AWS_DEFAULT_REGION")
+
+
+def get_session() -> boto3.session.Session:
+    """
+    Returns the process wide boto3 session, creating it on first use. Session
+    creation is not thread safe, so it is guarded by the registry lock.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            _session = boto3.session.Session()
+        return _session
+
+
+def get_client(service_name: str) -> Any:
+    """
+    Returns the shared boto3 client for the service in the current region,
+    creating it on first use.
+
+    Args:
+        service_name: The service e.g. 's3', 'sqs', 'dynamodb'.
+
+    Returns:
+        Any: The boto3 client.
+    """
+    key = (service_name, current_region())
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    session = get_session()
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = session.client(service_name, region_name=key[1])
+            _clients[key] = client
+        return client
+
+
+def get_resource(service_name: str) -> Any:
+    """
+    Returns this thread's boto3 resource for the service in the current
+    region, creating it on first use.
+
+    Args:
+        service_name: The service e.g. 'dynamodb', 's3'.
+
+    Returns:
+        Any: The boto3 resource.
+    """
+    resources: Optional[Dict[ClientKey, Any]] = getattr(
+        _thread_local, "resources", None)
+    if resources is None:
+        resources = {}
+        _thread_local.resources = resources
+    key = (service_name, current_region())
+    resource = resources.get(key)
+    if resource is None:
+        # created from the shared session (which caches the loaded service
+        # models) - one at a time as the session is not thread safe
+        session = get_session()
+        with _lock:
+            resource = session.resource(service_name, region_name=key[1])
+        resources[key] = resource
+    return resource
+
+
+def get_dynamodb_table(table_name: str) -> Any:
+    """
+    Returns this thread's DynamoDB table resource for the table.
+
+    Args:
+        table_name: The table name.
+
+    Returns:
+        Any: The boto3 Table resource.
+    """
+    tables: Optional[Dict[Tuple[str, Optional[str]], Any]] = getattr(
+        _thread_local, "tables", None)
+    if tables is None:
+        tables = {}
+        _thread_local.tables = tables
+    key = (table_name, current_region())
+    table = tables.get(key)
+    if table is None:
+        table = get_resource("dynamodb").Table(table_name)
+        tables[key] = table
+    return table
+
+
+def clear_aws_clients() -> None:
+    """
+    Drops the cached session, clients and this thread's resources - e.g. after
+    changing credentials. Other threads' resources are kept until they end.
+    """
+    global _session
+    with _lock:
+        _session = None
+        _clients.clear()
+    _thread_local.__dict__.clear()
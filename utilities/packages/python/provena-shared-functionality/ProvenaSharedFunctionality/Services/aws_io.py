@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+
+"""
+Non blocking use of boto3 from async (FastAPI) route handlers.
+
+boto3 is blocking - calling it directly in an async def handler stalls every
+other request on the worker for the duration of the call. Instead the (sync)
+helper is run on a dedicated, bounded thread pool and awaited, so slow AWS
+calls only hold a pool thread.
+
+The pool is separate from the starlette/anyio thread pool used for sync routes
+and dependencies, so a burst of slow AWS calls can't starve those (and vice
+versa). Its threads are long lived, so clients/resources they use are reused
+across calls.
+
+Size the pool with the AWS_IO_MAX_WORKERS environment variable.
+"""
+
+AWS_IO_MAX_WORKERS_ENV = "AWS_IO_MAX_WORKERS"
+DEFAULT_AWS_IO_MAX_WORKERS = 32
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def aws_io_max_workers() -> int:
+    """
+    The configured pool size - the AWS_IO_MAX_WORKERS environment variable if
+    set to a positive integer, otherwise the default.
+    """
+    value = os.getenv(AWS_IO_MAX_WORKERS_ENV)
+    try:
+        workers = int(value) if value is not None else DEFAULT_AWS_IO_MAX_WORKERS
+    except ValueError:
+        workers = DEFAULT_AWS_IO_MAX_WORKERS
+    return workers if workers > 0 else DEFAULT_AWS_IO_MAX_WORKERS
+
+
+def get_aws_io_executor() -> ThreadPoolExecutor:
+    """
+    Returns the process wide AWS IO thread pool, creating it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=aws_io_max_workers(),
+                thread_name_prefix="aws-io"
+            )
+        return _executor
+
+
+def configure_aws_io_executor(max_workers: int) -> None:
+    """
+    Replaces the AWS IO thread pool with one of the given size. Calls already
+    running on the previous pool complete on it.
+
+    Args:
+        max_workers: The maximum concurrent AWS calls.
+    """
+    global _executor
+    if max_workers <= 0:
+        raise ValueError("max_workers must be positive.")
+    with _executor_lock:
+        previous = _executor
+        _executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="aws-io"
+        )
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+async def run_aws_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Runs the blocking function on the AWS IO thread pool and awaits the
+    result. Context variables (e.g. the sentry scope) are carried into the
+    call.
+
+    Args:
+        func: The blocking function, e.g. a boto3 helper.
+        *args, **kwargs: The function's arguments.
+
+    Returns:
+        T: The function's result - exceptions are raised as is.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_aws_io_executor(),
+        functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def aws_io(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """
+    Produces an async variant of a blocking helper which is run with
+    run_aws_io, e.g.
+
+    get_entry_raw_async = aws_io(get_entry_raw)
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        return await run_aws_io(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional
+from ProvenaSharedFunctionality.Services.aws_clients import get_resource
+import time
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+# Retries (with backoff) for keys DynamoDB leaves unprocessed
+BATCH_GET_MAX_RETRIES = 5
+
+
+class BatchGetError(Exception):
+    """Raised when items could not be read with BatchGetItem."""
+
+
+def batch_get_items(
+    table_name: str,
+    key_name: str,
+    keys: List[str],
+    attributes: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches the items with the given (string, partition only) keys from the
+    table using BatchGetItem - BATCH_GET_MAX_KEYS per request, retrying any
+    unprocessed keys with backoff.
+
+    Args:
+        table_name: The table to fetch from.
+        key_name: The name of the table's partition key.
+        keys: The keys to fetch - duplicates are ignored.
+        attributes: Only fetch these attributes (the key is always included),
+            by default all attributes.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: key -> item, for the keys which were found.
+
+    Raises:
+        BatchGetError: If the table could not be read or keys remained
+            unprocessed after BATCH_GET_MAX_RETRIES retries.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+
+    # projection - names are substituted as attributes may be reserved words
+    projection: Dict[str, Any] = {}
+    if attributes is not None:
+        names = list(dict.fromkeys([key_name] + attributes))
+        projection = {
+            'ProjectionExpression': ", ".join(f"#a{i}" for i in range(len(names))),
+            'ExpressionAttributeNames': {f"#a{i}": name for i, name in enumerate(names)}
+        }
+
+    ddb_resource = get_resource('dynamodb')
+    found: Dict[str, Dict[str, Any]] = {}
+
+    for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+        request_items: Dict[str, Any] = {
+            table_name: {
+                'Keys': [{key_name: key} for key in unique_keys[start:start + BATCH_GET_MAX_KEYS]],
+                **projection
+            }
+        }
+        retries = 0
+        while request_items:
+            try:
+                response = ddb_resource.batch_get_item(
+                    RequestItems=request_items)
+            except Exception as e:
+                raise BatchGetError(str(e)) from e
+
+            for item in response.get('Responses', {}).get(table_name, []):
+                found[item[key_name]] = item
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                retries += 1
+                if retries > BATCH_GET_MAX_RETRIES:
+                    unprocessed = len(request_items.get(
+                        table_name, {}).get('Keys', []))
+                    raise BatchGetError(
+                        f"{unprocessed} keys were unprocessed after {BATCH_GET_MAX_RETRIES} retries.")
+                time.sleep(0.05 * 2 ** retries)
+
+    return found
@@ -1,9 +1,16 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import  Union
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Union
+import asyncio
 import base64
+import os
+import threading
+import time
 import boto3  # type: ignore
 from botocore.config import Config  # type: ignore
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 # Typed boto3 kms client
 from mypy_boto3_kms.client import KMSClient
@@ -23,6 +30,16 @@ class KMSConfig(EncryptionConfig):
     connect_timeout: int = 5
     read_timeout: int = 10
     max_retries: int = 3
+    # Envelope encryption - messages are encrypted locally (AES-GCM) with a
+    # data key generated by KMS, which is reused for up to
+    # data_key_max_age_seconds or data_key_max_uses messages. Decryption
+    # accepts both envelope and direct KMS ciphertexts either way.
+    envelope_encryption: bool = True
+    data_key_max_age_seconds: int = 300
+    data_key_max_uses: int = 10000
+    # Unwrapped data keys are kept for decrypting later messages
+    decrypt_key_max_age_seconds: int = 3600
+    decrypt_key_cache_size: int = 1000
 
 
 class EncryptionError(Exception):
@@ -30,6 +47,123 @@ class EncryptionError(Exception):
     pass
 
 
+# Envelope ciphertexts are <prefix><encrypted data key>.<nonce + ciphertext>
+# (each base64 encoded) - direct KMS ciphertexts are base64 so never contain
+# the separator
+ENVELOPE_PREFIX = "env1."
+ENVELOPE_SEPARATOR = "."
+NONCE_BYTES = 12
+
+T = TypeVar("T")
+
+
+@dataclass
+class DataKey:
+    # the data key for encrypting messages
+    plaintext: bytes
+    # the data key encrypted by the KMS key - stored with each message
+    encrypted: bytes
+    # monotonic time at which the key was generated
+    created: float
+    # number of messages encrypted with the key
+    uses: int = 0
+
+
+class DataKeyCache:
+    """
+    Process wide cache of the data keys for a single KMS key - the current key
+    used to encrypt messages and the unwrapped keys of received messages. The
+    cache is shared by every service instance for the key, so services can be
+    built per request.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.encrypt_key: Optional[DataKey] = None
+        # encrypted data key -> (data key, monotonic time unwrapped)
+        self.decrypt_keys: OrderedDict[bytes, Tuple[bytes, float]] = OrderedDict()
+
+    def take_encrypt_key(self, max_age_seconds: int, max_uses: int) -> Optional[DataKey]:
+        """
+        Returns the current data key (counting the use) if it is within its
+        lifetime and usage limits.
+        """
+        with self.lock:
+            key = self.encrypt_key
+            if key is None or key.uses >= max_uses or time.monotonic() - key.created >= max_age_seconds:
+                return None
+            key.uses += 1
+            return key
+
+    def store_encrypt_key(self, key: DataKey) -> None:
+        with self.lock:
+            self.encrypt_key = key
+        # messages encrypted with this key can be decrypted without KMS
+        self.store_decrypt_key(encrypted=key.encrypted,
+                               plaintext=key.plaintext, max_size=None)
+
+    def get_decrypt_key(self, encrypted: bytes, max_age_seconds: int) -> Optional[bytes]:
+        with self.lock:
+            entry = self.decrypt_keys.get(encrypted)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] >= max_age_seconds:
+                del self.decrypt_keys[encrypted]
+                return None
+            self.decrypt_keys.move_to_end(encrypted)
+            return entry[0]
+
+    def store_decrypt_key(self, encrypted: bytes, plaintext: bytes, max_size: Optional[int]) -> None:
+        with self.lock:
+            self.decrypt_keys[encrypted] = (plaintext, time.monotonic())
+            self.decrypt_keys.move_to_end(encrypted)
+            while max_size is not None and len(self.decrypt_keys) > max_size:
+                self.decrypt_keys.popitem(last=False)
+
+
+# Shared across the process - keyed by (region, key id)
+data_key_caches: Dict[Tuple[str, str], DataKeyCache] = {}
+# boto3 clients are thread safe and slow to create - keyed by (region,
+# connect timeout, read timeout, max retries)
+kms_clients: Dict[Tuple[str, int, int, int], KMSClient] = {}
+shared_lock = threading.Lock()
+
+
+def get_data_key_cache(config: KMSConfig) -> DataKeyCache:
+    with shared_lock:
+        key = (config.region, config.key_id)
+        cache = data_key_caches.get(key)
+        if cache is None:
+            cache = DataKeyCache()
+            data_key_caches[key] = cache
+        return cache
+
+
+def get_kms_client(config: KMSConfig) -> KMSClient:
+    with shared_lock:
+        key = (config.region, config.connect_timeout,
+               config.read_timeout, config.max_retries)
+        client = kms_clients.get(key)
+        if client is None:
+            client = boto3.client(
+                'kms',
+                region_name=config.region,
+                config=Config(
+                    connect_timeout=config.connect_timeout,
+                    read_timeout=config.read_timeout,
+                    retries={'max_attempts': config.max_retries}
+                )
+            )
+            kms_clients[key] = client
+        return client
+
+
+async def run_blocking(func: Callable[..., T], **kwargs: Any) -> T:
+    # runs a blocking (e.g. boto3) call on the default executor so that the
+    # event loop is not blocked
+    return await asyncio.get_running_loop().run_in_executor(None, partial(func, **kwargs))
+
+
 class EncryptionService(ABC):
     """
     Abstract base class for encryption services.
@@ -84,6 +218,10 @@ class KMSEncryptionService(EncryptionService):
 
     This service uses AWS KMS for encryption and decryption operations, handling
     the specifics of working with KMS including encryption context and error handling.
+
+    In envelope mode (the default) KMS only generates and unwraps data keys,
+    which are cached (see DataKeyCache), and each message is encrypted
+    locally with AES-GCM. KMS calls are run on a thread executor.
     """
 
     def __init__(self, config: KMSConfig):
@@ -94,15 +232,68 @@ class KMSEncryptionService(EncryptionService):
             config: KMS-specific configuration including key ID and AWS settings.
         """
         self.config = config
-        self.client: KMSClient = boto3.client(
-            'kms',
-            region_name=config.region,
-            config=Config(
-                connect_timeout=config.connect_timeout,
-                read_timeout=config.read_timeout,
-                retries={'max_attempts': config.max_retries}
-            )
+        self.client: KMSClient = get_kms_client(config)
+        self.key_cache = get_data_key_cache(config)
+
+    async def get_encrypt_key(self) -> DataKey:
+        key = self.key_cache.take_encrypt_key(
+            max_age_seconds=self.config.data_key_max_age_seconds,
+            max_uses=self.config.data_key_max_uses
+        )
+        if key is not None:
+            return key
+
+        response = await run_blocking(
+            self.client.generate_data_key,
+            KeyId=self.config.key_id,
+            KeySpec='AES_256'
+        )
+        key = DataKey(
+            plaintext=response['Plaintext'],
+            encrypted=response['CiphertextBlob'],
+            created=time.monotonic(),
+            uses=1
         )
+        self.key_cache.store_encrypt_key(key)
+        return key
+
+    async def get_decrypt_key(self, encrypted_key: bytes) -> bytes:
+        key = self.key_cache.get_decrypt_key(
+            encrypted=encrypted_key,
+            max_age_seconds=self.config.decrypt_key_max_age_seconds
+        )
+        if key is not None:
+            return key
+
+        response = await run_blocking(
+            self.client.decrypt,
+            CiphertextBlob=encrypted_key
+        )
+        key = response['Plaintext']
+        self.key_cache.store_decrypt_key(
+            encrypted=encrypted_key,
+            plaintext=key,
+            max_size=self.config.decrypt_key_cache_size
+        )
+        return key
+
+    async def envelope_encrypt(self, plaintext: bytes) -> str:
+        key = await self.get_encrypt_key()
+        nonce = os.urandom(NONCE_BYTES)
+        # the encrypted data key is authenticated with the message
+        ciphertext = AESGCM(key.plaintext).encrypt(
+            nonce, plaintext, key.encrypted)
+        return ENVELOPE_PREFIX + base64.b64encode(key.encrypted).decode('utf-8') + \
+            ENVELOPE_SEPARATOR + \
+            base64.b64encode(nonce + ciphertext).decode('utf-8')
+
+    async def envelope_decrypt(self, ciphertext: str) -> bytes:
+        encoded_key, encoded_message = ciphertext[len(
+            ENVELOPE_PREFIX):].split(ENVELOPE_SEPARATOR)
+        encrypted_key = base64.b64decode(encoded_key)
+        message = base64.b64decode(encoded_message)
+        key = await self.get_decrypt_key(encrypted_key)
+        return AESGCM(key).decrypt(message[:NONCE_BYTES], message[NONCE_BYTES:], encrypted_key)
 
     async def encrypt(
         self,
@@ -125,8 +316,12 @@ class KMSEncryptionService(EncryptionService):
             if isinstance(plaintext, str):
                 plaintext = plaintext.encode('utf-8')
 
+            if self.config.envelope_encryption:
+                return await self.envelope_encrypt(plaintext)
+
             # Encrypt using KMS
-            response = self.client.encrypt(
+            response = await run_blocking(
+                self.client.encrypt,
                 KeyId=self.config.key_id,
                 Plaintext=plaintext,
             )
@@ -154,11 +349,15 @@ class KMSEncryptionService(EncryptionService):
             EncryptionError: If KMS decryption fails.
         """
         try:
+            if ciphertext.startswith(ENVELOPE_PREFIX):
+                return (await self.envelope_decrypt(ciphertext)).decode('utf-8')
+
             # Decode base64 ciphertext
             decoded_ciphertext = base64.b64decode(ciphertext)
 
             # Decrypt using KMS
-            response = self.client.decrypt(
+            response = await run_blocking(
+                self.client.decrypt,
                 CiphertextBlob=decoded_ciphertext,
             )
 
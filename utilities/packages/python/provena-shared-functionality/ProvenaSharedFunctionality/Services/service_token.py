@@ -0,0 +1,328 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi.exceptions import HTTPException
+from requests.auth import HTTPBasicAuth
+import asyncio
+import base64
+import json
+import requests
+import threading
+import time
+
+
+@dataclass
+class ClientCredentials:
+    """Service account (client credentials grant) details."""
+    client_id: str
+    client_secret: str
+    grant_type: str
+    token_endpoint: str
+
+
+# Loads the current credentials, e.g. from a secret - only called when a new
+# token is requested
+CredentialsLoader = Callable[[], ClientCredentials]
+
+# Reads the (string) value of the secret with the given ARN, e.g. through a
+# secret cache
+SecretReader = Callable[[str], str]
+
+
+class ServiceTokenError(Exception):
+    """Raised when a service account token could not be obtained."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        # the token endpoint's response status, if a response was received
+        self.status_code = status_code
+
+
+@dataclass
+class CachedToken:
+    access_token: str
+    # wall clock times - the token must be replaced from refresh_at and is
+    # replaced in the background from refresh_ahead_at
+    refresh_ahead_at: float
+    refresh_at: float
+
+
+def token_lifetime(response_json: Dict[str, Any], access_token: str, default_lifetime_seconds: float) -> float:
+    """
+    Determines the token lifetime in seconds - from the token response's
+    expires_in, otherwise the exp claim of the (JWT) access token, otherwise
+    the default.
+    """
+    expires_in = response_json.get('expires_in')
+    if isinstance(expires_in, (int, float)) and expires_in > 0:
+        return float(expires_in)
+    try:
+        payload = access_token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(
+            payload + '=' * (-len(payload) % 4)))
+        return max(0.0, float(claims['exp']) - time.time())
+    except Exception:
+        return default_lifetime_seconds
+
+
+def request_client_credential_token(credentials: ClientCredentials, timeout_seconds: float, default_lifetime_seconds: float) -> Tuple[str, float]:
+    """
+    Makes a client credentials token request.
+
+    Args:
+        credentials: The client credentials and token endpoint.
+        timeout_seconds: Request timeout.
+        default_lifetime_seconds: Lifetime to assume if the response doesn't include one.
+
+    Returns:
+        Tuple[str, float]: The access token and its lifetime in seconds.
+
+    Raises:
+        ServiceTokenError: If the request fails.
+    """
+    try:
+        response = requests.post(
+            credentials.token_endpoint,
+            data={'grant_type': credentials.grant_type},
+            auth=HTTPBasicAuth(credentials.client_id,
+                               credentials.client_secret),
+            timeout=timeout_seconds
+        )
+    except Exception as e:
+        raise ServiceTokenError(
+            f"Service token request failed: {str(e)}") from e
+
+    if response.status_code != 200:
+        raise ServiceTokenError(
+            f"Service token request failed, code: {response.status_code}.", status_code=response.status_code)
+
+    try:
+        response_json = response.json()
+        access_token = response_json['access_token']
+    except Exception as e:
+        raise ServiceTokenError(
+            f"Service token response could not be parsed: {str(e)}", status_code=response.status_code) from e
+
+    return access_token, token_lifetime(response_json, access_token, default_lifetime_seconds)
+
+
+class ServiceTokenProvider:
+    """
+    Provides a service account access token, cached until shortly before it
+    expires.
+
+    Once a token is refresh_ahead_fraction of the way through its usable
+    lifetime it is still returned, but a replacement is requested in the
+    background, so busy services don't wait for token requests. A token is no
+    longer used within refresh_margin_seconds (at most a quarter of its
+    lifetime) of expiry.
+
+    Only one token request is made at a time - concurrent callers needing a
+    new token wait for it.
+    """
+
+    def __init__(
+        self,
+        load_credentials: CredentialsLoader,
+        refresh_margin_seconds: float = 30,
+        refresh_ahead_fraction: float = 0.8,
+        default_lifetime_seconds: float = 60,
+        timeout_seconds: float = 10
+    ):
+        self.load_credentials = load_credentials
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.refresh_ahead_fraction = refresh_ahead_fraction
+        self.default_lifetime_seconds = default_lifetime_seconds
+        self.timeout_seconds = timeout_seconds
+
+        self.token: Optional[CachedToken] = None
+        # held while requesting a token
+        self.refresh_lock = threading.Lock()
+        self.background_refresh: Optional[threading.Thread] = None
+        self.state_lock = threading.Lock()
+
+    def fetch(self) -> CachedToken:
+        requested_at = time.time()
+        access_token, lifetime = request_client_credential_token(
+            credentials=self.load_credentials(),
+            timeout_seconds=self.timeout_seconds,
+            default_lifetime_seconds=self.default_lifetime_seconds
+        )
+        refresh_at = requested_at + lifetime - \
+            min(self.refresh_margin_seconds, lifetime / 4)
+        token = CachedToken(
+            access_token=access_token,
+            refresh_ahead_at=requested_at +
+            (refresh_at - requested_at) * self.refresh_ahead_fraction,
+            refresh_at=refresh_at
+        )
+        self.token = token
+        return token
+
+    def refresh(self) -> CachedToken:
+        # single flight - whoever gets the lock first fetches, the rest reuse
+        # the result
+        with self.refresh_lock:
+            token = self.token
+            if token is not None and time.time() < token.refresh_at:
+                return token
+            return self.fetch()
+
+    def run_background_refresh(self) -> None:
+        try:
+            with self.refresh_lock:
+                token = self.token
+                if token is None or time.time() >= token.refresh_ahead_at:
+                    self.fetch()
+        except Exception as e:
+            # the token is refreshed when next needed instead
+            print(f"Background service token refresh failed, error: {e}.")
+        finally:
+            with self.state_lock:
+                self.background_refresh = None
+
+    def start_background_refresh(self) -> None:
+        with self.state_lock:
+            if self.background_refresh is not None:
+                return
+            self.background_refresh = threading.Thread(
+                target=self.run_background_refresh, name="service-token-refresh", daemon=True)
+            self.background_refresh.start()
+
+    def cached_token(self) -> Optional[str]:
+        """
+        The current token if it can still be used (never blocks), starting a
+        background refresh if it is due.
+        """
+        token = self.token
+        now = time.time()
+        if token is None or now >= token.refresh_at:
+            return None
+        if now >= token.refresh_ahead_at:
+            self.start_background_refresh()
+        return token.access_token
+
+    def get_token(self) -> str:
+        """
+        Returns a valid access token, requesting one if needed (blocking).
+
+        Raises:
+            ServiceTokenError: If a token could not be obtained.
+        """
+        token = self.cached_token()
+        if token is not None:
+            return token
+        return self.refresh().access_token
+
+    async def get_token_async(self) -> str:
+        """
+        Returns a valid access token - token requests are run on the default
+        executor so the event loop is not blocked.
+
+        Raises:
+            ServiceTokenError: If a token could not be obtained.
+        """
+        token = self.cached_token()
+        if token is not None:
+            return token
+        return (await asyncio.get_running_loop().run_in_executor(None, self.refresh)).access_token
+
+
+# Providers are shared across the process
+service_token_providers: Dict[str, ServiceTokenProvider] = {}
+service_token_providers_lock = threading.Lock()
+
+
+def get_service_token_provider(key: str, load_credentials: CredentialsLoader) -> ServiceTokenProvider:
+    """
+    Returns the process wide token provider for the key (e.g. the service
+    account secret and token endpoint), creating it on first use.
+
+    Args:
+        key: Identifies the service account.
+        load_credentials: Loads the service account credentials when a token is requested.
+
+    Returns:
+        ServiceTokenProvider: The shared provider.
+    """
+    with service_token_providers_lock:
+        provider = service_token_providers.get(key)
+        if provider is None:
+            provider = ServiceTokenProvider(load_credentials=load_credentials)
+            service_token_providers[key] = provider
+        return provider
+
+
+def get_secret_service_token_provider(secret_arn: str, token_endpoint: str, read_secret: SecretReader) -> ServiceTokenProvider:
+    """
+    Returns the process wide token provider for the service account stored
+    (as client_id, client_secret and grant_type json) in the given secret. The
+    secret is only read when a new token is requested.
+
+    Args:
+        secret_arn: The service account secret ARN.
+        token_endpoint: The keycloak token endpoint.
+        read_secret: Reads the secret value.
+
+    Returns:
+        ServiceTokenProvider: The shared provider.
+    """
+    def load_credentials() -> ClientCredentials:
+        secret_json = json.loads(read_secret(secret_arn))
+        return ClientCredentials(
+            client_id=secret_json['client_id'],
+            client_secret=secret_json['client_secret'],
+            grant_type=secret_json['grant_type'],
+            token_endpoint=token_endpoint
+        )
+
+    return get_service_token_provider(
+        key=f"{secret_arn}:{token_endpoint}",
+        load_credentials=load_credentials
+    )
+
+
+def service_token_http_exception(error: ServiceTokenError) -> HTTPException:
+    """
+    Maps a service token failure to the HTTPException the APIs report - always
+    an internal error, as the caller can't fix it.
+    """
+    if error.status_code == 401:
+        return HTTPException(
+            status_code=500,
+            detail="API service account creds appear to be incorrect. Contact administrator."
+        )
+    if error.status_code is not None:
+        return HTTPException(
+            status_code=500,
+            detail=f"API service creds request failed, code: {error.status_code}."
+        )
+    return HTTPException(
+        status_code=500,
+        detail=f"API service creds request failed, error: {error}."
+    )
+
+
+def get_http_service_token(provider: ServiceTokenProvider) -> str:
+    """
+    Returns a token from the provider (blocking if one is requested).
+
+    Raises:
+        HTTPException: 500 if a token could not be obtained.
+    """
+    try:
+        return provider.get_token()
+    except ServiceTokenError as e:
+        raise service_token_http_exception(e)
+
+
+async def get_http_service_token_async(provider: ServiceTokenProvider) -> str:
+    """
+    Returns a token from the provider without blocking the event loop.
+
+    Raises:
+        HTTPException: 500 if a token could not be obtained.
+    """
+    try:
+        return await provider.get_token_async()
+    except ServiceTokenError as e:
+        raise service_token_http_exception(e)
@@ -14,6 +14,8 @@ setup(
         'sentry-sdk[fastapi]',
         'boto3',
         'mypy_boto3_kms',
+        'requests',
+        'cryptography',
         'pydantic[email]==1.10.17'
     ],
     package_data={
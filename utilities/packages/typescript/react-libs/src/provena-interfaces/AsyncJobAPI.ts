@@ -22,6 +22,8 @@ export type JobSubType =
   | "SEND_EMAIL"
   | "GENERATE_REPORT";
 export type JobStatus = "PENDING" | "DEQUEUED" | "IN_PROGRESS" | "SUCCEEDED" | "FAILED";
+export type JobPriority = "INTERACTIVE" | "BULK";
+export type JobStatusStreamEventType = "status" | "summary" | "end";
 export type DatasetType = "DATA_STORE";
 export type ItemSubType =
   | "WORKFLOW_RUN"
@@ -72,6 +74,7 @@ export interface JobStatusTable {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
   status: JobStatus;
   info?: string;
@@ -79,6 +82,30 @@ export interface JobStatusTable {
     [k: string]: unknown;
   };
 }
+export interface AdminLaunchJobBatchFailure {
+  index: number;
+  session_id?: string;
+  error: string;
+}
+export interface AdminLaunchJobBatchItem {
+  job_sub_type: JobSubType;
+  job_payload: {
+    [k: string]: unknown;
+  };
+}
+export interface AdminLaunchJobBatchRequest {
+  username?: string;
+  request_batch_id?: boolean;
+  add_to_batch?: string;
+  job_type: JobType;
+  jobs: AdminLaunchJobBatchItem[];
+  priority?: JobPriority;
+}
+export interface AdminLaunchJobBatchResponse {
+  session_ids: string[];
+  batch_id?: string;
+  failures?: AdminLaunchJobBatchFailure[];
+}
 export interface AdminLaunchJobRequest {
   username?: string;
   request_batch_id?: boolean;
@@ -88,6 +115,7 @@ export interface AdminLaunchJobRequest {
   job_payload: {
     [k: string]: unknown;
   };
+  priority?: JobPriority;
 }
 export interface AdminLaunchJobResponse {
   session_id: string;
@@ -123,6 +151,16 @@ export interface AdminListJobsResponse {
 export interface AdminRetryJobResponse {
   session_id: string;
 }
+export interface BatchCounterTable {
+  batch_id: string;
+  username: string;
+  total?: number;
+  pending?: number;
+  dequeued?: number;
+  in_progress?: number;
+  succeeded?: number;
+  failed?: number;
+}
 export interface EmailSendEmailPayload {
   email_to: string;
   subject: string;
@@ -130,6 +168,9 @@ export interface EmailSendEmailPayload {
   reason: string;
 }
 export interface EmailSendEmailResult {}
+export interface GetBatchSummaryResponse {
+  summary: BatchCounterTable;
+}
 export interface GetJobResponse {
   job: JobStatusTable;
 }
@@ -143,8 +184,12 @@ export interface JobSnsPayload {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
 }
+export interface JobStatusStreamEnd {
+  complete: boolean;
+}
 export interface JobTableBase {
   session_id: string;
   created_timestamp: number;
@@ -155,6 +200,7 @@ export interface JobTableBase {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
 }
 export interface ListByBatchRequest {
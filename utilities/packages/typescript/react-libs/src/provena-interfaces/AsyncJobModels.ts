@@ -22,6 +22,7 @@ export type JobSubType =
   | "SEND_EMAIL"
   | "GENERATE_REPORT";
 export type JobStatus = "PENDING" | "DEQUEUED" | "IN_PROGRESS" | "SUCCEEDED" | "FAILED";
+export type JobPriority = "INTERACTIVE" | "BULK";
 export type DatasetType = "DATA_STORE";
 export type ItemSubType =
   | "WORKFLOW_RUN"
@@ -76,6 +77,7 @@ export interface JobSnsPayload {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
 }
 export interface JobStatusTable {
@@ -88,6 +90,7 @@ export interface JobStatusTable {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
   status: JobStatus;
   info?: string;
@@ -105,6 +108,7 @@ export interface JobTableBase {
   };
   job_type: JobType;
   job_sub_type: JobSubType;
+  priority?: JobPriority;
   gsi_status?: string;
 }
 export interface ModelRunRecord {
@@ -118,6 +118,14 @@ export interface AdminLinkUserAssignRequest {
 }
 export interface AdminLinkUserAssignResponse {}
 export interface AdminLinkUserClearResponse {}
+export interface AdminLinkUserLookupBatchRequest {
+  usernames: string[];
+}
+export interface AdminLinkUserLookupBatchResponse {
+  person_ids: {
+    [k: string]: string;
+  };
+}
 export interface AdminLinkUserLookupResponse {
   person_id?: string;
   success: boolean;
@@ -227,6 +235,9 @@ export interface ListGroupsResponse {
 export interface ListMembersResponse {
   status: Status;
   group?: UserGroup;
+  person_links?: {
+    [k: string]: string;
+  };
 }
 export interface UserGroup {
   id: string;
@@ -59,6 +59,19 @@ export interface AccessInfo {
    */
   description?: string;
 }
+export interface AccessProjectionRebuildRequest {
+  pagination_key?: {
+    [k: string]: unknown;
+  };
+  page_size?: number;
+}
+export interface AccessProjectionRebuildResponse {
+  status: Status;
+  reprojected_count: number;
+  pagination_key?: {
+    [k: string]: unknown;
+  };
+}
 export interface AccessSettings {
   owner: string;
   general: string[];
@@ -599,6 +612,15 @@ export interface DatasetTemplateSeedResponse {
 export interface DescribeAccessResponse {
   roles: string[];
 }
+export interface DescribeAccessBatchRequest {
+  ids: string[];
+}
+export interface DescribeAccessBatchResponse {
+  roles: {
+    [k: string]: string[];
+  };
+  missing: string[];
+}
 export interface EntityBase {
   history: HistoryEntryDomainInfoBase[];
   display_name: string;
@@ -6,16 +6,55 @@
 */
 
 export type SearchResultType = "DATASET" | "REGISTRY_ITEM";
+export type ItemCategory = "ACTIVITY" | "AGENT" | "ENTITY";
+export type RecordType = "SEED_ITEM" | "COMPLETE_ITEM";
+export type SearchFacet = "item_category" | "item_subtype" | "record_type";
 
+export interface FacetBucket {
+  key: string;
+  count: number;
+}
+export interface LatencyHistogramBucket {
+  upper_bound_ms?: number;
+  count: number;
+}
 export interface MixedQueryResult {
   id: string;
   score: number;
+  projection?: SearchResultProjection;
   type: SearchResultType;
 }
 export interface MixedQueryResults {
   status: Status;
   results?: MixedQueryResult[];
   warnings?: string[];
+  next_cursor?: string;
+}
+export interface SearchQueryMetrics {
+  cache_hits: number;
+  cache_misses: number;
+  coalesced_waits: number;
+  upstream_failures: number;
+  cached_entries: number;
+  upstream_request_count: number;
+  upstream_latency_total_ms: number;
+  upstream_latency_histogram: LatencyHistogramBucket[];
+}
+export interface SearchQueryMetricsResponse {
+  status: Status;
+  metrics: SearchQueryMetrics;
+}
+export interface SearchResultProjection {
+  display_name?: string;
+  item_category?: string;
+  item_subtype?: string;
+  record_type?: string;
+  owner_username?: string;
+  created_timestamp?: number;
+  updated_timestamp?: number;
+  key_fields?: {
+    [k: string]: string;
+  };
 }
 export interface Status {
   success: boolean;
@@ -24,15 +63,43 @@ export interface Status {
 export interface QueryResult {
   id: string;
   score: number;
+  projection?: SearchResultProjection;
 }
 export interface QueryResults {
   status: Status;
   results?: QueryResult[];
   warnings?: string[];
+  next_cursor?: string;
+  facets?: {
+    [k: string]: FacetBucket[];
+  };
 }
 export interface StatusResponse {
   status: Status;
 }
+export interface StructuredSearchFields {
+  item_category: string;
+  item_subtype: string;
+  record_type: string;
+  owner_username: string;
+  created_timestamp: number;
+  updated_timestamp: number;
+  dataset_template_ids?: string[];
+  workflow_template_ids?: string[];
+  study_ids?: string[];
+}
+export interface StructuredSearchFilters {
+  item_category?: ItemCategory;
+  record_type?: RecordType;
+  owner_username?: string;
+  created_after?: number;
+  created_before?: number;
+  updated_after?: number;
+  updated_before?: number;
+  dataset_template_id?: string;
+  workflow_template_id?: string;
+  study_id?: string;
+}
 export interface UserInfo {
   username: string;
   email: string;
@@ -83,6 +83,8 @@ export const REGISTRY_STORE_GENERIC_API_ENDPOINTS = {
   // GENERIC
   PAGINATED_LIST: REGISTRY_STORE_API_URL + "/registry/general/list",
   FETCH_ITEM: REGISTRY_STORE_API_URL + "/registry/general/fetch",
+  DESCRIBE_ACCESS_BATCH:
+    REGISTRY_STORE_API_URL + "/registry/general/describe_access_batch",
   // ENTITY DATASET
   APPROVAL_REQUEST_LIST:
     REGISTRY_STORE_API_URL + "/registry/entity/dataset/user/releases",
@@ -149,6 +151,7 @@ export const AUTH_API_ENDPOINTS = {
   USER_LINK_LOOKUP: AUTH_API_URL + userLinkPrefix + "/lookup",
   USER_LINK_VALIDATE: AUTH_API_URL + userLinkPrefix + "/validate",
   USER_LINK_ASSIGN: AUTH_API_URL + userLinkPrefix + "/assign",
+  ADMIN_LINK_LOOKUP_BATCH: AUTH_API_URL + "/link/admin/lookup_batch",
 };
 
 const SPECIAL_QUERY_BASE = PROV_API_URL + "/explore/special";
@@ -8,13 +8,14 @@ import { UntypedFetchResponse } from "../provena-interfaces/RegistryAPI";
 import { ItemSubType } from "../provena-interfaces/RegistryModels";
 import { requestErrToMsg } from "../util";
 
-export const searchRegistry = (query: string, searchResultsLimit?: number, subtypeFilter?: ItemSubType) => {
+export const searchRegistry = (query: string, searchResultsLimit?: number, subtypeFilter?: ItemSubType, hydrate?: boolean) => {
   const endpoint = SEARCH_API_ENDPOINTS.SEARCH_REGISTRY;
 
   var params = {
     query: query,
     ...(subtypeFilter && {subtype_filter: subtypeFilter}),
     ...(searchResultsLimit && {record_limit: searchResultsLimit}),
+    ...(hydrate && {hydrate: hydrate}),
   };
 
   return requests